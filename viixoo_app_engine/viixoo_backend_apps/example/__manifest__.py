@@ -0,0 +1,7 @@
+"""Manifest of the example app."""
+
+{
+    "name": "Example",
+    "depends": [],
+    "installable": True,
+}
@@ -17,8 +17,8 @@ class ExampleService(BaseService):
         ]
 
     def get_all_examples(self):
-        """Return all examples."""
-        return [example.model_dump() for example in self.examples]
+        """Return all examples, serialized by the route without dumping them first."""
+        return self.examples
 
     def get_example(self, id: int):
         """Return example by id."""
@@ -0,0 +1,99 @@
+"""Tests for the BootCache class."""
+
+import os
+from unittest.mock import patch
+from fastapi import FastAPI
+from viixoo_core.boot_cache import BootCache
+
+
+def make_apps(path):
+    """Create an app with a manifest and return the path of its init file."""
+    app_path = path / "sale"
+    app_path.mkdir()
+    (app_path / "__manifest__.py").write_text('{"depends": []}')
+    init_path = app_path / "__init__.py"
+    init_path.write_text("VALUE = 1\n")
+    return init_path
+
+
+def make_app():
+    """Create an application with a route."""
+    app = FastAPI()
+
+    @app.get("/sale")
+    async def get_sales():
+        return []
+
+    return app
+
+
+class TestBootCache:
+    """Tests for the BootCache class."""
+
+    def test_is_fresh(self, tmp_path):
+        """Test is_fresh hashes the files with a new modification time."""
+        # Arrange
+        init_path = make_apps(tmp_path)
+        sources = BootCache.get_sources(str(tmp_path))
+
+        # Act & Assert
+        assert BootCache.is_fresh(sources, str(tmp_path))
+        os.utime(init_path, ns=(0, 0))
+        assert BootCache.is_fresh(sources, str(tmp_path))
+        init_path.write_text("VALUE = 2\n")
+        assert not BootCache.is_fresh(sources, str(tmp_path))
+
+    def test_is_fresh_new_file(self, tmp_path):
+        """Test is_fresh when a source file was added."""
+        # Arrange
+        make_apps(tmp_path)
+        sources = BootCache.get_sources(str(tmp_path))
+        (tmp_path / "sale" / "models.py").write_text("")
+
+        # Act & Assert
+        assert not BootCache.is_fresh(sources, str(tmp_path))
+
+    def test_build_and_load(self, tmp_path, capsys):
+        """Test load returns the cache written by build while the sources are unchanged."""
+        # Arrange
+        init_path = make_apps(tmp_path)
+        cache_path = str(tmp_path / "cache.json")
+        BootCache.write(BootCache.build(make_app(), str(tmp_path)), cache_path)
+
+        # Act
+        with patch.object(BootCache, "path", cache_path):
+            cache = BootCache.load(str(tmp_path))
+            init_path.write_text("VALUE = 2\n")
+            stale_cache = BootCache.load(str(tmp_path))
+
+        # Assert
+        assert list(cache["manifests"]) == ["sale"]
+        assert cache["routes"] == [["/sale", ["GET"], "get_sales"]]
+        assert "/sale" in cache["openapi"]["paths"]
+        assert stale_cache is None
+        assert "is stale" in capsys.readouterr().out
+
+    def test_load_missing(self, tmp_path):
+        """Test load when the cache was not built."""
+        # Act & Assert
+        with patch.object(BootCache, "path", str(tmp_path / "missing.json")):
+            assert BootCache.load(str(tmp_path)) is None
+        with patch.object(BootCache, "path", None):
+            assert BootCache.load(str(tmp_path)) is None
+
+    def test_apply(self, capsys):
+        """Test apply uses the cached OpenAPI document only if the routes match."""
+        # Arrange
+        app = make_app()
+        cache = {"routes": BootCache.get_routes(app), "openapi": {"cached": True}}
+        other_app = make_app()
+        other_app.get("/stock")(lambda: [])
+
+        # Act
+        BootCache.apply(app, cache)
+        BootCache.apply(other_app, cache)
+
+        # Assert
+        assert app.openapi() == {"cached": True}
+        assert other_app.openapi_schema is None
+        assert "The routes differ" in capsys.readouterr().out
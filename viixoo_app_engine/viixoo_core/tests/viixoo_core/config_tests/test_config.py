@@ -3,7 +3,8 @@
 import pytest
 from unittest.mock import patch, mock_open
 import os
-from viixoo_core.config import BaseConfig
+import signal
+from viixoo_core.config import BaseConfig, DatabaseSettings
 
 
 class TestBaseConfig:
@@ -175,3 +176,73 @@ class TestBaseConfig:
             "📂 Config from file: /test/path/test_module/test_module.conf"
             in captured.out
         )
+
+
+class TestSettings:
+    """Test the cached typed settings of BaseConfig."""
+
+    def setup_method(self):
+        """Forget the settings of the other tests."""
+        BaseConfig.settings.clear()
+        BaseConfig.files.clear()
+
+    @patch.dict("os.environ", clear=True)
+    def test_get_settings_cached(self, tmp_path):
+        """Test get_settings reads the config file once."""
+        # Arrange
+        (tmp_path / "sale").mkdir()
+        (tmp_path / "sale" / "sale.conf").write_text(
+            "[database]\ndb_type=postgresql\ndbname=sale_db\nreplicas=replica1, replica2"
+        )
+
+        # Act
+        with patch.object(
+            BaseConfig, "get_config", wraps=BaseConfig.get_config
+        ) as mock_get_config:
+            settings = BaseConfig.get_settings(str(tmp_path), "sale")
+            same_settings = BaseConfig.get_settings(str(tmp_path), "sale")
+
+        # Assert
+        assert isinstance(settings, DatabaseSettings)
+        assert settings is same_settings
+        assert settings.dbname == "sale_db"
+        assert settings.replicas == ["replica1", "replica2"]
+        mock_get_config.assert_called_once()
+
+    @patch.dict("os.environ", clear=True)
+    @patch.object(BaseConfig, "check_interval", 0)
+    def test_get_settings_file_changed(self, tmp_path, capsys):
+        """Test get_settings reloads the settings when the config file changed."""
+        # Arrange
+        file_path = tmp_path / "sale" / "sale.conf"
+        file_path.parent.mkdir()
+        file_path.write_text("[database]\ndb_type=postgresql\ndbname=sale_db")
+        BaseConfig.get_settings(str(tmp_path), "sale")
+        version = BaseConfig.version
+
+        # Act
+        file_path.write_text("[database]\ndb_type=postgresql\ndbname=new_db")
+        mtime = os.stat(file_path).st_mtime_ns + 1
+        os.utime(file_path, ns=(mtime, mtime))
+        settings = BaseConfig.get_settings(str(tmp_path), "sale")
+
+        # Assert
+        assert settings.dbname == "new_db"
+        assert BaseConfig.version == version + 1
+        assert "🔄 Config file changed" in capsys.readouterr().out
+
+    @patch.object(BaseConfig, "reload")
+    def test_install_reload_signal(self, mock_reload):
+        """Test install_reload_signal reloads the settings on SIGHUP."""
+        # Arrange
+        previous_handler = signal.getsignal(signal.SIGHUP)
+
+        # Act
+        try:
+            BaseConfig.install_reload_signal()
+            signal.raise_signal(signal.SIGHUP)
+        finally:
+            signal.signal(signal.SIGHUP, previous_handler)
+
+        # Assert
+        mock_reload.assert_called_once()
@@ -0,0 +1,148 @@
+"""Tests for the apps loaded from their manifests."""
+
+import sys
+import pytest
+from viixoo_core.import_utils import ImportUtils
+
+
+def make_app(path, name, manifest=None, code=""):
+    """Create the package of an app with its manifest."""
+    app_path = path / name
+    app_path.mkdir()
+    (app_path / "__init__.py").write_text(code)
+    if manifest is not None:
+        (app_path / "__manifest__.py").write_text(
+            f'"""Manifest of {name}."""\n\n{manifest!r}\n'
+        )
+
+
+class TestLoadApps:
+    """Tests for the apps loaded from their manifests."""
+
+    def test_get_manifests(self, tmp_path):
+        """Test get_manifests reads the manifests and defaults the missing ones."""
+        # Arrange
+        make_app(tmp_path, "partner")
+        make_app(tmp_path, "sale", {"name": "Sales", "depends": ["partner"]})
+        (tmp_path / "not_an_app").mkdir()
+        (tmp_path / "file.txt").write_text("")
+
+        # Act
+        manifests = ImportUtils.get_manifests(str(tmp_path))
+
+        # Assert
+        assert list(manifests) == ["partner", "sale"]
+        assert manifests["partner"]["depends"] == []
+        assert manifests["partner"]["installable"] is True
+        assert manifests["sale"]["name"] == "Sales"
+        assert manifests["sale"]["depends"] == ["partner"]
+        assert manifests["sale"]["path"] == str(tmp_path / "sale")
+
+    def test_get_manifests_invalid(self, tmp_path, capsys):
+        """Test get_manifests marks the apps with an invalid manifest as failed."""
+        # Arrange
+        manifests = {
+            "empty": "",
+            "docstring": '"""Manifest of docstring."""\n',
+            "not_a_dict": '["depends"]\n',
+            "syntax_error": "{'depends': [\n",
+        }
+        for name, content in manifests.items():
+            make_app(tmp_path, name)
+            (tmp_path / name / "__manifest__.py").write_text(content)
+
+        # Act
+        manifests = ImportUtils.get_manifests(str(tmp_path))
+
+        # Assert
+        assert sorted(manifests) == ["docstring", "empty", "not_a_dict", "syntax_error"]
+        for name, manifest in manifests.items():
+            assert manifest["installable"] is False
+            assert manifest["error"]
+            assert manifest["path"] == str(tmp_path / name)
+        captured = capsys.readouterr().out
+        assert "❌ Invalid manifest of app 'empty'" in captured
+        assert "❌ Invalid manifest of app 'docstring'" in captured
+
+    def test_resolve_dependencies(self):
+        """Test resolve_dependencies groups the needed apps in dependency levels."""
+        # Arrange
+        manifests = {
+            "base": {"depends": [], "installable": True},
+            "partner": {"depends": ["base"], "installable": True},
+            "product": {"depends": ["base"], "installable": True},
+            "sale": {"depends": ["partner", "product"], "installable": True},
+            "stock": {"depends": ["product"], "installable": False},
+        }
+
+        # Act & Assert
+        assert ImportUtils.resolve_dependencies(manifests) == [
+            ["base"],
+            ["partner", "product"],
+            ["sale"],
+        ]
+        assert ImportUtils.resolve_dependencies(manifests, ["stock"]) == [
+            ["base"],
+            ["product"],
+            ["stock"],
+        ]
+
+    def test_resolve_dependencies_errors(self):
+        """Test resolve_dependencies with a missing app and circular dependencies."""
+        # Arrange
+        manifests = {
+            "a": {"depends": ["b"], "installable": True},
+            "b": {"depends": ["a"], "installable": True},
+            "c": {"depends": ["missing"], "installable": True},
+        }
+
+        # Act & Assert
+        with pytest.raises(ValueError) as e:
+            ImportUtils.resolve_dependencies(manifests, ["c"])
+        assert "App 'missing' not found" in str(e.value)
+        with pytest.raises(ValueError) as e:
+            ImportUtils.resolve_dependencies(manifests, ["a"])
+        assert "Circular dependencies between apps: a, b" in str(e.value)
+
+    def test_load_apps(self, tmp_path, capsys):
+        """Test load_apps imports the apps in order and isolates the failed ones."""
+        # Arrange
+        make_app(tmp_path, "la_base", code="VALUE = 1\n")
+        make_app(
+            tmp_path,
+            "la_sale",
+            {"depends": ["la_base"]},
+            "from la_base import VALUE\nDOUBLE = VALUE * 2\n",
+        )
+        make_app(tmp_path, "la_broken", code="raise RuntimeError('boom')\n")
+        make_app(tmp_path, "la_report", {"depends": ["la_broken"]})
+        make_app(tmp_path, "la_invalid")
+        (tmp_path / "la_invalid" / "__manifest__.py").write_text("")
+        make_app(tmp_path, "la_stock", {"depends": ["la_invalid"]})
+
+        # Act
+        try:
+            modules = ImportUtils.load_apps(str(tmp_path), jobs=2)
+        finally:
+            for name in ("la_base", "la_sale", "la_broken", "la_report", "la_stock"):
+                sys.modules.pop(name, None)
+
+        # Assert
+        assert list(modules) == ["la_base", "la_sale"]
+        assert modules["la_sale"].DOUBLE == 2
+        assert set(ImportUtils.import_times) == {"la_base", "la_sale"}
+        captured = capsys.readouterr().out
+        assert "❌ Error importing app 'la_broken': boom" in captured
+        assert "⏭️ App 'la_report' skipped" in captured
+        assert "⏭️ App 'la_invalid' skipped, its manifest is invalid" in captured
+        assert "⏭️ App 'la_stock' skipped" in captured
+        assert "2 apps imported" in captured and "4 failed" in captured
+
+    def test_load_apps_not_found(self, tmp_path, capsys):
+        """Test load_apps when the apps directory does not exist."""
+        # Act
+        modules = ImportUtils.load_apps(str(tmp_path / "missing"))
+
+        # Assert
+        assert modules == {}
+        assert "not found" in capsys.readouterr().out
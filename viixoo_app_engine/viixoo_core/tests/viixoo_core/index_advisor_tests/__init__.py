@@ -0,0 +1 @@
+"""Init package."""
@@ -0,0 +1,139 @@
+"""Tests for the IndexAdvisor class."""
+
+import json
+from typing import Optional
+from pydantic import Field
+from viixoo_core.index_advisor import IndexAdvisor
+from viixoo_core.models.base import BaseDBModel
+
+
+class PartnerModel(BaseDBModel):
+    """Mock model for the index advisor."""
+
+    __tablename__ = "partner"
+    __indexes__ = [{"columns": ["company_id", "active"]}]
+
+    name: Optional[str] = None
+    email: Optional[str] = Field(default=None, json_schema_extra=dict(unique=True))
+    company_id: Optional[int] = None
+    active: Optional[bool] = None
+    create_date: Optional[str] = None
+
+
+def entry(shape, count=20, total_time=2.0, explained=0, seq_scans=0):
+    """Build a recorded stats entry."""
+    return {
+        "shape": shape,
+        "count": count,
+        "total_time": total_time,
+        "max_time": 0.5,
+        "explained": explained,
+        "seq_scans": seq_scans,
+    }
+
+
+class TestIndexAdvisor:
+    """Tests for the IndexAdvisor class."""
+
+    def test_get_candidates_and(self):
+        """Test get_candidates puts the equality columns before the range column."""
+        # Arrange
+        shape = [["create_date", ">"], ["active", "="], ["name", "ilike"]]
+
+        # Act
+        candidates = IndexAdvisor.get_candidates(shape)
+
+        # Assert
+        assert candidates == [
+            ("trigram", ("name",)),
+            ("btree", ("active", "create_date")),
+        ]
+
+    def test_get_candidates_or(self):
+        """Test get_candidates suggests one index per column in OR conditions."""
+        # Arrange
+        shape = ["|", ["email", "="], ["company_id", "in"]]
+
+        # Act
+        candidates = IndexAdvisor.get_candidates(shape)
+
+        # Assert
+        assert candidates == [("btree", ("email",)), ("btree", ("company_id",))]
+
+    def test_suggest(self, capsys):
+        """Test suggest skips the covered, rare and index-served candidates."""
+        # Arrange
+        stats = {
+            "partner": {
+                "a": entry(
+                    [["create_date", ">"], ["name", "ilike"]], explained=4, seq_scans=2
+                ),
+                "b": entry([["active", "="], ["company_id", "="]], total_time=9.0),
+                "c": entry([["email", "="]], total_time=9.0),
+                "d": entry([["name", "="]], count=2),
+                "e": entry([["id", "="]]),
+                "f": entry([["active", "="]], explained=3, seq_scans=0),
+            },
+            "unknown": {"a": entry([["name", "="]])},
+        }
+
+        # Act
+        suggestions = IndexAdvisor.suggest(stats, {"partner": PartnerModel})
+
+        # Assert
+        assert list(suggestions) == ["partner"]
+        assert [(s["kind"], s["columns"]) for s in suggestions["partner"]] == [
+            ("trigram", ["name"]),
+            ("btree", ["create_date"]),
+        ]
+        assert suggestions["partner"][0]["score"] == 3.0
+        captured = capsys.readouterr()
+        assert "No model found for table 'unknown'" in captured.out
+
+    def test_load_stats(self, tmp_path):
+        """Test load_stats merges the files of every process."""
+        # Arrange
+        shape = [["name", "="]]
+        key = json.dumps(shape)
+        first = {"partner": {key: entry(shape, count=1, total_time=1.0)}}
+        second = {"partner": {key: entry(shape, count=2, total_time=0.5, explained=1)}}
+        (tmp_path / "advisor-1.json").write_text(json.dumps(first))
+        (tmp_path / "advisor-2.json").write_text(json.dumps(second))
+
+        # Act
+        stats = IndexAdvisor.load_stats(str(tmp_path))
+
+        # Assert
+        assert stats["partner"][key]["count"] == 3
+        assert stats["partner"][key]["total_time"] == 1.5
+        assert stats["partner"][key]["explained"] == 1
+
+    def test_get_candidates_json(self):
+        """Test get_candidates suggests a GIN index for the containment of a JSONB field."""
+        # Arrange
+        shape = [["attributes.color", "="], ["attributes.width", ">"], ["active", "="]]
+
+        # Act
+        candidates = IndexAdvisor.get_candidates(shape)
+
+        # Assert
+        assert candidates == [("jsonb", ("attributes",)), ("btree", ("active",))]
+        assert IndexAdvisor.format_suggestion(
+            {**entry([]), "kind": "jsonb", "columns": ["attributes"]}
+        ).startswith('attributes: json_schema_extra=dict(index="jsonb_path_ops")')
+
+    def test_format_suggestion(self):
+        """Test format_suggestion for each kind of suggestion."""
+        # Arrange
+        suggestion = entry([], count=4, total_time=0.02, explained=2, seq_scans=1)
+
+        # Act & Assert
+        assert IndexAdvisor.format_suggestion(
+            {**suggestion, "kind": "btree", "columns": ["active", "create_date"]}
+        ) == (
+            '__indexes__: {"columns": ["active", "create_date"]}'
+            "  # 4 queries, avg 5.00 ms, 1/2 sampled seq scans"
+        )
+        assert IndexAdvisor.format_suggestion(
+            {**suggestion, "kind": "trigram", "columns": ["name"]}
+        ).startswith('name: json_schema_extra=dict(search_index="trigram")')
@@ -0,0 +1,157 @@
+"""Tests for the data change tracking and the migration_logs_data partitions of the Migration class."""
+
+import datetime
+import pytest
+from unittest.mock import MagicMock, patch
+from pydantic import Field
+from viixoo_core.migrations import Migration
+from viixoo_core.models.base import BaseDBModel
+
+
+class OrderModel(BaseDBModel):
+    """Mock model with statement-level tracking."""
+
+    __tablename__ = "sale_order"
+    __tracking__ = {"mode": "statement", "format": "jsonb"}
+
+    name: str = Field(json_schema_extra=dict(track_changes=True))
+    state: str = Field(json_schema_extra=dict(track_changes=True))
+
+
+class TestDataTracking:
+    """Tests for the data change tracking triggers."""
+
+    def test_pydantic_to_sql_tracking(self):
+        """Test pydantic_to_sql adds the tracking config of the model."""
+        # Act
+        schema = Migration.pydantic_to_sql(OrderModel)
+
+        # Assert
+        assert schema["__tracking__"] == {"mode": "statement", "format": "jsonb"}
+        assert "__tracking__" not in Migration.get_columns(schema)
+
+    def test_pydantic_to_sql_tracking_unsupported_mode(self):
+        """Test pydantic_to_sql with an unsupported tracking mode."""
+
+        class WrongModel(BaseDBModel):
+            __tablename__ = "wrong"
+            __tracking__ = {"mode": "transaction"}
+
+        # Act & Assert
+        with pytest.raises(ValueError) as e:
+            Migration.pydantic_to_sql(WrongModel)
+        assert "Unsupported tracking mode 'transaction'" in str(e.value)
+
+    @patch.object(Migration, "log_change")
+    def test_enable_data_tracking_statement(self, mock_log_change):
+        """Test enable_data_tracking creates a statement trigger per event."""
+        # Arrange
+        cursor = MagicMock()
+        schema = Migration.pydantic_to_sql(OrderModel)
+
+        # Act
+        Migration.enable_data_tracking(cursor, "sale_order", schema)
+
+        # Assert
+        queries = [c[0][0] for c in cursor.execute.call_args_list]
+        function = queries[0]
+        assert "FROM new_rows n JOIN old_rows o ON o.id = n.id" in function
+        assert "jsonb_build_object('name', n.name, 'state', n.state)" in function
+        assert "DROP TRIGGER IF EXISTS sale_order_track_changes ON sale_order;" in (
+            queries[1]
+        )
+        triggers = queries[2:]
+        assert len(triggers) == 3
+        assert "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows" in triggers[1]
+        assert all("FOR EACH STATEMENT" in trigger for trigger in triggers)
+        mock_log_change.assert_called_once()
+
+    @patch.object(Migration, "log_change")
+    def test_enable_data_tracking_row(self, mock_log_change):
+        """Test enable_data_tracking creates one row trigger by default."""
+        # Arrange
+        cursor = MagicMock()
+        schema = {
+            "id": {"type": "SERIAL PRIMARY KEY"},
+            "name": {"type": "TEXT", "track_changes": True},
+        }
+
+        # Act
+        Migration.enable_data_tracking(cursor, "partner", schema)
+
+        # Assert
+        queries = [c[0][0] for c in cursor.execute.call_args_list]
+        assert "FROM (SELECT NEW.*) n CROSS JOIN UNNEST(ARRAY['name'])" in queries[0]
+        assert len(queries) == 3
+        assert "FOR EACH ROW EXECUTE FUNCTION partner_track_function()" in queries[2]
+
+
+class TestLogsDataPartitions:
+    """Tests for the monthly partitions of migration_logs_data."""
+
+    def test_add_months(self):
+        """Test add_months returns the first day of the month."""
+        # Act & Assert
+        assert Migration.add_months(datetime.date(2026, 11, 15), 2) == datetime.date(
+            2027, 1, 1
+        )
+        assert Migration.add_months(datetime.date(2026, 1, 31), -1) == datetime.date(
+            2025, 12, 1
+        )
+
+    def test_get_range_partitions(self):
+        """Test get_range_partitions reads the bounds of the partitions."""
+        # Arrange
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [
+            (
+                "migration_logs_data_legacy",
+                "FOR VALUES FROM (MINVALUE) TO ('2026-01-01 00:00:00')",
+            ),
+            ("migration_logs_data_default", "DEFAULT"),
+        ]
+
+        # Act
+        partitions = Migration.get_range_partitions(cursor, "migration_logs_data")
+
+        # Assert
+        assert partitions == {"migration_logs_data_legacy": (None, "2026-01-01")}
+
+    @patch.object(Migration, "log_change")
+    @patch.object(Migration, "get_range_partitions")
+    def test_sync_logs_data_partitions(self, mock_partitions, mock_log_change):
+        """Test sync_logs_data_partitions creates the next months and drops the expired ones."""
+        # Arrange
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [("id",), ("timestamp",)]
+        month = datetime.date.today().replace(day=1)
+        expired = Migration.add_months(month, -13)
+        mock_partitions.return_value = {
+            "migration_logs_data_legacy": (None, str(Migration.add_months(month, -12))),
+            "migration_logs_data_current": (
+                str(month),
+                str(Migration.add_months(month, 1)),
+            ),
+            "migration_logs_data_expired": (
+                str(expired),
+                str(Migration.add_months(expired, 1)),
+            ),
+        }
+
+        # Act
+        Migration.sync_logs_data_partitions(cursor, retention_months=12)
+
+        # Assert
+        queries = [c[0][0] for c in cursor.execute.call_args_list]
+        created = [q for q in queries if "ATTACH PARTITION" in q]
+        assert len(created) == 3
+        next_month = Migration.add_months(month, 1)
+        assert (
+            f"migration_logs_data_y{next_month.year}m{next_month.month:02d}"
+            in created[0]
+        )
+        assert "DELETE FROM migration_logs_data_default" in created[0]
+        assert queries[4:] == [
+            "DROP TABLE migration_logs_data_legacy;",
+            "DROP TABLE migration_logs_data_expired;",
+        ]
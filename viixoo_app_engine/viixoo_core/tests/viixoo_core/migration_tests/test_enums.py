@@ -0,0 +1,183 @@
+"""Tests for the Enum fields stored as native ENUM types or SMALLINT codes."""
+
+import enum
+import pytest
+from unittest.mock import MagicMock, patch
+from typing import Optional
+from pydantic import Field
+from viixoo_core.migrations import Migration
+from viixoo_core.models.postgres import PostgresModel
+
+
+class SaleOrder_state_enum(str, enum.Enum):
+    """Mock enum of a converted Odoo Selection field."""
+
+    draft = "draft"
+    sale = "sale"
+    cancel = "cancel"
+
+
+class SaleOrderModel(PostgresModel):
+    """Mock model with enums stored natively and as codes."""
+
+    __tablename__ = "sale_order"
+
+    state: SaleOrder_state_enum = SaleOrder_state_enum.draft
+    invoice_state: Optional[SaleOrder_state_enum] = Field(
+        default=SaleOrder_state_enum.sale,
+        json_schema_extra=dict(enum_storage="code"),
+    )
+    label: SaleOrder_state_enum = Field(
+        default=None, json_schema_extra=dict(enum_storage="text")
+    )
+
+
+class TestEnums:
+    """Tests for the Enum fields stored as native ENUM types or SMALLINT codes."""
+
+    def test_pydantic_to_sql_enums(self):
+        """Test pydantic_to_sql maps the enums to their storage."""
+        # Act
+        schema = Migration.pydantic_to_sql(SaleOrderModel)
+
+        # Assert
+        values = ["draft", "sale", "cancel"]
+        assert schema["state"]["type"] == "SALE_ORDER_STATE_ENUM"
+        assert schema["state"]["enum"] == values
+        assert schema["state"]["default"] == "draft"
+        assert schema["invoice_state"]["type"] == "SMALLINT"
+        assert schema["invoice_state"]["enum_storage"] == "code"
+        assert schema["invoice_state"]["default"] == "1"
+        assert schema["label"]["type"] == "CHARACTER VARYING"
+        assert "enum" not in schema["label"]
+
+    def test_pydantic_to_sql_unsupported_enum_storage(self):
+        """Test pydantic_to_sql with an unsupported enum storage."""
+
+        class WrongModel(PostgresModel):
+            __tablename__ = "wrong"
+
+            state: SaleOrder_state_enum = Field(
+                json_schema_extra=dict(enum_storage="bits")
+            )
+
+        # Act & Assert
+        with pytest.raises(ValueError) as e:
+            Migration.pydantic_to_sql(WrongModel)
+        assert "Unsupported enum storage 'bits'" in str(e.value)
+
+    @patch.object(Migration, "log_change")
+    def test_sync_enum_types_create(self, mock_log_change):
+        """Test sync_enum_types creates the missing types."""
+        # Arrange
+        cursor = MagicMock()
+        tables = {"sale_order": Migration.pydantic_to_sql(SaleOrderModel)}
+
+        # Act
+        Migration.sync_enum_types(cursor, tables, {})
+
+        # Assert
+        cursor.execute.assert_called_once_with(
+            "CREATE TYPE SALE_ORDER_STATE_ENUM AS ENUM ('draft', 'sale', 'cancel');"
+        )
+        mock_log_change.assert_called_once()
+
+    @patch.object(Migration, "log_change")
+    def test_sync_enum_types_add_values(self, mock_log_change, capsys):
+        """Test sync_enum_types adds the new values in order and reports the removed ones."""
+        # Arrange
+        cursor = MagicMock()
+        tables = {"sale_order": Migration.pydantic_to_sql(SaleOrderModel)}
+        enum_types = {"SALE_ORDER_STATE_ENUM": ["sale", "done"]}
+
+        # Act
+        Migration.sync_enum_types(cursor, tables, enum_types)
+
+        # Assert
+        assert [c[0][0] for c in cursor.execute.call_args_list] == [
+            "ALTER TYPE SALE_ORDER_STATE_ENUM ADD VALUE IF NOT EXISTS 'draft' BEFORE 'sale';",
+            "ALTER TYPE SALE_ORDER_STATE_ENUM ADD VALUE IF NOT EXISTS 'cancel' AFTER 'sale';",
+        ]
+        assert enum_types["SALE_ORDER_STATE_ENUM"] == [
+            "draft",
+            "sale",
+            "cancel",
+            "done",
+        ]
+        assert "Value 'done' of enum type 'SALE_ORDER_STATE_ENUM'" in (
+            capsys.readouterr().out
+        )
+
+    def test_plan_table_changes_to_native_enum(self):
+        """Test plan_table_changes converts a text column to a native enum."""
+        # Arrange
+        schema = Migration.pydantic_to_sql(SaleOrderModel)
+        existing = {
+            "columns": {
+                "id": {"type": "BIGINT", "required": True, "default": None},
+                "state": {
+                    "type": "CHARACTER VARYING",
+                    "required": True,
+                    "default": "'draft'::character varying",
+                },
+                "invoice_state": {
+                    "type": "CHARACTER VARYING",
+                    "required": False,
+                    "default": None,
+                },
+                "label": {"type": "CHARACTER VARYING", "required": False},
+            }
+        }
+        existing["columns"]["label"]["default"] = None
+
+        # Act
+        changes = Migration.plan_table_changes("sale_order", schema, existing)
+
+        # Assert
+        assert [change["clause"] for change in changes] == [
+            "ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY",
+            "ALTER COLUMN state DROP DEFAULT",
+            "ALTER COLUMN state TYPE SALE_ORDER_STATE_ENUM "
+            "USING state::SALE_ORDER_STATE_ENUM",
+            "ALTER COLUMN state DROP NOT NULL",
+            "ALTER COLUMN state SET DEFAULT 'draft'::SALE_ORDER_STATE_ENUM",
+            "ALTER COLUMN invoice_state TYPE SMALLINT USING "
+            "(array_position(ARRAY['draft', 'sale', 'cancel'], invoice_state::text) - 1)::SMALLINT",
+            "ALTER COLUMN invoice_state SET DEFAULT '1'::SMALLINT",
+        ]
+
+
+class TestEnumCodes:
+    """Tests for the SMALLINT codes of the Enum fields in PostgresModel."""
+
+    def test_encode_rows(self):
+        """Test encode_rows replaces the values by their codes."""
+        # Act
+        rows = SaleOrderModel.encode_rows(
+            [{"state": "sale", "invoice_state": SaleOrder_state_enum.cancel}]
+        )
+
+        # Assert
+        assert rows == [{"state": "sale", "invoice_state": 2}]
+
+    def test_decode_rows(self):
+        """Test decode_rows replaces the codes by their values."""
+        # Act
+        rows = SaleOrderModel.decode_rows([{"id": 1, "invoice_state": 0}])
+
+        # Assert
+        assert rows == [{"id": 1, "invoice_state": "draft"}]
+
+    def test_encode_domain(self):
+        """Test encode_domain replaces the compared values by their codes."""
+        # Act
+        domain = SaleOrderModel.encode_domain(
+            ["|", ("invoice_state", "in", ["sale", "cancel"]), ("state", "=", "sale")]
+        )
+
+        # Assert
+        assert domain == [
+            "|",
+            ("invoice_state", "in", [1, 2]),
+            ("state", "=", "sale"),
+        ]
@@ -0,0 +1,131 @@
+"""Tests for the full-text search columns in the Migration class."""
+
+import pytest
+from unittest.mock import MagicMock, patch
+from typing import Optional
+from viixoo_core.migrations import Migration
+from viixoo_core.models.base import BaseDBModel
+
+
+class ArticleModel(BaseDBModel):
+    """Mock model with full-text search."""
+
+    __tablename__ = "article"
+    __fulltext__ = {
+        "fields": {"title": "A", "body": "B"},
+        "language": "spanish",
+        "html_fields": ["body"],
+    }
+
+    title: str
+    body: Optional[str] = None
+
+
+class TestMigrationFulltext:
+    """Tests for the full-text search columns in the Migration class."""
+
+    def test_pydantic_to_sql_fulltext_column(self):
+        """Test pydantic_to_sql adds the generated tsvector column."""
+        # Act
+        schema = Migration.pydantic_to_sql(ArticleModel)
+
+        # Assert
+        title = "setweight(to_tsvector('spanish'::regconfig, coalesce(title::text, '')), 'A')"
+        body = (
+            "setweight(to_tsvector('spanish'::regconfig, "
+            "regexp_replace(coalesce(body::text, ''), '<[^>]*>', ' ', 'g')), 'B')"
+        )
+        assert schema["search_vector"] == {
+            "type": "TSVECTOR",
+            "required": False,
+            "generated": f"{title} || {body}",
+            "search_index": "fulltext",
+        }
+
+    def test_pydantic_to_sql_fulltext_unknown_field(self):
+        """Test pydantic_to_sql when a full-text field is not in the model."""
+
+        class WrongModel(BaseDBModel):
+            __tablename__ = "wrong"
+            __fulltext__ = {"fields": ["missing"]}
+
+        # Act & Assert
+        with pytest.raises(ValueError) as e:
+            Migration.pydantic_to_sql(WrongModel)
+        assert "Full-text field 'missing' not found in 'wrong'" in str(e.value)
+
+    def test_generate_create_table_query_generated_column(self):
+        """Test generate_create_table_query with a generated column."""
+        # Arrange
+        schema = {
+            "id": {"type": "SERIAL PRIMARY KEY", "required": True},
+            "search_vector": {
+                "type": "TSVECTOR",
+                "required": False,
+                "generated": "to_tsvector('simple'::regconfig, coalesce(name::text, ''))",
+            },
+        }
+
+        # Act
+        query, _ = Migration.generate_create_table_query("users", schema)
+
+        # Assert
+        assert query == (
+            "CREATE TABLE IF NOT EXISTS users (id SERIAL PRIMARY KEY, search_vector TSVECTOR "
+            "GENERATED ALWAYS AS (to_tsvector('simple'::regconfig, coalesce(name::text, ''))) STORED);"
+        )
+
+    @patch.object(Migration, "log_change")
+    @patch.object(Migration, "get_column_comment")
+    def test_sync_generated_columns_new(self, mock_comment, mock_log_change):
+        """Test sync_generated_columns only saves the expression of a new column."""
+        # Arrange
+        cursor = MagicMock()
+        mock_comment.return_value = None
+        schema = {"search_vector": {"type": "TSVECTOR", "generated": "expr"}}
+
+        # Act
+        Migration.sync_generated_columns(cursor, "article", schema)
+
+        # Assert
+        cursor.execute.assert_called_once_with(
+            "COMMENT ON COLUMN article.search_vector IS %s;", ("expr",)
+        )
+        mock_log_change.assert_not_called()
+
+    @patch.object(Migration, "log_change")
+    @patch.object(Migration, "get_column_comment")
+    def test_sync_generated_columns_changed(self, mock_comment, mock_log_change):
+        """Test sync_generated_columns rebuilds a column whose expression changed."""
+        # Arrange
+        cursor = MagicMock()
+        mock_comment.return_value = "old_expr"
+        schema = {"search_vector": {"type": "TSVECTOR", "generated": "expr"}}
+
+        # Act
+        Migration.sync_generated_columns(cursor, "article", schema)
+
+        # Assert
+        queries = [c[0][0] for c in cursor.execute.call_args_list]
+        assert queries == [
+            "ALTER TABLE article DROP COLUMN search_vector;",
+            "ALTER TABLE article ADD COLUMN search_vector TSVECTOR GENERATED ALWAYS AS (expr) STORED;",
+            "COMMENT ON COLUMN article.search_vector IS %s;",
+        ]
+        mock_log_change.assert_called_once()
+
+    @patch.object(Migration, "log_change")
+    @patch.object(Migration, "get_column_comment")
+    def test_sync_generated_columns_unchanged(self, mock_comment, mock_log_change):
+        """Test sync_generated_columns does nothing when the expression is the same."""
+        # Arrange
+        cursor = MagicMock()
+        mock_comment.return_value = "expr"
+        schema = {"search_vector": {"type": "TSVECTOR", "generated": "expr"}}
+
+        # Act
+        Migration.sync_generated_columns(cursor, "article", schema)
+
+        # Assert
+        cursor.execute.assert_not_called()
+        mock_log_change.assert_not_called()
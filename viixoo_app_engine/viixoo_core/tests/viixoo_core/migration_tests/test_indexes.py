@@ -0,0 +1,275 @@
+"""Tests for the index declarations in the Migration class."""
+
+import pytest
+import psycopg2
+from unittest.mock import MagicMock, patch
+from typing import Optional
+from pydantic import Field
+from psycopg2.sql import SQL, Identifier, Literal
+from viixoo_core.migrations import Migration
+import viixoo_core.migrations
+from viixoo_core.models.base import BaseDBModel
+
+
+class OrderModel(BaseDBModel):
+    """Mock model with index declarations."""
+
+    __tablename__ = "sale_order"
+    __indexes__ = [
+        {
+            "columns": ["partner_id", "date"],
+            "where": "state = 'draft'",
+            "include": ["amount"],
+        },
+        {"columns": ["lower(name)"], "unique": True},
+    ]
+
+    name: str
+    date: Optional[str] = None
+    amount: Optional[float] = None
+    state: Optional[str] = Field(default=None, json_schema_extra=dict(index="hash"))
+    partner_id: Optional[int] = Field(
+        default=None, json_schema_extra=dict(foreign_key="partner(id)")
+    )
+    user_id: Optional[int] = Field(
+        default=None, json_schema_extra=dict(foreign_key="users(id)", index=False)
+    )
+
+
+INDEXES = [
+    {
+        "name": "sale_order_state_idx",
+        "columns": ["state"],
+        "unique": False,
+        "using": "hash",
+        "where": None,
+        "include": [],
+    },
+    {
+        "name": "sale_order_partner_id_idx",
+        "columns": ["partner_id"],
+        "unique": False,
+        "using": "btree",
+        "where": None,
+        "include": [],
+    },
+]
+
+
+class TestMigrationIndexes:
+    """Tests for the index declarations in the Migration class."""
+
+    def test_pydantic_to_sql_indexes(self):
+        """Test pydantic_to_sql collects the field and model indexes."""
+        # Act
+        schema = Migration.pydantic_to_sql(OrderModel)
+
+        # Assert
+        assert schema["__indexes__"] == INDEXES + [
+            {
+                "name": "sale_order_partner_id_date_idx",
+                "columns": ["partner_id", "date"],
+                "unique": False,
+                "using": "btree",
+                "where": "state = 'draft'",
+                "include": ["amount"],
+            },
+            {
+                "name": "sale_order_lower_name_uniq_idx",
+                "columns": ["lower(name)"],
+                "unique": True,
+                "using": "btree",
+                "where": None,
+                "include": [],
+            },
+        ]
+        assert "__indexes__" not in Migration.get_columns(schema)
+
+    def test_normalize_index_long_name(self):
+        """Test normalize_index truncates the names longer than 63 characters."""
+        # Act
+        index = Migration.normalize_index(
+            OrderModel,
+            {
+                "columns": [
+                    "partner_id",
+                    "date",
+                    "amount",
+                    "state",
+                    "user_id",
+                    "lower(name)",
+                    "name",
+                ]
+            },
+        )
+
+        # Assert
+        assert len(index["name"]) <= 63
+        assert index["name"].startswith(
+            "sale_order_partner_id_date_amount_state_user_id_lower_"
+        )
+
+    def test_normalize_index_unknown_column(self):
+        """Test normalize_index with a column that is not in the model."""
+        # Act & Assert
+        with pytest.raises(ValueError) as e:
+            Migration.normalize_index(OrderModel, {"columns": ["missing"]})
+        assert "Index column 'missing' not found in 'sale_order'" in str(e.value)
+
+    def test_get_index_definition(self):
+        """Test get_index_definition with a partial covering index."""
+        # Arrange
+        index = Migration.normalize_index(OrderModel, OrderModel.__indexes__[0])
+
+        # Act
+        definition = Migration.get_index_definition("sale_order", index)
+
+        # Assert
+        assert definition == (
+            "ON sale_order USING btree (partner_id, date) INCLUDE (amount) WHERE state = 'draft'"
+        )
+
+    @patch.object(Migration, "log_change")
+    @patch.object(Migration, "get_existing_indexes")
+    def test_sync_indexes_new_table(self, mock_existing, mock_log_change):
+        """Test sync_indexes builds the indexes of a new table directly."""
+        # Arrange
+        cursor = MagicMock()
+        mock_existing.return_value = {}
+        schema = {"__indexes__": INDEXES[:1]}
+
+        # Act
+        Migration.sync_indexes(cursor, "sale_order", schema)
+
+        # Assert
+        queries = [c[0][0] for c in cursor.execute.call_args_list]
+        assert queries == [
+            "CREATE INDEX IF NOT EXISTS sale_order_state_idx ON sale_order USING hash (state);",
+            SQL("COMMENT ON INDEX {} IS {};").format(
+                Identifier("sale_order_state_idx"),
+                Literal("viixoo_index:ON sale_order USING hash (state)"),
+            ),
+        ]
+        assert viixoo_core.migrations.state.deferred_queries == []
+
+    @patch.object(Migration, "log_change")
+    @patch.object(Migration, "get_existing_indexes")
+    def test_sync_indexes_concurrently(self, mock_existing, mock_log_change):
+        """Test sync_indexes defers the concurrent builds, rebuilds invalid indexes and drops obsolete ones."""
+        # Arrange
+        cursor = MagicMock()
+        mock_existing.return_value = {
+            "sale_order_pkey": {"comment": None, "valid": True},
+            "sale_order_state_idx": {
+                "comment": "viixoo_index:ON sale_order USING hash (state)",
+                "valid": False,
+            },
+            "sale_order_partner_id_idx": {
+                "comment": "viixoo_index:ON sale_order USING btree (partner_id)",
+                "valid": True,
+            },
+            "sale_order_old_idx": {
+                "comment": "viixoo_index:ON sale_order USING btree (old)",
+                "valid": True,
+            },
+        }
+        schema = {"__indexes__": INDEXES}
+
+        # Act
+        Migration.sync_indexes(cursor, "sale_order", schema, concurrently=True)
+
+        # Assert
+        cursor.execute.assert_not_called()
+        queries = [q[0] for q in viixoo_core.migrations.state.deferred_queries]
+        assert queries[:2] == [
+            "DROP INDEX CONCURRENTLY IF EXISTS sale_order_state_idx;",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS sale_order_state_idx ON sale_order USING hash (state);",
+        ]
+        assert queries[3] == "DROP INDEX CONCURRENTLY IF EXISTS sale_order_old_idx;"
+        assert len(queries) == 4
+        mock_log_change.assert_not_called()
+
+        # Clean up
+        viixoo_core.migrations.state.deferred_queries.clear()
+
+    @patch.object(Migration, "log_change")
+    def test_run_deferred_queries(self, mock_log_change):
+        """Test run_deferred_queries runs every query in autocommit mode."""
+        # Arrange
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        viixoo_core.migrations.state.deferred_queries.extend(
+            [("QUERY 1", "CREATE INDEX", "one"), ("QUERY 2", "DROP INDEX", "two")]
+        )
+
+        # Act
+        Migration.run_deferred_queries(conn)
+
+        # Assert
+        assert conn.autocommit is True
+        assert [c[0][0] for c in cursor.execute.call_args_list] == [
+            "RESET lock_timeout;",
+            "QUERY 1",
+            "QUERY 2",
+        ]
+        assert mock_log_change.call_count == 2
+        assert viixoo_core.migrations.state.deferred_queries == []
+
+    @patch("viixoo_core.migrations.time.sleep")
+    @patch.object(Migration, "log_change")
+    def test_run_deferred_queries_drops_invalid_index(
+        self, mock_log_change, mock_sleep
+    ):
+        """Test a cancelled concurrent build drops its invalid index before the retry."""
+        # Arrange
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        query = (
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS sale_state_idx ON sale (state);"
+        )
+        viixoo_core.migrations.state.deferred_queries.append(
+            (query, "CREATE INDEX", "one")
+        )
+        cursor.execute.side_effect = [
+            None,
+            None,
+            psycopg2.errors.LockNotAvailable("timeout"),
+            None,
+            None,
+            None,
+        ]
+        cursor.fetchone.side_effect = [None, (True, False)]
+
+        # Act
+        succeeded = Migration.run_deferred_queries(conn)
+
+        # Assert
+        assert succeeded
+        queries = [c[0][0] for c in cursor.execute.call_args_list]
+        assert "pg_index" in queries[1]
+        assert queries[2] == query
+        assert "pg_index" in queries[3]
+        assert queries[4] == "DROP INDEX CONCURRENTLY IF EXISTS sale_state_idx;"
+        assert queries[5] == query
+        mock_log_change.assert_called_once_with("CREATE INDEX", "one")
+
+    @patch.object(Migration, "log_change")
+    def test_run_deferred_queries_index_of_other_table(self, mock_log_change, capsys):
+        """Test a concurrent build fails when its index name is used by another table."""
+        # Arrange
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        query = "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS email_unique ON sale (email);"
+        viixoo_core.migrations.state.deferred_queries.append(
+            (query, "CREATE INDEX", "one")
+        )
+        cursor.fetchone.return_value = (False, True)
+
+        # Act
+        succeeded = Migration.run_deferred_queries(conn)
+
+        # Assert
+        assert not succeeded
+        assert query not in [c[0][0] for c in cursor.execute.call_args_list]
+        mock_log_change.assert_not_called()
+        assert "already exists on another table" in capsys.readouterr().out
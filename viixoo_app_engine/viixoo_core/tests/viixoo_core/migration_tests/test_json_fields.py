@@ -0,0 +1,85 @@
+"""Tests for the JSONB fields and their GIN indexes."""
+
+import pytest
+from typing import Optional
+from pydantic import BaseModel, Field
+from psycopg2.extras import Json
+from viixoo_core.migrations import Migration
+from viixoo_core.models.postgres import PostgresModel
+
+
+class Dimensions(BaseModel):
+    """Mock nested model."""
+
+    width: float
+    height: float
+
+
+class ProductModel(PostgresModel):
+    """Mock model with JSONB fields."""
+
+    __tablename__ = "product"
+
+    attributes: dict = Field(default={}, json_schema_extra=dict(index="jsonb_path_ops"))
+    dimensions: Optional[Dimensions] = Field(
+        default=None, json_schema_extra=dict(index="gin")
+    )
+
+
+class TestJsonFields:
+    """Tests for the JSONB fields and their GIN indexes."""
+
+    def test_pydantic_to_sql_json_indexes(self):
+        """Test pydantic_to_sql declares the GIN indexes of the JSONB fields."""
+        # Act
+        schema = Migration.pydantic_to_sql(ProductModel)
+
+        # Assert
+        assert schema["attributes"]["type"] == "JSONB"
+        assert schema["dimensions"]["type"] == "JSONB"
+        assert [
+            (index["name"], index["columns"], index["using"])
+            for index in schema["__indexes__"]
+        ] == [
+            (
+                "product_attributes_jsonb_path_ops_idx",
+                ["attributes jsonb_path_ops"],
+                "gin",
+            ),
+            ("product_dimensions_idx", ["dimensions"], "gin"),
+        ]
+        assert Migration.get_index_definition("product", schema["__indexes__"][0]) == (
+            "ON product USING gin (attributes jsonb_path_ops)"
+        )
+
+    def test_pydantic_to_sql_jsonb_path_ops_not_json(self):
+        """Test pydantic_to_sql with a jsonb_path_ops index in a field that is not JSONB."""
+
+        class WrongModel(PostgresModel):
+            __tablename__ = "wrong"
+
+            name: str = Field(json_schema_extra=dict(index="jsonb_path_ops"))
+
+        # Act & Assert
+        with pytest.raises(ValueError) as e:
+            Migration.pydantic_to_sql(WrongModel)
+        assert "Index 'jsonb_path_ops' in field 'name' requires a JSONB field" in str(
+            e.value
+        )
+
+    def test_encode_rows_json(self):
+        """Test encode_rows adapts the values of the JSONB fields as JSON."""
+        # Act
+        rows = ProductModel.encode_rows(
+            [
+                {
+                    "attributes": {"color": "red"},
+                    "dimensions": Dimensions(width=1, height=2),
+                }
+            ]
+        )
+
+        # Assert
+        assert isinstance(rows[0]["attributes"], Json)
+        assert rows[0]["attributes"].adapted == {"color": "red"}
+        assert rows[0]["dimensions"].adapted == {"width": 1.0, "height": 2.0}
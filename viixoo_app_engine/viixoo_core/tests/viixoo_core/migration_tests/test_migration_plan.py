@@ -0,0 +1,236 @@
+"""Tests for the migration plan of the Migration class."""
+
+from unittest.mock import MagicMock, patch
+from viixoo_core.migrations import Migration, PlanCursor
+from viixoo_core.import_utils import ImportUtils
+from viixoo_core.config import BaseConfig
+import viixoo_core.migrations
+
+STATS = {"rows": 1200000, "size": 500 * 1024 * 1024, "total_size": 800 * 1024 * 1024}
+
+CONFIG = {
+    "db_type": "postgresql",
+    "user": "user",
+    "password": "password",
+    "host": "localhost",
+    "port": "5432",
+    "dbname": "test",
+}
+
+
+class TestMigrationPlan:
+    """Test the dry-run plan of the migrations."""
+
+    def test_estimate_statement_rewrite(self):
+        """Test estimate_statement detects the statements that rewrite the table."""
+        # Act
+        step = Migration.estimate_statement(
+            "sale",
+            "ALTER TABLE sale ALTER COLUMN code TYPE TEXT USING code::TEXT;",
+            STATS,
+        )
+
+        # Assert
+        assert step["lock"] == "ACCESS EXCLUSIVE"
+        assert step["effect"] == "rewrite"
+        assert step["estimate"] == "rewrites ~800.0 MB"
+
+    def test_estimate_statement_scan(self):
+        """Test estimate_statement detects the statements that scan the table."""
+        # Act
+        not_null = Migration.estimate_statement(
+            "sale", "ALTER TABLE sale ALTER COLUMN code SET NOT NULL;", STATS
+        )
+        foreign_key = Migration.estimate_statement(
+            "sale",
+            "ALTER TABLE sale ADD CONSTRAINT sale_partner_id_fk FOREIGN KEY (partner_id) "
+            "REFERENCES partner(id) ON DELETE NO ACTION ON UPDATE NO ACTION;",
+            dict(STATS, rows=-1),
+        )
+        concurrently = Migration.estimate_statement(
+            "sale",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS sale_idx ON sale USING btree (code);",
+            STATS,
+        )
+
+        # Assert
+        assert (not_null["lock"], not_null["effect"]) == ("ACCESS EXCLUSIVE", "scan")
+        assert not_null["estimate"] == "scans ~1200000 rows (500.0 MB)"
+        assert foreign_key["lock"] == "SHARE ROW EXCLUSIVE"
+        assert foreign_key["estimate"] == "scans unknown rows (500.0 MB)"
+        assert concurrently["lock"] == "SHARE UPDATE EXCLUSIVE"
+
+    def test_estimate_statement_new_table(self):
+        """Test estimate_statement does not report costs for a new table."""
+        # Act
+        step = Migration.estimate_statement(
+            "sale",
+            "CREATE INDEX IF NOT EXISTS sale_idx ON sale USING btree (code);",
+            None,
+        )
+
+        # Assert
+        assert step["effect"] == "instant"
+        assert step["estimate"] == "new table"
+
+    def test_plan_cursor(self):
+        """Test PlanCursor records the statements instead of running them."""
+        # Arrange
+        cursor = MagicMock()
+        cursor.mogrify.return_value = b"COMMENT ON COLUMN sale.code IS 'expr';"
+        recorder = PlanCursor(cursor)
+
+        # Act
+        recorder.execute("DROP INDEX IF EXISTS sale_idx;")
+        recorder.execute("COMMENT ON COLUMN sale.code IS %s;", ("expr",))
+
+        # Assert
+        cursor.execute.assert_not_called()
+        assert recorder.queries == [
+            "DROP INDEX IF EXISTS sale_idx;",
+            "COMMENT ON COLUMN sale.code IS 'expr';",
+        ]
+
+    def test_plan_cursor_select(self):
+        """Test PlanCursor runs the SELECT queries, unless the database is missing."""
+        # Arrange
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ("p",)
+        recorder = PlanCursor(cursor)
+        missing = PlanCursor(MagicMock(), read=False)
+
+        # Act
+        recorder.execute("SELECT relkind FROM pg_class WHERE oid = %s;", ("sale",))
+        missing.execute("SELECT relkind FROM pg_class WHERE oid = %s;", ("sale",))
+
+        # Assert
+        cursor.execute.assert_called_once_with(
+            "SELECT relkind FROM pg_class WHERE oid = %s;", ("sale",)
+        )
+        assert recorder.fetchone() == ("p",)
+        assert recorder.queries == []
+        assert missing.fetchone() is None
+        assert missing.fetchall() == []
+        missing.cursor.execute.assert_not_called()
+
+    @patch.object(Migration, "create_migration_log_tables")
+    @patch.object(Migration, "get_table_stats")
+    @patch.object(Migration, "get_catalog")
+    @patch.object(Migration, "get_postgresql_tables")
+    @patch.object(Migration, "get_postgresql_connection")
+    def test_plan_postgresql_migrations(
+        self,
+        mock_connection,
+        mock_tables,
+        mock_catalog,
+        mock_stats,
+        mock_log_tables,
+        capsys,
+    ):
+        """Test plan_postgresql_migrations prints the plan and rolls back."""
+        # Arrange
+        conn = mock_connection.return_value
+        cursor = conn.cursor.return_value
+        cursor.fetchall.return_value = [("unaccent",), ("pg_trgm",)]
+        mock_tables.return_value = {
+            "sale": {
+                "id": {"type": "INTEGER", "primary_key": True, "required": True},
+                "code": {"type": "TEXT", "required": True},
+            },
+            "partner": {"id": {"type": "SERIAL PRIMARY KEY", "required": True}},
+        }
+        mock_catalog.return_value = {
+            "sale": {
+                "columns": {
+                    "id": {"type": "INTEGER", "required": True, "default": None},
+                    "code": {"type": "TEXT", "required": False, "default": None},
+                },
+                "foreign_keys": {},
+                "unique": {},
+                "indexes": {},
+                "triggers": [],
+            }
+        }
+        mock_stats.return_value = {"sale": STATS}
+
+        # Act
+        steps = Migration.plan_postgresql_migrations(CONFIG, MagicMock())
+
+        # Assert
+        assert [(step["table"], step["statement"]) for step in steps] == [
+            ("sale", "ALTER TABLE sale ALTER COLUMN code SET NOT NULL;"),
+            (
+                "partner",
+                "CREATE TABLE IF NOT EXISTS partner (id SERIAL PRIMARY KEY);",
+            ),
+        ]
+        mock_connection.assert_called_once_with(create=False)
+        conn.set_session.assert_called_once_with(readonly=True)
+        assert all(c[0][0].startswith("SELECT") for c in cursor.execute.call_args_list)
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+        captured = capsys.readouterr()
+        assert "🔴 [ACCESS EXCLUSIVE, scans ~1200000 rows (500.0 MB)]" in captured.out
+        assert viixoo_core.migrations.state.pending_logs == []
+
+    @patch.object(Migration, "create_logs_data_table")
+    @patch.object(Migration, "sync_logs_data_partitions")
+    @patch.object(Migration, "get_postgresql_tables")
+    @patch.object(Migration, "get_maintenance_connection")
+    @patch.object(Migration, "get_postgresql_connection")
+    def test_plan_postgresql_migrations_missing_database(
+        self,
+        mock_connection,
+        mock_maintenance,
+        mock_tables,
+        mock_logs_data_partitions,
+        mock_logs_data_table,
+    ):
+        """Test the plan of a missing database plans its creation without creating it."""
+        # Arrange
+        mock_connection.return_value = None
+        cursor = mock_maintenance.return_value.cursor.return_value
+        cursor.mogrify.return_value = b'CREATE DATABASE "test";'
+        mock_tables.return_value = {
+            "partner": {
+                "id": {"type": "SERIAL PRIMARY KEY", "required": True},
+                "name": {"type": "TEXT", "track_changes": True},
+            }
+        }
+
+        # Act
+        steps = Migration.plan_postgresql_migrations(CONFIG, MagicMock())
+
+        # Assert
+        statements = [(step["table"], step["statement"]) for step in steps]
+        assert statements[0] == (None, 'CREATE DATABASE "test";')
+        assert statements[1][1].startswith("CREATE TABLE IF NOT EXISTS migration_logs")
+        assert (None, "CREATE EXTENSION IF NOT EXISTS unaccent;") in statements
+        assert (
+            "partner",
+            "CREATE TABLE IF NOT EXISTS partner (id SERIAL PRIMARY KEY, name TEXT);",
+        ) in statements
+        assert any(
+            table == "partner" and "CREATE TRIGGER" in statement
+            for table, statement in statements
+        )
+        assert steps[0]["estimate"] == "database"
+        cursor.execute.assert_not_called()
+        mock_connection.assert_called_once_with(create=False)
+
+    @patch.object(ImportUtils, "import_module_from_path")
+    @patch.object(BaseConfig, "get_config")
+    @patch.object(Migration, "run_postgresql_migrations")
+    @patch.object(Migration, "plan_postgresql_migrations")
+    def test_run_plan(self, mock_plan, mock_run, mock_get_config, mock_import_module):
+        """Test run with plan only plans the migrations."""
+        # Arrange
+        mock_import_module.return_value = {"module1": MagicMock()}
+        mock_get_config.return_value = CONFIG
+
+        # Act
+        Migration.run(plan=True)
+
+        # Assert
+        mock_plan.assert_called_once()
+        mock_run.assert_not_called()
@@ -29,7 +29,7 @@ class TestMigrationGetPostgresqlConnection:
 
         mock_cursor.fetchone.return_value = None  # Database does not exist
 
-        viixoo_core.migrations.config = self.config
+        viixoo_core.migrations.state.config = self.config
 
         # Act
         conn = Migration.get_postgresql_connection()
@@ -55,13 +55,13 @@ class TestMigrationGetPostgresqlConnection:
         mock_cursor = MagicMock()
         mock_connect = viixoo_core.migrations.psycopg2.connect = mock_connection
         mock_connection.cursor.return_value = mock_cursor
-        viixoo_core.migrations.db_connection = mock_connection.return_value = (
+        viixoo_core.migrations.state.connection = mock_connection.return_value = (
             mock_connection
         )
 
         mock_cursor.fetchone.return_value = [1]  # Database exists
 
-        viixoo_core.migrations.config = self.config
+        viixoo_core.migrations.state.config = self.config
         # Act
         conn = Migration.get_postgresql_connection()
 
@@ -83,9 +83,9 @@ class TestMigrationGetPostgresqlConnection:
         mock_connection = MagicMock()
         mock_connection.closed = False
         mock_connect = viixoo_core.migrations.psycopg2.connect = mock_connection
-        viixoo_core.migrations.db_connection = mock_connection
+        viixoo_core.migrations.state.connection = mock_connection
 
-        viixoo_core.migrations.config = self.config
+        viixoo_core.migrations.state.config = self.config
         # Act
         conn = Migration.get_postgresql_connection()
 
@@ -94,7 +94,7 @@ class TestMigrationGetPostgresqlConnection:
         mock_connect.assert_not_called()
 
         # Reset after the test
-        viixoo_core.migrations.db_connection = False
+        viixoo_core.migrations.state.connection = None
 
     def test_get_postgresql_connection_connection_closed(self):
         """Test get_postgresql_connection when already connected but connection is closed."""
@@ -102,13 +102,13 @@ class TestMigrationGetPostgresqlConnection:
         mock_connection_old = MagicMock()
         mock_connect = viixoo_core.migrations.psycopg2.connect = MagicMock()
         mock_connection_old.closed = True
-        viixoo_core.migrations.db_connection = mock_connection_old
+        viixoo_core.migrations.state.connection = mock_connection_old
 
         mock_connection_new = MagicMock()
         mock_connection_new.cursor.return_value.fetchone.return_value = [1]
         mock_connect.return_value = mock_connection_new
 
-        viixoo_core.migrations.config = self.config
+        viixoo_core.migrations.state.config = self.config
         # Act
         conn = Migration.get_postgresql_connection()
         # Assert
@@ -117,4 +117,4 @@ class TestMigrationGetPostgresqlConnection:
         assert mock_connection_new.autocommit is True
 
         # Reset after the test
-        viixoo_core.migrations.db_connection = False
+        viixoo_core.migrations.state.connection = None
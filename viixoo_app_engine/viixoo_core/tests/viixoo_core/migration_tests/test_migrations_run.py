@@ -2,7 +2,7 @@
 
 import pytest
 from unittest.mock import MagicMock, patch
-from viixoo_core.migrations import Migration
+from viixoo_core.migrations import Migration, state
 from viixoo_core.import_utils import ImportUtils
 from viixoo_core.config import BaseConfig
 
@@ -123,3 +123,116 @@ class TestMigrationRun:
         mock_run_postgresql_migrations.assert_not_called()
         captured = capsys.readouterr()
         assert "✅ Migrations completed." in captured.out
+
+    @patch.object(ImportUtils, "import_module_from_path")
+    @patch.object(BaseConfig, "get_config")
+    @patch.object(Migration, "run_postgresql_migrations")
+    def test_run_jobs(
+        self,
+        mock_run_postgresql_migrations,
+        mock_get_config,
+        mock_import_module,
+        capsys,
+    ):
+        """Test run method migrates the databases in parallel with ordered reports."""
+        # Arrange
+        mock_import_module.return_value = {
+            "module1": MagicMock(),
+            "module2": MagicMock(),
+            "module3": MagicMock(),
+        }
+        config = {"db_type": "postgresql", "host": "host1", "port": "5432"}
+        mock_get_config.side_effect = [
+            dict(config, dbname="dbname1"),
+            dict(config, dbname="dbname2"),
+            dict(config, dbname="dbname1"),
+        ]
+
+        def migrate(config, module, online, force):
+            print(f"migrating {config['dbname']}")
+
+        mock_run_postgresql_migrations.side_effect = migrate
+
+        # Act
+        Migration.run(jobs=2)
+
+        # Assert
+        assert mock_run_postgresql_migrations.call_count == 3
+        captured = capsys.readouterr()
+        assert captured.out.splitlines() == [
+            "migrating dbname1",
+            "🚀 Migrations completed for module module1",
+            "migrating dbname2",
+            "🚀 Migrations completed for module module2",
+            "migrating dbname1",
+            "🚀 Migrations completed for module module3",
+            "📊 3 modules migrated in 2 databases, 0 failed",
+            "✅ Migrations completed.",
+        ]
+
+    @patch.object(ImportUtils, "import_module_from_path")
+    @patch.object(BaseConfig, "get_config")
+    @patch.object(Migration, "run_postgresql_migrations")
+    def test_run_jobs_failure(
+        self,
+        mock_run_postgresql_migrations,
+        mock_get_config,
+        mock_import_module,
+        capsys,
+    ):
+        """Test run method stops a database after a failed module and raises the error."""
+        # Arrange
+        modules = {"module1": MagicMock(), "module2": MagicMock()}
+        mock_import_module.return_value = dict(modules, module3=MagicMock())
+        config = {"db_type": "postgresql", "host": "host1", "port": "5432"}
+        mock_get_config.side_effect = [
+            dict(config, dbname="dbname1"),
+            dict(config, dbname="dbname2"),
+            dict(config, dbname="dbname1"),
+        ]
+
+        def migrate(config, module, online, force):
+            if module is modules["module1"]:
+                raise RuntimeError("boom")
+
+        mock_run_postgresql_migrations.side_effect = migrate
+
+        # Act
+        with pytest.raises(RuntimeError):
+            Migration.run(jobs=2)
+
+        # Assert
+        assert mock_run_postgresql_migrations.call_count == 2
+        captured = capsys.readouterr()
+        assert captured.out.splitlines() == [
+            "❌ Migrations failed for module module1: boom",
+            "🚀 Migrations completed for module module2",
+            "⏭️ Migrations skipped for module module3",
+            "📊 1 modules migrated in 2 databases, 1 failed",
+        ]
+
+    @patch.object(Migration, "run_postgresql_migrations")
+    def test_migrate_module_resets_state(self, mock_run_postgresql_migrations):
+        """Test migrate_module closes the connection and resets the state on errors."""
+        # Arrange
+        connection = MagicMock(closed=False)
+
+        def migrate(config, module, online, force):
+            state.config = config
+            state.connection = connection
+            state.deferred_queries.append(("CREATE INDEX", "CREATE INDEX", "idx"))
+            state.pending_logs.append(("CREATE TABLE", "Table 'sale' created"))
+            raise RuntimeError("boom")
+
+        mock_run_postgresql_migrations.side_effect = migrate
+
+        # Act
+        with pytest.raises(RuntimeError):
+            Migration.migrate_module("module1", MagicMock(), {"dbname": "db1"})
+
+        # Assert
+        connection.close.assert_called_once()
+        assert state.connection is None
+        assert state.config == {}
+        assert state.deferred_queries == []
+        assert state.pending_logs == []
@@ -0,0 +1,207 @@
+"""Tests for the partitioned tables declared in the models."""
+
+import datetime
+import pytest
+from unittest.mock import MagicMock, patch
+from pydantic import Field
+from viixoo_core.migrations import Migration
+from viixoo_core.models.base import BaseDBModel
+from viixoo_core.models.postgres import PostgresModel
+
+
+class EventModel(PostgresModel):
+    """Mock model partitioned by month."""
+
+    __tablename__ = "event"
+    __partition__ = {"by": "range", "column": "date", "retention": 6}
+
+    name: str
+    date: datetime.date
+
+
+SCHEMA = {
+    "id": {"type": "SERIAL PRIMARY KEY", "required": True},
+    "name": {"type": "TEXT", "required": True},
+    "date": {"type": "DATE", "required": True},
+}
+
+
+class TestPartitions:
+    """Tests for the partitioned tables declared in the models."""
+
+    def test_pydantic_to_sql_partition(self):
+        """Test pydantic_to_sql adds the partitioning of the model with its defaults."""
+        # Act
+        schema = Migration.pydantic_to_sql(EventModel)
+
+        # Assert
+        partition = schema["__partition__"]
+        assert partition["by"] == "range"
+        assert partition["column"] == "date"
+        assert partition["interval"] == "month"
+        assert (partition["premake"], partition["retention"]) == (3, 6)
+        assert partition["expire"] == "detach"
+
+    def test_pydantic_to_sql_partition_unique_field(self):
+        """Test pydantic_to_sql when a unique field is not the partition column."""
+
+        class WrongModel(BaseDBModel):
+            __tablename__ = "wrong"
+            __partition__ = {"by": "hash", "column": "date"}
+
+            code: str = Field(json_schema_extra=dict(unique=True))
+            date: datetime.date
+
+        # Act & Assert
+        with pytest.raises(ValueError) as e:
+            Migration.pydantic_to_sql(WrongModel)
+        assert "Unique field 'code' of partitioned model 'WrongModel'" in str(e.value)
+
+    def test_pydantic_to_sql_partition_unknown_column(self):
+        """Test pydantic_to_sql when the partition column is not in the model."""
+
+        class WrongModel(BaseDBModel):
+            __tablename__ = "wrong"
+            __partition__ = {"column": "missing"}
+
+        # Act & Assert
+        with pytest.raises(ValueError) as e:
+            Migration.pydantic_to_sql(WrongModel)
+        assert "Partition column 'missing' not found in model 'WrongModel'" in str(
+            e.value
+        )
+
+    def test_generate_create_table_query_partitioned(self):
+        """Test generate_create_table_query creates a partitioned parent table."""
+        # Arrange
+        schema = dict(SCHEMA, __partition__={"by": "range", "column": "date"})
+
+        # Act
+        query, _ = Migration.generate_create_table_query("event", schema)
+
+        # Assert
+        assert query == (
+            "CREATE TABLE IF NOT EXISTS event (id SERIAL NOT NULL, name TEXT NOT NULL, "
+            "date DATE NOT NULL, PRIMARY KEY (id, date)) PARTITION BY RANGE (date);"
+        )
+
+    def test_get_partition_key_type(self):
+        """Test get_partition_key_type returns the type of the partition column."""
+        # Act & Assert
+        schema = dict(SCHEMA, __partition__={"column": "id"})
+        assert Migration.get_partition_key_type(schema) == "INTEGER"
+        schema = dict(SCHEMA, __partition__={"column": "date"})
+        assert Migration.get_partition_key_type(schema) == "DATE"
+
+    @patch.object(Migration, "log_change")
+    @patch.object(Migration, "get_partitions")
+    def test_sync_partitions_list(self, mock_partitions, mock_log_change):
+        """Test sync_partitions creates the missing list partitions and the default one."""
+        # Arrange
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ("p",)
+        mock_partitions.return_value = {"event_es": "FOR VALUES IN ('ES')"}
+        schema = dict(
+            SCHEMA,
+            __partition__={
+                "by": "list",
+                "column": "country",
+                "values": {"es": ["ES"], "mx": ["MX", "M'X"]},
+            },
+        )
+
+        # Act
+        Migration.sync_partitions(cursor, "event", schema)
+
+        # Assert
+        assert [c[0][0] for c in cursor.execute.call_args_list[1:]] == [
+            "CREATE TABLE event_default PARTITION OF event DEFAULT;",
+            "CREATE TABLE event_mx PARTITION OF event FOR VALUES IN ('MX', 'M''X');",
+        ]
+        assert mock_log_change.call_count == 2
+
+    @patch.object(Migration, "log_change")
+    @patch.object(Migration, "get_partitions")
+    def test_sync_partitions_hash(self, mock_partitions, mock_log_change):
+        """Test sync_partitions creates the hash partitions without a default one."""
+        # Arrange
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ("p",)
+        mock_partitions.return_value = {}
+        schema = dict(
+            SCHEMA, __partition__={"by": "hash", "column": "id", "modulus": 2}
+        )
+
+        # Act
+        Migration.sync_partitions(cursor, "event", schema)
+
+        # Assert
+        assert [c[0][0] for c in cursor.execute.call_args_list[1:]] == [
+            "CREATE TABLE event_h0 PARTITION OF event FOR VALUES WITH (MODULUS 2, REMAINDER 0);",
+            "CREATE TABLE event_h1 PARTITION OF event FOR VALUES WITH (MODULUS 2, REMAINDER 1);",
+        ]
+
+    @patch.object(Migration, "get_partitions")
+    def test_sync_partitions_not_partitioned(self, mock_partitions, capsys):
+        """Test sync_partitions does not convert a table created without partitions."""
+        # Arrange
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ("r",)
+        schema = dict(SCHEMA, __partition__={"by": "hash", "column": "id"})
+
+        # Act
+        Migration.sync_partitions(cursor, "event", schema)
+
+        # Assert
+        mock_partitions.assert_not_called()
+        assert "Table 'event' is not partitioned" in capsys.readouterr().out
+
+    @patch.object(Migration, "log_change")
+    @patch.object(Migration, "get_range_partitions")
+    def test_sync_range_partitions_detach(self, mock_partitions, mock_log_change):
+        """Test sync_range_partitions creates the next days and detaches the expired ones."""
+        # Arrange
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [("id",), ("date",), ("name",)]
+        today = datetime.date.today()
+        expired = today - datetime.timedelta(days=3)
+        mock_partitions.return_value = {
+            "event_expired": (str(expired), str(expired + datetime.timedelta(days=1))),
+            "event_today": (str(today), str(today + datetime.timedelta(days=1))),
+        }
+
+        # Act
+        Migration.sync_range_partitions(
+            cursor,
+            "event",
+            "date",
+            interval="day",
+            premake=1,
+            retention=2,
+            expire="detach",
+        )
+
+        # Assert
+        queries = [c[0][0] for c in cursor.execute.call_args_list]
+        tomorrow = today + datetime.timedelta(days=1)
+        name = f"event_{tomorrow.strftime('y%Ym%md%d')}"
+        assert len(queries) == 3
+        assert "attgenerated = ''" in queries[0]
+        assert (
+            f"CREATE TABLE {name} (LIKE event INCLUDING DEFAULTS INCLUDING GENERATED);"
+            in queries[1]
+        )
+        assert (
+            f"INSERT INTO {name} (id, date, name)\n"
+            "                SELECT id, date, name FROM event_default" in queries[1]
+        )
+        assert queries[1].index("DELETE FROM event_default") < queries[1].index(
+            "ATTACH PARTITION"
+        )
+        assert queries[2] == "ALTER TABLE event DETACH PARTITION event_expired;"
+
+    def test_get_domain_casts(self):
+        """Test get_domain_casts returns the type of the partition key of the model."""
+        # Act & Assert
+        assert EventModel.get_domain_casts() == {"date": "DATE"}
+        assert PostgresModel.get_domain_casts() == {}
@@ -0,0 +1,123 @@
+"""Tests for the many2many and one2many relations in the Migration class."""
+
+import pytest
+from typing import List
+from pydantic import Field
+from viixoo_core.migrations import Migration
+from viixoo_core.models.base import BaseDBModel
+
+
+class OrderModel(BaseDBModel):
+    """Mock model with relations."""
+
+    __tablename__ = "sale_order"
+
+    name: str
+    tag_ids: List[int] = Field(
+        default_factory=list, json_schema_extra=dict(many2many="crm_tag")
+    )
+    line_ids: List[int] = Field(
+        default_factory=list,
+        json_schema_extra=dict(one2many="sale_order_line", inverse="order_id"),
+    )
+
+
+class LineModel(BaseDBModel):
+    """Mock comodel without the inverse field."""
+
+    __tablename__ = "sale_order_line"
+
+    name: str
+
+
+class TestRelations:
+    """Tests for the many2many and one2many relations."""
+
+    def test_pydantic_to_sql_relations(self):
+        """Test pydantic_to_sql declares the relations instead of columns."""
+        # Act
+        schema = Migration.pydantic_to_sql(OrderModel)
+
+        # Assert
+        assert list(Migration.get_columns(schema)) == ["id", "name"]
+        assert schema["__relations__"] == [
+            {
+                "type": "many2many",
+                "field": "tag_ids",
+                "comodel": "crm_tag",
+                "relation": "crm_tag_sale_order_rel",
+                "column1": "sale_order_id",
+                "column2": "crm_tag_id",
+            },
+            {
+                "type": "one2many",
+                "field": "line_ids",
+                "comodel": "sale_order_line",
+                "inverse": "order_id",
+            },
+        ]
+
+    def test_pydantic_to_sql_one2many_without_inverse(self):
+        """Test pydantic_to_sql with a one2many field without inverse."""
+
+        class WrongModel(BaseDBModel):
+            __tablename__ = "wrong"
+
+            line_ids: List[int] = Field(json_schema_extra=dict(one2many="line"))
+
+        # Act & Assert
+        with pytest.raises(ValueError) as e:
+            Migration.pydantic_to_sql(WrongModel)
+        assert "One2many field 'line_ids' in 'wrong' requires an inverse field" in str(
+            e.value
+        )
+
+    def test_add_relation_tables(self):
+        """Test add_relation_tables adds the relation table and the inverse foreign key."""
+        # Arrange
+        tables = {
+            "sale_order": Migration.pydantic_to_sql(OrderModel),
+            "sale_order_line": Migration.pydantic_to_sql(LineModel),
+        }
+
+        # Act
+        Migration.add_relation_tables(tables)
+
+        # Assert
+        relation = tables["crm_tag_sale_order_rel"]
+        query, foreign_keys = Migration.generate_create_table_query(
+            "crm_tag_sale_order_rel", relation
+        )
+        assert query == (
+            "CREATE TABLE IF NOT EXISTS crm_tag_sale_order_rel (sale_order_id BIGINT, "
+            "crm_tag_id BIGINT, PRIMARY KEY (sale_order_id, crm_tag_id));"
+        )
+        assert "FOREIGN KEY (crm_tag_id) REFERENCES crm_tag(id) ON DELETE CASCADE" in (
+            foreign_keys
+        )
+        assert relation["__indexes__"][0]["columns"] == ["crm_tag_id", "sale_order_id"]
+
+        line = tables["sale_order_line"]
+        assert line["order_id"]["foreign_key"] == "sale_order(id)"
+        assert line["__indexes__"][0]["name"] == "sale_order_line_order_id_idx"
+
+    def test_add_relation_tables_both_sides(self):
+        """Test add_relation_tables with a relation declared from both sides."""
+
+        class TagModel(BaseDBModel):
+            __tablename__ = "crm_tag"
+
+            order_ids: List[int] = Field(
+                default_factory=list, json_schema_extra=dict(many2many="sale_order")
+            )
+
+        tables = {
+            "sale_order": Migration.pydantic_to_sql(OrderModel),
+            "crm_tag": Migration.pydantic_to_sql(TagModel),
+        }
+
+        # Act
+        Migration.add_relation_tables(tables)
+
+        # Assert
+        assert list(tables) == ["sale_order", "crm_tag", "crm_tag_sale_order_rel"]
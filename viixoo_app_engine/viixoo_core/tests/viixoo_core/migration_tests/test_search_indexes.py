@@ -0,0 +1,87 @@
+"""Tests for the trigram search indexes in the Migration class."""
+
+import pytest
+from unittest.mock import MagicMock, patch
+from typing import Optional
+from pydantic import Field
+from viixoo_core.migrations import Migration
+from viixoo_core.models.base import BaseDBModel
+
+
+class SearchModel(BaseDBModel):
+    """Mock model with a trigram search field."""
+
+    __tablename__ = "partner"
+
+    name: Optional[str] = Field(
+        default=None, json_schema_extra=dict(search_index="trigram")
+    )
+    ref: Optional[str] = None
+
+
+class TestMigrationSearchIndexes:
+    """Tests for the trigram search indexes in the Migration class."""
+
+    def test_pydantic_to_sql_search_index(self):
+        """Test pydantic_to_sql keeps the search_index option of the fields."""
+        # Act
+        schema = Migration.pydantic_to_sql(SearchModel)
+
+        # Assert
+        assert schema["name"]["search_index"] == "trigram"
+        assert "search_index" not in schema["ref"]
+
+    def test_pydantic_to_sql_unsupported_search_index(self):
+        """Test pydantic_to_sql with an unsupported search_index option."""
+
+        class WrongModel(BaseDBModel):
+            __tablename__ = "wrong"
+
+            name: Optional[str] = Field(
+                default=None, json_schema_extra=dict(search_index="bloom")
+            )
+
+        # Act & Assert
+        with pytest.raises(ValueError) as e:
+            Migration.pydantic_to_sql(WrongModel)
+        assert "Unsupported search index 'bloom' in field 'name'" in str(e.value)
+
+    @patch.object(Migration, "log_change")
+    @patch.object(Migration, "get_existing_search_indexes")
+    def test_sync_search_indexes_create(self, mock_existing, mock_log_change):
+        """Test sync_search_indexes creates the missing trigram indexes."""
+        # Arrange
+        cursor = MagicMock()
+        mock_existing.return_value = []
+        schema = Migration.pydantic_to_sql(SearchModel)
+
+        # Act
+        Migration.sync_search_indexes(cursor, "partner", schema)
+
+        # Assert
+        cursor.execute.assert_called_once_with(
+            "CREATE INDEX IF NOT EXISTS partner_name_trgm_idx ON partner "
+            "USING GIN (viixoo_unaccent(lower(name)) gin_trgm_ops);"
+        )
+        mock_log_change.assert_called_once()
+
+    @patch.object(Migration, "log_change")
+    @patch.object(Migration, "get_existing_search_indexes")
+    def test_sync_search_indexes_drop_obsolete(self, mock_existing, mock_log_change):
+        """Test sync_search_indexes drops the indexes no longer declared."""
+        # Arrange
+        cursor = MagicMock()
+        mock_existing.return_value = ["partner_name_trgm_idx", "partner_ref_trgm_idx"]
+        schema = Migration.pydantic_to_sql(SearchModel)
+
+        # Act
+        Migration.sync_search_indexes(cursor, "partner", schema)
+
+        # Assert
+        cursor.execute.assert_called_once_with(
+            "DROP INDEX IF EXISTS partner_ref_trgm_idx;"
+        )
+        mock_log_change.assert_called_once_with(
+            "DROP INDEX",
+            "Search index 'partner_ref_trgm_idx' removed from 'partner'",
+        )
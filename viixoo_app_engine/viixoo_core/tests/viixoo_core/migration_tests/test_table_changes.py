@@ -0,0 +1,439 @@
+"""Tests for the catalog introspection and the table changes of the Migration class."""
+
+import psycopg2
+from unittest.mock import MagicMock, patch
+from viixoo_core.migrations import Migration
+import viixoo_core.migrations
+
+
+SCHEMA = {
+    "id": {"type": "INTEGER", "primary_key": True, "required": True},
+    "name": {"type": "CHARACTER VARYING", "required": True, "default": False},
+    "code": {"type": "CHARACTER VARYING", "unique": True, "default": "new"},
+    "partner_id": {
+        "type": "INTEGER",
+        "foreign_key": "partner(id)",
+        "on_delete": "SET NULL",
+    },
+}
+
+
+def existing_table(**columns):
+    """Return an introspected table with the given columns."""
+    existing_columns = {
+        "id": {"type": "INTEGER", "required": True, "default": None, "comment": None},
+        "name": {
+            "type": "CHARACTER VARYING",
+            "required": True,
+            "default": None,
+            "comment": None,
+        },
+        "code": {
+            "type": "CHARACTER VARYING",
+            "required": False,
+            "default": "'new'::character varying",
+            "comment": None,
+        },
+        "partner_id": {
+            "type": "INTEGER",
+            "required": False,
+            "default": None,
+            "comment": None,
+        },
+    }
+    existing_columns.update(columns)
+    return {
+        "columns": existing_columns,
+        "foreign_keys": {
+            "partner_id": {
+                "name": "partner_id_fk",
+                "foreign_table": "partner",
+                "on_delete": "SET NULL",
+                "on_update": "NO ACTION",
+            }
+        },
+        "unique": {"code": "code_unique"},
+        "indexes": {},
+        "triggers": [],
+    }
+
+
+class TestTableChanges:
+    """Test the planning and the application of the table changes."""
+
+    def test_get_catalog(self):
+        """Test get_catalog introspects all the tables in four queries."""
+        # Arrange
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [
+            [
+                ("sale", "id", "BIGINT", True, None, False, None, True),
+                ("sale", "partner_id", "INTEGER", False, None, False, None, False),
+            ],
+            [
+                ("sale", "partner_id_fk", "f", "partner_id", "partner", "n", "a", True),
+                ("sale", "sale_code_not_null", "c", "code", None, " ", " ", False),
+                ("missing", "code_unique", "u", "code", None, " ", " ", True),
+            ],
+            [("sale", "sale_pkey", None, True)],
+            [("sale", "sale_track_changes")],
+        ]
+
+        # Act
+        catalog = Migration.get_catalog(cursor, ["sale", "missing"])
+
+        # Assert
+        assert cursor.execute.call_count == 4
+        assert list(catalog) == ["sale"]
+        assert catalog["sale"]["columns"]["partner_id"] == {
+            "type": "INTEGER",
+            "required": False,
+            "default": None,
+            "generated": False,
+            "comment": None,
+            "identity": False,
+        }
+        assert catalog["sale"]["foreign_keys"] == {
+            "partner_id": {
+                "name": "partner_id_fk",
+                "foreign_table": "partner",
+                "on_delete": "SET NULL",
+                "on_update": "NO ACTION",
+                "valid": True,
+            }
+        }
+        assert catalog["sale"]["checks"] == {
+            "sale_code_not_null": {"column": "code", "valid": False}
+        }
+        assert catalog["sale"]["indexes"] == {
+            "sale_pkey": {"comment": None, "valid": True}
+        }
+        assert catalog["sale"]["triggers"] == ["sale_track_changes"]
+
+    def test_plan_table_changes_unchanged(self):
+        """Test plan_table_changes returns no changes when the table is up to date."""
+        # Act
+        changes = Migration.plan_table_changes("sale", SCHEMA, existing_table())
+
+        # Assert
+        assert changes == []
+
+    def test_plan_table_changes(self):
+        """Test plan_table_changes detects new, changed and obsolete columns."""
+        # Arrange
+        schema = dict(SCHEMA)
+        schema["amount"] = {"type": "REAL", "required": True, "default": 0.5}
+        schema["code"] = {"type": "TEXT"}
+        schema["partner_id"] = {"type": "INTEGER", "foreign_key": "partner(id)"}
+        existing = existing_table(
+            name={
+                "type": "CHARACTER VARYING",
+                "required": False,
+                "default": None,
+                "comment": None,
+            },
+            old_field={"type": "TEXT", "required": False, "default": None},
+        )
+
+        # Act
+        changes = Migration.plan_table_changes("sale", schema, existing)
+
+        # Assert
+        assert [change["clause"] for change in changes] == [
+            "ALTER COLUMN name SET NOT NULL",
+            "ALTER COLUMN code TYPE TEXT USING code::TEXT",
+            "DROP CONSTRAINT code_unique",
+            "DROP CONSTRAINT partner_id_fk",
+            "ADD CONSTRAINT sale_partner_id_fk FOREIGN KEY (partner_id) REFERENCES partner(id) "
+            "ON DELETE NO ACTION ON UPDATE NO ACTION",
+            "ADD COLUMN amount REAL DEFAULT '0.5'::REAL NOT NULL",
+            "DROP COLUMN old_field CASCADE",
+        ]
+        assert {change["table"] for change in changes} == {"sale"}
+
+    def test_plan_table_changes_online(self):
+        """Test plan_table_changes defers the scans of the table in online mode."""
+        # Arrange
+        schema = dict(SCHEMA)
+        schema["name"] = {"type": "CHARACTER VARYING", "required": True, "default": "-"}
+        schema["email"] = {"type": "CHARACTER VARYING", "unique": True}
+        existing = existing_table(
+            name={
+                "type": "CHARACTER VARYING",
+                "required": False,
+                "default": "'-'::character varying",
+                "comment": None,
+            },
+            email={"type": "CHARACTER VARYING", "required": False, "default": None},
+        )
+        existing["foreign_keys"] = {}
+        existing["indexes"] = {"sale_email_unique": {"comment": None, "valid": False}}
+
+        # Act
+        changes = Migration.plan_table_changes("sale", schema, existing, online=True)
+
+        # Assert
+        assert [change["clause"] for change in changes] == [
+            "ADD CONSTRAINT sale_name_not_null CHECK (name IS NOT NULL) NOT VALID",
+            "ADD CONSTRAINT sale_partner_id_fk FOREIGN KEY (partner_id) REFERENCES partner(id) "
+            "ON DELETE SET NULL ON UPDATE NO ACTION NOT VALID",
+            None,
+        ]
+        deferred = [query for change in changes for query, _, _ in change["deferred"]]
+        assert deferred == [
+            Migration.get_backfill_query("sale", "name", "'-'::CHARACTER VARYING"),
+            "ALTER TABLE sale VALIDATE CONSTRAINT sale_name_not_null;",
+            "ALTER TABLE sale ALTER COLUMN name SET NOT NULL;",
+            "ALTER TABLE sale DROP CONSTRAINT sale_name_not_null;",
+            "ALTER TABLE sale VALIDATE CONSTRAINT sale_partner_id_fk;",
+            "DROP INDEX CONCURRENTLY IF EXISTS sale_email_unique;",
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS sale_email_unique ON sale (email);",
+            "ALTER TABLE sale ADD CONSTRAINT sale_email_unique UNIQUE USING INDEX sale_email_unique;",
+        ]
+
+    def test_run_backfill(self):
+        """Test run_backfill updates the batches until no row is left."""
+        # Arrange
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [[(1,), (7,)], [(12,)], []]
+        query = Migration.get_backfill_query("sale", "name", "'50%'::TEXT")
+
+        # Act
+        Migration.run_backfill(cursor, query)
+
+        # Assert
+        assert "SET name = '50%%'::TEXT" in query
+        assert [c[0][1] for c in cursor.execute.call_args_list] == [(0,), (7,), (12,)]
+
+    @patch.object(Migration, "log_change")
+    def test_apply_table_changes(self, mock_log_change):
+        """Test apply_table_changes combines the changes in one ALTER TABLE."""
+        # Arrange
+        cursor = MagicMock()
+        changes = [
+            {
+                "table": "sale",
+                "action": "ADD COLUMN",
+                "clause": "ADD COLUMN amount REAL",
+                "description": "one",
+                "deferred": [],
+            },
+            {
+                "table": "sale",
+                "action": "ADD CONSTRAINT",
+                "clause": None,
+                "description": "unique",
+                "deferred": [("CREATE UNIQUE INDEX", "CREATE INDEX", "index")],
+            },
+            {
+                "table": "sale",
+                "action": "DROP COLUMN",
+                "clause": "DROP COLUMN old_field CASCADE",
+                "description": "two",
+                "deferred": [],
+            },
+        ]
+
+        # Act
+        Migration.apply_table_changes(cursor, "sale", changes)
+
+        # Assert
+        cursor.execute.assert_called_once_with(
+            "ALTER TABLE sale ADD COLUMN amount REAL, DROP COLUMN old_field CASCADE;"
+        )
+        assert mock_log_change.call_count == 2
+        assert viixoo_core.migrations.state.deferred_queries == [
+            ("CREATE UNIQUE INDEX", "CREATE INDEX", "index")
+        ]
+
+        # Clean up
+        viixoo_core.migrations.state.deferred_queries.clear()
+
+    @patch.object(Migration, "disable_removed_tracking_fields")
+    @patch.object(Migration, "get_catalog")
+    def test_update_table_schema_introspects_missing_table(
+        self, mock_catalog, mock_disable
+    ):
+        """Test update_table_schema introspects the table when it is not given."""
+        # Arrange
+        cursor = MagicMock()
+        existing = existing_table()
+        existing["triggers"] = ["sale_track_changes"]
+        mock_catalog.return_value = {"sale": existing}
+
+        # Act
+        Migration.update_table_schema(cursor, "sale", SCHEMA)
+
+        # Assert
+        mock_catalog.assert_called_once_with(cursor, ["sale"])
+        cursor.execute.assert_not_called()
+        mock_disable.assert_called_once_with(cursor, "sale", SCHEMA)
+
+    @patch("viixoo_core.migrations.execute_values")
+    def test_log_change_batch(self, mock_execute_values):
+        """Test the logs are inserted in one statement by flush_logs."""
+        # Arrange
+        cursor = MagicMock()
+        Migration.log_change("ADD COLUMN", "one")
+        Migration.log_change("DROP COLUMN", "two")
+
+        # Act
+        Migration.flush_logs(cursor)
+
+        # Assert
+        mock_execute_values.assert_called_once_with(
+            cursor,
+            "INSERT INTO migration_logs (action, description) VALUES %s",
+            [("ADD COLUMN", "one"), ("DROP COLUMN", "two")],
+        )
+        assert viixoo_core.migrations.state.pending_logs == []
+
+    @patch("viixoo_core.migrations.time.sleep")
+    @patch.object(Migration, "run_deferred_queries")
+    @patch.object(Migration, "migrate_postgresql_tables")
+    @patch.object(Migration, "get_postgresql_tables")
+    @patch.object(Migration, "enable_trigram_extension")
+    @patch.object(Migration, "enable_unaccent_extension")
+    @patch.object(Migration, "create_migration_log_tables")
+    @patch.object(Migration, "get_postgresql_connection")
+    def test_run_postgresql_migrations_online_retry(
+        self,
+        mock_connection,
+        mock_log_tables,
+        mock_unaccent,
+        mock_trigram,
+        mock_tables,
+        mock_migrate,
+        mock_deferred,
+        mock_sleep,
+    ):
+        """Test the online migration is retried when the lock_timeout expires."""
+        # Arrange
+        conn = mock_connection.return_value
+        cursor = conn.cursor.return_value
+        mock_tables.return_value = {"sale": SCHEMA}
+        mock_migrate.side_effect = [psycopg2.errors.LockNotAvailable(), None]
+
+        # Act
+        Migration.run_postgresql_migrations(
+            {"dbname": "test"}, MagicMock(__name__="sale"), online=True
+        )
+
+        # Assert
+        assert mock_migrate.call_count == 2
+        cursor.execute.assert_any_call("SET lock_timeout = %s;", ("5s",))
+        conn.rollback.assert_called_once()
+        mock_sleep.assert_called_once_with(1)
+        mock_deferred.assert_called_once_with(conn)
+
+    def test_get_schema_fingerprint(self):
+        """Test get_schema_fingerprint is stable and detects schema changes."""
+        # Arrange
+        reordered = dict(reversed(list(SCHEMA.items())))
+        changed = dict(SCHEMA, code={"type": "TEXT"})
+
+        # Act
+        fingerprint = Migration.get_schema_fingerprint({"sale": SCHEMA})
+
+        # Assert
+        assert len(fingerprint) == 64
+        assert Migration.get_schema_fingerprint({"sale": reordered}) == fingerprint
+        assert Migration.get_schema_fingerprint({"sale": changed}) != fingerprint
+
+    @patch("viixoo_core.migrations.execute_values")
+    @patch.object(Migration, "sync_partitions")
+    @patch.object(Migration, "migrate_postgresql_tables")
+    @patch.object(Migration, "get_postgresql_tables")
+    @patch.object(Migration, "enable_unaccent_extension")
+    @patch.object(Migration, "create_migration_log_tables")
+    @patch.object(Migration, "get_postgresql_connection")
+    def test_run_postgresql_migrations_unchanged_fingerprint(
+        self,
+        mock_connection,
+        mock_log_tables,
+        mock_unaccent,
+        mock_tables,
+        mock_migrate,
+        mock_sync_partitions,
+        mock_execute_values,
+        capsys,
+    ):
+        """Test the migration is skipped when the schema fingerprint did not change.
+
+        The partitions are still maintained and the pending logs written.
+        """
+        # Arrange
+        conn = mock_connection.return_value
+        cursor = conn.cursor.return_value
+        mock_tables.return_value = {"sale": SCHEMA}
+        mock_log_tables.side_effect = lambda cursor: Migration.log_change(
+            "CREATE PARTITION", "Partition 'migration_logs_data_y2030m01' created"
+        )
+        cursor.fetchone.side_effect = [
+            ("PostgreSQL 16",),
+            (Migration.get_schema_fingerprint({"sale": SCHEMA}),),
+        ]
+
+        # Act
+        Migration.run_postgresql_migrations(
+            {"dbname": "test"}, MagicMock(__name__="sale")
+        )
+
+        # Assert
+        cursor.execute.assert_any_call(
+            "SELECT fingerprint FROM migration_fingerprints WHERE module = %s;",
+            ("sale",),
+        )
+        mock_unaccent.assert_not_called()
+        mock_migrate.assert_not_called()
+        mock_sync_partitions.assert_called_once_with(cursor, "sale", SCHEMA)
+        mock_execute_values.assert_called_once()
+        assert viixoo_core.migrations.state.pending_logs == []
+        conn.commit.assert_called_once()
+        conn.close.assert_called_once()
+        assert "Schema unchanged, skipping module sale" in capsys.readouterr().out
+
+    @patch.object(Migration, "run_deferred_queries")
+    @patch.object(Migration, "migrate_postgresql_tables")
+    @patch.object(Migration, "get_postgresql_tables")
+    @patch.object(Migration, "enable_trigram_extension")
+    @patch.object(Migration, "enable_unaccent_extension")
+    @patch.object(Migration, "create_migration_log_tables")
+    @patch.object(Migration, "get_postgresql_connection")
+    def test_run_postgresql_migrations_saves_fingerprint(
+        self,
+        mock_connection,
+        mock_log_tables,
+        mock_unaccent,
+        mock_trigram,
+        mock_tables,
+        mock_migrate,
+        mock_deferred,
+    ):
+        """Test the fingerprint is stored only when the deferred statements succeed."""
+        # Arrange
+        conn = mock_connection.return_value
+        cursor = conn.cursor.return_value
+        mock_tables.return_value = {"sale": SCHEMA}
+        cursor.fetchone.return_value = None
+        mock_deferred.side_effect = [True, False]
+        module = MagicMock(__name__="sale")
+
+        # Act
+        Migration.run_postgresql_migrations({"dbname": "test"}, module)
+        saved = [
+            c
+            for c in cursor.execute.call_args_list
+            if "migration_fingerprints (" in c[0][0]
+        ]
+        Migration.run_postgresql_migrations({"dbname": "test"}, module, force=True)
+
+        # Assert
+        fingerprint = Migration.get_schema_fingerprint({"sale": SCHEMA})
+        assert [c[0][1] for c in saved] == [("sale", fingerprint)]
+        assert mock_migrate.call_count == 2
+        assert [
+            c
+            for c in cursor.execute.call_args_list
+            if "migration_fingerprints (" in c[0][0]
+        ] == saved
@@ -0,0 +1,229 @@
+"""Tests for the mapping of the field types to SQL types in the Migration class."""
+
+import enum
+import uuid
+import datetime
+from decimal import Decimal
+from typing import Annotated, Literal, Optional
+from unittest.mock import patch
+from pydantic import BaseModel, Field
+from viixoo_core.migrations import Migration, SQL_TYPES
+import viixoo_core.migrations
+from viixoo_core.models.base import BaseDBModel
+
+
+class Color(enum.Enum):
+    """Mock enum with string values."""
+
+    red = "red"
+    blue = "blue"
+
+
+class Priority(enum.IntEnum):
+    """Mock enum with integer values."""
+
+    low = 0
+    high = 1
+
+
+class Address(BaseModel):
+    """Mock nested model stored as JSONB."""
+
+    street: str
+
+
+class ProductModel(BaseDBModel):
+    """Mock model with the supported field types."""
+
+    __tablename__ = "product"
+
+    price: Decimal = Field(max_digits=16, decimal_places=2)
+    weight: float
+    image: Optional[bytes] = None
+    code: uuid.UUID
+    tags: list[str] = ["new", 'a "b"']
+    address: Optional[Address] = None
+    options: dict = {}
+    color: Color = Color.red
+    priority: Priority = Priority.low
+    active: bool = False
+
+
+class LineModel(BaseDBModel):
+    """Mock model with an integer foreign key."""
+
+    __tablename__ = "sale_line"
+
+    order_id: Optional[int] = Field(
+        default=None, json_schema_extra=dict(foreign_key="sale_order(id)")
+    )
+    quantity: int = 0
+
+
+class TestTypes:
+    """Tests for the mapping of the field types to SQL types."""
+
+    def test_get_sql_type(self):
+        """Test get_sql_type with the builtin, optional and container types."""
+        # Act & Assert
+        assert Migration.get_sql_type(str) == "CHARACTER VARYING"
+        assert Migration.get_sql_type(Optional[int]) == "INTEGER"
+        assert Migration.get_sql_type(float | None) == "DOUBLE PRECISION"
+        assert Migration.get_sql_type(Annotated[bytes, "x"]) == "BYTEA"
+        assert Migration.get_sql_type(datetime.timedelta) == "INTERVAL"
+        assert Migration.get_sql_type(Literal["a", "b"]) == "CHARACTER VARYING"
+        assert Migration.get_sql_type(list[int]) == "INTEGER[]"
+        assert Migration.get_sql_type(list[Address]) == "JSONB"
+        assert Migration.get_sql_type(dict[str, int]) == "JSONB"
+        assert Migration.get_sql_type(Priority) == "INTEGER"
+        assert Migration.get_sql_type(int | str) == "TEXT"
+
+    def test_register_type(self):
+        """Test register_type maps a type and its subclasses."""
+
+        class Money(Decimal):
+            pass
+
+        class Euro(Money):
+            pass
+
+        # Act
+        with patch.dict(SQL_TYPES):
+            Migration.register_type(Money, "MONEY")
+
+            # Assert
+            assert Migration.get_sql_type(Euro) == "MONEY"
+        assert Migration.get_sql_type(Euro) == "NUMERIC"
+
+    def test_pydantic_to_sql_types(self):
+        """Test pydantic_to_sql maps the fields and renders their defaults."""
+        # Act
+        schema = Migration.pydantic_to_sql(ProductModel)
+
+        # Assert
+        assert schema["id"] == {
+            "type": "BIGINT",
+            "primary_key": True,
+            "identity": True,
+            "required": True,
+        }
+        assert {column: props["type"] for column, props in schema.items()} == {
+            "id": "BIGINT",
+            "price": "NUMERIC(16,2)",
+            "weight": "DOUBLE PRECISION",
+            "image": "BYTEA",
+            "code": "UUID",
+            "tags": "CHARACTER VARYING[]",
+            "address": "JSONB",
+            "options": "JSONB",
+            "color": "COLOR",
+            "priority": "INTEGER",
+            "active": "BOOLEAN",
+        }
+        assert schema["tags"]["default"] == '{"new","a \\"b\\""}'
+        assert schema["options"]["default"] == "{}"
+        assert schema["color"]["default"] == "red"
+        assert schema["priority"]["default"] == 0
+        assert schema["active"]["default"] is False
+        assert not schema["image"]["required"]
+
+    def test_generate_create_table_query_identity(self):
+        """Test generate_create_table_query creates the id as an identity."""
+        # Arrange
+        schema = {"id": {"type": "BIGINT", "primary_key": True, "identity": True}}
+
+        # Act
+        query, _ = Migration.generate_create_table_query("product", schema)
+
+        # Assert
+        assert query == (
+            "CREATE TABLE IF NOT EXISTS product "
+            "(id BIGINT GENERATED BY DEFAULT AS IDENTITY, PRIMARY KEY (id));"
+        )
+
+    def test_plan_table_changes_serial_to_bigint(self):
+        """Test plan_table_changes widens a SERIAL id and its sequence."""
+        # Arrange
+        schema = {"id": {"type": "BIGINT", "primary_key": True, "identity": True}}
+        existing = {
+            "columns": {
+                "id": {
+                    "type": "INTEGER",
+                    "required": True,
+                    "default": "nextval('product_id_seq'::regclass)",
+                    "identity": False,
+                }
+            }
+        }
+
+        # Act
+        changes = Migration.plan_table_changes("product", schema, existing)
+
+        # Assert
+        assert [c["clause"] for c in changes] == [
+            "ALTER COLUMN id TYPE BIGINT USING id::BIGINT"
+        ]
+        assert changes[0]["deferred"][0][0] == (
+            "ALTER SEQUENCE product_id_seq AS BIGINT;"
+        )
+
+    def test_plan_table_changes_serial_to_bigint_online(self, capsys):
+        """Test plan_table_changes postpones the widening of a SERIAL id in online mode."""
+        # Arrange
+        schema = {"id": {"type": "BIGINT", "primary_key": True, "identity": True}}
+        existing = {
+            "columns": {
+                "id": {
+                    "type": "INTEGER",
+                    "required": True,
+                    "default": "nextval('product_id_seq'::regclass)",
+                    "identity": False,
+                }
+            }
+        }
+
+        # Act
+        changes = Migration.plan_table_changes("product", schema, existing, online=True)
+
+        # Assert
+        assert changes == []
+        assert viixoo_core.migrations.state.postponed_changes == [
+            "Column 'id' in 'product' widened from INTEGER to BIGINT"
+        ]
+        assert "postponed, it rewrites the table" in capsys.readouterr().out
+
+        # Clean up
+        viixoo_core.migrations.state.postponed_changes.clear()
+
+    def test_pydantic_to_sql_foreign_key_bigint(self):
+        """Test pydantic_to_sql maps the integer foreign keys to BIGINT."""
+        # Act
+        schema = Migration.pydantic_to_sql(LineModel)
+
+        # Assert
+        assert schema["order_id"]["type"] == "BIGINT"
+        assert schema["quantity"]["type"] == "INTEGER"
+
+    def test_plan_table_changes_add_identity(self):
+        """Test plan_table_changes makes an id without a default an identity."""
+        # Arrange
+        schema = {"id": {"type": "BIGINT", "primary_key": True, "identity": True}}
+        existing = {
+            "columns": {
+                "id": {
+                    "type": "BIGINT",
+                    "required": True,
+                    "default": None,
+                    "identity": False,
+                }
+            }
+        }
+
+        # Act
+        changes = Migration.plan_table_changes("product", schema, existing)
+
+        # Assert
+        assert [c["clause"] for c in changes] == [
+            "ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY"
+        ]
+        assert changes[0]["deferred"][0][1] == "SET IDENTITY"
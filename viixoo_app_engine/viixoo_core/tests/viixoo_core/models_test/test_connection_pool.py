@@ -0,0 +1,109 @@
+"""Tests for the connection pools of the PostgresModel class."""
+
+import pytest
+from unittest.mock import MagicMock, patch
+from psycopg2.pool import PoolError
+import viixoo_core.models.postgres as postgres
+from viixoo_core.models.pool import ConnectionPool
+from viixoo_core.models.postgres import PostgresModel
+
+CONFIG = {
+    "dbname": "test_db",
+    "user": "test_user",
+    "password": "test_password",
+    "host": "test_host",
+    "port": 5432,
+    "pool_min": 0,
+    "pool_max": 2,
+}
+
+
+class TestConnectionPool:
+    """Tests for the connection pools of the PostgresModel class."""
+
+    def setup_method(self):
+        """Forget the pools of the other tests."""
+        postgres.connection_pools.clear()
+
+    @patch("psycopg2.pool.psycopg2.connect")
+    def test_get_pool(self, mock_connect):
+        """Test get_pool returns one pool per database and process."""
+        # Act
+        pool = PostgresModel.get_pool(CONFIG)
+        same_pool = PostgresModel.get_pool(dict(CONFIG))
+        other_pool = PostgresModel.get_pool(dict(CONFIG, dbname="other_db"))
+        with patch.object(postgres, "pools_pid", -1):
+            forked_pool = PostgresModel.get_pool(CONFIG)
+
+        # Assert
+        assert pool is same_pool
+        assert other_pool is not pool
+        assert forked_pool is not pool
+        assert pool.maxconn == 2
+
+    @patch("psycopg2.pool.psycopg2.connect")
+    def test_get_pool_settings_changed(self, mock_connect):
+        """Test get_pool retires the pool of a database whose settings changed."""
+        # Arrange
+        mock_connect.side_effect = lambda *a, **kw: MagicMock(closed=0)
+        pool = PostgresModel.get_pool(CONFIG)
+        idle_conn, used_conn = pool.getconn(), pool.getconn()
+        pool.putconn(idle_conn)
+
+        # Act
+        new_pool = PostgresModel.get_pool(dict(CONFIG, statement_timeout=5000))
+        pool.putconn(used_conn)
+
+        # Assert
+        assert new_pool is not pool
+        assert new_pool.options["statement_timeout"] == 5000
+        idle_conn.close.assert_called_once()
+        used_conn.close.assert_called_once()
+        new_pool.getconn()
+        assert mock_connect.call_args.kwargs["options"] == "-c statement_timeout=5000"
+
+    @patch("psycopg2.pool.psycopg2.connect")
+    def test_getconn_waits_for_free_connection(self, mock_connect):
+        """Test getconn fails after the timeout when all the connections are in use."""
+        # Arrange
+        mock_connect.side_effect = lambda *a, **kw: MagicMock(closed=0)
+        pool = ConnectionPool(0, 1, timeout=0.01)
+        conn = pool.getconn()
+
+        # Act & Assert
+        with pytest.raises(PoolError):
+            pool.getconn()
+        pool.putconn(conn)
+        assert pool.getconn() is conn
+        assert conn.pool is pool
+
+    @patch("psycopg2.pool.psycopg2.connect")
+    def test_getconn_replaces_closed_connection(self, mock_connect):
+        """Test getconn does not return a connection closed by the server."""
+        # Arrange
+        closed_conn, new_conn = MagicMock(closed=0), MagicMock(closed=0)
+        mock_connect.side_effect = [closed_conn, new_conn]
+        pool = ConnectionPool(0, 1, timeout=0.01)
+        pool.putconn(pool.getconn())
+        closed_conn.closed = 1
+
+        # Act
+        conn = pool.getconn()
+
+        # Assert
+        assert conn is new_conn
+        closed_conn.close.assert_called_once()
+
+    @patch("psycopg2.pool.psycopg2.connect")
+    def test_close_pools(self, mock_connect):
+        """Test close_pools closes and forgets the pools of the process."""
+        # Arrange
+        pool = PostgresModel.get_pool(CONFIG)
+
+        # Act
+        with patch.object(pool, "closeall") as mock_closeall:
+            PostgresModel.close_pools()
+
+        # Assert
+        mock_closeall.assert_called_once()
+        assert postgres.connection_pools == {}
@@ -301,3 +301,100 @@ class TestDomainTranslator:
         # Assert
         assert sql_query == "WHERE (name = %s OR (field1 = %s AND field2 = %s))"
         assert params == ["Jack", "Sam", "Daniel"]
+
+    def test_translate_exact_pattern_conditions(self):
+        """Test translate method with =like and =ilike conditions."""
+        # Arrange
+        domain = [("name", "=like", "Jo_n"), ("email", "=ilike", "%@test.com")]
+
+        # Act
+        sql_query, params = DomainTranslator.translate(domain)
+
+        # Assert
+        assert sql_query == "WHERE name LIKE %s AND email ILIKE %s"
+        assert params == ["Jo_n", "%@test.com"]
+
+    def test_translate_unaccent_ilike_conditions(self):
+        """Test translate method with unaccent_ilike conditions."""
+        # Arrange
+        domain = [
+            ("name", "unaccent_ilike", "%José%"),
+            ("city", "not unaccent_ilike", "Bogotá"),
+        ]
+
+        # Act
+        sql_query, params = DomainTranslator.translate(domain)
+
+        # Assert
+        expec_name = "viixoo_unaccent(lower(name)) LIKE viixoo_unaccent(lower(%s))"
+        expec_city = "viixoo_unaccent(lower(city)) NOT LIKE viixoo_unaccent(lower(%s))"
+        assert sql_query == f"WHERE {expec_name} AND {expec_city}"
+        assert params == ["%José%", "Bogotá"]
+
+    def test_translate_search_conditions(self):
+        """Test translate method with full-text search and match conditions."""
+        # Arrange
+        domain = [
+            ("search_vector", "search", "john -doe"),
+            ("search_vector", "match", ("spanish", "casa")),
+        ]
+
+        # Act
+        sql_query, params = DomainTranslator.translate(domain)
+
+        # Assert
+        expected = "search_vector @@ websearch_to_tsquery(%s::regconfig, %s)"
+        assert sql_query == f"WHERE {expected} AND {expected}"
+        assert params == ["simple", "john -doe", "spanish", "casa"]
+
+    def test_translate_casts(self):
+        """Test translate casts the values compared to the given fields."""
+        # Arrange
+        domain = [
+            ("date", ">=", "2026-01-01"),
+            ("id", "in", [1, 2]),
+            ("name", "=", "a"),
+        ]
+
+        # Act
+        sql_query, params = DomainTranslator.translate(
+            domain, {"date": "DATE", "id": "INTEGER"}
+        )
+
+        # Assert
+        assert sql_query == (
+            "WHERE date >= %s::DATE AND id IN (%s::INTEGER, %s::INTEGER) AND name = %s"
+        )
+        assert params == ["2026-01-01", 1, 2, "a"]
+
+    def test_translate_json_conditions(self):
+        """Test translate with the JSON paths and operators of the JSONB fields."""
+        # Arrange
+        domain = [
+            ("attributes.size.unit", "=", "cm"),
+            ("attributes.size.width", ">", 10),
+            ("attributes.color", "in", ["red", "blue"]),
+            ("attributes", "@>", {"tags": ["new"]}),
+            ("attributes.size", "has_key", "height"),
+        ]
+
+        # Act
+        sql_query, params = DomainTranslator.translate(domain)
+
+        # Assert
+        assert sql_query == (
+            "WHERE attributes @> %s::jsonb AND (attributes #>> %s)::numeric > %s "
+            "AND (attributes #>> %s) IN (%s, %s) AND attributes @> %s::jsonb "
+            "AND (attributes #> %s) ? %s"
+        )
+        assert params == [
+            '{"size": {"unit": "cm"}}',
+            ["size", "width"],
+            10,
+            ["color"],
+            "red",
+            "blue",
+            '{"tags": ["new"]}',
+            ["size"],
+            "height",
+        ]
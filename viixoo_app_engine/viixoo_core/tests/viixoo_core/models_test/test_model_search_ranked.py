@@ -0,0 +1,62 @@
+"""Tests for the search_ranked method of the PostgresModel class."""
+
+import pytest
+from unittest.mock import MagicMock, patch
+from psycopg2.sql import SQL, Identifier, Literal
+from typing import Optional
+from viixoo_core.models.postgres import PostgresModel
+
+
+class MockPostgresModel(PostgresModel):
+    """Mock PostgresModel class with full-text search."""
+
+    __tablename__ = "mock_table"
+    __fulltext__ = {"fields": ["name"], "language": "english"}
+
+    name: Optional[str] = None
+
+
+class TestPostgresModelSearchRanked:
+    """Test the search_ranked method of the PostgresModel class."""
+
+    @patch.object(PostgresModel, "get_connection")
+    def test_search_ranked(self, mock_get_connection):
+        """Test search_ranked method with a domain and a limit."""
+        # Arrange
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_get_connection.return_value.__enter__.return_value = mock_conn
+        mock_cursor.fetchall.return_value = [{"id": 1, "name": "John", "rank": 0.6}]
+
+        model = MockPostgresModel(id=1)
+
+        # Act
+        results = model.search_ranked("john", [("id", ">", 0)], limit=10)
+
+        # Assert
+        tsquery = "search_vector @@ websearch_to_tsquery(%s::regconfig, %s)"
+        expected_query = SQL(
+            "SELECT *, ts_rank({column}, websearch_to_tsquery(%s::regconfig, %s)) AS rank "
+            "FROM {table} {where_clause} ORDER BY rank DESC LIMIT {limit} OFFSET {offset}"
+        ).format(
+            column=Identifier("search_vector"),
+            table=Identifier("mock_table"),
+            where_clause=SQL(f"WHERE {tsquery} AND id > %s"),
+            limit=Literal(10),
+            offset=Literal(0),
+        )
+        mock_cursor.execute.assert_called_once_with(
+            expected_query, ["english", "john", "english", "john", 0]
+        )
+        assert results == [{"id": 1, "name": "John", "rank": 0.6}]
+
+    def test_search_ranked_no_fulltext(self):
+        """Test search_ranked method in a model without full-text search."""
+        # Arrange
+        model = PostgresModel(id=1)
+
+        # Act & Assert
+        with pytest.raises(ValueError) as e:
+            model.search_ranked("john")
+        assert "Full-text search not defined in" in str(e.value)
@@ -3,7 +3,9 @@
 import pytest
 from unittest.mock import MagicMock, patch
 import viixoo_core
+from viixoo_core.models.pool import PooledConnection
 from viixoo_core.models.postgres import PostgresModel
+from viixoo_core.models.registry import DatabaseRegistry
 from viixoo_core.config import BaseConfig
 import importlib
 
@@ -11,11 +13,18 @@ import importlib
 class TestPostgresModelGetConnection:
     """Test the get_connection method of the PostgresModel class."""
 
+    def setup_method(self):
+        """Forget the databases and connection pools of the other tests."""
+        DatabaseRegistry.reset()
+        BaseConfig.settings.clear()
+        viixoo_core.models.postgres.connection_pools.clear()
+
     @patch.object(BaseConfig, "get_config")
-    @patch("psycopg2.connect")
+    # psycopg2.connect is patched first, patch resolves its target with import_module
     @patch.object(importlib, "import_module")
+    @patch("psycopg2.connect")
     def test_get_connection_new_connection(
-        self, mock_import_module, mock_psycopg2_connect, mock_get_config
+        self, mock_psycopg2_connect, mock_import_module, mock_get_config
     ):
         """Test get_connection when a new connection is required."""
         # Arrange
@@ -33,8 +42,8 @@ class TestPostgresModelGetConnection:
         mock_import_module.return_value = mock_module
 
         mock_connection = MagicMock()
+        mock_connection.closed = 0
         mock_psycopg2_connect.return_value = mock_connection
-        viixoo_core.models.postgres.db_connection = mock_connection
 
         model = PostgresModel(id=1)
         model.__class__.__module__ = "test_module.models"
@@ -44,9 +53,11 @@ class TestPostgresModelGetConnection:
 
         # Assert
         assert connection == mock_connection
-        mock_import_module.assert_called_once_with("test_module")
+        mock_import_module.assert_any_call("test_module")
         mock_get_config.assert_called_once_with(base_path="/test/path", module="models")
-        mock_psycopg2_connect.assert_called_once_with(**mock_config)
+        mock_psycopg2_connect.assert_called_once_with(
+            connection_factory=PooledConnection, connect_timeout=10, **mock_config
+        )
 
         # Clean up
         viixoo_core.models.postgres.db_connection = False
@@ -71,10 +82,11 @@ class TestPostgresModelGetConnection:
         viixoo_core.models.postgres.db_connection = False
 
     @patch.object(BaseConfig, "get_config")
-    @patch("psycopg2.connect")
+    # psycopg2.connect is patched first, patch resolves its target with import_module
     @patch.object(importlib, "import_module")
+    @patch("psycopg2.connect")
     def test_get_connection_existing_connection_closed(
-        self, mock_import_module, mock_psycopg2_connect, mock_get_config
+        self, mock_psycopg2_connect, mock_import_module, mock_get_config
     ):
         """Test get_connection when an existing connection is available but closed."""
         # Arrange
@@ -96,6 +108,7 @@ class TestPostgresModelGetConnection:
         mock_import_module.return_value = mock_module
 
         mock_connection_new = MagicMock()
+        mock_connection_new.closed = 0
         mock_psycopg2_connect.return_value = mock_connection_new
 
         model = PostgresModel(id=1)
@@ -104,16 +117,19 @@ class TestPostgresModelGetConnection:
 
         # Assert
         assert connection == mock_connection_new
-        mock_psycopg2_connect.assert_called_once_with(**mock_config)
+        mock_psycopg2_connect.assert_called_once_with(
+            connection_factory=PooledConnection, connect_timeout=10, **mock_config
+        )
 
         # Clean up
         viixoo_core.models.postgres.db_connection = False
 
     @patch.object(BaseConfig, "get_config")
-    @patch("psycopg2.connect")
+    # psycopg2.connect is patched first, patch resolves its target with import_module
     @patch.object(importlib, "import_module")
+    @patch("psycopg2.connect")
     def test_get_connection_error(
-        self, mock_import_module, mock_psycopg2_connect, mock_get_config
+        self, mock_psycopg2_connect, mock_import_module, mock_get_config
     ):
         """Test get_connection error."""
         # Arrange
@@ -135,6 +151,6 @@ class TestPostgresModelGetConnection:
         assert "Some error" in str(e.value)
 
         # Assert
-        mock_import_module.assert_called_once_with("test_module")
+        mock_import_module.assert_any_call("test_module")
         mock_get_config.assert_called_once_with(base_path="/test/path", module="models")
         mock_psycopg2_connect.assert_not_called()
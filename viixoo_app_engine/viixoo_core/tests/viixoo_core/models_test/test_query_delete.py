@@ -41,7 +41,7 @@ class TestPostgresModelQueryDelete:
 
         # Assert
         mock_get_connection.assert_called_once()
-        mock_translate.assert_called_once_with(mock_domain)
+        mock_translate.assert_called_once_with(mock_domain, {})
         assert result is True
 
     @patch.object(PostgresModel, "get_connection")
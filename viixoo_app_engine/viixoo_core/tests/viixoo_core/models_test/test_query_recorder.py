@@ -0,0 +1,124 @@
+"""Tests for the QueryRecorder class."""
+
+import json
+import os
+from unittest.mock import MagicMock, patch
+from viixoo_core.models.query_recorder import QueryRecorder
+from viixoo_core.models.postgres import PostgresModel
+
+PLAN = [
+    {
+        "Plan": {
+            "Node Type": "Limit",
+            "Plans": [{"Node Type": "Seq Scan", "Relation Name": "mock_table"}],
+        }
+    }
+]
+
+
+class MockPostgresModel(PostgresModel):
+    """Mock PostgresModel class for testing purposes."""
+
+    __tablename__ = "mock_table"
+
+
+class TestQueryRecorder:
+    """Tests for the QueryRecorder class."""
+
+    def setup_method(self):
+        """Reset the recorded stats."""
+        QueryRecorder.stats = {}
+        QueryRecorder.pending = 0
+
+    def test_domain_shape(self):
+        """Test domain_shape removes the values of the domain."""
+        # Act
+        shape = QueryRecorder.domain_shape(
+            ["|", ("name", "=", "John"), ("age", ">", 3)]
+        )
+
+        # Assert
+        assert shape == ["|", ["name", "="], ["age", ">"]]
+
+    @patch.object(QueryRecorder, "sample_rate", 1)
+    def test_record_with_explain(self):
+        """Test record aggregates the stats and explains the sampled queries."""
+        # Arrange
+        cursor = MagicMock()
+        cursor.mogrify.return_value = b"SELECT * FROM mock_table WHERE name = 'a'"
+        cursor.fetchone.return_value = {"QUERY PLAN": PLAN}
+
+        # Act
+        QueryRecorder.record(
+            "mock_table", [("name", "=", "a")], 0.2, cursor, "Q", ["a"]
+        )
+        QueryRecorder.record("mock_table", [("name", "=", "b")], 0.4)
+
+        # Assert
+        assert [c[0][0] for c in cursor.execute.call_args_list] == [
+            "SAVEPOINT viixoo_explain",
+            "EXPLAIN (FORMAT JSON) SELECT * FROM mock_table WHERE name = 'a'",
+            "RELEASE SAVEPOINT viixoo_explain",
+        ]
+        entry = QueryRecorder.stats["mock_table"][json.dumps([["name", "="]])]
+        assert entry["count"] == 2
+        assert round(entry["total_time"], 6) == 0.6
+        assert entry["max_time"] == 0.4
+        assert entry["explained"] == 1
+        assert entry["seq_scans"] == 1
+
+    def test_explain_seq_scan_error(self, capsys):
+        """Test a failed EXPLAIN is rolled back to its savepoint, keeping the transaction."""
+        # Arrange
+        cursor = MagicMock()
+        cursor.mogrify.return_value = b"UPDATE mock_table SET name = 'a'"
+        cursor.execute.side_effect = [None, Exception("permission denied"), None]
+
+        # Act
+        seq_scan = QueryRecorder.explain_seq_scan(cursor, "mock_table", "Q", ["a"])
+
+        # Assert
+        assert seq_scan is None
+        assert [c[0][0] for c in cursor.execute.call_args_list] == [
+            "SAVEPOINT viixoo_explain",
+            "EXPLAIN (FORMAT JSON) UPDATE mock_table SET name = 'a'",
+            "ROLLBACK TO SAVEPOINT viixoo_explain",
+        ]
+        assert "permission denied" in capsys.readouterr().out
+
+    def test_has_seq_scan_other_table(self):
+        """Test has_seq_scan ignores the sequential scans on other tables."""
+        # Act & Assert
+        assert not QueryRecorder.has_seq_scan(PLAN[0]["Plan"], "other_table")
+
+    @patch.object(QueryRecorder, "flush_every", 1)
+    def test_record_flush(self, tmp_path):
+        """Test record writes the stats file of the process."""
+        # Arrange
+        with patch.object(QueryRecorder, "path", str(tmp_path)):
+            # Act
+            QueryRecorder.record("mock_table", [("name", "=", "a")], 0.2)
+
+        # Assert
+        file_path = tmp_path / f"advisor-{os.getpid()}.json"
+        assert json.loads(file_path.read_text()) == QueryRecorder.stats
+
+    @patch.object(QueryRecorder, "enabled", True)
+    @patch.object(QueryRecorder, "record")
+    @patch.object(PostgresModel, "get_connection")
+    def test_query_select_records(self, mock_get_connection, mock_record):
+        """Test query_select records the domain when the recorder is enabled."""
+        # Arrange
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_get_connection.return_value.__enter__.return_value = mock_conn
+        mock_cursor.fetchall.return_value = [{"id": 1}]
+
+        # Act
+        rows = MockPostgresModel(id=1).query_select(domain=[("id", "=", 1)])
+
+        # Assert
+        assert rows == [{"id": 1}]
+        mock_record.assert_called_once()
+        assert mock_record.call_args[0][:2] == ("mock_table", [("id", "=", 1)])
@@ -56,7 +56,7 @@ class TestPostgresModelQuerySelect:
 
         # Assert
         mock_get_connection.assert_called_once()
-        mock_translate.assert_called_once_with([])
+        mock_translate.assert_called_once_with([], {})
         mock_cursor.execute.assert_called_once_with(expected_query, [])
         assert results == mock_result
 
@@ -87,7 +87,7 @@ class TestPostgresModelQuerySelect:
 
         # Assert
         mock_get_connection.assert_called_once()
-        mock_translate.assert_called_once_with(mock_domain)
+        mock_translate.assert_called_once_with(mock_domain, {})
         mock_cursor.execute.assert_called_once_with(
             SQL(
                 "SELECT {fields} FROM {table} {where_clause} LIMIT {limit} OFFSET {offset}"
@@ -49,7 +49,7 @@ class TestPostgresModelQueryUpdate:
 
         # Assert
         mock_get_connection.assert_called_once()
-        mock_translate.assert_called_once_with(mock_domain)
+        mock_translate.assert_called_once_with(mock_domain, {})
         mock_cursor.execute.assert_called_once()
         assert results == mock_result
 
@@ -77,7 +77,7 @@ class TestPostgresModelQueryUpdate:
 
         # Assert
         mock_get_connection.assert_called_once()
-        mock_translate.assert_called_once_with(mock_domain)
+        mock_translate.assert_called_once_with(mock_domain, {})
         mock_cursor.execute.assert_called_once()
         assert results == mock_result
 
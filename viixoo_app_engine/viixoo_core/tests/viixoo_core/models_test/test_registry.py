@@ -0,0 +1,175 @@
+"""Tests for the DatabaseRegistry class."""
+
+import time
+import asyncio
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+from viixoo_core.config import BaseConfig
+from viixoo_core.models.postgres import PostgresModel
+from viixoo_core.models.registry import (
+    DatabaseRegistry,
+    TenantMiddleware,
+    current_tenant,
+)
+
+CONFIG = {"dbname": "sale_db", "host": "localhost"}
+
+
+class SaleModel(PostgresModel):
+    """Mock model of the sale app."""
+
+    __tablename__ = "sale_order"
+
+
+class CountryModel(PostgresModel):
+    """Mock model of a database shared by the tenants."""
+
+    __tablename__ = "country"
+    __database__ = "shared"
+
+
+SaleModel.__module__ = "viixoo_backend_apps.sale.models"
+CountryModel.__module__ = "viixoo_backend_apps.sale.models"
+
+
+class TestDatabaseRegistry:
+    """Tests for the DatabaseRegistry class."""
+
+    def setup_method(self):
+        """Forget the databases and settings of the other tests."""
+        DatabaseRegistry.reset()
+        BaseConfig.settings.clear()
+
+    @patch.object(BaseConfig, "get_config")
+    @patch("viixoo_core.models.registry.importlib.import_module")
+    def test_get_config_app(self, mock_import_module, mock_get_config):
+        """Test get_config reads the configuration of an app once."""
+        # Arrange
+        mock_import_module.return_value = MagicMock(__path__=["/apps"])
+        mock_get_config.return_value = CONFIG
+
+        # Act
+        configs = [DatabaseRegistry.get_config(SaleModel) for _ in range(3)]
+
+        # Assert
+        assert all(config["dbname"] == "sale_db" for config in configs)
+        assert configs[0]["pool_max"] == 10
+        mock_get_config.assert_called_once_with(base_path="/apps", module="sale")
+        assert DatabaseRegistry.apps == {"sale": "sale"}
+
+    @patch.object(BaseConfig, "get_config")
+    @patch("viixoo_core.models.registry.importlib.import_module")
+    def test_get_config_threads(self, mock_import_module, mock_get_config):
+        """Test the threads resolving an app at the same time read its settings once."""
+        # Arrange
+        mock_import_module.return_value = MagicMock(__path__=["/apps"])
+        barrier = threading.Barrier(8)
+
+        def get_config(**kwargs):
+            time.sleep(0.01)
+            return CONFIG
+
+        mock_get_config.side_effect = get_config
+
+        def resolve():
+            barrier.wait()
+            return DatabaseRegistry.get_config(SaleModel)
+
+        # Act
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            configs = list(executor.map(lambda _: resolve(), range(8)))
+
+        # Assert
+        assert all(config["dbname"] == "sale_db" for config in configs)
+        mock_get_config.assert_called_once()
+
+    @patch.object(BaseConfig, "get_config")
+    @patch("viixoo_core.models.registry.importlib.import_module")
+    def test_get_config_reload(self, mock_import_module, mock_get_config, capsys):
+        """Test get_config reads the configuration of an app again after a reload."""
+        # Arrange
+        mock_import_module.return_value = MagicMock(__path__=["/apps"])
+        mock_get_config.side_effect = [CONFIG, {**CONFIG, "dbname": "new_db"}]
+        DatabaseRegistry.get_config(SaleModel)
+
+        # Act
+        BaseConfig.reload()
+        config = DatabaseRegistry.get_config(SaleModel)
+
+        # Assert
+        assert config["dbname"] == "new_db"
+        assert mock_get_config.call_count == 2
+
+    def test_get_config_tenant(self):
+        """Test get_config applies the overrides of the tenant of the context."""
+        # Arrange
+        DatabaseRegistry.register_database("main", CONFIG)
+        DatabaseRegistry.register_database("shared", {"dbname": "shared_db"})
+        DatabaseRegistry.register_app("sale", "main")
+        DatabaseRegistry.register_tenant("acme", dbname="acme_db")
+
+        # Act
+        with DatabaseRegistry.use_tenant("acme"):
+            config = DatabaseRegistry.get_config(SaleModel)
+            shared_config = DatabaseRegistry.get_config(CountryModel)
+        config_without_tenant = DatabaseRegistry.get_config(SaleModel)
+
+        # Assert
+        assert config == {"dbname": "acme_db", "host": "localhost"}
+        assert shared_config == {"dbname": "shared_db"}
+        assert config_without_tenant == CONFIG
+        assert current_tenant.get() is None
+
+    def test_errors(self):
+        """Test the unknown databases and tenants are rejected."""
+        # Act & Assert
+        with pytest.raises(ValueError) as e:
+            DatabaseRegistry.register_app("sale", "missing")
+        assert "Database 'missing' not registered" in str(e.value)
+        with pytest.raises(ValueError) as e:
+            DatabaseRegistry.get_config(CountryModel)
+        assert "Database 'shared' not registered" in str(e.value)
+        with pytest.raises(ValueError) as e:
+            with DatabaseRegistry.use_tenant("unknown"):
+                pass
+        assert "Tenant 'unknown' not registered" in str(e.value)
+
+    def test_use_tenant_tasks(self):
+        """Test the tenant of a context is isolated from the concurrent tasks."""
+        # Arrange
+        DatabaseRegistry.register_tenant("acme", dbname="acme_db")
+        DatabaseRegistry.register_tenant("globex", dbname="globex_db")
+
+        async def read_tenant(tenant):
+            with DatabaseRegistry.use_tenant(tenant):
+                await asyncio.sleep(0.01)
+                return current_tenant.get()
+
+        async def main():
+            return await asyncio.gather(read_tenant("acme"), read_tenant("globex"))
+
+        # Act & Assert
+        assert asyncio.run(main()) == ["acme", "globex"]
+
+    def test_tenant_middleware(self):
+        """Test TenantMiddleware sets the tenant of the header of the requests."""
+        # Arrange
+        DatabaseRegistry.register_tenant("acme", dbname="acme_db")
+        app = FastAPI()
+        app.add_middleware(TenantMiddleware, header="X-Tenant")
+
+        @app.get("/tenant")
+        def get_tenant():
+            return current_tenant.get()
+
+        client = TestClient(app)
+
+        # Act & Assert
+        assert client.get("/tenant", headers={"X-Tenant": "acme"}).json() == "acme"
+        assert client.get("/tenant").json() is None
+        response = client.get("/tenant", headers={"X-Tenant": "unknown"})
+        assert response.status_code == 400
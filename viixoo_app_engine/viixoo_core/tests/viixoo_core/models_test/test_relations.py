@@ -0,0 +1,99 @@
+"""Tests for the batched relation reads and writes of the PostgresModel class."""
+
+import pytest
+from typing import List
+from unittest.mock import MagicMock, patch
+from pydantic import Field
+from viixoo_core.models.postgres import PostgresModel
+
+
+class MockOrderModel(PostgresModel):
+    """Mock model with relations."""
+
+    __tablename__ = "sale_order"
+
+    name: str = ""
+    tag_ids: List[int] = Field(
+        default_factory=list, json_schema_extra=dict(many2many="crm_tag")
+    )
+    line_ids: List[int] = Field(
+        default_factory=list,
+        json_schema_extra=dict(one2many="sale_order_line", inverse="order_id"),
+    )
+
+
+def mock_cursor(mock_get_connection):
+    """Return the cursor of the mocked connection."""
+    mock_conn = MagicMock()
+    cursor = MagicMock()
+    mock_conn.cursor.return_value.__enter__.return_value = cursor
+    mock_get_connection.return_value.__enter__.return_value = mock_conn
+    return cursor
+
+
+class TestPostgresModelRelations:
+    """Tests for the batched relation reads and writes of the PostgresModel class."""
+
+    @patch.object(PostgresModel, "get_connection")
+    def test_read_relations(self, mock_get_connection):
+        """Test read_relations reads each relation of all the records in one query."""
+        # Arrange
+        cursor = mock_cursor(mock_get_connection)
+        cursor.fetchall.side_effect = [[(1, [4, 5])], [(2, [7])]]
+
+        # Act
+        result = MockOrderModel().read_relations([1, 2])
+
+        # Assert
+        assert result == {
+            "tag_ids": {1: [4, 5], 2: []},
+            "line_ids": {1: [], 2: [7]},
+        }
+        assert cursor.execute.call_count == 2
+        assert cursor.execute.call_args_list[0][0][1] == ([1, 2],)
+
+    @patch.object(PostgresModel, "get_connection")
+    def test_write_relations(self, mock_get_connection):
+        """Test write_relations replaces the relations with two queries per field."""
+        # Arrange
+        cursor = mock_cursor(mock_get_connection)
+
+        # Act
+        MockOrderModel().write_relations(
+            {"tag_ids": {1: [4, 5], 2: []}, "line_ids": {1: [7]}}
+        )
+
+        # Assert
+        params = [c[0][1] for c in cursor.execute.call_args_list]
+        assert params == [
+            ([1, 2], [1, 1], [4, 5]),
+            ([1, 1], [4, 5]),
+            ([1], [7]),
+            ([1], [7]),
+        ]
+
+    def test_write_relations_unknown_field(self):
+        """Test write_relations with a field that is not a relation."""
+        # Act & Assert
+        with patch.object(PostgresModel, "get_connection"):
+            with pytest.raises(ValueError) as e:
+                MockOrderModel().write_relations({"name": {1: [2]}})
+        assert "Field 'name' is not a relation of 'sale_order'" in str(e.value)
+
+    @patch.object(PostgresModel, "load_model")
+    @patch.object(PostgresModel, "write_relations")
+    @patch.object(PostgresModel, "query_insert")
+    def test_create_relations(self, mock_insert, mock_write_relations, mock_load):
+        """Test create inserts the columns and writes the relations afterwards."""
+        # Arrange
+        mock_insert.return_value = [{"id": 10}]
+        mock_load.return_value = [MagicMock()]
+
+        # Act
+        MockOrderModel().create([{"name": "SO1", "tag_ids": [4], "line_ids": []}])
+
+        # Assert
+        assert MockOrderModel.encode_rows(mock_insert.call_args[0][0]) == [
+            {"name": "SO1"}
+        ]
+        mock_write_relations.assert_called_once_with({"tag_ids": {10: [4]}})
@@ -0,0 +1,159 @@
+"""Tests for the read replica routing of the PostgresModel class."""
+
+import math
+import contextvars
+import psycopg2
+from unittest.mock import MagicMock, patch
+from viixoo_core.models.postgres import PostgresModel
+from viixoo_core.models.registry import DatabaseRegistry
+from viixoo_core.models.replicas import ReplicaRouter
+
+CONFIG = {
+    "dbname": "sale_db",
+    "user": "postgres",
+    "password": "",
+    "host": "primary",
+    "port": 5432,
+    "replicas": ["host=replica1", "host=replica2 port=5433"],
+    "replica_max_lag": 10,
+}
+
+
+class SaleModel(PostgresModel):
+    """Mock model of the sale app."""
+
+    __tablename__ = "sale_order"
+
+
+SaleModel.__module__ = "viixoo_backend_apps.sale.models"
+
+
+def mock_pools(lags=None):
+    """Return a get_pool mock with a pool per host, the replicas with their lag."""
+    lags = lags or {}
+    pools = {}
+
+    def get_pool(config):
+        host = config["host"]
+        if host not in pools:
+            pools[host] = MagicMock()
+            conn = pools[host].getconn.return_value
+            conn.host = host
+            cursor = conn.__enter__.return_value.cursor.return_value.__enter__
+            cursor.return_value.fetchone.return_value = [lags.get(host, 0)]
+        return pools[host]
+
+    return MagicMock(side_effect=get_pool)
+
+
+class TestReplicaRouter:
+    """Tests for the read replica routing of the PostgresModel class."""
+
+    def setup_method(self):
+        """Route the sale app to a database with replicas."""
+        DatabaseRegistry.reset()
+        ReplicaRouter.reset()
+        DatabaseRegistry.register_database("sale", CONFIG)
+        DatabaseRegistry.register_app("sale", "sale")
+
+    def test_get_replica_config(self):
+        """Test get_replica_config applies the DSN of the replica to the primary."""
+        # Act
+        replica = ReplicaRouter.get_replica_config(CONFIG, "host=replica2 port=5433")
+
+        # Assert
+        assert replica["host"] == "replica2"
+        assert replica["port"] == 5433
+        assert replica["dbname"] == "sale_db"
+        assert replica["replicas"] == []
+
+    def test_read_from_replicas(self):
+        """Test the reads use the replicas in turn, checking their lag once."""
+        # Arrange
+        get_pool = mock_pools()
+
+        # Act
+        with patch.object(PostgresModel, "get_pool", get_pool):
+            hosts = contextvars.copy_context().run(
+                lambda: [
+                    SaleModel.model_construct().get_connection(readonly=True).host
+                    for _ in range(3)
+                ]
+            )
+
+        # Assert
+        assert hosts == ["replica1", "replica2", "replica1"]
+        assert set(ReplicaRouter.lags) == {
+            ("replica1", 5432, "sale_db"),
+            ("replica2", 5433, "sale_db"),
+        }
+
+    def test_read_your_writes(self):
+        """Test the reads use the primary after a write in the same context."""
+        # Arrange
+        get_pool = mock_pools()
+        model = SaleModel.model_construct()
+
+        def request():
+            before = model.get_connection(readonly=True).host
+            model.get_connection()
+            after = model.get_connection(readonly=True).host
+            return before, after
+
+        # Act
+        with patch.object(PostgresModel, "get_pool", get_pool):
+            before, after = contextvars.copy_context().run(request)
+            other_request = contextvars.copy_context().run(
+                lambda: model.get_connection(readonly=True).host
+            )
+            with ReplicaRouter.use_primary():
+                primary = model.get_connection(readonly=True).host
+
+        # Assert
+        assert before == "replica1"
+        assert after == "primary"
+        assert other_request == "replica2"
+        assert primary == "primary"
+
+    def test_skip_lagging_replicas(self):
+        """Test the replicas behind the primary or unavailable are skipped."""
+        # Arrange
+        get_pool = mock_pools(lags={"replica1": 60})
+        model = SaleModel.model_construct()
+
+        # Act
+        with patch.object(PostgresModel, "get_pool", get_pool):
+            first = contextvars.copy_context().run(
+                lambda: model.get_connection(readonly=True).host
+            )
+            get_pool(
+                ReplicaRouter.get_replica_config(CONFIG, "host=replica2 port=5433")
+            ).getconn.side_effect = psycopg2.OperationalError("down")
+            second = contextvars.copy_context().run(
+                lambda: model.get_connection(readonly=True).host
+            )
+
+        # Assert
+        assert first == "replica2"
+        assert second == "primary"
+        assert ReplicaRouter.lags[("replica1", 5432, "sale_db")][0] == 60
+        assert ReplicaRouter.lags[("replica2", 5433, "sale_db")][0] == math.inf
+
+    @patch.object(PostgresModel, "query_select")
+    @patch.object(PostgresModel, "write_relations")
+    @patch.object(PostgresModel, "get_relations")
+    def test_write_selects_from_primary(
+        self, mock_get_relations, mock_write_relations, mock_query_select
+    ):
+        """Test write reads the records to write from the primary."""
+        # Arrange
+        mock_get_relations.return_value = {"tag_ids": {"type": "many2many"}}
+        mock_query_select.side_effect = lambda *args: [
+            {"id": 1, "primary": ReplicaRouter.is_written(CONFIG)}
+        ]
+
+        # Act
+        written = SaleModel.model_construct(id=1).write([{"tag_ids": [1]}])
+
+        # Assert
+        assert written == [{"id": 1, "primary": True}]
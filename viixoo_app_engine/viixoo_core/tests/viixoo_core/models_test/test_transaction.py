@@ -0,0 +1,109 @@
+"""Tests for the transactions of the PostgresModel class."""
+
+import pytest
+from unittest.mock import MagicMock, call, patch
+from viixoo_core.models.postgres import PostgresModel
+from viixoo_core.models.registry import DatabaseRegistry
+from viixoo_core.models.transaction import Transaction
+
+CONFIG = {
+    "dbname": "sale_db",
+    "user": "postgres",
+    "password": "",
+    "host": "localhost",
+    "port": 5432,
+}
+
+
+class SaleModel(PostgresModel):
+    """Mock model of the sale app."""
+
+    __tablename__ = "sale_order"
+
+
+SaleModel.__module__ = "viixoo_backend_apps.sale.models"
+
+
+class TestTransaction:
+    """Tests for the transactions of the PostgresModel class."""
+
+    def setup_method(self):
+        """Route the sale app to a mock database."""
+        DatabaseRegistry.reset()
+        DatabaseRegistry.register_database("sale", CONFIG)
+        DatabaseRegistry.register_app("sale", "sale")
+        self.pool = MagicMock()
+        self.conn = self.pool.getconn.return_value
+        self.cursor = self.conn.cursor.return_value.__enter__.return_value
+
+    def get_statements(self):
+        """Return the statements executed in the connection of the transaction."""
+        return [c.args for c in self.cursor.execute.call_args_list]
+
+    def test_transaction_binds_connection(self):
+        """Test the queries of the block use the connection of the transaction."""
+        # Arrange
+        model = SaleModel.model_construct()
+
+        # Act
+        with patch.object(PostgresModel, "get_pool", return_value=self.pool):
+            with SaleModel.transaction() as transaction:
+                with model.get_connection() as conn:
+                    write_conn = conn
+                with model.get_connection(readonly=True) as conn:
+                    read_conn = conn
+                committed_inside = self.conn.__exit__.called
+            outside = model.get_connection()
+
+        # Assert
+        assert isinstance(transaction, Transaction)
+        assert write_conn is read_conn is self.conn
+        assert not committed_inside
+        self.pool.getconn.assert_called()
+        self.conn.__enter__.assert_called_once()
+        self.conn.__exit__.assert_called_once_with(None, None, None)
+        assert outside is not transaction
+
+    def test_transaction_options(self):
+        """Test the options of the transaction are set locally."""
+        # Act
+        with patch.object(PostgresModel, "get_pool", return_value=self.pool):
+            with SaleModel.transaction(statement_timeout=500, synchronous_commit="off"):
+                pass
+
+        # Assert
+        assert self.get_statements() == [
+            ("SELECT set_config(%s, %s, true)", ("statement_timeout", "500")),
+            ("SELECT set_config(%s, %s, true)", ("synchronous_commit", "off")),
+        ]
+
+    def test_transaction_invalid_option(self):
+        """Test an invalid synchronous_commit is rejected and rolls back."""
+        # Act & Assert
+        with patch.object(PostgresModel, "get_pool", return_value=self.pool):
+            with pytest.raises(ValueError, match="Invalid synchronous_commit 'never'"):
+                with SaleModel.transaction(synchronous_commit="never"):
+                    pass
+        assert self.conn.__exit__.call_args.args[0] is ValueError
+
+    def test_nested_savepoints(self):
+        """Test the nested blocks are savepoints, rolled back alone on errors."""
+        # Act
+        with patch.object(PostgresModel, "get_pool", return_value=self.pool):
+            with SaleModel.transaction() as transaction:
+                with SaleModel.transaction() as nested:
+                    pass
+                with pytest.raises(KeyError):
+                    with SaleModel.transaction():
+                        raise KeyError("line")
+
+        # Assert
+        assert nested is transaction
+        self.pool.getconn.assert_called_once()
+        assert self.cursor.execute.call_args_list == [
+            call("SAVEPOINT viixoo_savepoint_1"),
+            call("RELEASE SAVEPOINT viixoo_savepoint_1"),
+            call("SAVEPOINT viixoo_savepoint_2"),
+            call("ROLLBACK TO SAVEPOINT viixoo_savepoint_2"),
+        ]
+        self.conn.__exit__.assert_called_once_with(None, None, None)
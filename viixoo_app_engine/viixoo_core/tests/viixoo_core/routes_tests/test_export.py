@@ -0,0 +1,185 @@
+"""Tests for the streamed exports of the models."""
+
+import json
+import asyncio
+import pytest
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+from fastapi import APIRouter, FastAPI
+from starlette.requests import ClientDisconnect
+from starlette.testclient import TestClient
+from viixoo_core.models.postgres import PostgresModel
+from viixoo_core.routes.base_controller import BaseController
+from viixoo_core.routes.export import ExportResponse, ModelExporter
+
+ROWS = [
+    {"id": 1, "name": "SO1", "amount": Decimal("1.50"), "data": {"a": 1}},
+    {"id": 2, "name": "SO2", "amount": Decimal("2"), "data": None},
+    {"id": 3, "name": "SO3", "amount": Decimal("0"), "data": None},
+]
+
+
+class MockOrderModel(PostgresModel):
+    """Mock model to export."""
+
+    __tablename__ = "sale_order"
+
+    name: str = ""
+
+
+class MockBatches:
+    """Generator of batches of rows, recording whether it was closed."""
+
+    def __init__(self, batch_size=2):
+        """Initialize the batches of ROWS."""
+        self.closed = False
+        self.generator = self.generate(batch_size)
+
+    def generate(self, batch_size):
+        """Yield ROWS by batches."""
+        try:
+            for start in range(0, len(ROWS), batch_size):
+                end = start + batch_size
+                yield [dict(row) for row in ROWS[start:end]]
+        finally:
+            self.closed = True
+
+
+class TestModelExporter:
+    """Tests for the ModelExporter class."""
+
+    @patch.object(PostgresModel, "get_connection")
+    def test_iter_batches(self, mock_get_connection):
+        """Test iter_batches reads the rows with a server-side cursor by batches."""
+        # Arrange
+        cursor = MagicMock()
+        mock_conn = mock_get_connection.return_value.__enter__.return_value
+        mock_conn.cursor.return_value.__enter__.return_value = cursor
+        cursor.fetchmany.side_effect = [ROWS[:2], ROWS[2:], []]
+
+        # Act
+        batches = list(MockOrderModel().iter_batches(["id"], batch_size=2))
+
+        # Assert
+        assert batches == [ROWS[:2], ROWS[2:]]
+        assert mock_conn.cursor.call_args.kwargs["name"].startswith("viixoo_export_")
+        assert cursor.itersize == 2
+        mock_get_connection.assert_called_once_with(readonly=True)
+
+    def test_iter_ndjson(self):
+        """Test iter_ndjson writes a JSON line per row and a chunk per batch."""
+        # Act
+        chunks = list(ModelExporter.iter_ndjson(MockBatches().generator))
+
+        # Assert
+        assert len(chunks) == 2
+        lines = b"".join(chunks).decode().splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+        assert json.loads(lines[0])["data"] == {"a": 1}
+
+    def test_iter_csv(self):
+        """Test iter_csv writes the header once and the JSON fields as JSON."""
+        # Act
+        chunks = list(ModelExporter.iter_csv(MockBatches().generator, ["id", "name"]))
+
+        # Assert
+        assert len(chunks) == 2
+        assert b"".join(chunks).decode().splitlines() == [
+            "id,name,amount,data",
+            '1,SO1,1.50,"{""a"":1}"',
+            "2,SO2,2,",
+            "3,SO3,0,",
+        ]
+
+    def test_iter_csv_empty(self):
+        """Test iter_csv writes the header of the columns when there are no rows."""
+        # Act
+        chunks = list(ModelExporter.iter_csv(iter([]), ["id", "name"]))
+
+        # Assert
+        assert b"".join(chunks).decode().splitlines() == ["id,name"]
+
+    def test_get_fields(self):
+        """Test get_fields returns the SQL types of the columns of the model."""
+        # Act
+        fields = ModelExporter.get_fields(MockOrderModel)
+        selected = ModelExporter.get_fields(MockOrderModel, ["name", "amount"])
+
+        # Assert
+        assert fields == {"id": "BIGINT", "name": "CHARACTER VARYING"}
+        assert selected == {"name": "CHARACTER VARYING", "amount": "TEXT"}
+
+    def test_check_format(self):
+        """Test the unknown formats are rejected."""
+        # Act & Assert
+        with pytest.raises(ValueError, match="Unknown export format 'xml'"):
+            ModelExporter.check_format("xml")
+
+    def test_export_route(self):
+        """Test the export route streams the format of the query parameter."""
+        # Arrange
+        app = FastAPI()
+        controller = BaseController(APIRouter())
+        controller.add_export_route("/orders/export", MockOrderModel)
+        app.include_router(controller.router)
+        client = TestClient(app)
+        batches = MockBatches()
+
+        # Act
+        with patch.object(
+            PostgresModel, "iter_batches", return_value=batches.generator
+        ) as mock_iter_batches:
+            response = client.get("/orders/export", params={"format": "csv"})
+        unknown = client.get("/orders/export", params={"format": "xml"})
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/csv; charset=utf-8"
+        assert 'filename="sale_order.csv"' in response.headers["content-disposition"]
+        assert len(response.text.splitlines()) == 4
+        mock_iter_batches.assert_called_once_with(False, [], 2000)
+        assert batches.closed
+        assert unknown.status_code == 400
+
+    def test_export_route_empty(self):
+        """Test the CSV export of no rows has the header of the model columns."""
+        # Arrange
+        app = FastAPI()
+        controller = BaseController(APIRouter())
+        controller.add_export_route("/orders/export", MockOrderModel)
+        app.include_router(controller.router)
+        client = TestClient(app)
+
+        # Act
+        with patch.object(
+            PostgresModel, "iter_batches", return_value=(rows for rows in [])
+        ):
+            response = client.get("/orders/export", params={"format": "csv"})
+
+        # Assert
+        assert response.status_code == 200
+        assert response.text.splitlines() == ["id,name"]
+
+    def test_client_disconnect(self):
+        """Test the rows are no longer read once the client disconnects."""
+        # Arrange
+        batches = MockBatches(batch_size=1)
+        response = ExportResponse(
+            ModelExporter.iter_export(batches.generator, "ndjson", MockOrderModel)
+        )
+        sent = []
+
+        async def send(message):
+            if len(sent) == 2:
+                raise OSError("Connection reset")
+            sent.append(message)
+
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+
+        # Act
+        with pytest.raises(ClientDisconnect):
+            asyncio.run(response(scope, None, send))
+
+        # Assert
+        assert batches.closed
+        assert sent[1]["body"].startswith(b'{"id":1')
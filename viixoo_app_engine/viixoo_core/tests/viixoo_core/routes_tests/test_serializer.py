@@ -0,0 +1,104 @@
+"""Tests for the JSON serialization of the responses."""
+
+import json
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+from fastapi import APIRouter, FastAPI
+from pydantic import BaseModel
+from starlette.testclient import TestClient
+import viixoo_core.routes.serializer as serializer
+from viixoo_core.routes.base_controller import BaseController
+from viixoo_core.routes.serializer import JSONSerializer
+
+
+class MockModel(BaseModel):
+    """Mock model."""
+
+    id: int
+    name: str
+    amount: Decimal = Decimal("0")
+
+
+class TestJSONSerializer:
+    """Tests for the JSONSerializer class."""
+
+    def test_dumps_models(self):
+        """Test dumps serializes a list of models with a cached TypeAdapter."""
+        # Arrange
+        models = [MockModel(id=1, name="A"), MockModel(id=2, name="B", amount="1.5")]
+
+        # Act
+        data = JSONSerializer.dumps(models)
+
+        # Assert
+        assert json.loads(data) == [
+            {"id": 1, "name": "A", "amount": "0"},
+            {"id": 2, "name": "B", "amount": "1.5"},
+        ]
+        assert MockModel in JSONSerializer.adapters
+        assert json.loads(JSONSerializer.dumps(models[0]))["id"] == 1
+
+    def test_dumps_rows(self):
+        """Test dumps serializes rows, with and without orjson."""
+        # Arrange
+        rows = [{"id": 1, "date": date(2024, 1, 31), "amount": Decimal("2.50")}]
+        expected = [{"id": 1, "date": "2024-01-31", "amount": "2.50"}]
+
+        # Act
+        data = JSONSerializer.dumps(rows)
+        with patch.object(serializer, "orjson", None):
+            data_without_orjson = JSONSerializer.dumps(rows)
+
+        # Assert
+        assert json.loads(data) == expected
+        assert json.loads(data_without_orjson) == expected
+
+    def test_iter_array(self):
+        """Test iter_array serializes the items of a generator by chunks."""
+        # Arrange
+        rows = ({"id": i} for i in range(5))
+
+        # Act
+        chunks = list(JSONSerializer.iter_array(rows, chunk_size=2))
+
+        # Assert
+        assert len(chunks) == 5
+        assert json.loads(b"".join(chunks)) == [{"id": i} for i in range(5)]
+        assert b"".join(JSONSerializer.iter_array([])) == b"[]"
+
+
+class TestBaseControllerResponses:
+    """Tests for the JSON responses of the BaseController class."""
+
+    def test_fast_json_route(self):
+        """Test the fast_json routes keep their parameters and return JSON."""
+        # Arrange
+        app = FastAPI()
+        controller = BaseController(APIRouter())
+
+        def get_models(limit: int = 2):
+            return [MockModel(id=i, name=f"M{i}") for i in range(limit)]
+
+        async def get_rows():
+            return [{"id": 1}]
+
+        controller.add_route("/models", get_models, fast_json=True)
+        controller.add_route("/rows", get_rows, fast_json=True)
+        controller.add_route(
+            "/stream",
+            lambda: controller.stream_response(({"id": i} for i in range(3)), 2),
+        )
+        app.include_router(controller.router)
+        client = TestClient(app)
+
+        # Act
+        models = client.get("/models", params={"limit": 3})
+        rows = client.get("/rows")
+        stream = client.get("/stream")
+
+        # Assert
+        assert models.headers["content-type"] == "application/json"
+        assert [m["name"] for m in models.json()] == ["M0", "M1", "M2"]
+        assert rows.json() == [{"id": 1}]
+        assert stream.json() == [{"id": 0}, {"id": 1}, {"id": 2}]
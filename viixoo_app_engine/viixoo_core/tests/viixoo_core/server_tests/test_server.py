@@ -0,0 +1,97 @@
+"""Tests for the PreforkServer class."""
+
+import signal
+from unittest.mock import patch
+from viixoo_core.server import PreforkServer, get_default_workers
+
+
+class TestPreforkServer:
+    """Tests for the PreforkServer class."""
+
+    def test_get_default_workers(self):
+        """Test get_default_workers returns the CPUs available."""
+        # Act & Assert
+        assert get_default_workers() >= 1
+
+    @patch("viixoo_core.server.PostgresModel.close_pools")
+    def test_load_app(self, mock_close_pools):
+        """Test load_app imports the application and closes the pools of the master."""
+        # Arrange
+        server = PreforkServer(app="viixoo_core.server:PreforkServer")
+
+        # Act
+        app = server.load_app()
+
+        # Assert
+        assert app is PreforkServer
+        mock_close_pools.assert_called_once()
+
+    @patch("viixoo_core.server.os.waitpid")
+    def test_reap_workers(self, mock_waitpid, capsys):
+        """Test reap_workers forgets the exited workers and reports the failed ones."""
+        # Arrange
+        server = PreforkServer(workers=3)
+        server.workers = {10: 0.0, 11: 0.0, 12: 0.0}
+        mock_waitpid.side_effect = [(10, 0), (11, 1 << 8), (0, 0)]
+
+        # Act
+        server.reap_workers()
+
+        # Assert
+        assert list(server.workers) == [12]
+        output = capsys.readouterr().out
+        assert "👋 Worker exited: 10" in output
+        assert "⚠️ Worker 11 exited with code 1" in output
+
+    @patch("viixoo_core.server.os.kill")
+    @patch.object(PreforkServer, "spawn_worker")
+    def test_restart_workers(self, mock_spawn_worker, mock_kill):
+        """Test restart_workers starts the new workers before stopping the old ones."""
+        # Arrange
+        server = PreforkServer(workers=2)
+        server.workers = {10: 0.0, 11: 0.0}
+
+        # Act
+        server.restart_workers()
+
+        # Assert
+        assert mock_spawn_worker.call_count == 2
+        assert [c.args for c in mock_kill.call_args_list] == [
+            (10, signal.SIGTERM),
+            (11, signal.SIGTERM),
+        ]
+
+    @patch("viixoo_core.server.os.kill")
+    def test_reload_workers(self, mock_kill):
+        """Test reload_workers sends SIGHUP to the workers to reload their settings."""
+        # Arrange
+        server = PreforkServer(workers=2)
+        server.workers = {10: 0.0, 11: 0.0}
+
+        # Act
+        server.reload_workers()
+
+        # Assert
+        assert [c.args for c in mock_kill.call_args_list] == [
+            (10, signal.SIGHUP),
+            (11, signal.SIGHUP),
+        ]
+
+    @patch("viixoo_core.server.os.waitpid")
+    @patch("viixoo_core.server.os.kill")
+    def test_stop_workers_timeout(self, mock_kill, mock_waitpid):
+        """Test stop_workers kills the workers still running after the graceful timeout."""
+        # Arrange
+        server = PreforkServer(workers=1, graceful_timeout=0)
+        server.workers = {10: 0.0}
+        mock_waitpid.return_value = (10, signal.SIGKILL)
+
+        # Act
+        server.stop_workers()
+
+        # Assert
+        assert [c.args for c in mock_kill.call_args_list] == [
+            (10, signal.SIGTERM),
+            (10, signal.SIGKILL),
+        ]
+        assert server.workers == {}
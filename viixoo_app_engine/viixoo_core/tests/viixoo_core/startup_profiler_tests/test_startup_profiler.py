@@ -0,0 +1,106 @@
+"""Tests for the StartupProfiler class."""
+
+import json
+from unittest.mock import patch
+from viixoo_core.startup_profiler import StartupProfiler
+from viixoo_core.models.postgres import PostgresModel
+
+
+class TestStartupProfiler:
+    """Tests for the StartupProfiler class."""
+
+    def setup_method(self):
+        """Reset the recorded events."""
+        StartupProfiler.events = []
+        StartupProfiler.model_starts = {}
+
+    @patch.object(StartupProfiler, "enabled", False)
+    def test_span_disabled(self):
+        """Test span records nothing when the profiler is disabled."""
+        # Act
+        with StartupProfiler.span("sale", "import"):
+            pass
+
+        # Assert
+        assert StartupProfiler.events == []
+
+    @patch.object(StartupProfiler, "enabled", True)
+    def test_span(self):
+        """Test span records a complete trace event, also when the block fails."""
+        # Act
+        try:
+            with StartupProfiler.span("sale", "import"):
+                raise ImportError("boom")
+        except ImportError:
+            pass
+
+        # Assert
+        (event,) = StartupProfiler.events
+        assert event["name"] == "sale"
+        assert event["cat"] == "import"
+        assert event["ph"] == "X"
+        assert event["dur"] >= 0
+
+    @patch.object(StartupProfiler, "enabled", True)
+    def test_model_creation(self):
+        """Test the creation of the model classes is recorded."""
+
+        class ProfiledModel(PostgresModel):
+            __tablename__ = "profiled"
+
+            name: str
+
+        # Assert
+        (event,) = StartupProfiler.events
+        assert event["cat"] == "model"
+        assert event["name"].endswith("ProfiledModel")
+        assert StartupProfiler.model_starts == {}
+
+    @patch.object(StartupProfiler, "top", 2)
+    def test_format_report(self):
+        """Test format_report sorts the steps and adds the time of each kind of step."""
+        # Arrange
+        StartupProfiler.add_event("sale", "import", 0, 0.002)
+        StartupProfiler.add_event("stock", "import", 0, 0.001)
+        StartupProfiler.add_event("sale", "routes", 0, 0.004)
+
+        # Act
+        report = StartupProfiler.format_report().splitlines()
+
+        # Assert
+        assert report[1:4] == [
+            "    routes: 4.0 ms",
+            "    import: 3.0 ms",
+            "🐢 Slowest 2 steps:",
+        ]
+        assert report[4].split() == ["4.0", "ms", "routes", "sale"]
+        assert report[5].split() == ["2.0", "ms", "import", "sale"]
+        assert len(report) == 6
+
+    def test_write_trace(self, tmp_path):
+        """Test write_trace writes the events in the Chrome trace format."""
+        # Arrange
+        StartupProfiler.add_event("sale", "routes", 1, 2)
+        StartupProfiler.add_event("sale", "import", 0, 1)
+
+        # Act
+        with patch.object(StartupProfiler, "path", str(tmp_path)):
+            file_path = StartupProfiler.write_trace()
+
+        # Assert
+        with open(file_path, "r") as f:
+            trace = json.load(f)
+        assert file_path.startswith(str(tmp_path))
+        assert [e["cat"] for e in trace["traceEvents"]] == ["import", "routes"]
+        assert trace["traceEvents"][0]["dur"] == 1000000
+
+    @patch.object(StartupProfiler, "enabled", False)
+    @patch.object(StartupProfiler, "write_trace")
+    def test_finish_disabled(self, mock_write_trace, capsys):
+        """Test finish does nothing when the profiler is disabled."""
+        # Act
+        StartupProfiler.finish()
+
+        # Assert
+        mock_write_trace.assert_not_called()
+        assert capsys.readouterr().out == ""
@@ -12,10 +12,10 @@ from starlette.testclient import TestClient
 class TestApp:
     """Test the main app."""
 
-    @patch("viixoo_core.app.ImportUtils.import_module_from_path")
+    @patch("viixoo_core.app.ImportUtils.load_apps")
     def test_load_modules_success(self, mock_import_module):
         """Test load_modules function with successful module loading."""
-        # Mock the return value of import_module_from_path
+        # Mock the return value of load_apps
         mock_module_1 = MagicMock()
         mock_module_1.routes.routes = MagicMock()
         mock_module_1.routes.routes.register_routes = MagicMock()
@@ -31,14 +31,14 @@ class TestApp:
         load_modules()
 
         # Assertions
-        mock_import_module.assert_called_once_with(APPS_PATH)
+        mock_import_module.assert_called_once_with(APPS_PATH, manifests=None)
         mock_module_1.routes.routes.register_routes.assert_called_once_with(controller)
         mock_module_2.routes.routes.register_routes.assert_called_once_with(controller)
 
-    @patch("viixoo_core.app.ImportUtils.import_module_from_path")
+    @patch("viixoo_core.app.ImportUtils.load_apps")
     def test_load_modules_no_routes(self, mock_import_module, capsys):
         """Test load_modules when a module has no routes attribute."""
-        # Mock the return value of import_module_from_path
+        # Mock the return value of load_apps
         mock_module_1 = MagicMock()
         mock_module_1.routes = MagicMock()
         mock_module_1.routes.routes = None
@@ -50,14 +50,14 @@ class TestApp:
         load_modules()
 
         # Assertions
-        mock_import_module.assert_called_once_with(APPS_PATH)
+        mock_import_module.assert_called_once_with(APPS_PATH, manifests=None)
         captured = capsys.readouterr()
         assert " don't have routes, ignoring..." in captured.out
 
-    @patch("viixoo_core.app.ImportUtils.import_module_from_path")
+    @patch("viixoo_core.app.ImportUtils.load_apps")
     def test_load_modules_no_register_routes(self, mock_import_module, capsys):
         """Test load_modules when a module has no register_routes method."""
-        # Mock the return value of import_module_from_path
+        # Mock the return value of load_apps
         mock_module_1 = MagicMock()
         mock_module_1.routes = MagicMock()
         mock_module_1.routes.routes = MagicMock()
@@ -71,20 +71,20 @@ class TestApp:
 
         # Assertions
         captured = capsys.readouterr()
-        mock_import_module.assert_called_once_with(APPS_PATH)
+        mock_import_module.assert_called_once_with(APPS_PATH, manifests=None)
         assert "Error loading modules" in captured.out
 
-    @patch("viixoo_core.app.ImportUtils.import_module_from_path")
+    @patch("viixoo_core.app.ImportUtils.load_apps")
     def test_load_modules_error(self, mock_import_module):
         """Test load_modules function with an exception during module loading."""
-        # Mock import_module_from_path to raise an exception
+        # Mock load_apps to raise an exception
         mock_import_module.side_effect = Exception("Test exception")
 
         # Call the function
         load_modules()
 
         # Assertions
-        mock_import_module.assert_called_once_with(APPS_PATH)
+        mock_import_module.assert_called_once_with(APPS_PATH, manifests=None)
 
     def test_app_endpoints(self):
         """Test the main app endpoints (healthcheck, /, /v1, /v1/docs)."""
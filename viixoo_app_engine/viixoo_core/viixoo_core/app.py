@@ -5,6 +5,10 @@ from viixoo_core.routes.base_controller import BaseController
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.openapi.docs import get_swagger_ui_html
 from viixoo_core.import_utils import APPS_PATH, ImportUtils
+from viixoo_core.startup_profiler import StartupProfiler
+from viixoo_core.boot_cache import BootCache
+from viixoo_core.models.registry import TenantMiddleware
+from viixoo_core.config import BaseConfig
 from starlette.middleware.cors import CORSMiddleware
 import os
 from dotenv import load_dotenv
@@ -23,9 +27,14 @@ app.add_middleware(
         allow_methods=["*"],
         allow_headers=["*"],
     )
+# Header with the tenant of the requests, to route them to its databases
+tenant_header = os.getenv("VIIXOO_TENANT_HEADER", "")
+if tenant_header:
+    app.add_middleware(TenantMiddleware, header=tenant_header)
 
 router = APIRouter()
 controller = BaseController(router)
+boot_cache = BootCache.load(APPS_PATH)
 
 
 # Cargar dinámicamente todos los módulos dentro de viixoo_backend_apps
@@ -33,12 +42,15 @@ def load_modules():
     """Load all modules in the APPS_PATH directory."""
     print(f"📂 Loading modules in path: {APPS_PATH}")
     try:
-        modules = ImportUtils.import_module_from_path(APPS_PATH)
+        modules = ImportUtils.load_apps(
+            APPS_PATH, manifests=boot_cache and boot_cache["manifests"]
+        )
         for module in modules:
             if hasattr(modules[module], "routes"):
                 _routes = modules[module].routes
                 if hasattr(_routes.routes, "register_routes"):
-                    _routes.routes.register_routes(controller)  # Registrar rutas
+                    with StartupProfiler.span(module, "routes"):
+                        _routes.routes.register_routes(controller)  # Registrar rutas
                     print(f"✅ Module loaded: {module}")
                 else:
                     print(f"⚠️ {module} don't have routes, ignoring...")
@@ -52,6 +64,7 @@ load_modules()
 
 # dynamic register routers
 app.include_router(router)
+StartupProfiler.finish()
 
 
 @app.get(f"{API_PREFIX}/healthcheck")
@@ -90,10 +103,15 @@ async def swagger_ui_html(request: Request) -> HTMLResponse:
     )
 
 
+# Use the precomputed OpenAPI document, once all the routes are registered
+BootCache.apply(app, boot_cache)
+
+
 def run_app():
     """Run the FastAPI application."""
     import uvicorn
 
+    BaseConfig.install_reload_signal()
     uvicorn.run("viixoo_core.app:app", host="0.0.0.0", port=8000)
 
 
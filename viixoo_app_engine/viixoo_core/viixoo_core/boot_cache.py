@@ -0,0 +1,209 @@
+"""Boot cache. Precompute the apps, routes and OpenAPI document of the application.
+
+Build it once, e.g. in the Docker image, after the sources are copied::
+
+    viixoo_build_cache --output .viixoo_boot_cache.json
+
+The workers read ``VIIXOO_BOOT_CACHE`` (``.viixoo_boot_cache.json`` by default) at
+startup: the manifests of the apps are not read again and the OpenAPI document is
+not generated on the first hit of the docs. The cache is ignored when a source of
+the apps or of viixoo_core changed since it was built.
+"""
+
+import os
+import json
+import hashlib
+import argparse
+import importlib
+import fastapi
+import pydantic
+from typing import Any, Dict, List, Optional
+from fastapi.routing import APIRoute
+from viixoo_core.version import __version__
+from viixoo_core.import_utils import APPS_PATH, ImportUtils
+
+# Bump it when the content of the cache changes, so the old caches are rebuilt
+BOOT_CACHE_VERSION = 1
+SOURCE_EXTENSIONS = (".py", ".conf")
+CORE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+
+class BootCache:
+    """Build and load the boot cache of the application."""
+
+    path: Optional[str] = os.getenv("VIIXOO_BOOT_CACHE", ".viixoo_boot_cache.json")
+
+    @classmethod
+    def get_versions(cls) -> Dict[str, str]:
+        """Return the versions the cache depends on, besides the sources."""
+        return {
+            "cache": BOOT_CACHE_VERSION,
+            "viixoo_core": __version__,
+            "fastapi": fastapi.__version__,
+            "pydantic": pydantic.VERSION,
+        }
+
+    @classmethod
+    def get_source_files(cls, module_path: str) -> List[str]:
+        """Return the source files of the apps and of viixoo_core, sorted."""
+        files = []
+        for root_path in (module_path, CORE_PATH):
+            for root, dirs, names in os.walk(root_path):
+                dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+                files.extend(
+                    os.path.join(root, name)
+                    for name in sorted(names)
+                    if name.endswith(SOURCE_EXTENSIONS)
+                )
+        return files
+
+    @classmethod
+    def file_hash(cls, file_path: str) -> str:
+        """Return the sha256 of the content of a file."""
+        with open(file_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    @classmethod
+    def get_sources(cls, module_path: str) -> Dict[str, dict]:
+        """Return the modification time, size and hash of the source files."""
+        sources = {}
+        for file_path in cls.get_source_files(module_path):
+            stat = os.stat(file_path)
+            sources[file_path] = {
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": cls.file_hash(file_path),
+            }
+        return sources
+
+    @classmethod
+    def is_fresh(cls, sources: Dict[str, dict], module_path: str) -> bool:
+        """Check the source files did not change since the cache was built.
+
+        The files with the same modification time and size are unchanged; the
+        content of the others is hashed, since copying the sources, e.g. to a Docker
+        image, changes their modification time.
+        """
+        files = cls.get_source_files(module_path)
+        if set(files) != set(sources):
+            return False
+
+        for file_path in files:
+            stat = os.stat(file_path)
+            source = sources[file_path]
+            if stat.st_size != source["size"]:
+                return False
+            if stat.st_mtime_ns == source["mtime"]:
+                continue
+            if cls.file_hash(file_path) != source["sha256"]:
+                return False
+        return True
+
+    @classmethod
+    def get_routes(cls, app: fastapi.FastAPI) -> List[List[Any]]:
+        """Return the route table of the application, path, methods and name."""
+        return [
+            [route.path, sorted(route.methods), route.name]
+            for route in app.routes
+            if isinstance(route, APIRoute)
+        ]
+
+    @classmethod
+    def build(cls, app: fastapi.FastAPI, module_path: str) -> Dict[str, Any]:
+        """Build the cache of a loaded application.
+
+        :param app: The application, with the routes of its apps registered
+        :param module_path: The path of the apps
+        """
+        return {
+            "versions": cls.get_versions(),
+            "module_path": os.path.abspath(module_path),
+            "sources": cls.get_sources(module_path),
+            "manifests": ImportUtils.get_manifests(module_path),
+            "routes": cls.get_routes(app),
+            "openapi": app.openapi(),
+        }
+
+    @classmethod
+    def write(cls, cache: Dict[str, Any], file_path: str):
+        """Write the cache to a file, replacing it atomically."""
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, file_path)
+
+    @classmethod
+    def load(cls, module_path: str) -> Optional[Dict[str, Any]]:
+        """Return the cache of the apps in the path, None if missing or stale."""
+        if not cls.path or not os.path.exists(cls.path):
+            return None
+
+        try:
+            with open(cls.path, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error reading boot cache '{cls.path}': {e}")
+            return None
+
+        if (
+            cache.get("versions") != cls.get_versions()
+            or cache.get("module_path") != os.path.abspath(module_path)
+            or not cls.is_fresh(cache.get("sources", {}), module_path)
+        ):
+            print(f"⚠️ Boot cache '{cls.path}' is stale, ignoring it...")
+            return None
+
+        print(f"⚡ Boot cache loaded: {cls.path}")
+        return cache
+
+    @classmethod
+    def apply(cls, app: fastapi.FastAPI, cache: Optional[Dict[str, Any]]):
+        """Use the cached OpenAPI document, if the routes of the application match.
+
+        :param app: The application, with all its routes
+        :param cache: The cache returned by ``load``
+        """
+        if cache is None:
+            return
+        if cls.get_routes(app) != cache["routes"]:
+            print("⚠️ The routes differ from the boot cache, ignoring its OpenAPI...")
+            return
+        # Replace the method, as documented by FastAPI to customize the document,
+        # since it is generated again when the routes changed after it was cached
+        app.openapi_schema = cache["openapi"]
+        app.openapi = lambda: cache["openapi"]
+
+
+def setup_parser():
+    """Set up the argument parser for the boot cache."""
+    parser = argparse.ArgumentParser(
+        description="Build the boot cache of the application."
+    )
+    parser.add_argument(
+        "--output",
+        default=BootCache.path,
+        help="File of the cache (default: VIIXOO_BOOT_CACHE or .viixoo_boot_cache.json)",
+    )
+    return parser
+
+
+def main():
+    """Execute the main entry point for the boot cache."""
+    args = setup_parser().parse_args()
+
+    # The class used by the application, also when run with ``python -m``
+    boot_cache = importlib.import_module("viixoo_core.boot_cache").BootCache
+    # Load the application from the sources, not from a previous cache
+    boot_cache.path = None
+    app = importlib.import_module("viixoo_core.app").app
+
+    cache = boot_cache.build(app, APPS_PATH)
+    boot_cache.write(cache, args.output)
+    print(
+        f"✅ Boot cache written to {args.output}: {len(cache['manifests'])} apps, "
+        f"{len(cache['routes'])} routes"
+    )
+
+
+if __name__ == "__main__":
+    main()
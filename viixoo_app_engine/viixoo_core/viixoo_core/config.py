@@ -1,14 +1,59 @@
 """Settings module."""
 
 import os
+import time
+import signal
+import threading
 import configparser
 from abc import ABC
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple, Union
+from pydantic import BaseModel
+
+
+class DatabaseSettings(BaseModel):
+    """Typed settings of the database of a module, see ``BaseConfig.get_settings``."""
+
+    db_type: Union[str, bool] = False
+    dbname: str = "viixoo_app_engine_test_db"
+    user: str = "postgres"
+    password: str = ""
+    host: str = "localhost"
+    port: int = 5432
+    # Months of data change logs kept, 0 keeps them forever
+    tracking_retention_months: int = 0
+    # Connections of the pool of each worker, opened with the pool and at most
+    pool_min: int = 1
+    pool_max: int = 10
+    # Seconds waited for a free connection of the pool, and for a new connection
+    pool_timeout: float = 30
+    connect_timeout: int = 10
+    # Milliseconds a statement may run before it is cancelled, 0 for no limit
+    statement_timeout: int = 0
+    # DSNs of the read replicas, and seconds they may lag behind the primary
+    replicas: List[str] = []
+    replica_max_lag: float = 10
+
+
+def split_list(value: str) -> List[str]:
+    """Split a comma or line separated setting."""
+    return [
+        item.strip() for item in value.replace("\n", ",").split(",") if item.strip()
+    ]
 
 
 class BaseConfig(ABC):
     """Base class for database configuration, allowing reading from environment variables or `.conf` files."""
 
+    # Typed settings of the modules by (base path, module), see get_settings
+    settings: Dict[Tuple[str, str], DatabaseSettings] = {}
+    # Modification time of the config files read, checked every check_interval seconds
+    files: Dict[str, int] = {}
+    check_interval: float = float(os.getenv("VIIXOO_CONFIG_CHECK_INTERVAL", 5))
+    checked_at: float = 0
+    # Incremented on every reload, to refresh the values derived from the settings
+    version: int = 0
+    lock = threading.RLock()
+
     @classmethod
     def from_env(cls, module) -> Dict[str, Any]:
         """Read the settings from environment variables."""
@@ -19,6 +64,18 @@ class BaseConfig(ABC):
             "password": os.getenv(f"{module}_DB_PASSWORD", ""),
             "host": os.getenv(f"{module}_DB_HOST", "localhost"),
             "port": int(os.getenv(f"{module}_DB_PORT", 5432)),
+            # Months of data change logs kept, 0 keeps them forever
+            "tracking_retention_months": int(
+                os.getenv(f"{module}_TRACKING_RETENTION_MONTHS", 0)
+            ),
+            # Connections of the pool of each worker, opened with the pool and at most
+            "pool_min": int(os.getenv(f"{module}_DB_POOL_MIN", 1)),
+            "pool_max": int(os.getenv(f"{module}_DB_POOL_MAX", 10)),
+            "pool_timeout": float(os.getenv(f"{module}_DB_POOL_TIMEOUT", 30)),
+            "connect_timeout": int(os.getenv(f"{module}_DB_CONNECT_TIMEOUT", 10)),
+            "statement_timeout": int(os.getenv(f"{module}_DB_STATEMENT_TIMEOUT", 0)),
+            "replicas": split_list(os.getenv(f"{module}_DB_REPLICAS", "")),
+            "replica_max_lag": float(os.getenv(f"{module}_DB_REPLICA_MAX_LAG", 10)),
         }
         return config
 
@@ -38,6 +95,22 @@ class BaseConfig(ABC):
             "password": config.get("database", "password", fallback=""),
             "host": config.get("database", "host", fallback="localhost"),
             "port": config.getint("database", "port", fallback=5432),
+            "tracking_retention_months": config.getint(
+                "database", "tracking_retention_months", fallback=0
+            ),
+            "pool_min": config.getint("database", "pool_min", fallback=1),
+            "pool_max": config.getint("database", "pool_max", fallback=10),
+            "pool_timeout": config.getfloat("database", "pool_timeout", fallback=30),
+            "connect_timeout": config.getint(
+                "database", "connect_timeout", fallback=10
+            ),
+            "statement_timeout": config.getint(
+                "database", "statement_timeout", fallback=0
+            ),
+            "replicas": split_list(config.get("database", "replicas", fallback="")),
+            "replica_max_lag": config.getfloat(
+                "database", "replica_max_lag", fallback=10
+            ),
         }
 
     @classmethod
@@ -51,3 +124,58 @@ class BaseConfig(ABC):
             print(f"📂 Config from file: {file_path}")
             config = {**config, **file_config}
         return config
+
+    @classmethod
+    def get_settings(cls, base_path: str, module: str) -> DatabaseSettings:
+        """Return the typed settings of a module, read once and cached until a reload.
+
+        See ``get_config``. The cached settings are reloaded when one of the config
+        files read changes, or on ``reload``.
+        """
+        cls.check_files()
+        key = (base_path, module)
+        settings = cls.settings.get(key)
+        if settings is not None:
+            return settings
+
+        settings = DatabaseSettings(
+            **cls.get_config(base_path=base_path, module=module)
+        )
+        file_path = os.path.join(base_path, f"{module}", f"{module}.conf")
+        with cls.lock:
+            if os.path.exists(file_path):
+                cls.files[file_path] = os.stat(file_path).st_mtime_ns
+            cls.settings[key] = settings
+        return settings
+
+    @classmethod
+    def check_files(cls):
+        """Reload the settings if a config file changed, at most every ``check_interval``."""
+        now = time.monotonic()
+        if now - cls.checked_at < cls.check_interval:
+            return
+        cls.checked_at = now
+
+        for file_path, mtime in list(cls.files.items()):
+            try:
+                changed = os.stat(file_path).st_mtime_ns != mtime
+            except OSError:
+                changed = True
+            if changed:
+                print(f"🔄 Config file changed: {file_path}")
+                cls.reload()
+                return
+
+    @classmethod
+    def reload(cls):
+        """Forget the cached settings, they are read again on their next use."""
+        with cls.lock:
+            cls.settings.clear()
+            cls.files.clear()
+            cls.version += 1
+        print("🔄 Config reloaded")
+
+    @classmethod
+    def install_reload_signal(cls):
+        """Reload the settings on ``SIGHUP``, from the main thread of the process."""
+        signal.signal(signal.SIGHUP, lambda sig, frame: cls.reload())
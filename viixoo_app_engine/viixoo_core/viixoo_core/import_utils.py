@@ -1,10 +1,14 @@
 """Utility class to import modules dynamically."""
 
 import os
+import ast
 import sys
+import time
 import pkgutil
 import importlib
-from typing import List, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any
+from viixoo_core.startup_profiler import StartupProfiler
 
 APPS_PATH_DEFINED: str = os.environ.get("APPS_PATH", "")
 APPS_PATH: str = os.path.join(os.path.dirname(__file__), "../../viixoo_backend_apps")
@@ -14,10 +18,24 @@ if APPS_PATH_DEFINED:
 
 print(f"📂 APPS_PATH: {APPS_PATH}")
 
+# Metadata of an app, a dict literal read without importing the app. For example::
+#     """Manifest of the sales app."""
+#     {"name": "Sales", "depends": ["partner"]}
+MANIFEST_FILE = "__manifest__.py"
+MANIFEST_DEFAULTS = {"depends": [], "installable": True}
+
+# Apps loaded by the application with their dependencies, comma separated, all the
+# installable apps by default, and threads importing the independent apps
+APPS_SELECTED: str = os.environ.get("VIIXOO_APPS", "")
+IMPORT_JOBS: int = int(os.environ.get("VIIXOO_IMPORT_JOBS", 4))
+
 
 class ImportUtils:
     """Utility class to import modules dynamically."""
 
+    # Import time in seconds of the apps loaded by load_apps, by app name
+    import_times: Dict[str, float] = {}
+
     # Finds all the modules in the APPS_PATH
 
     @classmethod
@@ -76,7 +94,8 @@ class ImportUtils:
                         continue
 
                     sys.modules[package_name] = package  # Add to sys.modules
-                    spec.loader.exec_module(package)
+                    with StartupProfiler.span(package_name, "import"):
+                        spec.loader.exec_module(package)
 
                     modules[package_name] = package
 
@@ -86,3 +105,167 @@ class ImportUtils:
             print(f"❌ Error loading plugins: {e}")
 
         return modules
+
+    @classmethod
+    def read_manifest(cls, manifest_path: str) -> dict:
+        """Read the dict literal of a manifest file, without executing it.
+
+        :raise ValueError: if the last statement of the file is not a dict literal
+        """
+        with open(manifest_path, "r") as f:
+            tree = ast.parse(f.read(), manifest_path)
+        # The dict is the last expression, after the docstring if any
+        node = tree.body[-1] if tree.body else None
+        if not isinstance(node, ast.Expr) or not isinstance(node.value, ast.Dict):
+            raise ValueError("the last statement is not a dict")
+        return ast.literal_eval(node.value)
+
+    @classmethod
+    def get_manifests(cls, module_path: str) -> Dict[str, dict]:
+        """Read the manifests of the apps in a path, without importing them.
+
+        Every package is an app, its ``__manifest__.py`` is optional, see
+        ``MANIFEST_DEFAULTS``. An app with an invalid manifest is reported and
+        marked not installable, with the reason in its ``error`` key.
+        """
+        manifests = {}
+        for item in sorted(os.listdir(module_path)):
+            item_path = os.path.join(module_path, item)
+            if not os.path.exists(os.path.join(item_path, "__init__.py")):
+                continue
+
+            manifest = dict(MANIFEST_DEFAULTS, name=item)
+            manifest_path = os.path.join(item_path, MANIFEST_FILE)
+            if os.path.exists(manifest_path):
+                try:
+                    manifest.update(cls.read_manifest(manifest_path))
+                except (SyntaxError, ValueError, IndexError, AttributeError) as e:
+                    print(f"❌ Invalid manifest of app '{item}': {e}")
+                    manifest.update(installable=False, error=str(e))
+            manifest["path"] = item_path
+            manifests[item] = manifest
+        return manifests
+
+    @classmethod
+    def resolve_dependencies(
+        cls, manifests: Dict[str, dict], names: List[str] = None
+    ) -> List[List[str]]:
+        """Return the apps to import with their dependencies, in topological order.
+
+        The apps are grouped in levels, the apps of a level only depend on the apps
+        of the previous levels, so they can be imported in parallel.
+
+        :param names: the apps needed, all the installable apps by default
+        """
+        if names is None:
+            names = [name for name, m in manifests.items() if m["installable"]]
+
+        needed, pending = set(), list(names)
+        while pending:
+            name = pending.pop()
+            if name in needed:
+                continue
+            if name not in manifests:
+                raise ValueError(f"App '{name}' not found")
+            needed.add(name)
+            pending.extend(manifests[name]["depends"])
+
+        levels, done = [], set()
+        while len(done) < len(needed):
+            level = sorted(
+                name
+                for name in needed - done
+                if set(manifests[name]["depends"]) <= done
+            )
+            if not level:
+                raise ValueError(
+                    f"Circular dependencies between apps: {', '.join(sorted(needed - done))}"
+                )
+            levels.append(level)
+            done.update(level)
+        return levels
+
+    @classmethod
+    def import_app(cls, name: str, path: str) -> Any:
+        """Import the package of an app."""
+        spec = importlib.util.spec_from_file_location(
+            name, os.path.join(path, "__init__.py")
+        )
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[name] = package
+        try:
+            spec.loader.exec_module(package)
+        except BaseException:
+            del sys.modules[name]
+            raise
+        return package
+
+    @classmethod
+    def load_apps(
+        cls,
+        module_path: str,
+        names: List[str] = None,
+        jobs: int = IMPORT_JOBS,
+        manifests: Dict[str, dict] = None,
+    ) -> Dict[str, Any]:
+        """Import the needed apps and their dependencies, see ``resolve_dependencies``.
+
+        The apps of a dependency level are imported in parallel threads. An app that
+        fails to import is reported and skipped with the apps depending on it, the
+        other apps are still loaded. The import time of each app is printed and kept
+        in ``import_times``.
+
+        :param names: the apps needed, ``VIIXOO_APPS`` or all the installable apps by default
+        :param jobs: number of apps imported at the same time
+        :param manifests: the manifests of the apps, e.g. from the boot cache, read from the path by default
+        :return: the imported packages by app name, in import order
+        """
+        if names is None and APPS_SELECTED:
+            names = [name.strip() for name in APPS_SELECTED.split(",") if name.strip()]
+        if manifests is None:
+            try:
+                manifests = cls.get_manifests(module_path)
+            except FileNotFoundError:
+                print(f"🚨 Module directory '{module_path}' not found.")
+                return {}
+        levels = cls.resolve_dependencies(manifests, names)
+
+        modules, failed = {}, set()
+        cls.import_times = {}
+
+        def import_timed(name: str):
+            start = time.perf_counter()
+            with StartupProfiler.span(name, "import"):
+                package = cls.import_app(name, manifests[name]["path"])
+            return package, time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+            for level in levels:
+                ready = []
+                for name in level:
+                    if manifests[name].get("error"):
+                        failed.add(name)
+                        print(f"⏭️ App '{name}' skipped, its manifest is invalid")
+                    elif failed.intersection(manifests[name]["depends"]):
+                        failed.add(name)
+                        print(f"⏭️ App '{name}' skipped, a dependency failed to import")
+                    else:
+                        ready.append(name)
+
+                futures = {name: executor.submit(import_timed, name) for name in ready}
+                for name, future in futures.items():
+                    try:
+                        modules[name], cls.import_times[name] = future.result()
+                    except Exception as e:
+                        failed.add(name)
+                        print(f"❌ Error importing app '{name}': {e}")
+                        continue
+                    print(
+                        f"📦 App imported: {name} ({cls.import_times[name] * 1000:.1f} ms)"
+                    )
+
+        total = sum(cls.import_times.values())
+        print(
+            f"⏱️ {len(modules)} apps imported in {total * 1000:.1f} ms, {len(failed)} failed"
+        )
+        return modules
@@ -0,0 +1,245 @@
+"""Index advisor. Suggest index declarations from the domains recorded by the models.
+
+Enable the recorder in the workers with ``VIIXOO_INDEX_ADVISOR=1`` and, after some
+real traffic, run::
+
+    viixoo_index_advisor --path .viixoo_index_advisor --min-count 10
+"""
+
+import os
+import json
+import glob
+import argparse
+from typing import Any, Dict, List
+from viixoo_core.migrations import Migration
+from viixoo_core.import_utils import ImportUtils, APPS_PATH
+from viixoo_core.models.query_recorder import QueryRecorder
+
+# Operators served by a btree index, equality columns go first in the index
+EQUALITY_OPERATORS = ("=", "in", "is null", "child_of", "parent_of")
+RANGE_OPERATORS = ("<", "<=", ">", ">=")
+# Pattern operators served by a trigram index
+TRIGRAM_OPERATORS = (
+    "like",
+    "ilike",
+    "=like",
+    "=ilike",
+    "startswith",
+    "endswith",
+    "contains",
+    "unaccent_ilike",
+)
+# Containment operators served by a GIN jsonb_path_ops index, the equality of a
+# JSON path is translated to a containment
+CONTAINMENT_OPERATORS = ("=", "@>")
+
+
+class IndexAdvisor:
+    """Suggest index declarations from the stats written by ``QueryRecorder``."""
+
+    @classmethod
+    def load_stats(cls, path: str) -> Dict[str, Dict[str, dict]]:
+        """Load and merge the stats files of all the processes."""
+        stats = {}
+        for file_path in sorted(glob.glob(os.path.join(path, "advisor-*.json"))):
+            with open(file_path, "r") as f:
+                file_stats = json.load(f)
+
+            for table, shapes in file_stats.items():
+                for key, entry in shapes.items():
+                    merged = stats.setdefault(table, {}).get(key)
+                    if merged is None:
+                        stats[table][key] = dict(entry)
+                        continue
+                    merged["count"] += entry["count"]
+                    merged["total_time"] += entry["total_time"]
+                    merged["max_time"] = max(merged["max_time"], entry["max_time"])
+                    merged["explained"] += entry["explained"]
+                    merged["seq_scans"] += entry["seq_scans"]
+        return stats
+
+    @classmethod
+    def get_candidates(cls, shape: List[Any]) -> List[tuple]:
+        """Return the candidate indexes of a domain shape as (kind, columns) tuples.
+
+        Conditions joined by AND give one btree index with the equality columns
+        first and then one range column. Conditions joined by OR need one index
+        per column. Pattern conditions give a trigram search index and containment
+        conditions on JSONB fields a GIN jsonb_path_ops index.
+        """
+        terms = [term for term in shape if isinstance(term, (list, tuple))]
+        candidates = []
+        equality, ranges = [], []
+
+        for field, operator in terms:
+            if "." in field or operator == "@>":
+                if operator in CONTAINMENT_OPERATORS:
+                    candidates.append(("jsonb", (field.split(".")[0],)))
+                continue
+            if operator in TRIGRAM_OPERATORS:
+                candidates.append(("trigram", (field,)))
+            elif operator in EQUALITY_OPERATORS and field not in equality:
+                equality.append(field)
+            elif operator in RANGE_OPERATORS and field not in ranges:
+                ranges.append(field)
+
+        if "|" in shape:
+            candidates.extend(("btree", (field,)) for field in equality + ranges)
+        elif equality or ranges:
+            candidates.append(("btree", tuple(equality + ranges[:1])))
+        return candidates
+
+    @classmethod
+    def is_covered(cls, kind: str, columns: tuple, schema: dict) -> bool:
+        """Check if a candidate index is already served by the table schema."""
+        if kind == "trigram":
+            column = schema.get(columns[0], {})
+            return column.get("search_index") == "trigram"
+        if kind == "jsonb":
+            return any(
+                index["using"] == "gin" and index["columns"][0].split()[0] == columns[0]
+                for index in schema.get("__indexes__", [])
+            )
+
+        existing = [["id"]]
+        existing += [
+            [col]
+            for col, props in Migration.get_columns(schema).items()
+            if props.get("unique")
+        ]
+        existing += [
+            index["columns"]
+            for index in schema.get("__indexes__", [])
+            if index["using"] == "btree" and not index["where"]
+        ]
+        return any(set(index[: len(columns)]) == set(columns) for index in existing)
+
+    @classmethod
+    def suggest(
+        cls, stats: Dict[str, Dict[str, dict]], models: dict, min_count: int = 10
+    ) -> Dict[str, List[dict]]:
+        """Return the suggested indexes per table, the most expensive first."""
+        suggestions = {}
+        for table, shapes in stats.items():
+            model = models.get(table)
+            if model is None:
+                print(f"⚠️ No model found for table '{table}', ignoring...")
+                continue
+
+            schema = Migration.pydantic_to_sql(model)
+            candidates = {}
+            for entry in shapes.values():
+                for kind, columns in cls.get_candidates(entry["shape"]):
+                    if columns == ("id",) or any(col not in schema for col in columns):
+                        continue
+                    candidate = candidates.setdefault(
+                        (kind, columns),
+                        {
+                            "kind": kind,
+                            "columns": list(columns),
+                            "count": 0,
+                            "total_time": 0.0,
+                            "explained": 0,
+                            "seq_scans": 0,
+                        },
+                    )
+                    for key in ("count", "total_time", "explained", "seq_scans"):
+                        candidate[key] += entry[key]
+
+            table_suggestions = []
+            for (kind, columns), candidate in candidates.items():
+                if candidate["count"] < min_count:
+                    continue
+                if candidate["explained"] and not candidate["seq_scans"]:
+                    # The sampled plans never scan the whole table
+                    continue
+                if cls.is_covered(kind, columns, schema):
+                    continue
+                seq_scan_ratio = (
+                    candidate["seq_scans"] / candidate["explained"]
+                    if candidate["explained"]
+                    else 0
+                )
+                candidate["score"] = candidate["total_time"] * (1 + seq_scan_ratio)
+                table_suggestions.append(candidate)
+
+            if table_suggestions:
+                suggestions[table] = sorted(
+                    table_suggestions, key=lambda c: c["score"], reverse=True
+                )
+        return suggestions
+
+    @classmethod
+    def format_suggestion(cls, suggestion: dict) -> str:
+        """Return a suggestion as the declaration to add to the model."""
+        if suggestion["kind"] == "trigram":
+            declaration = (
+                f"{suggestion['columns'][0]}: "
+                'json_schema_extra=dict(search_index="trigram")'
+            )
+        elif suggestion["kind"] == "jsonb":
+            declaration = (
+                f"{suggestion['columns'][0]}: "
+                'json_schema_extra=dict(index="jsonb_path_ops")'
+            )
+        elif len(suggestion["columns"]) == 1:
+            declaration = (
+                f"{suggestion['columns'][0]}: json_schema_extra=dict(index=True)"
+            )
+        else:
+            declaration = (
+                f"__indexes__: {json.dumps({'columns': suggestion['columns']})}"
+            )
+
+        average = suggestion["total_time"] / suggestion["count"] * 1000
+        details = f"{suggestion['count']} queries, avg {average:.2f} ms"
+        if suggestion["explained"]:
+            details += f", {suggestion['seq_scans']}/{suggestion['explained']} sampled seq scans"
+        return f"{declaration}  # {details}"
+
+
+def setup_parser() -> argparse.ArgumentParser:
+    """Set up command line argument parser."""
+    parser = argparse.ArgumentParser(
+        description="Suggest index declarations from the recorded domains",
+    )
+    parser.add_argument(
+        "--path",
+        default=QueryRecorder.path,
+        help=f"Directory with the recorded stats (default: {QueryRecorder.path})",
+    )
+    parser.add_argument(
+        "--min-count",
+        type=int,
+        default=10,
+        help="Minimum number of queries to suggest an index (default: 10)",
+    )
+    return parser
+
+
+def main():
+    """Execute the main entry point for the index advisor."""
+    args = setup_parser().parse_args()
+
+    stats = IndexAdvisor.load_stats(args.path)
+    if not stats:
+        print(f"🚨 No recorded stats found in '{args.path}'.")
+        return
+
+    models = {}
+    for module in ImportUtils.import_module_from_path(APPS_PATH).values():
+        models.update(Migration.get_models(module))
+
+    suggestions = IndexAdvisor.suggest(stats, models, min_count=args.min_count)
+    if not suggestions:
+        print("✅ No index suggestions.")
+        return
+
+    for table, table_suggestions in suggestions.items():
+        print(f"📊 {models[table].__name__} ({table}):")
+        for suggestion in table_suggestions:
+            print(f"    {IndexAdvisor.format_suggestion(suggestion)}")
+
+
+if __name__ == "__main__":
+    main()
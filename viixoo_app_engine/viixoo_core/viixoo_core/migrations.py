@@ -1,15 +1,261 @@
 """Database migrations for PostgreSQL with Pydantic models."""
 
+import io
+import re
+import json
+import sys
+import time
+import uuid
+import types
+import typing
+import hashlib
+import datetime
+import argparse
+import threading
+import contextlib
 import psycopg2
-from psycopg2.sql import Identifier, SQL
+from enum import Enum
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel
+from psycopg2.sql import Identifier, SQL, Literal
+from psycopg2.extras import execute_values
 from viixoo_core.config import BaseConfig
 from viixoo_core.models.base import BaseDBModel
+from viixoo_core.models.domain import UNACCENT_FUNCTION
 from viixoo_core.import_utils import ImportUtils, APPS_PATH
 from types import ModuleType
 from pydantic_core._pydantic_core import PydanticUndefinedType
 
-db_connection = False
-config: dict = {}
+SEARCH_INDEX_TYPES = ("trigram",)
+
+INDEX_METHODS = ("btree", "hash", "gin", "gist", "brin")
+# Comment that marks the indexes declared in the models, followed by their definition
+INDEX_COMMENT_PREFIX = "viixoo_index:"
+
+# pg_constraint.confdeltype / confupdtype codes
+FOREIGN_KEY_ACTIONS = {
+    "a": "NO ACTION",
+    "r": "RESTRICT",
+    "c": "CASCADE",
+    "n": "SET NULL",
+    "d": "SET DEFAULT",
+}
+
+# Statement pattern -> (lock level, effect) used by the migration plan. The effect
+# is "instant" (catalog only), "scan" (reads the whole table) or "rewrite".
+STATEMENT_COSTS = [
+    (r"CREATE TABLE", "ACCESS EXCLUSIVE", "instant"),
+    (r"CREATE (UNIQUE )?INDEX CONCURRENTLY", "SHARE UPDATE EXCLUSIVE", "scan"),
+    (r"CREATE (UNIQUE )?INDEX", "SHARE", "scan"),
+    (r"DROP INDEX CONCURRENTLY", "SHARE UPDATE EXCLUSIVE", "instant"),
+    (r"DROP INDEX", "ACCESS EXCLUSIVE", "instant"),
+    (r"COMMENT ON", "SHARE UPDATE EXCLUSIVE", "instant"),
+    (r"ALTER TABLE \S+ ADD COLUMN .* GENERATED ALWAYS", "ACCESS EXCLUSIVE", "rewrite"),
+    (r"ALTER TABLE \S+ ALTER COLUMN \S+ TYPE", "ACCESS EXCLUSIVE", "rewrite"),
+    (r"ALTER TABLE \S+ ALTER COLUMN \S+ SET NOT NULL", "ACCESS EXCLUSIVE", "scan"),
+    (
+        r"ALTER TABLE \S+ ADD CONSTRAINT \S+ UNIQUE USING INDEX",
+        "ACCESS EXCLUSIVE",
+        "instant",
+    ),
+    (r"ALTER TABLE \S+ ADD CONSTRAINT \S+ UNIQUE", "ACCESS EXCLUSIVE", "scan"),
+    (r"ALTER TABLE \S+ ADD PRIMARY KEY", "ACCESS EXCLUSIVE", "scan"),
+    (
+        r"ALTER TABLE \S+ ADD CONSTRAINT \S+ CHECK .* NOT VALID",
+        "ACCESS EXCLUSIVE",
+        "instant",
+    ),
+    (
+        r"ALTER TABLE \S+ ADD CONSTRAINT \S+ FOREIGN KEY .* NOT VALID",
+        "SHARE ROW EXCLUSIVE",
+        "instant",
+    ),
+    (r"ALTER TABLE \S+ ADD CONSTRAINT \S+ FOREIGN KEY", "SHARE ROW EXCLUSIVE", "scan"),
+    (r"ALTER TABLE \S+ VALIDATE CONSTRAINT", "SHARE UPDATE EXCLUSIVE", "scan"),
+    (r"ALTER TABLE", "ACCESS EXCLUSIVE", "instant"),
+    (r"(CREATE|ALTER) TYPE", "EXCLUSIVE", "instant"),
+    (r"CREATE (DATABASE|EXTENSION|SEQUENCE|OR REPLACE FUNCTION)", "NONE", "instant"),
+    (r"CREATE TRIGGER", "SHARE ROW EXCLUSIVE", "instant"),
+    (r"(WITH .* )?UPDATE", "ROW EXCLUSIVE", "scan"),
+]
+
+# Deferred actions whose cost can not be read from the statement. The online
+# SET NOT NULL follows a validated CHECK (column IS NOT NULL), so it skips the scan.
+ACTION_COSTS = {"SET NOT NULL": ("ACCESS EXCLUSIVE", "instant")}
+
+# Online migrations: lock_timeout of the schema changes, attempts when a lock is
+# not acquired in time, and rows updated per transaction when a default is backfilled
+LOCK_TIMEOUT = "5s"
+LOCK_RETRIES = 5
+BACKFILL_BATCH_SIZE = 10000
+
+# Index and table of a deferred statement, the index is left invalid when the
+# build is cancelled
+CONCURRENT_INDEX_PATTERN = re.compile(
+    r"CREATE (?:UNIQUE )?INDEX CONCURRENTLY IF NOT EXISTS (\S+) ON (\S+)"
+)
+
+# Search index type -> (index name suffix, index method and expression)
+SEARCH_INDEX_METHODS = {
+    "trigram": ("trgm", "GIN ({unaccent}(lower({column})) gin_trgm_ops)"),
+    "fulltext": ("fts", "GIN ({column})"),
+}
+
+# Data change tracking: trigger per modified row or per statement, and one log
+# row per changed column or one per modified row with the changes in JSONB
+TRACKING_MODES = ("row", "statement")
+TRACKING_FORMATS = ("columns", "jsonb")
+# Monthly partitions of migration_logs_data created in advance
+LOGS_DATA_PARTITIONS_AHEAD = 3
+
+# Partitioning declared in the models, see BaseDBModel.get_partition_config
+PARTITION_TYPES = ("range", "list", "hash")
+PARTITION_INTERVALS = ("day", "month", "year")
+PARTITION_EXPIRE_ACTIONS = ("drop", "detach")
+
+# Included in the schema fingerprints, bump it when the migrations generate a
+# different schema for the same models, so the unchanged modules are migrated again
+SCHEMA_FINGERPRINT_VERSION = 3
+
+
+def get_numeric_type(python_type: type, field) -> str:
+    """Return NUMERIC with the precision and scale of a Decimal field.
+
+    They are read from the ``max_digits`` and ``decimal_places`` of the field, or
+    from ``json_schema_extra=dict(digits=(precision, scale))``.
+    """
+    digits = (field.json_schema_extra or {}).get("digits") if field else None
+    if not digits and field:
+        max_digits = decimal_places = None
+        for metadata in field.metadata:
+            max_digits = getattr(metadata, "max_digits", None) or max_digits
+            decimal_places = getattr(metadata, "decimal_places", None) or decimal_places
+        if max_digits:
+            digits = (max_digits, decimal_places or 0)
+    return f"NUMERIC({digits[0]},{digits[1]})" if digits else "NUMERIC"
+
+
+# Storage of the Enum fields with string values, set with
+# json_schema_extra=dict(enum_storage=...): a native ENUM type, a SMALLINT code
+# (the position of the value in the Enum) or the text of the value
+ENUM_STORAGES = ("native", "code", "text")
+
+
+def get_enum_storage(python_type: type, field) -> str:
+    """Return how the values of an Enum field are stored, see ``ENUM_STORAGES``."""
+    values = [member.value for member in python_type]
+    if values and all(isinstance(value, int) for value in values):
+        # Integer values are already compact codes
+        return "integer"
+    storage = (field.json_schema_extra or {}).get("enum_storage") if field else None
+    if storage and storage not in ENUM_STORAGES:
+        raise ValueError(f"Unsupported enum storage '{storage}'")
+    if not all(isinstance(value, str) for value in values):
+        return "text"
+    return storage or "native"
+
+
+def get_enum_type_name(python_type: type, field) -> str:
+    """Return the name of the native ENUM type of an Enum.
+
+    It is the Enum class name in snake case, or ``json_schema_extra=dict(enum_type=...)``.
+    """
+    name = (field.json_schema_extra or {}).get("enum_type") if field else None
+    if not name:
+        name = re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", python_type.__name__)
+        name = re.sub(r"_+", "_", name)
+    return name.upper()
+
+
+def get_enum_type(python_type: type, field) -> str:
+    """Return the SQL type of an Enum, see ``get_enum_storage``."""
+    storage = get_enum_storage(python_type, field)
+    if storage == "integer":
+        return "INTEGER"
+    if storage == "code":
+        return "SMALLINT"
+    if storage == "native":
+        return get_enum_type_name(python_type, field)
+    return "CHARACTER VARYING"
+
+
+# Python type -> SQL type, or a function of the Python type and the field returning
+# it. Resolved along the MRO of the annotation, see Migration.register_type.
+SQL_TYPES: dict = {
+    str: "CHARACTER VARYING",
+    bool: "BOOLEAN",
+    int: "INTEGER",
+    float: "DOUBLE PRECISION",
+    Decimal: get_numeric_type,
+    bytes: "BYTEA",
+    uuid.UUID: "UUID",
+    datetime.datetime: "TIMESTAMP WITHOUT TIME ZONE",
+    datetime.date: "DATE",
+    datetime.time: "TIME WITHOUT TIME ZONE",
+    datetime.timedelta: "INTERVAL",
+    dict: "JSONB",
+    BaseModel: "JSONB",
+    Enum: get_enum_type,
+}
+
+# Integer primary keys are BIGINT identity columns, and the foreign keys BIGINT
+IDENTITY_TYPES = ("SMALLINT", "INTEGER", "BIGINT")
+
+
+class MigrationState(threading.local):
+    """State of the migration of one database.
+
+    The state is kept per thread, so several databases can be migrated at the
+    same time, see ``Migration.run``.
+    """
+
+    def __init__(self):
+        """Initialize an empty state."""
+        # Config of the database being migrated, see BaseConfig.get_config
+        self.config: dict = {}
+        # Connection to the database, see Migration.get_postgresql_connection
+        self.connection = None
+        # Statements that can not run inside the migration transaction, such as
+        # CREATE INDEX CONCURRENTLY. Executed after the commit as (query, action, description).
+        self.deferred_queries: list = []
+        # Changes logged during the migration, inserted in migration_logs in one batch
+        # by flush_logs as (action, description).
+        self.pending_logs: list = []
+        # Changes left out by the online mode because they rewrite the table. The
+        # schema fingerprint is not saved, so a later migration applies them.
+        self.postponed_changes: list = []
+
+    def reset(self):
+        """Close the connection and forget the state of the database migrated.
+
+        Called after each module, so the next database migrated by the thread
+        never reuses the connection or the queries of the previous one.
+        """
+        if self.connection is not None and not self.connection.closed:
+            self.connection.close()
+        self.__init__()
+
+
+state = MigrationState()
+
+
+class ParallelOutput(io.TextIOBase):
+    """Standard output of the migrations run in parallel.
+
+    The output of each thread migrating a database is kept in its own buffer, so
+    the reports of the modules are printed in order instead of interleaved.
+    """
+
+    def __init__(self, stream):
+        """Wrap the real standard output, used by the threads without a buffer."""
+        self.stream = stream
+        self.buffers = {}
+
+    def write(self, text: str) -> int:
+        """Write to the buffer of the current thread."""
+        buffer = self.buffers.get(threading.get_ident(), self.stream)
+        return buffer.write(text)
 
 
 class Migration:
@@ -18,39 +264,141 @@ class Migration:
     # Base methods
 
     @classmethod
-    def run(cls):
-        """Run the migrations."""
-        global config
+    def run(
+        cls,
+        plan: bool = False,
+        online: bool = False,
+        jobs: int = 1,
+        force: bool = False,
+    ):
+        """Run the migrations.
+
+        With ``jobs`` greater than one, the modules of different databases are
+        migrated concurrently in a pool of threads. The modules of the same database
+        are still migrated one after the other, and the reports are printed in the
+        order of the modules once all the migrations are done.
+
+        :param plan: only print the changes to apply, with their locks and costs
+        :param online: use the lock minimizing strategies, see ``plan_table_changes``
+        :param jobs: number of databases migrated at the same time
+        :param force: migrate the modules whose schema fingerprint did not change
+        """
         modules = ImportUtils.import_module_from_path(APPS_PATH)
+        configs = {}
         for module in modules:
             config = BaseConfig.get_config(APPS_PATH, module)
-            if config["db_type"] == "postgresql":
-                cls.run_postgresql_migrations(config=config, module=modules[module])
-            else:
+            if config["db_type"] != "postgresql":
                 raise ValueError(f"Unsupported database engine: {config['db_type']}")
-            print(f"🚀 Migrations completed for module {module}")
-        print("✅ Migrations completed.")
+            configs[module] = config
 
-    # PostgreSQL Migrations
+        if jobs <= 1:
+            for module, config in configs.items():
+                cls.migrate_module(module, modules[module], config, plan, online, force)
+            print("✅ Migrations completed.")
+            return
+
+        # Group the modules by database, each group is migrated by one thread
+        databases = {}
+        for module, config in configs.items():
+            key = (config["host"], config["port"], config["dbname"])
+            databases.setdefault(key, []).append(module)
+
+        output = ParallelOutput(sys.stdout)
+        reports = {}
+        errors = {}
+
+        def migrate_database(database_modules: list):
+            for module in database_modules:
+                reports[module] = output.buffers[threading.get_ident()] = io.StringIO()
+                try:
+                    cls.migrate_module(
+                        module, modules[module], configs[module], plan, online, force
+                    )
+                except Exception as e:
+                    errors[module] = e
+                    return
+                finally:
+                    del output.buffers[threading.get_ident()]
+
+        with contextlib.redirect_stdout(output):
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                list(executor.map(migrate_database, databases.values()))
+
+        for module in configs:
+            if module in reports:
+                print(reports[module].getvalue(), end="")
+            if module in errors:
+                print(f"❌ Migrations failed for module {module}: {errors[module]}")
+            elif module not in reports:
+                print(f"⏭️ Migrations skipped for module {module}")
+        print(
+            f"📊 {len(reports) - len(errors)} modules migrated in {len(databases)} "
+            f"databases, {len(errors)} failed"
+        )
+        if errors:
+            raise next(iter(errors.values()))
+        print("✅ Migrations completed.")
 
     @classmethod
-    def get_postgresql_connection(cls):
-        """Get the connection to PostgreSQL."""
-        global db_connection
-        global config
+    def migrate_module(
+        cls,
+        name: str,
+        module: ModuleType,
+        config: dict,
+        plan: bool = False,
+        online: bool = False,
+        force: bool = False,
+    ):
+        """Migrate, or plan the migration of, the tables of one module.
+
+        The migration ``state`` of the thread is reset at the end, also on errors.
+        """
+        try:
+            if plan:
+                cls.plan_postgresql_migrations(
+                    config=config, module=module, online=online
+                )
+                print(f"📋 Migration plan completed for module {name}")
+            else:
+                cls.run_postgresql_migrations(
+                    config=config, module=module, online=online, force=force
+                )
+                print(f"🚀 Migrations completed for module {name}")
+        finally:
+            state.reset()
 
-        if db_connection and not db_connection.closed:
-            return db_connection
+    # PostgreSQL Migrations
 
-        db_connection = psycopg2.connect(
+    @classmethod
+    def get_maintenance_connection(cls):
+        """Get an autocommit connection to the ``postgres`` database of the server."""
+        config = state.config
+        connection = psycopg2.connect(
             dbname="postgres",
             user=config["user"],
             password=config["password"],
             host=config["host"],
             port=config["port"],
         )
-        db_connection.autocommit = True
-        cursor = db_connection.cursor()
+        connection.autocommit = True
+        return connection
+
+    @classmethod
+    def get_postgresql_connection(cls, create: bool = True):
+        """Get the connection to the PostgreSQL database of the current migration.
+
+        The connection and the config are kept in the migration ``state`` of the
+        current thread.
+
+        :param create: create the database when it does not exist, otherwise
+            return None
+        """
+        config = state.config
+        if state.connection and not state.connection.closed:
+            return state.connection
+
+        connection = cls.get_maintenance_connection()
+        cursor = connection.cursor()
 
         # Check if the database exists
         cursor.execute(
@@ -58,6 +406,11 @@ class Migration:
         )
         db_exists = cursor.fetchone()
 
+        if not db_exists and not create:
+            cursor.close()
+            connection.close()
+            return None
+
         if not db_exists:
             # Create the database if it does not exist
             print(f"🚀 Creating database {config['dbname']}...")
@@ -66,9 +419,9 @@ class Migration:
             )
 
         cursor.close()
-        db_connection.close()
+        connection.close()
 
-        db_connection = psycopg2.connect(
+        state.connection = psycopg2.connect(
             dbname=config["dbname"],
             user=config["user"],
             password=config["password"],
@@ -76,13 +429,28 @@ class Migration:
             port=config["port"],
         )
 
-        return db_connection
+        return state.connection
 
     @classmethod
-    def run_postgresql_migrations(cls, config: dict, module: ModuleType):
-        """Run migrations for PostgreSQL with change logs."""
+    def run_postgresql_migrations(
+        cls,
+        config: dict,
+        module: ModuleType,
+        online: bool = False,
+        force: bool = False,
+    ):
+        """Run migrations for PostgreSQL with change logs.
+
+        The migration is skipped when the schema fingerprint of the module did not
+        change since its last successful migration, unless ``force`` is set.
+
+        In online mode the schema changes run with ``lock_timeout``, so they do not
+        queue the queries of the application behind them for long. When the lock
+        is not acquired in time, the migration is rolled back and retried.
+        """
         # Connect to the database
         print("🚀 Starting migrations...")
+        state.config = config
         try:
             conn = cls.get_postgresql_connection()
             cursor = conn.cursor()
@@ -97,29 +465,127 @@ class Migration:
         # Create log tables if they do not exist
         cls.create_migration_log_tables(cursor)
 
+        # Skip the introspection when the models did not change
+        tables = cls.get_postgresql_tables(module=module)
+        fingerprint = cls.get_schema_fingerprint(tables)
+        if not force and cls.get_stored_fingerprint(cursor, module) == fingerprint:
+            print(f"✅ Schema unchanged, skipping module {module.__name__}")
+            # The partitions of the next intervals are due whether the models
+            # changed or not, and so is the expiration of the old ones
+            try:
+                if online:
+                    cursor.execute("SET LOCAL lock_timeout = %s;", (LOCK_TIMEOUT,))
+                for table, schema in tables.items():
+                    cls.sync_partitions(cursor, table, schema)
+                cls.flush_logs(cursor)
+            except psycopg2.Error as e:
+                print(f"❌ Error during partition maintenance: {e}")
+                conn.rollback()
+                state.pending_logs.clear()
+            else:
+                conn.commit()
+            cursor.close()
+            conn.close()
+            return
+
         # Check unaccent extension
         cls.enable_unaccent_extension(cursor)
 
-        tables = cls.get_postgresql_tables(module=module)
-        try:
-            for table, schema in tables.items():
-                if cls.table_exists(cursor, table):
-                    cls.update_table_schema(cursor, table, schema)
-                else:
-                    create_table_query = cls.generate_create_table_query(table, schema)
-                    for query in create_table_query:
-                        cursor.execute(query)
-                    cls.log_change("CREATE TABLE", f"Table '{table}' created")
+        # Check pg_trgm extension and the immutable unaccent wrapper
+        cls.enable_trigram_extension(cursor)
 
-                # Enable data change tracking if any field requires it
-                cls.enable_data_tracking(cursor, table, schema)
-        except Exception as e:
-            print(f"❌ Error during migrations: {e}")
-            conn.rollback()
-        else:
-            conn.commit()
-            cursor.close()
-            conn.close()
+        # Create the enum types and commit their new values, which can not be used
+        # in the transaction that adds them
+        cls.sync_enum_types(cursor, tables)
+        cls.flush_logs(cursor)
+        conn.commit()
+
+        attempts = LOCK_RETRIES if online else 1
+        for attempt in range(1, attempts + 1):
+            state.deferred_queries.clear()
+            state.postponed_changes.clear()
+            try:
+                if online:
+                    cursor.execute("SET lock_timeout = %s;", (LOCK_TIMEOUT,))
+                cls.migrate_postgresql_tables(cursor, tables, online=online)
+                cls.flush_logs(cursor)
+            except psycopg2.errors.LockNotAvailable as e:
+                conn.rollback()
+                state.pending_logs.clear()
+                if attempt < attempts:
+                    print(f"⏳ Lock not available, retrying ({attempt}/{attempts})...")
+                    time.sleep(attempt)
+                    continue
+                print(f"❌ Error during migrations: {e}")
+            except Exception as e:
+                print(f"❌ Error during migrations: {e}")
+                conn.rollback()
+                state.pending_logs.clear()
+            else:
+                conn.commit()
+                if cls.run_deferred_queries(conn) and not state.postponed_changes:
+                    cls.save_fingerprint(cursor, module, fingerprint)
+                    conn.commit()
+            break
+
+        cursor.close()
+        conn.close()
+
+    @classmethod
+    def migrate_postgresql_tables(cls, cursor, tables: dict, online: bool = False):
+        """Create or update the tables of a module, in the migration transaction.
+
+        :param tables: table schemas by table name, see ``get_postgresql_tables``
+        :param online: use the lock minimizing strategies, see ``plan_table_changes``
+        """
+        # Introspect all the tables of the module at once
+        catalog = cls.get_catalog(cursor, list(tables))
+        for table, schema in tables.items():
+            existing = catalog.get(table)
+            if existing:
+                cls.update_table_schema(cursor, table, schema, existing, online=online)
+            else:
+                existing = {"columns": {}, "indexes": {}}
+                create_table_query = cls.generate_create_table_query(table, schema)
+                for query in create_table_query:
+                    cursor.execute(query)
+                cls.log_change("CREATE TABLE", f"Table '{table}' created")
+
+            # Create the partitions of the next intervals and expire the old ones
+            cls.sync_partitions(cursor, table, schema)
+
+            # Build the declared indexes, concurrently on existing tables
+            cls.sync_indexes(
+                cursor,
+                table,
+                schema,
+                concurrently=cls.can_index_concurrently(table, schema, catalog),
+                existing_indexes=existing["indexes"],
+            )
+
+            # Keep the generated full-text columns up to date
+            cls.sync_generated_columns(
+                cursor, table, schema, existing_columns=existing["columns"]
+            )
+
+            # Create or drop the search indexes declared in the model
+            cls.sync_search_indexes(
+                cursor, table, schema, existing_indexes=list(existing["indexes"])
+            )
+
+            # Enable data change tracking if any field requires it
+            cls.enable_data_tracking(cursor, table, schema)
+
+    @classmethod
+    def can_index_concurrently(cls, table_name: str, schema: dict, catalog: dict):
+        """Check whether the indexes of a table are built concurrently.
+
+        The indexes of the new tables are built in the migration transaction, and
+        indexes can not be built concurrently on partitioned tables.
+
+        :param catalog: the existing tables, see ``get_catalog``
+        """
+        return table_name in catalog and "__partition__" not in schema
 
     @classmethod
     def create_migration_log_tables(cls, cursor):
@@ -135,137 +601,462 @@ class Migration:
         """
         )
 
+        cls.create_logs_data_table(cursor)
+        cls.sync_logs_data_partitions(
+            cursor, state.config.get("tracking_retention_months", 0)
+        )
+
         cursor.execute(
             """
-            CREATE TABLE IF NOT EXISTS migration_logs_data (
-                id SERIAL PRIMARY KEY,
-                table_name VARCHAR(255),
-                column_name VARCHAR(255),
-                old_value TEXT,
-                new_value TEXT,
-                change_type VARCHAR(10), -- INSERT, UPDATE, DELETE
+            CREATE TABLE IF NOT EXISTS migration_fingerprints (
+                module VARCHAR(255) PRIMARY KEY,
+                fingerprint VARCHAR(64) NOT NULL,
                 timestamp TIMESTAMP DEFAULT NOW()
             )
         """
         )
 
     @classmethod
-    def log_change(cls, action: str, description: str):
-        """Log a change in the database structure."""
-        conn = cls.get_postgresql_connection()
-        cursor = conn.cursor()
+    def create_logs_data_table(cls, cursor):
+        """Create migration_logs_data partitioned by month of ``timestamp``.
+
+        A migration_logs_data created before the partitioning is kept as the
+        partition of all the months up to the current one, so its logs are dropped
+        with the other expired partitions.
+        """
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass('migration_logs_data');"
+        )
+        row = cursor.fetchone()
+        if row and row[0] == "p":
+            return
+
+        if row:
+            cursor.execute(
+                """
+                ALTER TABLE migration_logs_data RENAME TO migration_logs_data_legacy;
+                ALTER SEQUENCE migration_logs_data_id_seq OWNED BY NONE;
+                ALTER TABLE migration_logs_data_legacy
+                    ADD COLUMN IF NOT EXISTS record_id BIGINT,
+                    ADD COLUMN IF NOT EXISTS old_data JSONB,
+                    ADD COLUMN IF NOT EXISTS new_data JSONB;
+                UPDATE migration_logs_data_legacy SET timestamp = NOW() WHERE timestamp IS NULL;
+                ALTER TABLE migration_logs_data_legacy ALTER COLUMN timestamp SET NOT NULL;
+            """
+            )
+
         cursor.execute(
             """
-            INSERT INTO migration_logs (action, description) VALUES (%s, %s)
-        """,
-            (action, description),
+            CREATE SEQUENCE IF NOT EXISTS migration_logs_data_id_seq;
+            CREATE TABLE migration_logs_data (
+                id INTEGER NOT NULL DEFAULT nextval('migration_logs_data_id_seq'),
+                table_name VARCHAR(255),
+                column_name VARCHAR(255),
+                old_value TEXT,
+                new_value TEXT,
+                change_type VARCHAR(10), -- INSERT, UPDATE, DELETE
+                timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
+                record_id BIGINT,
+                old_data JSONB,
+                new_data JSONB
+            ) PARTITION BY RANGE (timestamp);
+            CREATE TABLE migration_logs_data_default PARTITION OF migration_logs_data DEFAULT;
+        """
         )
-        conn.commit()
-        print(f"📝 LOG: {action} - {description}")
+
+        if row:
+            end = cls.add_months(datetime.date.today().replace(day=1), 1)
+            cursor.execute(
+                f"""
+                ALTER TABLE migration_logs_data ATTACH PARTITION migration_logs_data_legacy
+                FOR VALUES FROM (MINVALUE) TO ('{end}');
+            """
+            )
+            cls.log_change(
+                "PARTITION TABLE",
+                f"Table 'migration_logs_data' partitioned by month, previous logs kept until {end}",
+            )
+        else:
+            cls.log_change("CREATE TABLE", "Table 'migration_logs_data' created")
 
     @classmethod
-    def table_exists(cls, cursor, table_name: str) -> bool:
-        """Check if the table already exists in PostgreSQL."""
+    def add_months(cls, day: datetime.date, months: int) -> datetime.date:
+        """Return the first day of the month ``months`` after the month of ``day``."""
+        month = day.year * 12 + day.month - 1 + months
+        return datetime.date(month // 12, month % 12 + 1, 1)
+
+    @classmethod
+    def get_partitions(cls, cursor, table_name: str) -> dict:
+        """Return the partitions of a table as name -> partition bound."""
         cursor.execute(
             """
-            SELECT EXISTS (
-                SELECT 1 FROM information_schema.tables WHERE table_name = %s
-            )
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s);
         """,
             (table_name,),
         )
-        return cursor.fetchone()[0]
+        return dict(cursor.fetchall())
+
+    @classmethod
+    def get_range_partitions(cls, cursor, table_name: str) -> dict:
+        """Return the range partitions of a table as name -> (start, end).
+
+        The bounds are the literal of the partition bound, None for MINVALUE or
+        MAXVALUE. The default partition is not included.
+        """
+        partitions = {}
+        for name, bound in cls.get_partitions(cursor, table_name).items():
+            match = re.match(r"FOR VALUES FROM \((.+)\) TO \((.+)\)", bound or "")
+            if not match:
+                continue
+            partitions[name] = tuple(
+                None if value in ("MINVALUE", "MAXVALUE") else value.strip("'")[:10]
+                for value in match.groups()
+            )
+        return partitions
 
     @classmethod
-    def get_existing_columns(cls, cursor, table_name: str) -> dict:
-        """Get the existing columns in a table with their types and constraints."""
+    def get_stored_columns(cls, cursor, table_name: str) -> list:
+        """Return the columns of a table that are not generated, in their order.
+
+        An empty list for a table that does not exist yet, in the migration plan.
+        """
         cursor.execute(
             """
-            SELECT column_name, data_type, is_nullable
-            FROM information_schema.columns
-            WHERE table_name = %s
+            SELECT attname FROM pg_attribute
+            WHERE attrelid = to_regclass(%s) AND attnum > 0 AND NOT attisdropped
+                AND attgenerated = ''
+            ORDER BY attnum;
         """,
             (table_name,),
         )
+        return [row[0] for row in cursor.fetchall()]
 
-        return {
-            row[0]: {"type": row[1].upper(), "required": (row[2] == "NO")}
-            for row in cursor.fetchall()
-        }
+    @classmethod
+    def sync_logs_data_partitions(cls, cursor, retention_months: int = 0):
+        """Create the monthly partitions of migration_logs_data and drop the expired ones.
+
+        :param retention_months: months of logs kept before the current one, 0 keeps
+            all the logs
+        """
+        cls.sync_range_partitions(
+            cursor,
+            "migration_logs_data",
+            "timestamp",
+            interval="month",
+            premake=LOGS_DATA_PARTITIONS_AHEAD,
+            retention=retention_months,
+            expire="drop",
+        )
 
     @classmethod
-    def add_foreign_key(
+    def get_interval_start(
+        cls, day: datetime.date, interval: str, offset: int = 0
+    ) -> datetime.date:
+        """Return the start of the ``interval`` ``offset`` intervals after the one of ``day``."""
+        if interval == "day":
+            return day + datetime.timedelta(days=offset)
+        if interval == "year":
+            return datetime.date(day.year + offset, 1, 1)
+        return cls.add_months(day, offset)
+
+    @classmethod
+    def sync_range_partitions(
         cls,
         cursor,
         table_name: str,
         column: str,
-        foreign_table: str,
-        on_delete: str,
-        on_update: str,
+        interval: str = "month",
+        premake: int = 3,
+        retention: int = 0,
+        expire: str = "drop",
     ):
-        """Add a foreign key with configurable ON DELETE and ON UPDATE policies.
+        """Create the range partitions of the next intervals and expire the old ones.
 
-        Supported values:
-            CASCADE, SET NULL, RESTRICT, NO ACTION, SET DEFAULT
+        The partitions of the current interval and the next ``premake`` intervals are
+        created in advance. The rows written past them go to the default partition,
+        and are moved to their partition when it is created.
+
+        :param interval: ``day``, ``month`` or ``year``
+        :param retention: intervals kept before the current one, 0 keeps all of them
+        :param expire: ``drop`` the expired partitions, or ``detach`` them from the
+            table to archive them
         """
-        fk_name = f"{table_name}_{column}_fk"
+        partitions = cls.get_range_partitions(cursor, table_name)
+        current = cls.get_interval_start(datetime.date.today(), interval)
+        suffix_formats = {"day": "y%Ym%md%d", "month": "y%Ym%m", "year": "y%Y"}
+        columns = None
+
+        for offset in range(premake + 1):
+            start = cls.get_interval_start(current, interval, offset)
+            end = cls.get_interval_start(start, interval, 1)
+            overlaps = any(
+                (lower is None or lower < str(end))
+                and (upper is None or upper > str(start))
+                for lower, upper in partitions.values()
+            )
+            if overlaps:
+                continue
+
+            name = f"{table_name}_{start.strftime(suffix_formats[interval])}"
+            condition = f"{column} >= '{start}' AND {column} < '{end}'"
+            if columns is None:
+                columns = ", ".join(cls.get_stored_columns(cursor, table_name))
+            # The rows of the interval are moved from the default partition before
+            # the partition is attached, in the same transaction. The generated
+            # columns are computed again, they can not be inserted.
+            move_rows = (
+                f"""
+                INSERT INTO {name} ({columns})
+                SELECT {columns} FROM {table_name}_default WHERE {condition};
+                DELETE FROM {table_name}_default WHERE {condition};"""
+                if columns
+                else ""
+            )
+            cursor.execute(
+                f"""
+                CREATE TABLE {name} (LIKE {table_name} INCLUDING DEFAULTS INCLUDING GENERATED);{move_rows}
+                ALTER TABLE {table_name} ATTACH PARTITION {name}
+                FOR VALUES FROM ('{start}') TO ('{end}');
+            """
+            )
+            cls.log_change("CREATE PARTITION", f"Partition '{name}' created")
 
-        # Remove the foreign key if it already exists
-        cursor.execute(
-            f"""
-            DO $$
-            BEGIN
-                IF EXISTS (
-                    SELECT 1 FROM information_schema.table_constraints
-                    WHERE constraint_name = '{fk_name}' AND table_name = '{table_name}'
-                ) THEN
-                    ALTER TABLE {table_name} DROP CONSTRAINT {fk_name};
-                END IF;
-            END $$;
+        if not retention:
+            return
+
+        cutoff = str(cls.get_interval_start(current, interval, -retention))
+        for name, (_, upper) in partitions.items():
+            if upper is None or upper > cutoff:
+                continue
+            if expire == "detach":
+                cursor.execute(f"ALTER TABLE {table_name} DETACH PARTITION {name};")
+                cls.log_change(
+                    "DETACH PARTITION", f"Expired partition '{name}' detached"
+                )
+            else:
+                cursor.execute(f"DROP TABLE {name};")
+                cls.log_change("DROP PARTITION", f"Expired partition '{name}' dropped")
+
+    @classmethod
+    def get_schema_fingerprint(cls, tables: dict) -> str:
+        """Return a stable hash of the table schemas of a module.
+
+        :param tables: table schemas by table name, see ``get_postgresql_tables``
         """
+        payload = json.dumps(
+            [SCHEMA_FINGERPRINT_VERSION, tables], sort_keys=True, default=str
         )
+        return hashlib.sha256(payload.encode()).hexdigest()
 
-        # Create the new FOREIGN KEY with custom policies
-        query = f"""ALTER TABLE {table_name} ADD CONSTRAINT {fk_name} FOREIGN KEY ({column}) REFERENCES {foreign_table}
-            ON DELETE CASCADE ON UPDATE CASCADE;"""
+    @classmethod
+    def get_stored_fingerprint(cls, cursor, module: ModuleType):
+        """Return the fingerprint of the last successful migration of a module."""
+        cursor.execute(
+            "SELECT fingerprint FROM migration_fingerprints WHERE module = %s;",
+            (module.__name__,),
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
 
-        if on_delete and on_update:
-            query = query.replace("ON DELETE CASCADE", f"ON DELETE {on_delete}")
-            query = query.replace("ON UPDATE CASCADE", f"ON UPDATE {on_update}")
-        elif on_delete:
-            query = query.replace("ON DELETE CASCADE", f"ON DELETE {on_delete}")
-        elif on_update:
-            query = query.replace("ON UPDATE CASCADE", f"ON UPDATE {on_update}")
+    @classmethod
+    def save_fingerprint(cls, cursor, module: ModuleType, fingerprint: str):
+        """Store the fingerprint of a module after a successful migration."""
+        cursor.execute(
+            """
+            INSERT INTO migration_fingerprints (module, fingerprint) VALUES (%s, %s)
+            ON CONFLICT (module)
+            DO UPDATE SET fingerprint = EXCLUDED.fingerprint, timestamp = NOW();
+        """,
+            (module.__name__, fingerprint),
+        )
 
-        cursor.execute(query)
+    @classmethod
+    def log_change(cls, action: str, description: str):
+        """Log a change in the database structure.
 
-        cls.log_change(
-            "ADD FOREIGN KEY",
-            f"Foreign key '{column}' -> '{foreign_table}.id' in '{table_name}' with ON DELETE {on_delete} and ON UPDATE {on_update}",
-        )
+        The log is written by ``flush_logs`` in the migration transaction, so it is
+        discarded with the changes if the migration fails.
+        """
+        state.pending_logs.append((action, description))
 
     @classmethod
-    def remove_foreign_key(cls, cursor, table_name: str, column: str):
-        """Remove a foreign key if it is no longer in the model."""
-        fk_name = f"{table_name}_{column}_fk"
-        cursor.execute(f"ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {fk_name};")
-        cls.log_change(
-            "REMOVE FOREIGN KEY", f"FK '{column}' removed from '{table_name}'"
+    def flush_logs(cls, cursor):
+        """Insert the pending logs in migration_logs in one statement."""
+        if not state.pending_logs:
+            return
+
+        execute_values(
+            cursor,
+            "INSERT INTO migration_logs (action, description) VALUES %s",
+            list(state.pending_logs),
         )
+        for action, description in state.pending_logs:
+            print(f"📝 LOG: {action} - {description}")
+        state.pending_logs.clear()
 
     @classmethod
-    def get_existing_foreign_keys(cls, cursor, table_name: str):
-        """Return a dictionary with the existing foreign keys in the table."""
+    def table_exists(cls, cursor, table_name: str) -> bool:
+        """Check if the table already exists in PostgreSQL."""
         cursor.execute(
-            f"""
-            SELECT kcu.column_name, ccu.table_name AS foreign_table
-            FROM information_schema.table_constraints AS tc
-            JOIN information_schema.key_column_usage AS kcu ON tc.constraint_name = kcu.constraint_name
-            JOIN information_schema.constraint_column_usage AS ccu ON ccu.constraint_name = tc.constraint_name
-            WHERE tc.table_name = '{table_name}' AND tc.constraint_type = 'FOREIGN KEY';
+            """
+            SELECT EXISTS (
+                SELECT 1 FROM information_schema.tables WHERE table_name = %s
+            )
+        """,
+            (table_name,),
+        )
+        return cursor.fetchone()[0]
+
+    @classmethod
+    def get_catalog(cls, cursor, tables: list) -> dict:
+        """Introspect the existing tables in a few bulk queries to the system catalog.
+
+        Returns, by table name, the columns with their type, nullability, default and
+        comment, the single column foreign keys, unique and check constraints, the
+        indexes and the triggers. The tables that do not exist are not included.
         """
+        catalog = {}
+        cursor.execute(
+            """
+            SELECT c.relname, a.attname, upper(format_type(a.atttypid, a.atttypmod)), a.attnotnull,
+                pg_get_expr(d.adbin, d.adrelid), a.attgenerated <> '', col_description(c.oid, a.attnum),
+                a.attidentity <> ''
+            FROM pg_attribute a
+            JOIN pg_class c ON c.oid = a.attrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+            WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p')
+                AND c.relname = ANY(%s) AND a.attnum > 0 AND NOT a.attisdropped
+            ORDER BY c.relname, a.attnum
+        """,
+            (tables,),
+        )
+        for (
+            table,
+            column,
+            data_type,
+            not_null,
+            default,
+            generated,
+            comment,
+            identity,
+        ) in cursor.fetchall():
+            existing = catalog.setdefault(
+                table,
+                {
+                    "columns": {},
+                    "foreign_keys": {},
+                    "unique": {},
+                    "checks": {},
+                    "indexes": {},
+                    "triggers": [],
+                },
+            )
+            existing["columns"][column] = {
+                "type": data_type,
+                "required": not_null,
+                "default": default,
+                "generated": generated,
+                "comment": comment,
+                "identity": identity,
+            }
+
+        cursor.execute(
+            """
+            SELECT c.relname, con.conname, con.contype, a.attname, f.relname,
+                con.confdeltype, con.confupdtype, con.convalidated
+            FROM pg_constraint con
+            JOIN pg_class c ON c.oid = con.conrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = con.conkey[1]
+            LEFT JOIN pg_class f ON f.oid = con.confrelid
+            WHERE n.nspname = current_schema() AND c.relname = ANY(%s)
+                AND con.contype IN ('f', 'u', 'c') AND cardinality(con.conkey) = 1
+        """,
+            (tables,),
+        )
+        for (
+            table,
+            name,
+            kind,
+            column,
+            foreign_table,
+            on_delete,
+            on_update,
+            valid,
+        ) in cursor.fetchall():
+            if table not in catalog:
+                continue
+            if kind == "f":
+                catalog[table]["foreign_keys"][column] = {
+                    "name": name,
+                    "foreign_table": foreign_table,
+                    "on_delete": FOREIGN_KEY_ACTIONS.get(on_delete, "NO ACTION"),
+                    "on_update": FOREIGN_KEY_ACTIONS.get(on_update, "NO ACTION"),
+                    "valid": valid,
+                }
+            elif kind == "c":
+                catalog[table]["checks"][name] = {"column": column, "valid": valid}
+            else:
+                catalog[table]["unique"][column] = name
+
+        cursor.execute(
+            """
+            SELECT c.relname, i.relname, obj_description(x.indexrelid, 'pg_class'), x.indisvalid
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            JOIN pg_class c ON c.oid = x.indrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = current_schema() AND c.relname = ANY(%s)
+        """,
+            (tables,),
+        )
+        for table, name, comment, valid in cursor.fetchall():
+            if table in catalog:
+                catalog[table]["indexes"][name] = {"comment": comment, "valid": valid}
+
+        cursor.execute(
+            """
+            SELECT c.relname, t.tgname
+            FROM pg_trigger t
+            JOIN pg_class c ON c.oid = t.tgrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = current_schema() AND c.relname = ANY(%s) AND NOT t.tgisinternal
+        """,
+            (tables,),
         )
-        return {row[0]: row[1] for row in cursor.fetchall()}
+        for table, name in cursor.fetchall():
+            if table in catalog:
+                catalog[table]["triggers"].append(name)
+
+        return catalog
+
+    @classmethod
+    def get_models(cls, module: ModuleType) -> dict:
+        """Get the Pydantic models defined in the submodules of a module, by table name."""
+        models = {}
+
+        # List all attributes and classes in the module
+        for attr_name in dir(module):
+            if attr_name.startswith("__"):
+                continue
+            attribute = getattr(module, attr_name)
+
+            for sub_attr in dir(attribute):
+                if sub_attr.startswith("__"):
+                    continue
+
+                sub_attr = getattr(attribute, sub_attr)
+                if (
+                    isinstance(sub_attr, type)
+                    and issubclass(sub_attr, BaseDBModel)
+                    and sub_attr is not BaseDBModel
+                ):
+                    models[sub_attr.__tablename__] = sub_attr
+        return models
 
     @classmethod
     def get_postgresql_tables(cls, module: ModuleType) -> dict:
@@ -273,24 +1064,9 @@ class Migration:
         tables = {}
 
         try:
-            # List all attributes and classes in the module
-            for attr_name in dir(module):
-                if attr_name.startswith("__"):
-                    continue
-                attribute = getattr(module, attr_name)
-
-                for sub_attr in dir(attribute):
-                    if sub_attr.startswith("__"):
-                        continue
-
-                    sub_attr = getattr(attribute, sub_attr)
-                    if (
-                        isinstance(sub_attr, type)
-                        and issubclass(sub_attr, BaseDBModel)
-                        and sub_attr is not BaseDBModel
-                    ):
-                        table_name = sub_attr.__tablename__
-                        tables[table_name] = cls.pydantic_to_sql(sub_attr)
+            for table_name, model in cls.get_models(module).items():
+                tables[table_name] = cls.pydantic_to_sql(model)
+            cls.add_relation_tables(tables)
         except ModuleNotFoundError:
             print(f"🚨 Module {module}.models not found")
             raise  # Ignore modules without models.py
@@ -300,47 +1076,347 @@ class Migration:
         return tables
 
     @classmethod
-    def remove_obsolete_columns(
-        cls, cursor, table_name: str, existing_columns: dict, schema: dict
-    ):
-        """Remove the columns that are no longer in the Pydantic models with logs."""
-        for column in existing_columns:
-            if column not in schema:
-                cursor.execute(
-                    f"ALTER TABLE {table_name} DROP COLUMN {column} CASCADE;"
+    def get_relation_config(
+        cls, model: type[BaseDBModel], field_name: str, field
+    ) -> dict:
+        """Return the relation declared by a field, or None for a column.
+
+        Many2many fields declare ``json_schema_extra=dict(many2many="<comodel table>")``
+        and are stored in a relation table, by default ``<table1>_<table2>_rel`` with
+        the tables sorted, with the ``<table>_id`` columns ``column1`` and ``column2``.
+        One2many fields declare ``json_schema_extra=dict(one2many="<comodel table>",
+        inverse="<field>")``, the inverse foreign key of the comodel.
+        """
+        extra = field.json_schema_extra or {}
+        table_name = model.__tablename__
+        if extra.get("many2many"):
+            comodel = extra["many2many"]
+            relation = {
+                "type": "many2many",
+                "field": field_name,
+                "comodel": comodel,
+                "relation": extra.get("relation")
+                or f"{'_'.join(sorted((table_name, comodel)))}_rel",
+                "column1": extra.get("column1") or f"{table_name}_id",
+                "column2": extra.get("column2") or f"{comodel}_id",
+            }
+            if relation["column1"] == relation["column2"]:
+                raise ValueError(
+                    f"Many2many field '{field_name}' in '{table_name}' requires "
+                    "column1 and column2 to relate a table with itself"
                 )
-                cls.log_change(
-                    "DROP COLUMN",
-                    f"Obsolete column '{column}' removed in '{table_name}'",
+            return relation
+        if extra.get("one2many"):
+            if not extra.get("inverse"):
+                raise ValueError(
+                    f"One2many field '{field_name}' in '{table_name}' requires an inverse field"
                 )
+            return {
+                "type": "one2many",
+                "field": field_name,
+                "comodel": extra["one2many"],
+                "inverse": extra["inverse"],
+            }
+        return None
 
     @classmethod
-    def pydantic_to_sql(cls, model: type[BaseDBModel]) -> dict:
-        """Convert a Pydantic model to a PostgreSQL schema with validations."""
-        field_mapping = {
-            "str": "CHARACTER VARYING",
-            "int": "INTEGER",
-            "float": "REAL",
-            "bool": "BOOLEAN",
-            "date": "DATE",
-            "datetime": "TIMESTAMP WITHOUT TIME ZONE",
+    def add_relation_tables(cls, tables: dict):
+        """Add the relation tables and the missing inverse foreign keys of the relations.
+
+        The inverse foreign keys of the one2many fields are added to their comodels
+        in the module when they do not declare them. The relation tables have the composite primary key (column1, column2), which
+        serves the reads from the model, and an index (column2, column1), which
+        covers the reads from the comodel.
+        """
+        for table, schema in list(tables.items()):
+            for relation in schema.get("__relations__", []):
+                if relation["type"] == "many2many":
+                    column1, column2 = relation["column1"], relation["column2"]
+                    existing = tables.get(relation["relation"])
+                    if existing is not None:
+                        # Declared from both sides of the relation
+                        if set(cls.get_columns(existing)) != {column1, column2}:
+                            raise ValueError(
+                                f"Relation table '{relation['relation']}' declared with different columns"
+                            )
+                        continue
+                    tables[relation["relation"]] = {
+                        column1: {
+                            "type": "BIGINT",
+                            "primary_key": True,
+                            "required": True,
+                            "foreign_key": f"{table}(id)",
+                            "on_delete": "CASCADE",
+                        },
+                        column2: {
+                            "type": "BIGINT",
+                            "primary_key": True,
+                            "required": True,
+                            "foreign_key": f"{relation['comodel']}(id)",
+                            "on_delete": "CASCADE",
+                        },
+                        "__indexes__": [
+                            {
+                                "name": f"{relation['relation']}_{column2}_idx",
+                                "columns": [column2, column1],
+                                "unique": False,
+                                "using": "btree",
+                                "where": None,
+                                "include": [],
+                            }
+                        ],
+                    }
+                else:
+                    comodel = tables.get(relation["comodel"])
+                    inverse = relation["inverse"]
+                    if comodel is None or inverse in comodel:
+                        # Declared in the comodel, or the comodel is in another module
+                        continue
+                    comodel[inverse] = {
+                        "type": "BIGINT",
+                        "required": False,
+                        "foreign_key": f"{table}(id)",
+                        "on_delete": "CASCADE",
+                    }
+                    comodel.setdefault("__indexes__", []).append(
+                        {
+                            "name": f"{relation['comodel']}_{inverse}_idx",
+                            "columns": [inverse],
+                            "unique": False,
+                            "using": "btree",
+                            "where": None,
+                            "include": [],
+                        }
+                    )
+
+    @classmethod
+    def get_columns(cls, schema: dict) -> dict:
+        """Return the columns of a table schema, without the table level keys like ``__indexes__``."""
+        return {
+            column: props
+            for column, props in schema.items()
+            if not column.startswith("__")
         }
 
-        schema = {
-            "id": {"type": "SERIAL PRIMARY KEY", "required": True}
-        }  # Default autoincremental ID
+    @classmethod
+    def register_type(cls, python_type: type, sql_type):
+        """Map a Python type, and its subclasses, to a SQL type in the models.
 
-        for field_name, field in model.model_fields.items():
-            field_type = field.annotation
-            is_required = field.is_required()
-            is_unique = (
-                field.json_schema_extra.get("unique", False)
-                if field.json_schema_extra
-                else False
-            )
-            primary_key = (
-                field.json_schema_extra.get("primary_key", False)
-                if field.json_schema_extra
+        :param sql_type: the SQL type, or a function of the Python type and the
+            pydantic field returning it
+        """
+        SQL_TYPES[python_type] = sql_type
+
+    @classmethod
+    def get_sql_type(cls, annotation, field=None) -> str:
+        """Return the SQL type of a field annotation, see ``register_type``.
+
+        Optional and annotated types are unwrapped. Lists, sets and tuples of a type
+        are arrays of it, except lists of objects which are stored as JSONB.
+        """
+        origin = typing.get_origin(annotation)
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if origin is typing.Annotated:
+            return cls.get_sql_type(args[0], field)
+        if origin in (typing.Union, getattr(types, "UnionType", typing.Union)):
+            return cls.get_sql_type(args[0], field) if len(args) == 1 else "TEXT"
+        if origin is typing.Literal:
+            return cls.get_sql_type(type(args[0]), field)
+        if origin in (list, set, tuple):
+            item_type = cls.get_sql_type(args[0], field) if args else "JSONB"
+            return "JSONB" if item_type == "JSONB" else f"{item_type}[]"
+        if origin is not None:
+            return cls.get_sql_type(origin, field)
+        if not isinstance(annotation, type):
+            return "TEXT"
+
+        mro = annotation.__mro__
+        if issubclass(annotation, Enum):
+            # Before the str or int mixin of the Enum
+            mro = [python_type for python_type in mro if issubclass(python_type, Enum)]
+        for python_type in mro:
+            sql_type = SQL_TYPES.get(python_type)
+            if sql_type is not None:
+                return sql_type(annotation, field) if callable(sql_type) else sql_type
+        return "TEXT"
+
+    @classmethod
+    def get_sql_default(cls, default, sql_type: str):
+        """Return the default of a field as the text of its SQL literal.
+
+        Enums are stored by value, JSONB defaults as JSON and array defaults as
+        array literals.
+        """
+        if isinstance(default, BaseModel):
+            default = default.model_dump(mode="json")
+        if isinstance(default, Enum):
+            default = default.value
+        if sql_type == "JSONB":
+            return json.dumps(default, default=str)
+        if sql_type.endswith("[]") and isinstance(default, (list, set, tuple)):
+            items = (
+                '"{}"'.format(
+                    str(item.value if isinstance(item, Enum) else item)
+                    .replace("\\", "\\\\")
+                    .replace('"', '\\"')
+                )
+                for item in default
+            )
+            return "{" + ",".join(items) + "}"
+        return default
+
+    @classmethod
+    def get_enum_class(cls, annotation):
+        """Return the Enum of an annotation, unwrapping optional, annotated and list types."""
+        if isinstance(annotation, type):
+            return annotation if issubclass(annotation, Enum) else None
+        for arg in typing.get_args(annotation):
+            enum_class = cls.get_enum_class(arg)
+            if enum_class:
+                return enum_class
+        return None
+
+    @classmethod
+    def get_enum_types(cls, cursor, tables: dict) -> dict:
+        """Return the labels of the existing native ENUM types used by the tables, by type name."""
+        names = {
+            props["type"].removesuffix("[]")
+            for schema in tables.values()
+            for props in cls.get_columns(schema).values()
+            if props.get("enum_storage") == "native"
+        }
+        if not names:
+            return {}
+        cursor.execute(
+            """
+            SELECT upper(t.typname), e.enumlabel
+            FROM pg_type t
+            JOIN pg_namespace n ON n.oid = t.typnamespace
+            JOIN pg_enum e ON e.enumtypid = t.oid
+            WHERE n.nspname = current_schema() AND upper(t.typname) = ANY(%s)
+            ORDER BY t.typname, e.enumsortorder
+        """,
+            (sorted(names),),
+        )
+        enum_types = {}
+        for name, label in cursor.fetchall():
+            enum_types.setdefault(name, []).append(label)
+        return enum_types
+
+    @classmethod
+    def sync_enum_types(cls, cursor, tables: dict, enum_types: dict = None):
+        """Create the native ENUM types of the tables and add their new values.
+
+        The new values are added in the position they have in the Enum. Values can
+        not be removed from an ENUM type, the removed ones are only reported.
+
+        :param tables: table schemas by table name, see ``get_postgresql_tables``
+        :param enum_types: the existing types from ``get_enum_types``, updated with
+            the synced types
+        """
+        if enum_types is None:
+            enum_types = cls.get_enum_types(cursor, tables)
+
+        declared = {}
+        for table, schema in tables.items():
+            for column, props in cls.get_columns(schema).items():
+                if props.get("enum_storage") != "native":
+                    continue
+                name = props["type"].removesuffix("[]")
+                if declared.setdefault(name, props["enum"]) != props["enum"]:
+                    raise ValueError(
+                        f"Enum type '{name}' of '{table}.{column}' declared with different values"
+                    )
+
+        def quote(value: str) -> str:
+            return "'{}'".format(value.replace("'", "''"))
+
+        for name, values in declared.items():
+            existing = enum_types.get(name)
+            if existing is None:
+                cursor.execute(
+                    f"CREATE TYPE {name} AS ENUM ({', '.join(map(quote, values))});"
+                )
+                cls.log_change("CREATE TYPE", f"Enum type '{name}' created")
+                enum_types[name] = list(values)
+                continue
+
+            for position, value in enumerate(values):
+                if value in existing:
+                    continue
+                if position:
+                    where = f"AFTER {quote(values[position - 1])}"
+                else:
+                    where = f"BEFORE {quote(existing[0])}"
+                cursor.execute(
+                    f"ALTER TYPE {name} ADD VALUE IF NOT EXISTS {quote(value)} {where};"
+                )
+                cls.log_change(
+                    "ALTER TYPE", f"Value '{value}' added to enum type '{name}'"
+                )
+                existing.insert(
+                    existing.index(values[position - 1]) + 1 if position else 0, value
+                )
+            for value in existing:
+                if value not in values:
+                    print(
+                        f"⚠️ Value '{value}' of enum type '{name}' is no longer in the model, "
+                        "enum values can not be removed"
+                    )
+
+    @classmethod
+    def get_enum_conversion(cls, column: str, props: dict, current_type: str) -> str:
+        """Return the USING expression that converts a column to the storage of its Enum.
+
+        The SMALLINT codes are the position of the value in the Enum.
+        """
+        column_type = props["type"]
+        values = ", ".join(
+            "'{}'".format(value.replace("'", "''")) for value in props["enum"]
+        )
+        if props["enum_storage"] == "code" and current_type not in IDENTITY_TYPES:
+            return (
+                f"(array_position(ARRAY[{values}], {column}::text) - 1)::{column_type}"
+            )
+        if props["enum_storage"] == "native" and current_type in IDENTITY_TYPES:
+            return f"(ARRAY[{values}])[{column} + 1]::{column_type}"
+        return f"{column}::{column_type}"
+
+    @classmethod
+    def pydantic_to_sql(cls, model: type[BaseDBModel]) -> dict:
+        """Convert a Pydantic model to a PostgreSQL schema with validations.
+
+        The types of the fields are mapped with ``get_sql_type``. The integer
+        primary keys, like the default ``id``, are BIGINT identity columns.
+        """
+        schema = {
+            "id": {
+                "type": "BIGINT",
+                "primary_key": True,
+                "identity": True,
+                "required": True,
+            }
+        }  # Default autoincremental ID
+        indexes = []
+        relations = []
+
+        for field_name, field in model.model_fields.items():
+            relation = cls.get_relation_config(model, field_name, field)
+            if relation:
+                # Stored in a relation table or in the comodel, see add_relation_tables
+                relations.append(relation)
+                continue
+
+            field_type = field.annotation
+            is_required = field.is_required()
+            is_unique = (
+                field.json_schema_extra.get("unique", False)
+                if field.json_schema_extra
+                else False
+            )
+            primary_key = (
+                field.json_schema_extra.get("primary_key", False)
+                if field.json_schema_extra
                 else False
             )
             foreign_key = (
@@ -355,9 +1431,8 @@ class Migration:
             )
             default = (
                 field.default
-                if field.default
-                and not isinstance(field.default, PydanticUndefinedType)
-                else False
+                if not isinstance(field.default, PydanticUndefinedType)
+                else None
             )
             on_delete = (
                 field.json_schema_extra.get("on_delete", False)
@@ -369,18 +1444,31 @@ class Migration:
                 if field.json_schema_extra
                 else False
             )
+            index = (
+                field.json_schema_extra.get("index", None)
+                if field.json_schema_extra
+                else None
+            )
+            search_index = (
+                field.json_schema_extra.get("search_index", False)
+                if field.json_schema_extra
+                else False
+            )
+            if search_index and search_index not in SEARCH_INDEX_TYPES:
+                raise ValueError(
+                    f"Unsupported search index '{search_index}' in field '{field_name}'"
+                )
 
-            if isinstance(field_type, type):
-                field_type_str = f"{field_type.__name__}"
-            elif hasattr(field_type, "__args__"):
+            if type(None) in typing.get_args(field_type):
                 # field: Optional[int] ...
-                if field_type.__name__ == "Optional":
-                    field_type_str = field_type.__args__[0].__name__
-                    is_required = False
-            else:
-                field_type_str = "str"
-
-            sql_type = field_mapping.get(field_type_str, "TEXT")
+                is_required = False
+
+            sql_type = cls.get_sql_type(field_type, field)
+            if field_name == "id" and sql_type in IDENTITY_TYPES:
+                # The default autoincremental ID
+                continue
+            if default is not None:
+                default = cls.get_sql_default(default, sql_type)
             schema[field_name] = {
                 "type": sql_type,
                 "primary_key": primary_key,
@@ -390,25 +1478,302 @@ class Migration:
                 "track_changes": track_changes,
                 "default": default,
             }
+            enum_class = cls.get_enum_class(field_type)
+            enum_storage = enum_class and get_enum_storage(enum_class, field)
+            if enum_storage in ("native", "code"):
+                values = [member.value for member in enum_class]
+                schema[field_name].update(enum=values, enum_storage=enum_storage)
+                if enum_storage == "code" and default in values:
+                    schema[field_name]["default"] = str(values.index(default))
+            if primary_key and sql_type in IDENTITY_TYPES:
+                schema[field_name].update(
+                    type="BIGINT", identity=True, required=True, default=None
+                )
+            elif foreign_key and sql_type in IDENTITY_TYPES:
+                # The referenced ids are BIGINT identity columns
+                schema[field_name]["type"] = "BIGINT"
 
             if on_delete:
                 schema[field_name]["on_delete"] = on_delete
             if on_update:
                 schema[field_name]["on_update"] = on_update
+            if search_index:
+                schema[field_name]["search_index"] = search_index
+
+            # Foreign keys are indexed unless the field sets index=False
+            if index is None and foreign_key:
+                index = True
+            if index == "jsonb_path_ops":
+                # GIN index of the containment (@>) queries of a JSONB field
+                if sql_type != "JSONB":
+                    raise ValueError(
+                        f"Index 'jsonb_path_ops' in field '{field_name}' requires a JSONB field"
+                    )
+                indexes.append(
+                    {"columns": [f"{field_name} jsonb_path_ops"], "using": "gin"}
+                )
+            elif index:
+                indexes.append({"columns": [field_name], "using": index})
+
+        indexes.extend(getattr(model, "__indexes__", []))
+        if indexes:
+            schema["__indexes__"] = [
+                cls.normalize_index(model, index) for index in indexes
+            ]
+
+        if relations:
+            schema["__relations__"] = relations
+
+        if getattr(model, "__tracking__", None):
+            tracking = model.get_tracking_config()
+            if tracking["mode"] not in TRACKING_MODES:
+                raise ValueError(
+                    f"Unsupported tracking mode '{tracking['mode']}' in model '{model.__name__}'"
+                )
+            if tracking["format"] not in TRACKING_FORMATS:
+                raise ValueError(
+                    f"Unsupported tracking format '{tracking['format']}' in model '{model.__name__}'"
+                )
+            schema["__tracking__"] = tracking
+
+        if getattr(model, "__partition__", None):
+            schema["__partition__"] = cls.get_partition_config(model, schema)
+
+        fulltext = model.get_fulltext_config()
+        if fulltext:
+            schema[fulltext["column"]] = {
+                "type": "TSVECTOR",
+                "required": False,
+                "generated": cls.get_fulltext_expression(model, fulltext),
+                "search_index": "fulltext",
+            }
 
         return schema
 
+    @classmethod
+    def normalize_index(cls, model: type[BaseDBModel], index: dict) -> dict:
+        """Validate an index declaration of a model and fill its defaults.
+
+        Supported keys:
+            columns: column names or expressions, optionally followed by an operator
+                class, e.g. ["partner_id", "lower(name)", "attributes jsonb_path_ops"]
+            name: index name, by default ``<table>_<columns>_idx``
+            unique: build a unique index
+            using: index method (btree, hash, gin, gist, brin), btree by default
+            where: predicate of a partial index, e.g. "active IS TRUE"
+            include: non key columns of a covering index
+        """
+        table_name = model.__tablename__
+        columns = index.get("columns", [])
+        if isinstance(columns, str):
+            columns = [columns]
+        if not columns:
+            raise ValueError(f"Index without columns in '{table_name}'")
+
+        for column in columns + list(index.get("include", [])):
+            if "(" not in column and column.split()[0] not in model.model_fields:
+                raise ValueError(f"Index column '{column}' not found in '{table_name}'")
+
+        using = index.get("using", "btree")
+        if using is True:
+            using = "btree"
+        if using not in INDEX_METHODS:
+            raise ValueError(f"Unsupported index method '{using}' in '{table_name}'")
+
+        name = index.get("name")
+        if not name:
+            suffix = "uniq_idx" if index.get("unique") else "idx"
+            name = re.sub(r"\W+", "_", f"{table_name}_{'_'.join(columns)}").strip("_")
+            name = f"{name}_{suffix}"
+            if len(name) > 63:
+                # PostgreSQL truncates identifiers to 63 characters
+                digest = hashlib.md5(name.encode()).hexdigest()[:8]
+                name = f"{name[:54].rstrip('_')}_{digest}"
+
+        return {
+            "name": name,
+            "columns": columns,
+            "unique": bool(index.get("unique", False)),
+            "using": using,
+            "where": index.get("where"),
+            "include": list(index.get("include", [])),
+        }
+
+    @classmethod
+    def get_fulltext_expression(cls, model: type[BaseDBModel], fulltext: dict) -> str:
+        """Build the tsvector expression of the generated full-text column of a model."""
+        if not fulltext["fields"]:
+            raise ValueError(f"No full-text fields defined in '{model.__tablename__}'")
+
+        vectors = []
+        for field_name, weight in fulltext["fields"].items():
+            if field_name not in model.model_fields:
+                raise ValueError(
+                    f"Full-text field '{field_name}' not found in '{model.__tablename__}'"
+                )
+            if weight and weight not in ("A", "B", "C", "D"):
+                raise ValueError(
+                    f"Unsupported full-text weight '{weight}' in field '{field_name}'"
+                )
+
+            value = f"coalesce({field_name}::text, '')"
+            if field_name in fulltext["html_fields"]:
+                value = f"regexp_replace({value}, '<[^>]*>', ' ', 'g')"
+            vector = f"to_tsvector('{fulltext['language']}'::regconfig, {value})"
+            if weight:
+                vector = f"setweight({vector}, '{weight}')"
+            vectors.append(vector)
+
+        return " || ".join(vectors)
+
+    @classmethod
+    def get_partition_config(cls, model: type[BaseDBModel], schema: dict) -> dict:
+        """Return the validated partitioning of a model, see ``BaseDBModel.get_partition_config``.
+
+        The unique constraints of a partitioned table must include its partition key,
+        so only the partition column may be unique.
+        """
+        partition = model.get_partition_config()
+        if partition["by"] not in PARTITION_TYPES:
+            raise ValueError(
+                f"Unsupported partition type '{partition['by']}' in model '{model.__name__}'"
+            )
+        column = partition["column"]
+        if column not in cls.get_columns(schema):
+            raise ValueError(
+                f"Partition column '{column}' not found in model '{model.__name__}'"
+            )
+        if partition["by"] == "range" and (
+            partition["interval"] not in PARTITION_INTERVALS
+        ):
+            raise ValueError(
+                f"Unsupported partition interval '{partition['interval']}' in model '{model.__name__}'"
+            )
+        if partition["expire"] not in PARTITION_EXPIRE_ACTIONS:
+            raise ValueError(
+                f"Unsupported partition expire action '{partition['expire']}' in model '{model.__name__}'"
+            )
+        if partition["by"] == "list" and not partition["values"]:
+            raise ValueError(
+                f"List partition values not defined in model '{model.__name__}'"
+            )
+        for col, props in cls.get_columns(schema).items():
+            if props.get("unique") and col != column:
+                raise ValueError(
+                    f"Unique field '{col}' of partitioned model '{model.__name__}' must be the partition column"
+                )
+        return partition
+
+    @classmethod
+    def get_partition_key_type(cls, schema: dict) -> str:
+        """Return the SQL type of the partition key of a partitioned table schema."""
+        column_type = schema[schema["__partition__"]["column"]]["type"]
+        column_type = column_type.replace(" PRIMARY KEY", "")
+        return {"SERIAL": "INTEGER", "BIGSERIAL": "BIGINT"}.get(
+            column_type, column_type
+        )
+
+    @classmethod
+    def sync_partitions(
+        cls, cursor, table_name: str, schema: dict, created: bool = False
+    ):
+        """Create the partitions declared in the model and expire the old range partitions.
+
+        Range and list partitioned tables have a default partition for the rows out
+        of the declared partitions. A table created before its partitioning is not
+        converted, it has to be recreated.
+
+        :param created: the table is created by the migration, so it is partitioned,
+            used by the migration plan where it does not exist yet
+        """
+        partition = schema.get("__partition__")
+        if not partition:
+            return
+
+        row = ("p",)
+        if not created:
+            cursor.execute(
+                "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s);",
+                (table_name,),
+            )
+            row = cursor.fetchone()
+        if not row or row[0] != "p":
+            print(
+                f"⚠️ Table '{table_name}' is not partitioned, recreate it to partition it by '{partition['column']}'"
+            )
+            return
+
+        partitions = cls.get_partitions(cursor, table_name)
+        if partition["by"] != "hash" and f"{table_name}_default" not in partitions:
+            cursor.execute(
+                f"CREATE TABLE {table_name}_default PARTITION OF {table_name} DEFAULT;"
+            )
+            cls.log_change(
+                "CREATE PARTITION", f"Partition '{table_name}_default' created"
+            )
+
+        if partition["by"] == "range":
+            cls.sync_range_partitions(
+                cursor,
+                table_name,
+                partition["column"],
+                interval=partition["interval"],
+                premake=partition["premake"],
+                retention=partition["retention"],
+                expire=partition["expire"],
+            )
+            return
+
+        if partition["by"] == "list":
+            bounds = {
+                f"{table_name}_{suffix}": "IN ({})".format(
+                    ", ".join(
+                        "'{}'".format(str(value).replace("'", "''")) for value in values
+                    )
+                )
+                for suffix, values in partition["values"].items()
+            }
+        else:
+            bounds = {
+                f"{table_name}_h{remainder}": f"WITH (MODULUS {partition['modulus']}, REMAINDER {remainder})"
+                for remainder in range(partition["modulus"])
+            }
+
+        for name, bound in bounds.items():
+            if name in partitions:
+                continue
+            cursor.execute(
+                f"CREATE TABLE {name} PARTITION OF {table_name} FOR VALUES {bound};"
+            )
+            cls.log_change("CREATE PARTITION", f"Partition '{name}' created")
+
     @classmethod
     def generate_create_table_query(cls, table: str, schema: dict) -> tuple[str]:
-        """Generate an SQL query to create a table with foreign keys and unique constraints."""
+        """Generate an SQL query to create a table with foreign keys and unique constraints.
+
+        A partitioned table is created without partitions, see ``sync_partitions``.
+        Its primary key includes the partition key.
+        """
+        partition = schema.get("__partition__")
         columns = []
         constraints = []
         contraints_fk = []
-        for col, props in schema.items():
+        primary_keys = []
+        for col, props in cls.get_columns(schema).items():
             col_def = f"{col} {props['type']}"
 
+            if partition and col_def.endswith(" PRIMARY KEY"):
+                col_def = col_def[: -len(" PRIMARY KEY")]
+                primary_keys.append(col)
+
+            if props.get("generated"):
+                col_def += f" GENERATED ALWAYS AS ({props['generated']}) STORED"
+
+            if props.get("identity"):
+                col_def += " GENERATED BY DEFAULT AS IDENTITY"
+
             if props.get("primary_key"):
-                constraints.append(f"PRIMARY KEY ({col})")
+                primary_keys.append(col)
 
             elif props.get("required") and "PRIMARY KEY" not in col_def:
                 col_def += " NOT NULL"
@@ -453,211 +1818,555 @@ class Migration:
 
             columns.append(col_def)
 
+        if partition and primary_keys and partition["column"] not in primary_keys:
+            primary_keys.append(partition["column"])
+        if primary_keys:
+            constraints.insert(0, f"PRIMARY KEY ({', '.join(primary_keys)})")
+
         query = (
-            f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns + constraints)});"
+            f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns + constraints)})"
         )
-        return (query, "".join(contraints_fk))
+        if partition:
+            query += f" PARTITION BY {partition['by'].upper()} ({partition['column']})"
+        return (query + ";", "".join(contraints_fk))
+
+    @classmethod
+    def is_same_default(cls, existing_default, default) -> bool:
+        """Compare a column default read from the catalog with the default of the model.
+
+        The catalog returns the default as an expression like ``'value'::character varying``.
+        """
+        if existing_default is None:
+            return False
+        value = re.sub(r"(::[\w \[\]]+)+$", "", existing_default).strip("'")
+        return value.lower() == str(default).lower()
 
     @classmethod
-    def update_table_schema(cls, cursor, table_name: str, schema: dict):
-        """Detect and apply any changes in the table schema with logs."""
-        existing_columns = cls.get_existing_columns(cursor, table_name)
-        existing_foreign_keys = cls.get_existing_foreign_keys(cursor, table_name)
+    def plan_table_changes(
+        cls, table_name: str, schema: dict, existing: dict, online: bool = False
+    ) -> list:
+        """Compare the schema of a model with the existing table and return the changes.
+
+        Each change is a dict with the ``table``, the ``action`` and the ``description``
+        of the migration log and the ``clause`` of the ALTER TABLE statement, so all
+        the changes of a table are applied by ``apply_table_changes`` in one statement.
+        The ``deferred`` statements of a change run after the migration transaction
+        is committed, as (query, action, description).
+
+        In online mode the changes that scan the table do not hold the lock during
+        the scan:
+            - foreign keys are added NOT VALID and validated after the commit
+            - NOT NULL is proven by a CHECK constraint added NOT VALID and validated
+              after the commit, the null values are first backfilled with the
+              default of the column in batches
+            - unique constraints are attached to a unique index built CONCURRENTLY
+
+        The integer columns widened to BIGINT, e.g. the SERIAL ids and their foreign
+        keys, rewrite the table under an ACCESS EXCLUSIVE lock. They are left out in
+        online mode and recorded in the ``postponed_changes`` of the migration state.
+
+        :param table_name: name of the table
+        :param schema: schema of the model, see ``pydantic_to_sql``
+        :param existing: the table introspected by ``get_catalog``
+        :param online: use the lock minimizing strategies
+        """
+        existing_columns = existing.get("columns", {})
+        existing_foreign_keys = existing.get("foreign_keys", {})
+        existing_unique = existing.get("unique", {})
+        existing_checks = existing.get("checks", {})
+        existing_indexes = existing.get("indexes", {})
+        changes = []
+
+        def change(action: str, clause: str, description: str, deferred: list = None):
+            changes.append(
+                {
+                    "table": table_name,
+                    "action": action,
+                    "clause": clause,
+                    "description": description,
+                    "deferred": deferred or [],
+                }
+            )
 
-        # Add new columns and modify existing ones
-        for column, column_props in schema.items():
+        for column, column_props in cls.get_columns(schema).items():
             column_type = column_props["type"]
             is_required = column_props.get("required", False)
             is_unique = column_props.get("unique", False)
             foreign_key = column_props.get("foreign_key")
             primary_key = column_props.get("primary_key", False)
             default = column_props.get("default", None)
-            on_delete = column_props.get("on_delete", "CASCADE")  # 🔥 Default CASCADE
-            on_update = column_props.get("on_update", "CASCADE")  # 🔥 Default CASCADE
-
-            if column not in existing_columns:
-                alter_query = (
-                    f"ALTER TABLE {table_name} ADD COLUMN {column} {column_type};"
-                )
-                cursor.execute(alter_query)
-                cls.log_change(
-                    "ADD COLUMN", f"Column '{column}' added to '{table_name}'"
-                )
-
-                if is_required:
-                    cursor.execute(
-                        f"ALTER TABLE {table_name} ALTER COLUMN {column} SET NOT NULL;"
+            current = existing_columns.get(column)
+            current_default = current and current["default"]
+
+            if current is None:
+                definition = f"{column} {column_type}"
+                if column_props.get("generated"):
+                    definition += (
+                        f" GENERATED ALWAYS AS ({column_props['generated']}) STORED"
                     )
-                    cls.log_change(
-                        "ALTER COLUMN",
-                        f"Column '{column}' in '{table_name}' marked as NOT NULL",
-                    )
-
-                if is_unique:
-                    cursor.execute(
-                        f"ALTER TABLE {table_name} ADD CONSTRAINT {column}_unique UNIQUE ({column});"
-                    )
-                    cls.log_change(
-                        "ADD CONSTRAINT",
-                        f"Column '{column}' in '{table_name}' is now UNIQUE",
-                    )
-
-                if foreign_key:
-                    cls.add_foreign_key(
-                        cursor, table_name, column, foreign_key, on_delete, on_update
-                    )
-                elif column in existing_foreign_keys:
-                    cls.remove_foreign_key(cursor, table_name, column)
-
-                if default:
-                    cursor.execute(
-                        f"ALTER TABLE {table_name} ALTER COLUMN {column} SET DEFAULT '{default}'::{column_type};"
-                    )
-                    cls.log_change(
-                        "ALTER COLUMN",
-                        f"Column '{column}' in '{table_name}' set default to '{default}'::{column_type}",
-                    )
-
+                else:
+                    if default:
+                        definition += f" DEFAULT '{default}'::{column_type}"
+                    if is_required and not primary_key:
+                        definition += " NOT NULL"
+                change(
+                    "ADD COLUMN",
+                    f"ADD COLUMN {definition}",
+                    f"Column '{column}' added to '{table_name}'",
+                )
                 if primary_key:
-                    cursor.execute(
-                        f"ALTER TABLE {table_name} ADD PRIMARY KEY ({column});"
-                    )
-                    cls.log_change(
+                    change(
                         "ADD PRIMARY KEY",
+                        f"ADD PRIMARY KEY ({column})",
                         f"Primary key '{column}' added to '{table_name}'",
                     )
-
-                if column_props.get("track_changes", False):
-                    cls.enable_data_tracking(cursor, table_name, schema)
+            elif column_props.get("generated"):
+                # Generated columns are kept in sync by sync_generated_columns
+                continue
             else:
-                if existing_columns[column].get("type") != column_type:
-                    alter_query = f"ALTER TABLE {table_name} ALTER COLUMN {column} TYPE {column_type} USING {column}::{column_type};"
-                    cursor.execute(alter_query)
-                    cls.log_change(
+                widened = column_type == "BIGINT" and current["type"] in (
+                    "SMALLINT",
+                    "INTEGER",
+                )
+                if current["type"] != column_type and widened and online:
+                    description = (
+                        f"Column '{column}' in '{table_name}' widened from "
+                        f"{current['type']} to {column_type}"
+                    )
+                    print(
+                        f"⚠️ {description} postponed, it rewrites the table, "
+                        "run the migrations without --online to apply it"
+                    )
+                    state.postponed_changes.append(description)
+                elif current["type"] != column_type:
+                    deferred = []
+                    sequence = re.match(r"nextval\('([^']+)'", current["default"] or "")
+                    if sequence and column_props.get("identity"):
+                        # The sequence of a SERIAL column keeps its type
+                        deferred.append(
+                            (
+                                f"ALTER SEQUENCE {sequence.group(1)} AS {column_type};",
+                                "ALTER SEQUENCE",
+                                f"Sequence '{sequence.group(1)}' is now of type {column_type}",
+                            )
+                        )
+                    using = f"{column}::{column_type}"
+                    if column_props.get("enum_storage"):
+                        using = cls.get_enum_conversion(
+                            column, column_props, current["type"]
+                        )
+                    if column_props.get("enum_storage") and current_default:
+                        # The default is not castable to the enum, it is set again below
+                        change(
+                            "ALTER COLUMN",
+                            f"ALTER COLUMN {column} DROP DEFAULT",
+                            f"Default of '{column}' in '{table_name}' removed",
+                        )
+                        current_default = None
+                    change(
                         "ALTER COLUMN",
+                        f"ALTER COLUMN {column} TYPE {column_type} USING {using}",
                         f"Column '{column}' in '{table_name}' is now of type {column_type}",
+                        deferred,
                     )
 
-                if is_required and not existing_columns[column].get("required"):
-                    cursor.execute(
-                        f"ALTER TABLE {table_name} ALTER COLUMN {column} SET NOT NULL;"
-                    )
-                    cls.log_change(
+                if (
+                    column_props.get("identity")
+                    and not current.get("identity")
+                    and not current["default"]
+                ):
+                    change(
                         "ALTER COLUMN",
-                        f"Column '{column}' in '{table_name}' marked as NOT NULL",
+                        f"ALTER COLUMN {column} ADD GENERATED BY DEFAULT AS IDENTITY",
+                        f"Column '{column}' in '{table_name}' is now an identity",
+                        [
+                            (
+                                f"SELECT setval(pg_get_serial_sequence('{table_name}', '{column}'), "
+                                f"coalesce(max({column}), 0) + 1, false) FROM {table_name};",
+                                "SET IDENTITY",
+                                f"Identity of '{column}' in '{table_name}' set after the existing rows",
+                            )
+                        ],
                     )
 
-                if not is_required and existing_columns[column].get("required"):
-                    cursor.execute(
-                        f"ALTER TABLE {table_name} ALTER COLUMN {column} DROP NOT NULL;"
+                if is_required and not current["required"] and online:
+                    check = f"{table_name}_{column}_not_null"
+                    deferred = []
+                    if default:
+                        deferred.append(
+                            (
+                                cls.get_backfill_query(
+                                    table_name, column, f"'{default}'::{column_type}"
+                                ),
+                                "BACKFILL",
+                                f"Null values of '{column}' in '{table_name}' set to '{default}'",
+                            )
+                        )
+                    deferred += [
+                        (
+                            f"ALTER TABLE {table_name} VALIDATE CONSTRAINT {check};",
+                            "VALIDATE CONSTRAINT",
+                            f"Constraint '{check}' validated in '{table_name}'",
+                        ),
+                        (
+                            f"ALTER TABLE {table_name} ALTER COLUMN {column} SET NOT NULL;",
+                            "SET NOT NULL",
+                            f"Column '{column}' in '{table_name}' marked as NOT NULL",
+                        ),
+                        (
+                            f"ALTER TABLE {table_name} DROP CONSTRAINT {check};",
+                            "DROP CONSTRAINT",
+                            f"Constraint '{check}' removed from '{table_name}'",
+                        ),
+                    ]
+                    change(
+                        "ADD CONSTRAINT",
+                        (
+                            f"ADD CONSTRAINT {check} CHECK ({column} IS NOT NULL) NOT VALID"
+                            if check not in existing_checks
+                            else None
+                        ),
+                        f"Column '{column}' in '{table_name}' checked as NOT NULL",
+                        deferred,
                     )
-                    cls.log_change(
+                elif is_required and not current["required"]:
+                    change(
                         "ALTER COLUMN",
+                        f"ALTER COLUMN {column} SET NOT NULL",
+                        f"Column '{column}' in '{table_name}' marked as NOT NULL",
+                    )
+                elif not is_required and not primary_key and current["required"]:
+                    change(
+                        "ALTER COLUMN",
+                        f"ALTER COLUMN {column} DROP NOT NULL",
                         f"Column '{column}' in '{table_name}' marked as NULLABLE",
                     )
 
-                if is_unique and not existing_columns[column].get("unique"):
-                    # Drop if exists and add again
-                    cursor.execute(
-                        f"ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {column}_unique;"
+                if default and not cls.is_same_default(current_default, default):
+                    change(
+                        "ALTER COLUMN",
+                        f"ALTER COLUMN {column} SET DEFAULT '{default}'::{column_type}",
+                        f"Column '{column}' in '{table_name}' set to default '{default}'",
                     )
-                    # Add unique constraint
-                    cursor.execute(
-                        f"ALTER TABLE {table_name} ADD CONSTRAINT {column}_unique UNIQUE ({column});"
+
+            if is_unique and not primary_key and column not in existing_unique:
+                # Scoped to the table, the index names are unique per schema
+                constraint = f"{table_name}_{column}_unique"
+                if online:
+                    deferred = []
+                    if existing_indexes.get(constraint, {}).get("valid") is False:
+                        # Left invalid by a failed concurrent build
+                        deferred.append(
+                            (
+                                f"DROP INDEX CONCURRENTLY IF EXISTS {constraint};",
+                                "DROP INDEX",
+                                f"Invalid index '{constraint}' removed from '{table_name}'",
+                            )
+                        )
+                    deferred += [
+                        (
+                            f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {constraint} "
+                            f"ON {table_name} ({column});",
+                            "CREATE INDEX",
+                            f"Index '{constraint}' created in '{table_name}'",
+                        ),
+                        (
+                            f"ALTER TABLE {table_name} ADD CONSTRAINT {constraint} "
+                            f"UNIQUE USING INDEX {constraint};",
+                            "ADD CONSTRAINT",
+                            f"Column '{column}' in '{table_name}' is now UNIQUE",
+                        ),
+                    ]
+                    change(
+                        "ADD CONSTRAINT",
+                        None,
+                        f"Column '{column}' in '{table_name}' is now UNIQUE",
+                        deferred,
                     )
-                    cls.log_change(
+                else:
+                    change(
                         "ADD CONSTRAINT",
+                        f"ADD CONSTRAINT {constraint} UNIQUE ({column})",
                         f"Column '{column}' in '{table_name}' is now UNIQUE",
                     )
+            elif not is_unique and column in existing_unique:
+                change(
+                    "DROP CONSTRAINT",
+                    f"DROP CONSTRAINT {existing_unique[column]}",
+                    f"Column '{column}' in '{table_name}' is no longer UNIQUE",
+                )
 
-                if not is_unique and existing_columns[column].get("unique"):
-                    cursor.execute(
-                        f"ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {column}_unique;"
-                    )
-                    cls.log_change(
-                        "DROP CONSTRAINT",
-                        f"Column '{column}' in '{table_name}' is no longer UNIQUE",
+            current_fk = existing_foreign_keys.get(column)
+            if foreign_key:
+                on_delete = column_props.get("on_delete") or "NO ACTION"
+                on_update = column_props.get("on_update") or "NO ACTION"
+                fk_name = f"{table_name}_{column}_fk"
+                expected_fk = {
+                    "foreign_table": foreign_key.split("(")[0].strip(),
+                    "on_delete": on_delete,
+                    "on_update": on_update,
+                }
+                validate = (
+                    f"ALTER TABLE {table_name} VALIDATE CONSTRAINT {{}};",
+                    "VALIDATE CONSTRAINT",
+                    f"Foreign key '{column}' validated in '{table_name}'",
+                )
+                if current_fk and all(
+                    current_fk[key] == value for key, value in expected_fk.items()
+                ):
+                    if online and current_fk.get("valid") is False:
+                        # Left not valid by a failed validation
+                        change(
+                            "VALIDATE CONSTRAINT",
+                            None,
+                            validate[2],
+                            [(validate[0].format(current_fk["name"]), *validate[1:])],
+                        )
+                    continue
+                if current_fk:
+                    change(
+                        "REMOVE FOREIGN KEY",
+                        f"DROP CONSTRAINT {current_fk['name']}",
+                        f"FK '{column}' removed from '{table_name}' to be rebuilt",
                     )
+                change(
+                    "ADD FOREIGN KEY",
+                    f"ADD CONSTRAINT {fk_name} FOREIGN KEY ({column}) "
+                    f"REFERENCES {foreign_key} ON DELETE {on_delete} ON UPDATE {on_update}"
+                    f"{' NOT VALID' if online else ''}",
+                    f"Foreign key '{column}' -> '{foreign_key}' in '{table_name}' with "
+                    f"ON DELETE {on_delete} and ON UPDATE {on_update}",
+                    [(validate[0].format(fk_name), *validate[1:])] if online else [],
+                )
+            elif current_fk:
+                change(
+                    "REMOVE FOREIGN KEY",
+                    f"DROP CONSTRAINT {current_fk['name']}",
+                    f"FK '{column}' removed from '{table_name}'",
+                )
 
-                if foreign_key and existing_foreign_keys.get(column) != foreign_key:
-                    cls.remove_foreign_key(cursor, table_name, column)
-                    cls.add_foreign_key(
-                        cursor, table_name, column, foreign_key, on_delete, on_update
-                    )
-                    cls.log_change(
-                        "ALTER FOREIGN KEY",
-                        f"Foreign key '{column}' -> '{foreign_key}.id' in '{table_name}'",
-                    )
+        # Remove obsolete columns
+        for column in existing_columns:
+            if column not in schema:
+                change(
+                    "DROP COLUMN",
+                    f"DROP COLUMN {column} CASCADE",
+                    f"Obsolete column '{column}' removed in '{table_name}'",
+                )
 
-                if not foreign_key and existing_foreign_keys.get(column):
-                    cls.remove_foreign_key(cursor, table_name, column)
-                    cls.log_change(
-                        "REMOVE FOREIGN KEY",
-                        f"FK '{column}' removed from '{table_name}'",
-                    )
+        return changes
 
-                if default and existing_columns[column].get("default") != default:
-                    cursor.execute(
-                        f"ALTER TABLE {table_name} ALTER COLUMN {column} SET DEFAULT '{default}'::{ existing_columns[column].get('type')};"
-                    )
-                    cls.log_change(
-                        "ALTER COLUMN",
-                        f"Column '{column}' in '{table_name}' set to default '{default}'",
-                    )
+    @classmethod
+    def get_backfill_query(cls, table_name: str, column: str, value: str) -> str:
+        """Return the query that sets a value to the next batch of null values of a column.
 
-        # Disable data tracking if a field no longer has track_changes
-        cls.disable_removed_tracking_fields(cursor, table_name, schema)
+        The batches follow the ids, the query takes the last id of the previous batch
+        and returns the ids updated, see ``run_backfill``.
+        """
+        value = value.replace("%", "%%")
+        return (
+            f"WITH batch AS (SELECT id FROM {table_name} WHERE id > %s AND {column} IS NULL "
+            f"ORDER BY id LIMIT {BACKFILL_BATCH_SIZE}) "
+            f"UPDATE {table_name} SET {column} = {value} FROM batch "
+            f"WHERE {table_name}.id = batch.id RETURNING {table_name}.id;"
+        )
 
-        # Remove obsolete columns
-        cls.remove_obsolete_columns(cursor, table_name, existing_columns, schema)
+    @classmethod
+    def run_backfill(cls, cursor, query: str):
+        """Run a backfill query of ``get_backfill_query`` until no row is updated.
+
+        In autocommit mode each batch is committed on its own, so the rows are not
+        locked until the whole table is updated.
+        """
+        last_id = 0
+        while True:
+            cursor.execute(query, (last_id,))
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+            last_id = max(ids)
+
+    @classmethod
+    def apply_table_changes(cls, cursor, table_name: str, changes: list):
+        """Apply the changes planned for a table in one ALTER TABLE statement.
+
+        A single statement takes the table lock once and rewrites the table at most
+        once, instead of once per changed column. The deferred statements of the
+        changes are queued to run after the commit.
+        """
+        applied = [change for change in changes if change["clause"]]
+        if applied:
+            clauses = ", ".join(change["clause"] for change in applied)
+            cursor.execute(f"ALTER TABLE {table_name} {clauses};")
+            for change in applied:
+                cls.log_change(change["action"], change["description"])
+
+        for change in changes:
+            state.deferred_queries.extend(change["deferred"])
+
+    @classmethod
+    def update_table_schema(
+        cls,
+        cursor,
+        table_name: str,
+        schema: dict,
+        existing: dict = None,
+        online: bool = False,
+    ):
+        """Detect and apply any changes in the table schema with logs.
+
+        :param existing: the table introspected by ``get_catalog``, introspected
+            here when it is not given
+        :param online: use the lock minimizing strategies, see ``plan_table_changes``
+        """
+        if existing is None:
+            existing = cls.get_catalog(cursor, [table_name]).get(table_name, {})
+
+        changes = cls.plan_table_changes(table_name, schema, existing, online=online)
+        cls.apply_table_changes(cursor, table_name, changes)
+        # Disable data tracking if no field has track_changes anymore
+        tracking = any(
+            props.get("track_changes") for props in cls.get_columns(schema).values()
+        )
+        triggers = cls.get_tracking_triggers(table_name).values()
+        if not tracking and set(triggers) & set(existing.get("triggers", [])):
+            cls.disable_removed_tracking_fields(cursor, table_name, schema)
+
+    @classmethod
+    def get_tracking_triggers(cls, table_name: str) -> dict:
+        """Return the names of the tracking triggers of a table by tracking mode.
+
+        A trigger with transition tables can only fire on one event, so the
+        statement mode needs a trigger per event.
+        """
+        return {
+            "row": f"{table_name}_track_changes",
+            "INSERT": f"{table_name}_track_insert",
+            "UPDATE": f"{table_name}_track_update",
+            "DELETE": f"{table_name}_track_delete",
+        }
+
+    @classmethod
+    def get_tracking_function_query(
+        cls, table_name: str, tracking_fields: list, tracking: dict
+    ) -> str:
+        """Return the query creating the tracking function of a table.
+
+        The same function serves the row and the statement triggers: the changed
+        rows are read from ``NEW`` and ``OLD``, or from the ``new_rows`` and
+        ``old_rows`` transition tables, and logged in one set-based insert.
+        """
+        columns = ", ".join(f"'{col}'" for col in tracking_fields)
+        if tracking["mode"] == "statement":
+            new_rows, old_rows = "new_rows n", "old_rows o"
+            both_rows = "new_rows n JOIN old_rows o ON o.id = n.id"
+        else:
+            new_rows, old_rows = "(SELECT NEW.*) n", "(SELECT OLD.*) o"
+            both_rows = "(SELECT NEW.*) n CROSS JOIN (SELECT OLD.*) o"
+
+        if tracking["format"] == "jsonb":
+
+            def row_data(alias):
+                values = ", ".join(f"'{col}', {alias}.{col}" for col in tracking_fields)
+                return f"jsonb_build_object({values})"
+
+            insert = f"""
+                INSERT INTO migration_logs_data (table_name, record_id, new_data, change_type)
+                SELECT TG_TABLE_NAME, n.id, {row_data("n")}, 'INSERT' FROM {new_rows};"""
+            update = f"""
+                INSERT INTO migration_logs_data (table_name, record_id, old_data, new_data, change_type)
+                SELECT TG_TABLE_NAME, n.id, d.old_data, d.new_data, 'UPDATE'
+                FROM {both_rows}
+                CROSS JOIN LATERAL (
+                    SELECT jsonb_object_agg(c.col, to_jsonb(o) -> c.col) AS old_data,
+                           jsonb_object_agg(c.col, to_jsonb(n) -> c.col) AS new_data
+                    FROM UNNEST(ARRAY[{columns}]) AS c(col)
+                    WHERE to_jsonb(o) -> c.col IS DISTINCT FROM to_jsonb(n) -> c.col
+                ) d
+                WHERE d.new_data IS NOT NULL;"""
+            delete = f"""
+                INSERT INTO migration_logs_data (table_name, record_id, old_data, change_type)
+                SELECT TG_TABLE_NAME, o.id, {row_data("o")}, 'DELETE' FROM {old_rows};"""
+        else:
+            insert = f"""
+                INSERT INTO migration_logs_data (table_name, column_name, new_value, change_type)
+                SELECT TG_TABLE_NAME, c.col, to_jsonb(n) ->> c.col, 'INSERT'
+                FROM {new_rows} CROSS JOIN UNNEST(ARRAY[{columns}]) AS c(col);"""
+            update = f"""
+                INSERT INTO migration_logs_data (table_name, column_name, old_value, new_value, change_type)
+                SELECT TG_TABLE_NAME, c.col, to_jsonb(o) ->> c.col, to_jsonb(n) ->> c.col, 'UPDATE'
+                FROM {both_rows} CROSS JOIN UNNEST(ARRAY[{columns}]) AS c(col)
+                WHERE to_jsonb(o) -> c.col IS DISTINCT FROM to_jsonb(n) -> c.col;"""
+            delete = f"""
+                INSERT INTO migration_logs_data (table_name, column_name, old_value, change_type)
+                SELECT TG_TABLE_NAME, c.col, to_jsonb(o) ->> c.col, 'DELETE'
+                FROM {old_rows} CROSS JOIN UNNEST(ARRAY[{columns}]) AS c(col);"""
+
+        return f"""
+            CREATE OR REPLACE FUNCTION {table_name}_track_function() RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN{insert}
+                ELSIF TG_OP = 'UPDATE' THEN{update}
+                ELSIF TG_OP = 'DELETE' THEN{delete}
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """
 
     @classmethod
     def enable_data_tracking(cls, cursor, table_name: str, schema: dict):
-        """Enable data change tracking for fields with track_changes=True."""
+        """Enable data change tracking for fields with track_changes=True.
+
+        The tracking mode and format are read from the ``__tracking__`` of the
+        schema, see ``BaseDBModel.get_tracking_config``.
+        """
         tracking_fields = [
-            col for col, props in schema.items() if props.get("track_changes")
+            col
+            for col, props in cls.get_columns(schema).items()
+            if props.get("track_changes")
         ]
 
         if tracking_fields:
-            trigger_name = f"{table_name}_track_changes"
+            tracking = schema.get("__tracking__", {"mode": "row", "format": "columns"})
             function_name = f"{table_name}_track_function"
+            triggers = cls.get_tracking_triggers(table_name)
 
             # Create tracking function if it does not exist
             cursor.execute(
-                f"""
-                CREATE OR REPLACE FUNCTION {function_name}() RETURNS TRIGGER AS $$
-                BEGIN
-                    IF TG_OP = 'INSERT' THEN
-                        INSERT INTO migration_logs_data (table_name, column_name, new_value, change_type)
-                        SELECT TG_TABLE_NAME, col, NEW.col::TEXT, 'INSERT'
-                        FROM (SELECT UNNEST(ARRAY[{', '.join([f"'{col}'" for col in tracking_fields])}])) AS t(col);
-                        RETURN NEW;
-                    ELSIF TG_OP = 'UPDATE' THEN
-                        INSERT INTO migration_logs_data (table_name, column_name, old_value, new_value, change_type)
-                        SELECT TG_TABLE_NAME, col, OLD.col::TEXT, NEW.col::TEXT, 'UPDATE'
-                        FROM (SELECT UNNEST(ARRAY[{', '.join([f"'{col}'" for col in tracking_fields])}])) AS t(col)
-                        WHERE OLD.col IS DISTINCT FROM NEW.col;
-                        RETURN NEW;
-                    ELSIF TG_OP = 'DELETE' THEN
-                        INSERT INTO migration_logs_data (table_name, column_name, old_value, change_type)
-                        SELECT TG_TABLE_NAME, col, OLD.col::TEXT, 'DELETE'
-                        FROM (SELECT UNNEST(ARRAY[{', '.join([f"'{col}'" for col in tracking_fields])}])) AS t(col);
-                        RETURN OLD;
-                    END IF;
-                END;
-                $$ LANGUAGE plpgsql;
-            """
+                cls.get_tracking_function_query(table_name, tracking_fields, tracking)
             )
 
-            # Create trigger to capture changes
+            # Create triggers to capture changes, removing the ones of the other mode
             cursor.execute(
-                f"""
-                DROP TRIGGER IF EXISTS {trigger_name} ON {table_name};
-                CREATE TRIGGER {trigger_name}
-                AFTER INSERT OR UPDATE OR DELETE ON {table_name}
-                FOR EACH ROW EXECUTE FUNCTION {function_name}();
-            """
+                "".join(
+                    f"DROP TRIGGER IF EXISTS {trigger} ON {table_name};"
+                    for trigger in triggers.values()
+                )
             )
+            if tracking["mode"] == "statement":
+                transition_tables = {
+                    "INSERT": "NEW TABLE AS new_rows",
+                    "UPDATE": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+                    "DELETE": "OLD TABLE AS old_rows",
+                }
+                for event, transition_table in transition_tables.items():
+                    cursor.execute(
+                        f"""
+                        CREATE TRIGGER {triggers[event]}
+                        AFTER {event} ON {table_name}
+                        REFERENCING {transition_table}
+                        FOR EACH STATEMENT EXECUTE FUNCTION {function_name}();
+                    """
+                    )
+            else:
+                cursor.execute(
+                    f"""
+                    CREATE TRIGGER {triggers["row"]}
+                    AFTER INSERT OR UPDATE OR DELETE ON {table_name}
+                    FOR EACH ROW EXECUTE FUNCTION {function_name}();
+                """
+                )
 
             cls.log_change(
                 "ENABLE DATA TRACKING",
@@ -671,52 +2380,644 @@ class Migration:
         cursor.execute("CREATE EXTENSION IF NOT EXISTS unaccent;")
         cls.log_change("ENABLE EXTENSION", "Extension 'unaccent' enabled")
 
+    @classmethod
+    def enable_trigram_extension(cls, cursor):
+        """Enable the 'pg_trgm' extension and create an immutable 'unaccent' wrapper.
+
+        ``unaccent`` is only STABLE, so it can not be used in index expressions.
+        The wrapper pins the dictionary, which makes it safe to declare IMMUTABLE.
+        """
+        print("🚀 Enabling 'pg_trgm' extension...if not enabled")
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+        cursor.execute(
+            f"""
+            CREATE OR REPLACE FUNCTION {UNACCENT_FUNCTION}(text) RETURNS text AS $$
+                SELECT public.unaccent('public.unaccent'::regdictionary, $1)
+            $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+        """
+        )
+        cls.log_change("ENABLE EXTENSION", "Extension 'pg_trgm' enabled")
+
+    @classmethod
+    def get_existing_search_indexes(cls, cursor, table_name: str) -> list:
+        """Return the names of the trigram and full-text search indexes of a table."""
+        cursor.execute(
+            """
+            SELECT indexname FROM pg_indexes
+            WHERE tablename = %s AND indexname ~ %s
+        """,
+            (table_name, f"^{table_name}_.+_(trgm|fts)_idx$"),
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    @classmethod
+    def sync_search_indexes(
+        cls, cursor, table_name: str, schema: dict, existing_indexes: list = None
+    ):
+        """Create the search indexes declared by the fields and drop the obsolete ones.
+
+        Trigram indexes are built over ``viixoo_unaccent(lower(column))``, the same
+        expression used by the ``unaccent_ilike`` domain operator. Full-text indexes
+        are built over the generated ``tsvector`` column.
+
+        :param existing_indexes: index names of the table from ``get_catalog``,
+            introspected here when they are not given
+        """
+        if existing_indexes is None:
+            existing_indexes = cls.get_existing_search_indexes(cursor, table_name)
+        pattern = re.compile(rf"^{table_name}_.+_(trgm|fts)_idx$")
+        existing_indexes = [name for name in existing_indexes if pattern.match(name)]
+        expected_indexes = []
+
+        for column, props in cls.get_columns(schema).items():
+            if props.get("search_index") not in SEARCH_INDEX_METHODS:
+                continue
+            suffix, method = SEARCH_INDEX_METHODS[props["search_index"]]
+            index_name = f"{table_name}_{column}_{suffix}_idx"
+            expected_indexes.append(index_name)
+            if index_name in existing_indexes:
+                continue
+            using = method.format(unaccent=UNACCENT_FUNCTION, column=column)
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} USING {using};"
+            )
+            cls.log_change(
+                "CREATE INDEX",
+                f"Search index '{index_name}' created in '{table_name}'",
+            )
+
+        for index_name in existing_indexes:
+            if index_name not in expected_indexes:
+                cursor.execute(f"DROP INDEX IF EXISTS {index_name};")
+                cls.log_change(
+                    "DROP INDEX",
+                    f"Search index '{index_name}' removed from '{table_name}'",
+                )
+
+    @classmethod
+    def get_index_definition(cls, table_name: str, index: dict) -> str:
+        """Return the definition of an index, the part of CREATE INDEX after its name."""
+        definition = (
+            f"ON {table_name} USING {index['using']} ({', '.join(index['columns'])})"
+        )
+        if index["include"]:
+            definition += f" INCLUDE ({', '.join(index['include'])})"
+        if index["where"]:
+            definition += f" WHERE {index['where']}"
+        return definition
+
+    @classmethod
+    def get_existing_indexes(cls, cursor, table_name: str) -> dict:
+        """Return the indexes of a table from ``pg_indexes`` with their comment and validity.
+
+        An index is invalid when a CREATE INDEX CONCURRENTLY failed to build it.
+        """
+        cursor.execute(
+            """
+            SELECT i.indexname, obj_description(x.indexrelid, 'pg_class'), x.indisvalid
+            FROM pg_indexes i
+            JOIN pg_index x ON x.indexrelid = format('%%I.%%I', i.schemaname, i.indexname)::regclass
+            WHERE i.tablename = %s
+        """,
+            (table_name,),
+        )
+        return {
+            row[0]: {"comment": row[1], "valid": row[2]} for row in cursor.fetchall()
+        }
+
+    @classmethod
+    def sync_indexes(
+        cls,
+        cursor,
+        table_name: str,
+        schema: dict,
+        concurrently: bool = False,
+        existing_indexes: dict = None,
+    ):
+        """Create the indexes declared in the model and drop the ones no longer declared.
+
+        The declared indexes are compared with ``pg_indexes``. Each index built by the
+        migrations keeps its definition as comment, so a changed declaration or an
+        invalid index is rebuilt. With ``concurrently`` the statements are deferred
+        until the migration transaction is committed and run with CONCURRENTLY, so
+        the table is not locked for writes while the index is built.
+
+        :param existing_indexes: indexes of the table from ``get_catalog``,
+            introspected here when they are not given
+        """
+        if existing_indexes is None:
+            existing_indexes = cls.get_existing_indexes(cursor, table_name)
+        declared_indexes = schema.get("__indexes__", [])
+        mode = "CONCURRENTLY " if concurrently else ""
+
+        def execute(query, action: str, description: str):
+            if concurrently:
+                state.deferred_queries.append((query, action, description))
+            else:
+                cursor.execute(query)
+                cls.log_change(action, description)
+
+        for index in declared_indexes:
+            name = index["name"]
+            unique = "UNIQUE " if index["unique"] else ""
+            definition = cls.get_index_definition(table_name, index)
+            comment = f"{INDEX_COMMENT_PREFIX}{unique}{definition}"
+
+            existing = existing_indexes.get(name)
+            if existing and existing["valid"] and existing["comment"] == comment:
+                continue
+            if existing:
+                execute(
+                    f"DROP INDEX {mode}IF EXISTS {name};",
+                    "DROP INDEX",
+                    f"Index '{name}' removed from '{table_name}' to be rebuilt",
+                )
+            execute(
+                f"CREATE {unique}INDEX {mode}IF NOT EXISTS {name} {definition};",
+                "CREATE INDEX",
+                f"Index '{name}' created in '{table_name}'",
+            )
+            execute(
+                SQL("COMMENT ON INDEX {} IS {};").format(
+                    Identifier(name), Literal(comment)
+                ),
+                "COMMENT INDEX",
+                f"Index '{name}' definition saved",
+            )
+
+        declared_names = [index["name"] for index in declared_indexes]
+        for name, existing in existing_indexes.items():
+            if name in declared_names or not (existing["comment"] or "").startswith(
+                INDEX_COMMENT_PREFIX
+            ):
+                continue
+            execute(
+                f"DROP INDEX {mode}IF EXISTS {name};",
+                "DROP INDEX",
+                f"Index '{name}' removed from '{table_name}'",
+            )
+
+    @classmethod
+    def check_concurrent_index(cls, cursor, query, retry: bool = False) -> bool:
+        """Check the index of a CREATE INDEX CONCURRENTLY IF NOT EXISTS can be built.
+
+        Index names are unique per schema, so IF NOT EXISTS would silently skip an
+        index of the same name on another table. When the statement is retried, the
+        index it left invalid is dropped, otherwise IF NOT EXISTS would skip it too.
+
+        :param retry: the statement is retried after a failed build
+        :return: False when the name is used by an index of another table
+        """
+        match = isinstance(query, str) and CONCURRENT_INDEX_PATTERN.match(query)
+        if not match:
+            return True
+        name, table_name = match.groups()
+        cursor.execute(
+            """
+            SELECT indrelid = to_regclass(%s), indisvalid FROM pg_index
+            WHERE indexrelid = to_regclass(%s);
+        """,
+            (table_name, name),
+        )
+        row = cursor.fetchone()
+        if not row:
+            return True
+        same_table, valid = row
+        if not same_table:
+            print(
+                f"❌ Index '{name}' already exists on another table than '{table_name}'"
+            )
+            return False
+        if retry and not valid:
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+            print(f"🗑️ Invalid index '{name}' dropped before retrying")
+        return True
+
+    @classmethod
+    def run_deferred_queries(cls, conn):
+        """Run the statements that can not run inside a transaction block, in autocommit mode.
+
+        A failed statement does not stop the others. An index that failed to build
+        concurrently is left invalid and rebuilt by the next migration, the same
+        for a constraint that failed to validate. The ``lock_timeout`` of the
+        online migrations is reset first, so the concurrent builds wait for their
+        locks instead of being cancelled. A statement that still did not get its
+        lock in time is retried, after dropping the invalid index it left, see
+        ``check_concurrent_index``.
+
+        :return: True when all the statements succeeded
+        """
+        if not state.deferred_queries:
+            return True
+
+        succeeded = True
+        conn.autocommit = True
+        cursor = conn.cursor()
+        cursor.execute("RESET lock_timeout;")
+        for query, action, description in state.deferred_queries:
+            for attempt in range(1, LOCK_RETRIES + 1):
+                try:
+                    if not cls.check_concurrent_index(cursor, query, retry=attempt > 1):
+                        succeeded = False
+                        break
+                    if action == "BACKFILL":
+                        cls.run_backfill(cursor, query)
+                    else:
+                        cursor.execute(query)
+                except psycopg2.errors.LockNotAvailable as e:
+                    if attempt < LOCK_RETRIES:
+                        time.sleep(attempt)
+                        continue
+                    print(f"❌ Error running '{query}': {e}")
+                    succeeded = False
+                except psycopg2.Error as e:
+                    print(f"❌ Error running '{query}': {e}")
+                    succeeded = False
+                else:
+                    cls.log_change(action, description)
+                break
+        cls.flush_logs(cursor)
+        cursor.close()
+        state.deferred_queries.clear()
+        return succeeded
+
+    @classmethod
+    def get_column_comment(cls, cursor, table_name: str, column: str):
+        """Return the comment of a column, None if it has no comment."""
+        cursor.execute(
+            """
+            SELECT col_description(attrelid, attnum) FROM pg_attribute
+            WHERE attrelid = %s::regclass AND attname = %s
+        """,
+            (table_name, column),
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    @classmethod
+    def sync_generated_columns(
+        cls, cursor, table_name: str, schema: dict, existing_columns: dict = None
+    ):
+        """Rebuild the generated columns whose expression changed in the model.
+
+        PostgreSQL can not alter the expression of a generated column, and it stores
+        it normalized, so the expression used is saved as the column comment.
+
+        :param existing_columns: columns of the table from ``get_catalog``, the
+            comments are introspected here when they are not given
+        """
+        for column, props in cls.get_columns(schema).items():
+            if not props.get("generated"):
+                continue
+
+            expression = props["generated"]
+            if existing_columns is None:
+                comment = cls.get_column_comment(cursor, table_name, column)
+            else:
+                comment = existing_columns.get(column, {}).get("comment")
+            if comment == expression:
+                continue
+
+            if comment is not None:
+                cursor.execute(f"ALTER TABLE {table_name} DROP COLUMN {column};")
+                cursor.execute(
+                    f"ALTER TABLE {table_name} ADD COLUMN {column} {props['type']} "
+                    f"GENERATED ALWAYS AS ({expression}) STORED;"
+                )
+                cls.log_change(
+                    "ALTER COLUMN",
+                    f"Generated column '{column}' in '{table_name}' rebuilt",
+                )
+            cursor.execute(
+                f"COMMENT ON COLUMN {table_name}.{column} IS %s;", (expression,)
+            )
+
     @classmethod
     def disable_removed_tracking_fields(cls, cursor, table_name: str, schema: dict):
         """Disable data tracking on removed or track_changes=False columns."""
         tracking_fields = [
-            col for col, props in schema.items() if props.get("track_changes")
+            col
+            for col, props in cls.get_columns(schema).items()
+            if props.get("track_changes")
         ]
 
-        trigger_name = f"{table_name}_track_changes"
         function_name = f"{table_name}_track_function"
 
         if tracking_fields:
             # Update the tracking function with the new fields
+            tracking = schema.get("__tracking__", {"mode": "row", "format": "columns"})
             cursor.execute(
-                f"""
-                CREATE OR REPLACE FUNCTION {function_name}() RETURNS TRIGGER AS $$
-                BEGIN
-                    IF TG_OP = 'INSERT' THEN
-                        INSERT INTO migration_logs_data (table_name, column_name, new_value, change_type)
-                        SELECT TG_TABLE_NAME, col, NEW.col::TEXT, 'INSERT'
-                        FROM (SELECT UNNEST(ARRAY[{', '.join([f"'{col}'" for col in tracking_fields])}])) AS t(col);
-                        RETURN NEW;
-                    ELSIF TG_OP = 'UPDATE' THEN
-                        INSERT INTO migration_logs_data (table_name, column_name, old_value, new_value, change_type)
-                        SELECT TG_TABLE_NAME, col, OLD.col::TEXT, NEW.col::TEXT, 'UPDATE'
-                        FROM (SELECT UNNEST(ARRAY[{', '.join([f"'{col}'" for col in tracking_fields])}])) AS t(col)
-                        WHERE OLD.col IS DISTINCT FROM NEW.col;
-                        RETURN NEW;
-                    ELSIF TG_OP = 'DELETE' THEN
-                        INSERT INTO migration_logs_data (table_name, column_name, old_value, change_type)
-                        SELECT TG_TABLE_NAME, col, OLD.col::TEXT, 'DELETE'
-                        FROM (SELECT UNNEST(ARRAY[{', '.join([f"'{col}'" for col in tracking_fields])}])) AS t(col);
-                        RETURN OLD;
-                    END IF;
-                END;
-                $$ LANGUAGE plpgsql;
-            """
+                cls.get_tracking_function_query(table_name, tracking_fields, tracking)
             )
 
         else:
-            # No more fields with track_changes=True, remove trigger and function
-            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name} ON {table_name};")
+            # No more fields with track_changes=True, remove triggers and function
+            for trigger in cls.get_tracking_triggers(table_name).values():
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table_name};")
             cursor.execute(f"DROP FUNCTION IF EXISTS {function_name} CASCADE;")
             cls.log_change(
                 "DISABLE DATA TRACKING", f"Data tracking removed in '{table_name}'"
             )
 
+    # Migration plan
+
+    @classmethod
+    def get_table_stats(cls, cursor, tables: list) -> dict:
+        """Return the estimated rows and the sizes of the existing tables from ``pg_class``.
+
+        ``reltuples`` is the estimate of the last VACUUM or ANALYZE, -1 if the table
+        was never analyzed.
+        """
+        cursor.execute(
+            """
+            SELECT c.relname, c.reltuples::bigint, pg_table_size(c.oid), pg_total_relation_size(c.oid)
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p') AND c.relname = ANY(%s)
+        """,
+            (tables,),
+        )
+        return {
+            row[0]: {"rows": row[1], "size": row[2], "total_size": row[3]}
+            for row in cursor.fetchall()
+        }
+
+    @classmethod
+    def format_size(cls, size: int) -> str:
+        """Return a size in bytes in a human readable unit."""
+        for unit in ("B", "kB", "MB", "GB"):
+            if size < 1024:
+                return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+            size /= 1024
+        return f"{size:.1f} TB"
+
+    @classmethod
+    def estimate_statement(
+        cls, table_name: str, statement: str, stats: dict, action: str = None
+    ) -> dict:
+        """Classify a statement of the plan by its lock level and estimate its cost.
+
+        :param table_name: table changed by the statement, None for the statements
+            of the database, such as the extensions and the log tables
+        :param statement: SQL statement
+        :param stats: the table stats from ``get_table_stats``, None for a new table
+        :param action: log action of a deferred statement, see ``ACTION_COSTS``
+        """
+        lock, effect = "ACCESS EXCLUSIVE", "instant"
+        for pattern, pattern_lock, pattern_effect in STATEMENT_COSTS:
+            if re.match(pattern, statement.strip(), re.IGNORECASE | re.DOTALL):
+                lock, effect = pattern_lock, pattern_effect
+                break
+        lock, effect = ACTION_COSTS.get(action, (lock, effect))
+
+        if table_name is None:
+            estimate = "database"
+        elif stats is None:
+            estimate = "new table"
+        elif effect == "rewrite":
+            estimate = f"rewrites ~{cls.format_size(stats['total_size'])}"
+        elif effect == "scan":
+            rows = f"~{stats['rows']} rows" if stats["rows"] >= 0 else "unknown rows"
+            estimate = f"scans {rows} ({cls.format_size(stats['size'])})"
+        else:
+            estimate = "catalog only"
+
+        return {
+            "table": table_name,
+            "statement": statement.strip(),
+            "lock": lock,
+            "effect": effect if stats is not None else "instant",
+            "estimate": estimate,
+        }
+
+    @classmethod
+    def plan_postgresql_migrations(
+        cls, config: dict, module: ModuleType, online: bool = False
+    ) -> list:
+        """Print the statements the migrations would run, without changing the database.
+
+        The plan follows the steps of ``run_postgresql_migrations`` with a
+        ``PlanCursor``, which runs the catalog queries in a read only session and
+        records the other statements. A missing database is not created, its
+        creation is the first step of the plan.
+
+        Each statement is classified by the lock it takes and whether it rewrites or
+        scans the whole table, with estimates from the ``pg_class`` row counts and
+        sizes. Statements that block reads or writes on non empty tables are marked
+        with 🔴. The deferred statements run after the commit of the migration.
+        """
+        state.config = config
+        try:
+            conn = cls.get_postgresql_connection(create=False)
+            database_exists = conn is not None
+            if not database_exists:
+                # Only renders the statements, there is no catalog to read
+                conn = cls.get_maintenance_connection()
+            conn.set_session(readonly=True)
+            cursor = conn.cursor()
+        except psycopg2.Error as e:
+            print(f"❌ Error connecting to PostgreSQL: {e}")
+            return []
+
+        print(f"📋 Migration plan for database: {config['dbname']}")
+        state.deferred_queries.clear()
+        tables = cls.get_postgresql_tables(module=module)
+        recorder = PlanCursor(cursor, read=database_exists)
+        steps = []
+        try:
+            if not database_exists:
+                recorder.execute(
+                    SQL("CREATE DATABASE {};").format(Identifier(config["dbname"]))
+                )
+            cls.create_migration_log_tables(recorder)
+            recorder.execute(
+                "SELECT extname FROM pg_extension WHERE extname IN ('unaccent', 'pg_trgm');"
+            )
+            if len(recorder.fetchall()) < 2:
+                cls.enable_unaccent_extension(recorder)
+                cls.enable_trigram_extension(recorder)
+            for query in list(recorder.queries):
+                # The log tables are created once
+                match = re.match(r"\s*CREATE TABLE IF NOT EXISTS (\w+)", query)
+                if match:
+                    recorder.execute("SELECT to_regclass(%s);", (match.group(1),))
+                    row = recorder.fetchone()
+                    if row and row[0]:
+                        recorder.queries.remove(query)
+            steps += [
+                cls.estimate_statement(None, query, None) for query in recorder.queries
+            ]
+            recorder.queries.clear()
+
+            catalog = cls.get_catalog(recorder, list(tables))
+            stats = cls.get_table_stats(recorder, list(tables))
+            enum_types = cls.get_enum_types(recorder, tables)
+            for table, schema in tables.items():
+                # The enum types are created before the first table using them
+                cls.sync_enum_types(recorder, {table: schema}, enum_types)
+                enum_statements = [(query, None) for query in recorder.queries]
+                recorder.queries.clear()
+
+                existing = catalog.get(table)
+                if existing:
+                    statements = []
+                    for change in cls.plan_table_changes(
+                        table, schema, existing, online=online
+                    ):
+                        if change["clause"]:
+                            statements.append(
+                                (f"ALTER TABLE {table} {change['clause']};", None)
+                            )
+                        state.deferred_queries.extend(change["deferred"])
+                else:
+                    existing = {"columns": {}, "indexes": {}}
+                    statements = [
+                        (query, None)
+                        for query in cls.generate_create_table_query(table, schema)
+                        if query
+                    ]
+
+                cls.sync_partitions(
+                    recorder, table, schema, created=table not in catalog
+                )
+                cls.sync_indexes(
+                    recorder,
+                    table,
+                    schema,
+                    concurrently=cls.can_index_concurrently(table, schema, catalog),
+                    existing_indexes=existing["indexes"],
+                )
+                cls.sync_generated_columns(
+                    recorder, table, schema, existing_columns=existing["columns"]
+                )
+                cls.sync_search_indexes(
+                    recorder, table, schema, existing_indexes=list(existing["indexes"])
+                )
+                cls.enable_data_tracking(recorder, table, schema)
+                statements += [(query, None) for query in recorder.queries]
+                statements += [
+                    (
+                        recorder.render(query, (0,) if action == "BACKFILL" else None),
+                        action,
+                    )
+                    for query, action, _ in state.deferred_queries
+                ]
+                recorder.queries.clear()
+                state.deferred_queries.clear()
+
+                statements = enum_statements + statements
+                steps += [
+                    cls.estimate_statement(table, statement, stats.get(table), action)
+                    for statement, action in statements
+                ]
+        finally:
+            state.pending_logs.clear()
+            conn.rollback()
+            cursor.close()
+            conn.close()
+
+        headers = [(None, f"🗄️ {config['dbname']}")]
+        headers += [(table, f"📦 {table}") for table in tables]
+        for table, header in headers:
+            table_steps = [step for step in steps if step["table"] == table]
+            if not table_steps:
+                continue
+            print(f"  {header}")
+            for step in table_steps:
+                blocking = step["lock"] in (
+                    "ACCESS EXCLUSIVE",
+                    "SHARE",
+                    "SHARE ROW EXCLUSIVE",
+                )
+                icon = "🔴" if blocking and step["effect"] != "instant" else "🟢"
+                print(
+                    f"    {icon} [{step['lock']}, {step['estimate']}] {step['statement']}"
+                )
+
+        if not steps:
+            print("✅ No changes.")
+        return steps
+
+
+class PlanCursor:
+    """Cursor that records the statements of the migration plan instead of running them.
+
+    The SELECT queries, which read the catalog, run on the real cursor, so the
+    plan takes the same decisions as the migration.
+    """
+
+    def __init__(self, cursor, read: bool = True):
+        """Wrap a real cursor, used to render the statements with their parameters.
+
+        :param read: run the SELECT queries, False when the database does not exist
+            yet, they return no rows then
+        """
+        self.cursor = cursor
+        self.read = read
+        self.queries = []
+        self.selected = False
+
+    def render(self, query, params=None) -> str:
+        """Return a statement with its parameters as SQL."""
+        if params is None and isinstance(query, str):
+            return query
+        return self.cursor.mogrify(query, params).decode()
+
+    def execute(self, query, params=None):
+        """Run a SELECT query, record the other statements."""
+        self.selected = False
+        if isinstance(query, str) and re.match(r"\s*SELECT\b", query, re.IGNORECASE):
+            if self.read:
+                self.cursor.execute(query, params)
+                self.selected = True
+            return
+        statement = self.render(query, params)
+        if statement.strip():
+            self.queries.append(statement)
+
+    def fetchone(self):
+        """Return the next row of the last SELECT query."""
+        return self.cursor.fetchone() if self.selected else None
+
+    def fetchall(self):
+        """Return the rows of the last SELECT query."""
+        return self.cursor.fetchall() if self.selected else []
+
+
+def setup_parser() -> argparse.ArgumentParser:
+    """Set up command line argument parser."""
+    parser = argparse.ArgumentParser(
+        description="Run the database migrations of the backend apps",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Print the changes with their locks and estimated costs, without applying them",
+    )
+    parser.add_argument(
+        "--online",
+        action="store_true",
+        help="Use lock minimizing strategies to migrate tables in use",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of databases migrated at the same time (default: 1)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Migrate the modules even when their schema fingerprint did not change",
+    )
+    return parser
+
+
+def main():
+    """Execute the main entry point for the migrations."""
+    args = setup_parser().parse_args()
+    Migration.run(plan=args.plan, online=args.online, jobs=args.jobs, force=args.force)
+
 
 if __name__ == "__main__":
-    Migration.run()
+    main()
@@ -1,3 +1,4 @@
 from . import base  # noqa
 from . import domain  # noqa
+from . import query_recorder  # noqa
 from . import postgres  # noqa
@@ -4,6 +4,7 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, List
 from pydantic import BaseModel, Field
 from typing import Optional, Annotated
+from viixoo_core.startup_profiler import StartupProfiler
 
 
 class BaseDBModel(BaseModel, ABC):
@@ -12,9 +13,91 @@ class BaseDBModel(BaseModel, ABC):
     __tablename__ = "table_name"  # Debe ser definido en cada modelo
     __description__ = "model_description"  # Debe ser definido en cada modelo
     __order__ = "id"  # Debe ser definido en cada modelo
+    # Full-text search, e.g. {"fields": {"name": "A", "description": "B"}, "language": "spanish"}
+    __fulltext__: Dict[str, Any] = {}
+    # Indexes, e.g. [{"columns": ["partner_id", "date"], "where": "active", "include": ["amount"]}]
+    __indexes__: List[Dict[str, Any]] = []
+    # Data change tracking of the track_changes fields, e.g. {"mode": "statement", "format": "jsonb"}
+    __tracking__: Dict[str, Any] = {}
+    # Partitioning, e.g. {"by": "range", "column": "date", "interval": "month", "retention": 12}
+    __partition__: Dict[str, Any] = {}
+    # Named database of the model instead of the one of its app, see DatabaseRegistry
+    __database__: str = ""
 
     id: Optional[Annotated[int, Field(json_schema_extra=dict(primary_key=True))]] = None
 
+    def __init_subclass__(cls, **kwargs):
+        """Start timing the creation of the model for the startup profiler."""
+        super().__init_subclass__(**kwargs)
+        StartupProfiler.start_model(cls)
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs):
+        """Record the creation of the model, once pydantic has built its schema."""
+        super().__pydantic_init_subclass__(**kwargs)
+        StartupProfiler.end_model(cls)
+
+    @classmethod
+    def get_fulltext_config(cls) -> Dict[str, Any]:
+        """Return the full-text search configuration of the model with its defaults.
+
+        ``fields`` may be a list of field names or a dict of field name -> weight (A, B, C or D).
+        ``html_fields`` lists the fields whose HTML tags are removed before indexing.
+        """
+        if not cls.__fulltext__:
+            return {}
+
+        fields = cls.__fulltext__.get("fields", {})
+        if isinstance(fields, (list, tuple)):
+            fields = {field: None for field in fields}
+
+        return {
+            "column": cls.__fulltext__.get("column", "search_vector"),
+            "language": cls.__fulltext__.get("language", "simple"),
+            "fields": fields,
+            "html_fields": list(cls.__fulltext__.get("html_fields", [])),
+        }
+
+    @classmethod
+    def get_tracking_config(cls) -> Dict[str, Any]:
+        """Return the data change tracking configuration of the model with its defaults.
+
+        ``mode`` is ``row`` to log the changes from a trigger per modified row, or
+        ``statement`` to log all the rows of a statement in one insert from its
+        transition tables. ``format`` is ``columns`` to log one row per changed
+        column, or ``jsonb`` to log one row per modified row with the changed
+        columns in ``old_data`` and ``new_data``.
+        """
+        return {
+            "mode": cls.__tracking__.get("mode", "row"),
+            "format": cls.__tracking__.get("format", "columns"),
+        }
+
+    @classmethod
+    def get_partition_config(cls) -> Dict[str, Any]:
+        """Return the partitioning configuration of the model with its defaults.
+
+        ``by`` is ``range``, ``list`` or ``hash``. Range partitions cover one
+        ``interval`` (``day``, ``month`` or ``year``) of ``column``: ``premake``
+        future partitions are created in advance, and the partitions older than
+        ``retention`` intervals are dropped or detached, as set by ``expire``. List
+        partitions are declared in ``values`` as partition suffix -> values, and hash
+        partitions by their ``modulus``.
+        """
+        if not cls.__partition__:
+            return {}
+
+        return {
+            "by": cls.__partition__.get("by", "range"),
+            "column": cls.__partition__.get("column"),
+            "interval": cls.__partition__.get("interval", "month"),
+            "premake": cls.__partition__.get("premake", 3),
+            "retention": cls.__partition__.get("retention", 0),
+            "expire": cls.__partition__.get("expire", "detach"),
+            "values": dict(cls.__partition__.get("values", {})),
+            "modulus": cls.__partition__.get("modulus", 4),
+        }
+
     @abstractmethod
     def get_connection(self):
         """Get the database connection."""
@@ -1,6 +1,14 @@
 """Domain translator for converting Odoo domains to SQL WHERE clauses."""
 
-from typing import List, Tuple, Any
+import json
+from typing import Dict, List, Tuple, Any
+
+# Immutable wrapper around ``unaccent`` created by the migrations, required to
+# build expression indexes over unaccented values.
+UNACCENT_FUNCTION = "viixoo_unaccent"
+
+# Text search configuration used when a full-text term does not give one
+TEXT_SEARCH_CONFIG = "simple"
 
 
 class DomainTranslator:
@@ -17,6 +25,10 @@ class DomainTranslator:
         "not like": "NOT LIKE",
         "ilike": "ILIKE",
         "not ilike": "NOT ILIKE",
+        "=like": "LIKE",
+        "=ilike": "ILIKE",
+        "unaccent_ilike": "LIKE",
+        "not unaccent_ilike": "NOT LIKE",
         "in": "IN",
         "not in": "NOT IN",
         "child_of": "IN",
@@ -26,21 +38,48 @@ class DomainTranslator:
         "contains": "LIKE",
         "is null": "IS NULL",
         "is not null": "IS NOT NULL",
+        "search": "@@",
+        "match": "@@",
         "any": "ANY",
         "not any": "NOT ANY",
+        "@>": "@>",
+        "<@": "<@",
+        "has_key": "?",
     }
 
+    # Operators comparing JSONB values, the other operators compare the text of a
+    # JSON path, see _json_path_cast
+    JSON_OPERATORS = ("@>", "<@", "has_key")
+
     @staticmethod
-    def translate(domain: List[Any]) -> str:
-        """Translate a domain into a SQL WHERE clause."""
+    def translate(domain: List[Any], casts: Dict[str, str] = None) -> str:
+        """Translate a domain into a SQL WHERE clause.
+
+        :param casts: SQL type by field, the values compared to the field are cast to
+            it. The values compared to a partition key must have its type, so the
+            planner prunes the partitions that can not hold them.
+        """
         if not domain:
             return "1=1", []
 
-        sql_conditions, params = DomainTranslator._parse_domain(domain)
+        sql_conditions, params = DomainTranslator._parse_domain(domain, casts)
         return f"WHERE {sql_conditions}", params
 
     @staticmethod
-    def _parse_domain(domain: List[Any]) -> Tuple[str, List[Any]]:
+    def _json_path_cast(value: Any) -> str:
+        """Return the cast of the text of a JSON path compared to a value."""
+        if isinstance(value, (list, tuple)):
+            value = value[0] if value else None
+        if isinstance(value, bool):
+            return "::boolean"
+        if isinstance(value, (int, float)):
+            return "::numeric"
+        return ""
+
+    @staticmethod
+    def _parse_domain(
+        domain: List[Any], casts: Dict[str, str] = None
+    ) -> Tuple[str, List[Any]]:
         """Parse a domain into a SQL WHERE clause."""
         if not domain:
             return "1=1", []
@@ -93,9 +132,35 @@ class DomainTranslator:
             elif isinstance(term, (list, tuple)) and len(term) == 3:
                 field, operator, value = term
                 sql_operator = DomainTranslator.TERM_OPERATORS_SQL.get(operator, "=")
+                placeholder = (
+                    f"%s::{casts[field]}" if casts and field in casts else "%s"
+                )
 
-                if operator in ("in", "not in") and isinstance(value, (list, tuple)):
-                    placeholders = ", ".join(["%s"] * len(value))
+                # JSON path in a JSONB field: ("attributes.size.width", ">", 10)
+                field, *path = field.split(".")
+                contains = path and operator == "=" and value is not None
+                if path and not contains:
+                    params.append(path)
+                    if operator in DomainTranslator.JSON_OPERATORS:
+                        field = f"({field} #> %s)"
+                    else:
+                        cast = DomainTranslator._json_path_cast(value)
+                        field = f"({field} #>> %s){cast}"
+
+                if contains:
+                    # Equality as containment, served by the GIN index of the field
+                    for key in reversed(path):
+                        value = {key: value}
+                    condition = f"{field} @> %s::jsonb"
+                    params.append(json.dumps(value, default=str))
+                elif operator in ("@>", "<@"):
+                    condition = f"{field} {sql_operator} %s::jsonb"
+                    params.append(json.dumps(value, default=str))
+                elif operator == "has_key":
+                    condition = f"{field} {sql_operator} %s"
+                    params.append(value)
+                elif operator in ("in", "not in") and isinstance(value, (list, tuple)):
+                    placeholders = ", ".join([placeholder] * len(value))
                     condition = f"{field} {sql_operator} ({placeholders})"
                     params.extend(value)
                 elif operator in (
@@ -115,6 +180,25 @@ class DomainTranslator:
                         value = f"%{value}%"
                     condition = f"{field} {sql_operator} %s"
                     params.append(value)
+                elif operator in ("=like", "=ilike"):
+                    # The pattern is used as given, without implicit wildcards
+                    condition = f"{field} {sql_operator} %s"
+                    params.append(value)
+                elif operator in ("unaccent_ilike", "not unaccent_ilike"):
+                    # Same expression as the trigram index built by the migrations
+                    condition = (
+                        f"{UNACCENT_FUNCTION}(lower({field})) {sql_operator} "
+                        f"{UNACCENT_FUNCTION}(lower(%s))"
+                    )
+                    params.append(value)
+                elif operator in ("search", "match"):
+                    # value is the search text or a (text search config, text) tuple
+                    if isinstance(value, (list, tuple)):
+                        config, value = value
+                    else:
+                        config = TEXT_SEARCH_CONFIG
+                    condition = f"{field} {sql_operator} websearch_to_tsquery(%s::regconfig, %s)"
+                    params.extend([config, value])
                 elif operator == "child_of":
                     condition = (
                         f"{field} IN (SELECT id FROM some_table WHERE parent_id = %s)"
@@ -123,7 +207,7 @@ class DomainTranslator:
                 elif operator in ("is null", "is not null"):
                     condition = f"{field} {sql_operator}"
                 else:
-                    condition = f"{field} {sql_operator} %s"
+                    condition = f"{field} {sql_operator} {placeholder}"
                     params.append(value)
 
                 sql_conditions.append(condition)
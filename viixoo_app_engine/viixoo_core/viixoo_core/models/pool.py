@@ -0,0 +1,81 @@
+"""Connection pool of the models, one per database in each worker process."""
+
+import threading
+import psycopg2
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+# Seconds waited for a free connection when all of them are in use
+POOL_TIMEOUT = 30
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """Connection returned to its pool when its ``with`` block ends.
+
+    The models use ``with self.get_connection() as conn``, which commits or rolls
+    back the transaction at the end of the block, as a plain psycopg2 connection.
+    """
+
+    pool = None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """End the transaction and return the connection to its pool."""
+        try:
+            return super().__exit__(exc_type, exc_value, traceback)
+        finally:
+            if self.pool is not None:
+                self.pool.putconn(self)
+
+
+class ConnectionPool(ThreadedConnectionPool):
+    """Thread safe pool that waits for a free connection instead of failing.
+
+    :param minconn: The connections opened with the pool
+    :param maxconn: The maximum connections open at the same time
+    :param timeout: Seconds waited for a free connection, see ``POOL_TIMEOUT``
+    """
+
+    def __init__(
+        self, minconn: int, maxconn: int, *args, timeout=POOL_TIMEOUT, **kwargs
+    ):
+        """Initialize the pool, the connections are ``PooledConnection``."""
+        self.timeout = timeout
+        self.available = threading.BoundedSemaphore(maxconn)
+        # Settings the pool was created with, and whether newer ones replaced it
+        self.options = {}
+        self.retired = False
+        kwargs.setdefault("connection_factory", PooledConnection)
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        # psycopg2 closes the returned connections beyond minconn, keep them all
+        # open once opened, to reuse them in the next requests
+        self.minconn = maxconn
+
+    def getconn(self, key=None):
+        """Return a free connection, replacing the connections closed by the server."""
+        if not self.available.acquire(timeout=self.timeout):
+            raise PoolError(f"No free connection after {self.timeout} seconds")
+        try:
+            conn = super().getconn(key)
+            if conn.closed:
+                super().putconn(conn, close=True)
+                conn = super().getconn(key)
+        except BaseException:
+            self.available.release()
+            raise
+        conn.pool = self
+        return conn
+
+    def putconn(self, conn, key=None, close=False):
+        """Return a connection to the pool, closing it if it is broken."""
+        conn.pool = None
+        try:
+            close = close or bool(conn.closed) or self.retired
+            super().putconn(conn, key, close=close)
+        finally:
+            self.available.release()
+
+    def retire(self):
+        """Close the idle connections, the ones in use are closed when returned."""
+        with self._lock:
+            self.retired = True
+            while self._pool:
+                self._pool.pop().close()
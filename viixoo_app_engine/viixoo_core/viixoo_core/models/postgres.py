@@ -1,47 +1,177 @@
 """Base model class for all models in the application."""
 
-import psycopg2
-import importlib
-from psycopg2.extras import RealDictCursor
-from psycopg2.sql import Identifier, SQL, Placeholder
-from typing import Dict, Any, List
+import os
+import time
+import uuid
+from enum import Enum
+from contextlib import contextmanager
+from pydantic import BaseModel
+from psycopg2.extras import RealDictCursor, Json
+from psycopg2.sql import Composed, Identifier, SQL, Placeholder, Literal
+from typing import Dict, Any, Iterator, List, Tuple
 from viixoo_core.models.base import BaseDBModel
 from viixoo_core.models.domain import DomainTranslator
-from viixoo_core.config import BaseConfig
+from viixoo_core.models.query_recorder import QueryRecorder
+from viixoo_core.models.pool import ConnectionPool
+from viixoo_core.models.registry import DatabaseRegistry
+from viixoo_core.models.replicas import ReplicaRouter
+from viixoo_core.models.transaction import Transaction, current_transactions
 
 
 db_connection = False
 
+# Rows fetched at once by the server-side cursors, see iter_batches
+EXPORT_BATCH_SIZE = 2000
+
+# Connection pools of this process by database, see get_pool
+connection_pools: Dict[tuple, ConnectionPool] = {}
+# Process that opened the pools, a forked worker opens its own
+pools_pid: int = os.getpid()
+
+# SQL type of the partition key by partitioned model, see get_domain_casts
+domain_casts: Dict[type, Dict[str, str]] = {}
+
+# Values of the Enum fields stored as SMALLINT codes by model, see get_enum_codes
+enum_codes: Dict[type, Dict[str, List[Any]]] = {}
+
+# JSONB fields by model, see get_json_fields
+json_fields: Dict[type, List[str]] = {}
+
+# SQL types of the columns by model, see get_column_types
+column_types: Dict[type, Dict[str, str]] = {}
+
+# Many2many and one2many relations by model, see get_relations
+relations: Dict[type, Dict[str, dict]] = {}
+
 
 class PostgresModel(BaseDBModel):
     """PostgreSQL Base model."""
 
-    def get_connection(self):
-        """Get database connexion."""
+    def get_connection(self, readonly: bool = False):
+        """Get database connexion.
+
+        :param readonly: The connection is only used to read, from a read replica of
+            the database if it has any, see ``ReplicaRouter``
+        """
         global db_connection
 
         if db_connection and not db_connection.closed:
             return db_connection
-        # Get the package name where the model is defined
-        package_name = self.__class__.__module__.split(".")
-
-        module = importlib.import_module(package_name[0])
-
-        # Get the base path of the package
-        basepath = module.__path__[0]
+        # Database of the app of the model, or of the tenant of the request
+        config = DatabaseRegistry.get_config(self.__class__)
+
+        # The queries of a transaction block use its connection, see transaction
+        transaction = Transaction.get_current(config)
+        if transaction is not None:
+            return transaction
+
+        if readonly:
+            conn = ReplicaRouter.get_connection(config, self.get_pool)
+            if conn is not None:
+                return conn
+        else:
+            # Read the writes of the request from the primary
+            ReplicaRouter.mark_written(config)
+
+        # Take a connection from the pool of the database of the configuration
+        return self.get_pool(config).getconn()
+
+    @classmethod
+    def get_pool(cls, config: Dict[str, Any]) -> ConnectionPool:
+        """Return the connection pool of the database of a configuration.
+
+        The pools belong to the process: a worker forked by the server opens its
+        own pools instead of sharing the sockets of its parent.
+        """
+        global pools_pid
 
-        # Load the configuration for the package
-        config = BaseConfig.get_config(base_path=basepath, module=package_name[1])
+        if pools_pid != os.getpid():
+            connection_pools.clear()
+            pools_pid = os.getpid()
 
-        # Establish the database connection using the configuration
-        connection = psycopg2.connect(
-            dbname=config["dbname"],
-            user=config["user"],
-            password=config["password"],
-            host=config["host"],
-            port=config["port"],
+        key = tuple(
+            config[param] for param in ("dbname", "user", "password", "host", "port")
         )
-        return connection
+        options = {
+            "connect_timeout": config.get("connect_timeout", 10),
+            "timeout": config.get("pool_timeout", 30),
+            "pool_min": config.get("pool_min", 1),
+            "pool_max": config.get("pool_max", 10),
+            "statement_timeout": config.get("statement_timeout", 0),
+        }
+        pool = connection_pools.get(key)
+        if pool is not None and pool.options != options:
+            # The settings were reloaded, the connections in use end with the old pool
+            pool.retire()
+            pool = None
+        if pool is None:
+            params = {}
+            if options["statement_timeout"]:
+                params["options"] = (
+                    f"-c statement_timeout={options['statement_timeout']}"
+                )
+            pool = connection_pools[key] = ConnectionPool(
+                options["pool_min"],
+                options["pool_max"],
+                timeout=options["timeout"],
+                dbname=config["dbname"],
+                user=config["user"],
+                password=config["password"],
+                host=config["host"],
+                port=config["port"],
+                connect_timeout=options["connect_timeout"],
+                **params,
+            )
+            pool.options = options
+        return pool
+
+    @classmethod
+    @contextmanager
+    def transaction(cls, statement_timeout: int = None, synchronous_commit: str = None):
+        """Run the queries of the block in one transaction of the database of the model.
+
+        The queries of the models of the same database in the block, including their
+        reads, use one connection and are committed once at the end of the block, or
+        rolled back if it raises an exception. A nested block is a savepoint: its
+        queries are rolled back alone if it raises an exception. For example::
+
+            with SaleOrder.transaction(synchronous_commit="off"):
+                order = SaleOrder(**values).create()
+                SaleOrderLine(order_id=order.id, **line).create()
+
+        :param statement_timeout: Milliseconds a statement may run before it is cancelled
+        :param synchronous_commit: ``off`` to commit without waiting for the WAL to be
+            flushed, see ``Transaction.set_options``
+        :return: The ``Transaction`` of the block
+        """
+        config = DatabaseRegistry.get_config(cls)
+        transaction = Transaction.get_current(config)
+        if transaction is not None:
+            with transaction.savepoint():
+                transaction.set_options(statement_timeout, synchronous_commit)
+                yield transaction
+            return
+
+        ReplicaRouter.mark_written(config)
+        conn = cls.get_pool(config).getconn()
+        transaction = Transaction(conn)
+        token = current_transactions.set(
+            {**current_transactions.get(), Transaction.get_key(config): transaction}
+        )
+        try:
+            # Commit or roll back once, and return the connection to its pool
+            with conn:
+                transaction.set_options(statement_timeout, synchronous_commit)
+                yield transaction
+        finally:
+            current_transactions.reset(token)
+
+    @classmethod
+    def close_pools(cls):
+        """Close the connection pools of this process, e.g. before forking the workers."""
+        while connection_pools:
+            _, pool = connection_pools.popitem()
+            pool.closeall()
 
     def load_model(
         self, model_class: BaseDBModel = None, domain: List[Any] = []
@@ -62,23 +192,299 @@ class PostgresModel(BaseDBModel):
         query_results = self.query_select(domain)
         return [model_class(**query_result) for query_result in query_results]
 
-    def query_select(
+    @classmethod
+    def get_domain_casts(cls) -> Dict[str, str]:
+        """Return the SQL type of the partition key of the model, to cast the domain values.
+
+        See ``DomainTranslator.translate``.
+        """
+        partition = cls.get_partition_config()
+        if not partition:
+            return {}
+
+        if cls not in domain_casts:
+            # Imported here, the migrations import the models
+            from viixoo_core.migrations import Migration
+
+            schema = Migration.pydantic_to_sql(cls)
+            domain_casts[cls] = {
+                partition["column"]: Migration.get_partition_key_type(schema)
+            }
+        return domain_casts[cls]
+
+    @classmethod
+    def get_enum_codes(cls) -> Dict[str, List[Any]]:
+        """Return the values of the Enum fields stored as SMALLINT codes, by field.
+
+        The code of a value is its position in the list.
+        """
+        if cls not in enum_codes:
+            # Imported here, the migrations import the models
+            from viixoo_core.migrations import Migration
+
+            schema = Migration.pydantic_to_sql(cls)
+            enum_codes[cls] = {
+                column: props["enum"]
+                for column, props in Migration.get_columns(schema).items()
+                if props.get("enum_storage") == "code"
+            }
+        return enum_codes[cls]
+
+    @classmethod
+    def get_json_fields(cls) -> List[str]:
+        """Return the fields stored as JSONB."""
+        if cls not in json_fields:
+            # Imported here, the migrations import the models
+            from viixoo_core.migrations import Migration
+
+            schema = Migration.pydantic_to_sql(cls)
+            json_fields[cls] = [
+                column
+                for column, props in Migration.get_columns(schema).items()
+                if props["type"] == "JSONB"
+            ]
+        return json_fields[cls]
+
+    @classmethod
+    def get_column_types(cls) -> Dict[str, str]:
+        """Return the SQL types of the columns of the table, by column, in the order of the model.
+
+        The Enum fields stored as codes have the type of their values, as they are
+        read, see ``decode_rows``.
+        """
+        if cls not in column_types:
+            # Imported here, the migrations import the models
+            from viixoo_core.migrations import Migration
+
+            schema = Migration.pydantic_to_sql(cls)
+            column_types[cls] = {
+                column: (
+                    "CHARACTER VARYING"
+                    if props.get("enum_storage") == "code"
+                    else props["type"]
+                )
+                for column, props in Migration.get_columns(schema).items()
+            }
+        return column_types[cls]
+
+    @classmethod
+    def get_relations(cls) -> Dict[str, dict]:
+        """Return the many2many and one2many relations of the model, by field.
+
+        See ``Migration.get_relation_config``.
+        """
+        if cls not in relations:
+            # Imported here, the migrations import the models
+            from viixoo_core.migrations import Migration
+
+            schema = Migration.pydantic_to_sql(cls)
+            relations[cls] = {
+                relation["field"]: relation
+                for relation in schema.get("__relations__", [])
+            }
+        return relations[cls]
+
+    @classmethod
+    def encode_value(cls, field: str, value: Any) -> Any:
+        """Return a value of a field as it is written in the database.
+
+        The values of the Enum fields stored as SMALLINT codes are replaced by their
+        code, see ``get_enum_codes``, and the values of the JSONB fields are adapted
+        as JSON.
+        """
+        if field in cls.get_json_fields() and value is not None:
+            if isinstance(value, BaseModel):
+                value = value.model_dump(mode="json")
+            return Json(value)
+        values = cls.get_enum_codes().get(field)
+        if not values or value is None:
+            return value
+        if isinstance(value, (list, tuple)):
+            return type(value)(cls.encode_value(field, item) for item in value)
+        return values.index(value.value if isinstance(value, Enum) else value)
+
+    @classmethod
+    def encode_rows(cls, rows: List[Dict]) -> List[Dict]:
+        """Return the rows with their values as written in the database, see ``encode_value``.
+
+        The relation fields are not columns of the table, see ``write_relations``.
+        """
+        if (
+            not cls.get_enum_codes()
+            and not cls.get_json_fields()
+            and not cls.get_relations()
+        ):
+            return rows
+        return [
+            {
+                field: cls.encode_value(field, value)
+                for field, value in row.items()
+                if field not in cls.get_relations()
+            }
+            for row in rows
+        ]
+
+    @classmethod
+    def decode_rows(cls, rows: List[Dict]) -> List[Dict]:
+        """Replace the codes of the Enum fields stored as codes by their values."""
+        codes = cls.get_enum_codes()
+        for row in rows if codes else []:
+            for field, values in codes.items():
+                if row.get(field) is not None:
+                    row[field] = values[row[field]]
+        return rows
+
+    @classmethod
+    def encode_domain(cls, domain: List[Any]) -> List[Any]:
+        """Replace the values compared to the Enum fields stored as codes by their codes."""
+        codes = cls.get_enum_codes()
+        if not codes:
+            return domain
+        return [
+            (
+                (term[0], term[1], cls.encode_value(term[0], term[2]))
+                if isinstance(term, (list, tuple))
+                and len(term) == 3
+                and term[0] in codes
+                else term
+            )
+            for term in domain
+        ]
+
+    def read_relations(
+        self, ids: List[int], fields: List[str] = None
+    ) -> Dict[str, Dict[int, List[int]]]:
+        """Read the related ids of many records, with one query per relation field.
+
+        :param ids: The ids of the records
+        :param fields: The relation fields to read, all by default
+        :return: By field, the related ids of each record. For example::
+            {"tag_ids": {1: [4, 5], 2: []}}
+        """
+        result = {}
+        with self.get_connection(readonly=True) as conn:
+            with conn.cursor() as cur:
+                for field, relation in self.get_relations().items():
+                    if fields is not None and field not in fields:
+                        continue
+                    if relation["type"] == "many2many":
+                        table = relation["relation"]
+                        key, related = relation["column1"], relation["column2"]
+                    else:
+                        table = relation["comodel"]
+                        key, related = relation["inverse"], "id"
+                    query = SQL(
+                        "SELECT {key}, array_agg({related} ORDER BY {related}) "
+                        "FROM {table} WHERE {key} = ANY(%s) GROUP BY {key}"
+                    ).format(
+                        key=Identifier(key),
+                        related=Identifier(related),
+                        table=Identifier(table),
+                    )
+                    cur.execute(query, (list(ids),))
+                    result[field] = {id_: [] for id_ in ids}
+                    result[field].update(dict(cur.fetchall()))
+        return result
+
+    def write_relations(self, values: Dict[str, Dict[int, List[Any]]]):
+        """Replace the related ids of many records, with two queries per relation field.
+
+        The related records are given by id or as models.
+
+        :param values: By field, the related ids of each record. For example::
+            {"tag_ids": {1: [4, 5], 2: []}}
+        """
+        model_relations = self.get_relations()
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                for field, records in values.items():
+                    relation = model_relations.get(field)
+                    if relation is None:
+                        raise ValueError(
+                            f"Field '{field}' is not a relation of '{self.__tablename__}'"
+                        )
+                    ids = list(records)
+                    pairs = [
+                        (id_, getattr(related, "id", related))
+                        for id_, related_ids in records.items()
+                        for related in related_ids
+                    ]
+                    keys = [pair[0] for pair in pairs]
+                    related = [pair[1] for pair in pairs]
+                    if relation["type"] == "many2many":
+                        names = dict(
+                            table=Identifier(relation["relation"]),
+                            key=Identifier(relation["column1"]),
+                            related=Identifier(relation["column2"]),
+                        )
+                        cur.execute(
+                            SQL(
+                                "DELETE FROM {table} WHERE {key} = ANY(%s) AND ({key}, {related}) "
+                                "NOT IN (SELECT * FROM unnest(%s::bigint[], %s::bigint[]))"
+                            ).format(**names),
+                            (ids, keys, related),
+                        )
+                        cur.execute(
+                            SQL(
+                                "INSERT INTO {table} ({key}, {related}) "
+                                "SELECT * FROM unnest(%s::bigint[], %s::bigint[]) "
+                                "ON CONFLICT DO NOTHING"
+                            ).format(**names),
+                            (keys, related),
+                        )
+                    else:
+                        names = dict(
+                            table=Identifier(relation["comodel"]),
+                            key=Identifier(relation["inverse"]),
+                        )
+                        cur.execute(
+                            SQL(
+                                "UPDATE {table} SET {key} = NULL "
+                                "WHERE {key} = ANY(%s) AND NOT (id = ANY(%s))"
+                            ).format(**names),
+                            (ids, related),
+                        )
+                        cur.execute(
+                            SQL(
+                                "UPDATE {table} SET {key} = v.key "
+                                "FROM unnest(%s::bigint[], %s::bigint[]) AS v(key, id) "
+                                "WHERE {table}.id = v.id"
+                            ).format(**names),
+                            (keys, related),
+                        )
+
+    def split_relations(
+        self, rows: List[Dict], ids: List[int], skip_empty: bool = False
+    ) -> Dict[str, Dict[int, List[Any]]]:
+        """Return the values of the relation fields of the rows written in the records ``ids``.
+
+        :param skip_empty: Ignore the empty relations, for new records
+        """
+        values = {}
+        for field in self.get_relations():
+            records = {
+                id_: row[field]
+                for id_, row in zip(ids, rows)
+                if field in row and (row[field] or not skip_empty)
+            }
+            if records:
+                values[field] = records
+        return values
+
+    def get_select_query(
         self,
         columns: List[str] = False,
         domain: List[Any] = [],
         limit: int = 0,
         offset: int = 0,
-    ) -> List[Dict]:
-        """Select the given columns from the table. Filter by domain. If no domain is given, return all rows.
+    ) -> Tuple[Composed, List[Any]]:
+        """Return the query selecting the given columns of the rows of the domain, and its parameters.
 
-        :param columns: A list of column names to select
-        :param domain: A list of tuples, each containing a field name, an operator and a value. For example::
-            [('name', '=', 'John'), ('age', '>', 30)]
-        :param limit: The maximum number of rows to return
-        :param offset: The number of rows to skip before returning rows
-        :return: A list of dictionaries, each representing a row in the table
+        See ``query_select``.
         """
-        where_clause, params = DomainTranslator.translate(domain)
+        where_clause, params = DomainTranslator.translate(
+            self.encode_domain(domain), self.get_domain_casts()
+        )
         query = SQL(
             "SELECT {fields} FROM {table} {where_clause} LIMIT {limit} OFFSET {offset}"
         ).format(
@@ -88,10 +494,80 @@ class PostgresModel(BaseDBModel):
             limit=SQL(limit) if limit != 0 else SQL("ALL"),
             offset=SQL(offset) if offset != 0 else SQL("0"),
         )
-        with self.get_connection() as conn:
+        return query, params
+
+    def query_select(
+        self,
+        columns: List[str] = False,
+        domain: List[Any] = [],
+        limit: int = 0,
+        offset: int = 0,
+    ) -> List[Dict]:
+        """Select the given columns from the table. Filter by domain. If no domain is given, return all rows.
+
+        :param columns: A list of column names to select
+        :param domain: A list of tuples, each containing a field name, an operator and a value. For example::
+            [('name', '=', 'John'), ('age', '>', 30)]
+        :param limit: The maximum number of rows to return
+        :param offset: The number of rows to skip before returning rows
+        :return: A list of dictionaries, each representing a row in the table
+        """
+        query, params = self.get_select_query(columns, domain, limit, offset)
+        with self.get_connection(readonly=True) as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                start = time.perf_counter()
                 cur.execute(query, params)
-                return cur.fetchall()
+                rows = cur.fetchall()
+                self.record_query(cur, query, params, domain, start)
+                return self.decode_rows(rows)
+
+    def iter_batches(
+        self,
+        columns: List[str] = False,
+        domain: List[Any] = [],
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> Iterator[List[Dict]]:
+        """Read the given columns of the rows of the domain by batches, with a server-side cursor.
+
+        Only one batch of rows is in memory at a time, e.g. to export a large table.
+        The connection is held until the generator is exhausted or closed.
+
+        :param columns: A list of column names to select
+        :param domain: A list of tuples, each containing a field name, an operator and a value. For example::
+            [('name', '=', 'John'), ('age', '>', 30)]
+        :param batch_size: The number of rows fetched from the server at once
+        :return: A generator of lists of dictionaries
+        """
+        query, params = self.get_select_query(columns, domain)
+        with self.get_connection(readonly=True) as conn:
+            name = f"viixoo_export_{uuid.uuid4().hex}"
+            with conn.cursor(name=name, cursor_factory=RealDictCursor) as cur:
+                cur.itersize = batch_size
+                cur.execute(query, params)
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        return
+                    yield self.decode_rows(rows)
+
+    def record_query(self, cursor, query, params: List[Any], domain, start: float):
+        """Record the executed domain for the index advisor, if it is enabled.
+
+        :param cursor: The cursor used to execute the query
+        :param query: The query executed
+        :param params: The parameters of the query
+        :param domain: The domain translated in the query
+        :param start: The ``time.perf_counter()`` value before the execution
+        """
+        if QueryRecorder.enabled:
+            QueryRecorder.record(
+                self.__tablename__,
+                domain,
+                time.perf_counter() - start,
+                cursor,
+                query,
+                params,
+            )
 
     def query_insert(self, rows: List[Dict] = []) -> List[Dict]:
         """Insert the given rows into the table.
@@ -101,6 +577,7 @@ class PostgresModel(BaseDBModel):
         """
         if not rows:
             rows = [self.model_dump()]
+        rows = self.encode_rows(rows)
 
         cols = list(rows[0].keys())
         query = SQL("INSERT INTO {table} ({cols}) VALUES %s RETURNING id").format(
@@ -124,12 +601,15 @@ class PostgresModel(BaseDBModel):
         """
         if not rows:
             rows = [self.model_dump()]
+        rows = self.encode_rows(rows)
 
         params = []
         where_clause = ""
 
         if domain:
-            where_clause, params = DomainTranslator.translate(domain)
+            where_clause, params = DomainTranslator.translate(
+                self.encode_domain(domain), self.get_domain_casts()
+            )
 
         setters = set(rows[0].keys())
         query = SQL(
@@ -144,8 +624,11 @@ class PostgresModel(BaseDBModel):
         values = [[row[col] for col in setters] for row in rows]
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                start = time.perf_counter()
                 cur.execute(query, values + params)
-                return cur.fetchall()
+                updated = cur.fetchall()
+                self.record_query(cur, query, values + params, domain, start)
+                return updated
 
     def query_delete(self, domain: List[Any]) -> bool:
         """Delete the given rows from the table.
@@ -159,20 +642,26 @@ class PostgresModel(BaseDBModel):
         if not domain:
             raise ValueError("Domain is required to delete rows.")
 
-        where_clause, params = DomainTranslator.translate(domain)
+        where_clause, params = DomainTranslator.translate(
+            self.encode_domain(domain), self.get_domain_casts()
+        )
         query = SQL("DELETE FROM {table} {where_clause}").format(
             table=Identifier(self.__tablename__),
             where_clause=SQL(where_clause),
         )
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                start = time.perf_counter()
                 cur.execute(query, params)
+                self.record_query(cur, query, params, domain, start)
                 return True
 
     def write(self, rows: List[Dict] = [], domain: List[Any] = []) -> List[int]:
         """Write the given rows to the table.
 
         If the table has a primary key, it will be used to update existing rows.
+        The relation fields of the first row replace the relations of all the rows
+        written, see ``write_relations``.
 
         :param rows: A list of dictionaries
         :param domain: A list of tuples, each containing a field name, an operator and a value. For example::
@@ -185,7 +674,18 @@ class PostgresModel(BaseDBModel):
         if not domain:
             domain = [("id", "=", self.id)]
 
-        return self.query_update(rows, domain)
+        model_relations = self.get_relations()
+        if any(field not in model_relations for field in rows[0]):
+            written = self.query_update(rows, domain)
+        else:
+            # The records to write, not the ones of a replica behind the primary
+            with ReplicaRouter.use_primary():
+                written = self.query_select(["id"], domain)
+        ids = [row["id"] for row in written]
+        values = self.split_relations(rows[:1] * len(ids), ids)
+        if values:
+            self.write_relations(values)
+        return written
 
     def create(self, rows: List[Dict] = []) -> BaseDBModel:
         """
@@ -198,6 +698,9 @@ class PostgresModel(BaseDBModel):
             rows = [self.model_dump()]
 
         ids = self.query_insert(rows)
+        values = self.split_relations(rows, [id_["id"] for id_ in ids], skip_empty=True)
+        if values:
+            self.write_relations(values)
         domain = [("id", "=", id_["id"]) for id_ in ids]
         return self.load_model(self.__class__, domain)[0]
 
@@ -216,6 +719,44 @@ class PostgresModel(BaseDBModel):
         query_results = self.query_select(domain, limit=limit, offset=offset)
         return query_results
 
+    def search_ranked(
+        self, text: str, domain: List[Any] = [], limit: int = 0, offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search in the model, ordered by relevance. Filter by domain.
+
+        The model must define ``__fulltext__``. Each row has a ``rank`` key with its ``ts_rank``.
+
+        :param text: The search text, in web search syntax. For example: ``"john -doe"``
+        :param domain: A list of tuples, each containing a field name, an operator and a value. For example::
+            [('name', '=', 'John'), ('age', '>', 30)]
+        :param limit: The maximum number of rows to return
+        :param offset: The number of rows to skip
+        :return: A list of dictionaries
+        """
+        fulltext = self.get_fulltext_config()
+        if not fulltext:
+            raise ValueError(f"Full-text search not defined in '{self.__tablename__}'")
+
+        search_term = (fulltext["column"], "search", (fulltext["language"], text))
+        where_clause, params = DomainTranslator.translate(
+            [search_term] + self.encode_domain(domain), self.get_domain_casts()
+        )
+        query = SQL(
+            "SELECT *, ts_rank({column}, websearch_to_tsquery(%s::regconfig, %s)) AS rank "
+            "FROM {table} {where_clause} ORDER BY rank DESC LIMIT {limit} OFFSET {offset}"
+        ).format(
+            column=Identifier(fulltext["column"]),
+            table=Identifier(self.__tablename__),
+            where_clause=SQL(where_clause),
+            limit=Literal(limit) if limit else SQL("ALL"),
+            offset=Literal(offset),
+        )
+        with self.get_connection(readonly=True) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(query, [fulltext["language"], text] + params)
+                return self.decode_rows(cur.fetchall())
+
     def search_load(self, domain: List[Any] = []) -> List[BaseDBModel]:
         """
         Read the given rows from the table. Filter by domain. If no domain is given, return all rows.
@@ -0,0 +1,156 @@
+"""Recorder of the domains executed by the models, used by the index advisor."""
+
+import os
+import json
+import atexit
+import random
+import threading
+from typing import Any, Dict, List, Optional
+
+ENABLED_VALUES = ("1", "true", "yes")
+SQL_EXPLAIN = "EXPLAIN (FORMAT JSON) "
+# Savepoint isolating the EXPLAIN from the transaction of the recorded query
+EXPLAIN_SAVEPOINT = "viixoo_explain"
+
+
+class QueryRecorder:
+    """Aggregate the shape, frequency and latency of the executed domains per table.
+
+    Opt-in with the ``VIIXOO_INDEX_ADVISOR`` environment variable. A sample of the
+    queries, ``VIIXOO_INDEX_ADVISOR_SAMPLE_RATE`` (0.01 by default), is explained
+    with ``EXPLAIN (FORMAT JSON)`` to find sequential scans. Each process writes its
+    stats to ``<VIIXOO_INDEX_ADVISOR_PATH>/advisor-<pid>.json``, read by the
+    ``viixoo_index_advisor`` command.
+    """
+
+    enabled: bool = os.getenv("VIIXOO_INDEX_ADVISOR", "").lower() in ENABLED_VALUES
+    sample_rate: float = float(os.getenv("VIIXOO_INDEX_ADVISOR_SAMPLE_RATE", 0.01))
+    path: str = os.getenv("VIIXOO_INDEX_ADVISOR_PATH", ".viixoo_index_advisor")
+    flush_every: int = 100
+
+    stats: Dict[str, Dict[str, dict]] = {}
+    pending: int = 0
+    lock = threading.Lock()
+
+    @classmethod
+    def domain_shape(cls, domain: List[Any]) -> List[Any]:
+        """Return the domain without its values, e.g. ``[["name", "="], "|", ["age", ">"]]``."""
+        shape = []
+        for term in domain or []:
+            if isinstance(term, (list, tuple)) and len(term) == 3:
+                shape.append([term[0], term[1]])
+            else:
+                shape.append(term)
+        return shape
+
+    @classmethod
+    def record(
+        cls,
+        table: str,
+        domain: List[Any],
+        duration: float,
+        cursor=None,
+        query=None,
+        params: List[Any] = None,
+    ):
+        """Record an executed domain.
+
+        :param table: The table queried
+        :param domain: The domain executed
+        :param duration: The execution time in seconds
+        :param cursor: The cursor used, to explain a sample of the queries
+        :param query: The query executed
+        :param params: The parameters of the query
+        """
+        shape = cls.domain_shape(domain)
+        key = json.dumps(shape)
+
+        seq_scan = None
+        if (
+            cursor is not None
+            and query is not None
+            and random.random() < cls.sample_rate
+        ):
+            seq_scan = cls.explain_seq_scan(cursor, table, query, params)
+
+        with cls.lock:
+            entry = cls.stats.setdefault(table, {}).setdefault(
+                key,
+                {
+                    "shape": shape,
+                    "count": 0,
+                    "total_time": 0.0,
+                    "max_time": 0.0,
+                    "explained": 0,
+                    "seq_scans": 0,
+                },
+            )
+            entry["count"] += 1
+            entry["total_time"] += duration
+            entry["max_time"] = max(entry["max_time"], duration)
+            if seq_scan is not None:
+                entry["explained"] += 1
+                entry["seq_scans"] += int(seq_scan)
+
+            cls.pending += 1
+            flush = cls.pending >= cls.flush_every
+
+        if flush:
+            cls.flush()
+
+    @classmethod
+    def explain_seq_scan(
+        cls, cursor, table: str, query, params: List[Any]
+    ) -> Optional[bool]:
+        """Return True if the plan of the query has a sequential scan on the table, None if it can not be explained.
+
+        The EXPLAIN runs in the transaction of the query, e.g. after an UPDATE, inside
+        a savepoint, so an error rolls back the EXPLAIN alone and never the query.
+        """
+        try:
+            explain = SQL_EXPLAIN + cursor.mogrify(query, params).decode()
+            cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        except Exception as e:
+            print(f"❌ Error explaining query on '{table}': {e}")
+            return None
+
+        try:
+            cursor.execute(explain)
+            row = cursor.fetchone()
+        except Exception as e:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            print(f"❌ Error explaining query on '{table}': {e}")
+            return None
+        cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+
+        plan = row["QUERY PLAN"] if isinstance(row, dict) else row[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return cls.has_seq_scan(plan[0]["Plan"], table)
+
+    @classmethod
+    def has_seq_scan(cls, plan: dict, table: str) -> bool:
+        """Walk an ``EXPLAIN (FORMAT JSON)`` plan looking for a sequential scan on the table."""
+        if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") == table:
+            return True
+        return any(cls.has_seq_scan(child, table) for child in plan.get("Plans", []))
+
+    @classmethod
+    def flush(cls):
+        """Write the stats of this process to its file in the advisor path."""
+        with cls.lock:
+            cls.pending = 0
+            if not cls.stats:
+                return
+            data = json.dumps(cls.stats)
+
+        os.makedirs(cls.path, exist_ok=True)
+        file_path = os.path.join(cls.path, f"advisor-{os.getpid()}.json")
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+
+
+if QueryRecorder.enabled:
+    atexit.register(QueryRecorder.flush)
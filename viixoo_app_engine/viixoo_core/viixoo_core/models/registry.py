@@ -0,0 +1,174 @@
+"""Registry of the databases of the apps, models and tenants."""
+
+import importlib
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Set
+from starlette.responses import JSONResponse
+from viixoo_core.config import BaseConfig
+
+# Tenant of the current request, see DatabaseRegistry.use_tenant
+current_tenant: ContextVar[Optional[str]] = ContextVar("current_tenant", default=None)
+
+
+class DatabaseRegistry:
+    """Map the apps and models to named databases, resolved once per process.
+
+    The database of an app is named after the app and its configuration is read
+    with ``BaseConfig.get_settings`` the first time one of its models connects. Models
+    declaring ``__database__`` use that database instead, e.g. a database shared by
+    all the tenants. During a request with a tenant, see ``use_tenant``, the other
+    models use the database of the app with the overrides of the tenant, e.g.
+    another ``dbname``, so one worker serves many tenant databases, each with its
+    pool.
+    """
+
+    # Configuration of the databases, by name
+    databases: Dict[str, Dict[str, Any]] = {}
+    # Database of the apps, by app name
+    apps: Dict[str, str] = {}
+    # Overrides of the database configuration of the tenants, by tenant
+    tenants: Dict[str, Dict[str, Any]] = {}
+    # Apps whose database was read from their settings, of BaseConfig.version
+    resolved_apps: Set[str] = set()
+    config_version: int = 0
+    # Serializes the reads of the settings of the apps by the threads of the workers
+    lock = threading.Lock()
+
+    @classmethod
+    def register_database(cls, name: str, config: Dict[str, Any]):
+        """Register a named database.
+
+        :param name: The name of the database, used by ``register_app`` and ``__database__``
+        :param config: The connection configuration, see ``DatabaseSettings``
+        """
+        cls.databases[name] = config
+
+    @classmethod
+    def register_app(cls, app: str, database: str):
+        """Use a registered database for the models of an app."""
+        if database not in cls.databases:
+            raise ValueError(f"Database '{database}' not registered")
+        cls.apps[app] = database
+
+    @classmethod
+    def register_tenant(cls, tenant: str, **overrides):
+        """Register a tenant with the overrides of its database configuration.
+
+        For example, a database per tenant in the same server::
+
+            DatabaseRegistry.register_tenant("acme", dbname="acme")
+        """
+        cls.tenants[tenant] = overrides
+
+    @classmethod
+    def reset(cls):
+        """Forget the registered databases, apps and tenants."""
+        with cls.lock:
+            cls.databases.clear()
+            cls.apps.clear()
+            cls.tenants.clear()
+            cls.resolved_apps.clear()
+
+    @classmethod
+    @contextmanager
+    def use_tenant(cls, tenant: Optional[str]):
+        """Route the connections of the block, and of its tasks, to a tenant."""
+        if tenant is not None and tenant not in cls.tenants:
+            raise ValueError(f"Tenant '{tenant}' not registered")
+        token = current_tenant.set(tenant)
+        try:
+            yield
+        finally:
+            current_tenant.reset(token)
+
+    @classmethod
+    def get_app_database(cls, model_class: type) -> str:
+        """Return the database of the app of a model, reading its settings once.
+
+        The databases read from the settings are read again when they are reloaded,
+        see ``BaseConfig.reload``. The registry is only changed under ``lock``, so
+        the threads resolving an app at the same time read its settings once.
+        """
+        BaseConfig.check_files()
+        # Get the package name where the model is defined
+        package_name = model_class.__module__.split(".")
+        app = package_name[1]
+        if cls.config_version == BaseConfig.version:
+            database = cls.apps.get(app)
+            if database is not None:
+                return database
+
+        with cls.lock:
+            if cls.config_version != BaseConfig.version:
+                for resolved_app in cls.resolved_apps:
+                    cls.apps.pop(resolved_app, None)
+                    cls.databases.pop(resolved_app, None)
+                cls.resolved_apps.clear()
+                cls.config_version = BaseConfig.version
+
+            # Resolved by another thread while this one waited for the lock
+            database = cls.apps.get(app)
+            if database is not None:
+                return database
+
+            module = importlib.import_module(package_name[0])
+            # Load the settings for the package from its base path
+            settings = BaseConfig.get_settings(base_path=module.__path__[0], module=app)
+            cls.register_database(app, settings.model_dump())
+            cls.register_app(app, app)
+            cls.resolved_apps.add(app)
+            return app
+
+    @classmethod
+    def get_config(cls, model_class: type) -> Dict[str, Any]:
+        """Return the connection configuration of a model for the current tenant."""
+        database = getattr(model_class, "__database__", None)
+        if database:
+            if database not in cls.databases:
+                raise ValueError(f"Database '{database}' not registered")
+            return cls.databases[database]
+
+        config = cls.databases[cls.get_app_database(model_class)]
+        tenant = current_tenant.get()
+        if tenant is None:
+            return config
+        return {**config, **cls.tenants[tenant]}
+
+
+class TenantMiddleware:
+    """Route the requests to the tenant of a header, e.g. ``X-Tenant: acme``.
+
+    The requests without the header use the databases of the apps, and the ones of
+    an unknown tenant are rejected with a 400 error.
+    """
+
+    def __init__(self, app, header: str = "x-tenant"):
+        """Initialize a TenantMiddleware instance.
+
+        :param app: The ASGI application
+        :param header: The header with the tenant of the request
+        """
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        """Run the request with the tenant of its header."""
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        tenant = dict(scope["headers"]).get(self.header)
+        if tenant is None:
+            await self.app(scope, receive, send)
+            return
+
+        tenant = tenant.decode("latin-1")
+        if tenant not in DatabaseRegistry.tenants:
+            response = JSONResponse({"detail": "Unknown tenant"}, status_code=400)
+            await response(scope, receive, send)
+            return
+
+        with DatabaseRegistry.use_tenant(tenant):
+            await self.app(scope, receive, send)
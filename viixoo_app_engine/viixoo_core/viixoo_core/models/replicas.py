@@ -0,0 +1,149 @@
+"""Routing of the read queries of the models to the read replicas of their database."""
+
+import os
+import math
+import time
+import threading
+import psycopg2
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+from psycopg2.extensions import parse_dsn
+
+# Seconds between the lag checks of each replica
+LAG_CHECK_INTERVAL = 5
+
+# Seconds the replica is behind the primary, 0 when it replayed all the WAL received
+LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+# Primary databases written in the current request, see ReplicaRouter.mark_written
+written_databases: ContextVar[FrozenSet[tuple]] = ContextVar(
+    "written_databases", default=frozenset()
+)
+# Read all the databases from their primary, see ReplicaRouter.use_primary
+primary_only: ContextVar[bool] = ContextVar("primary_only", default=False)
+
+
+class ReplicaRouter:
+    """Choose the read replica of the read queries of a database.
+
+    The replicas of a database are its ``replicas`` DSNs, e.g.
+    ``host=replica1 port=5433``, with the other connection parameters of the
+    primary. The read queries use them in turn, skipping the replicas behind the
+    primary by more than ``replica_max_lag`` seconds or unavailable, and use the
+    primary when none is left. Once a request writes to a database, its next reads
+    use the primary, to read its own writes.
+    """
+
+    check_interval: float = float(
+        os.getenv("VIIXOO_REPLICA_CHECK_INTERVAL", LAG_CHECK_INTERVAL)
+    )
+    # Lag in seconds and time of the last check of the replicas, by replica
+    lags: Dict[tuple, Tuple[float, float]] = {}
+    # Read queries routed to the replicas of each database, to use them in turn
+    counters: Dict[tuple, int] = {}
+    lock = threading.Lock()
+
+    @classmethod
+    def get_key(cls, config: Dict[str, Any]) -> tuple:
+        """Return the key of the database of a configuration."""
+        return (config["host"], config["port"], config["dbname"])
+
+    @classmethod
+    def get_replica_config(cls, config: Dict[str, Any], dsn: str) -> Dict[str, Any]:
+        """Return the configuration of a replica, the primary one with its DSN."""
+        params = parse_dsn(dsn)
+        if "port" in params:
+            params["port"] = int(params["port"])
+        return {**config, **params, "replicas": []}
+
+    @classmethod
+    def mark_written(cls, config: Dict[str, Any]):
+        """Read the database from the primary for the rest of the request."""
+        written = written_databases.get()
+        key = cls.get_key(config)
+        if key not in written:
+            written_databases.set(written | {key})
+
+    @classmethod
+    def is_written(cls, config: Dict[str, Any]) -> bool:
+        """Check whether the current request must read the database from the primary."""
+        return primary_only.get() or cls.get_key(config) in written_databases.get()
+
+    @classmethod
+    @contextmanager
+    def use_primary(cls):
+        """Read all the databases from their primary in the block."""
+        token = primary_only.set(True)
+        try:
+            yield
+        finally:
+            primary_only.reset(token)
+
+    @classmethod
+    def reset(cls):
+        """Forget the lags of the replicas."""
+        cls.lags.clear()
+        cls.counters.clear()
+
+    @classmethod
+    def get_lag(cls, replica: Dict[str, Any], get_pool: Callable) -> float:
+        """Return the lag of a replica in seconds, checked every ``check_interval``.
+
+        :param replica: The configuration of the replica
+        :param get_pool: Returns the connection pool of a configuration
+        :return: The lag, infinite when the replica is unavailable
+        """
+        key = cls.get_key(replica)
+        now = time.monotonic()
+        lag, checked_at = cls.lags.get(key, (0, -math.inf))
+        if now - checked_at < cls.check_interval:
+            return lag
+
+        try:
+            with get_pool(replica).getconn() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(LAG_QUERY)
+                    lag = float(cur.fetchone()[0])
+        except psycopg2.Error as e:
+            print(f"⚠️ Replica {key[0]}:{key[1]} unavailable: {e}")
+            lag = math.inf
+        cls.lags[key] = (lag, now)
+        return lag
+
+    @classmethod
+    def get_connection(
+        cls, config: Dict[str, Any], get_pool: Callable
+    ) -> Optional[Any]:
+        """Return a connection to a replica of a database for a read query.
+
+        :param config: The configuration of the primary
+        :param get_pool: Returns the connection pool of a configuration
+        :return: The connection, None to read from the primary
+        """
+        dsns = config.get("replicas")
+        if not dsns or cls.is_written(config):
+            return None
+
+        key = cls.get_key(config)
+        with cls.lock:
+            start = cls.counters.get(key, 0)
+            cls.counters[key] = start + 1
+
+        max_lag = config.get("replica_max_lag", 10)
+        for index in range(len(dsns)):
+            replica = cls.get_replica_config(config, dsns[(start + index) % len(dsns)])
+            if cls.get_lag(replica, get_pool) > max_lag:
+                continue
+            try:
+                return get_pool(replica).getconn()
+            except psycopg2.Error as e:
+                print(f"⚠️ Replica {replica['host']}:{replica['port']} unavailable: {e}")
+                cls.lags[cls.get_key(replica)] = (math.inf, time.monotonic())
+        return None
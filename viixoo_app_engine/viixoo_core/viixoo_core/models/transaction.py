@@ -0,0 +1,91 @@
+"""Explicit transactions of the models, see ``PostgresModel.transaction``."""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+SYNCHRONOUS_COMMIT_VALUES = ("on", "off", "local", "remote_write", "remote_apply")
+
+# Open transactions of the current request or task, by database, see get_key
+current_transactions: ContextVar[Dict[tuple, "Transaction"]] = ContextVar(
+    "current_transactions", default={}
+)
+
+
+class Transaction:
+    """Connection bound to a ``with PostgresModel.transaction()`` block.
+
+    The queries of the models of its database in the block use this connection
+    instead of one of their own, so they are committed once at the end of the
+    block, or rolled back together. It is used as the connections returned by
+    ``get_connection``, but its ``with`` blocks do not commit.
+    """
+
+    def __init__(self, conn):
+        """Initialize a Transaction instance.
+
+        :param conn: The connection of the transaction, with its transaction open
+        """
+        self.conn = conn
+        self.savepoints = 0
+
+    @staticmethod
+    def get_key(config: Dict[str, Any]) -> tuple:
+        """Return the key of the database of a configuration."""
+        return (config["host"], config["port"], config["dbname"])
+
+    @classmethod
+    def get_current(cls, config: Dict[str, Any]) -> Optional["Transaction"]:
+        """Return the open transaction of the database of a configuration, if any."""
+        return current_transactions.get().get(cls.get_key(config))
+
+    def __enter__(self):
+        """Return the connection of the transaction."""
+        return self.conn
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Keep the transaction open, it ends with its ``transaction`` block."""
+        return False
+
+    def set_options(
+        self, statement_timeout: int = None, synchronous_commit: str = None
+    ):
+        """Set the options of the rest of the transaction.
+
+        :param statement_timeout: Milliseconds a statement may run before it is cancelled
+        :param synchronous_commit: Whether the commit waits for the WAL to be flushed, e.g.
+            ``off`` for the writes that can be lost on a crash of the server, without
+            corrupting the database, to commit them faster
+        """
+        options = {}
+        if statement_timeout is not None:
+            options["statement_timeout"] = str(int(statement_timeout))
+        if synchronous_commit is not None:
+            if synchronous_commit not in SYNCHRONOUS_COMMIT_VALUES:
+                raise ValueError(
+                    f"Invalid synchronous_commit '{synchronous_commit}', "
+                    f"expected one of: {', '.join(SYNCHRONOUS_COMMIT_VALUES)}"
+                )
+            options["synchronous_commit"] = synchronous_commit
+        if not options:
+            return
+
+        with self.conn.cursor() as cur:
+            for name, value in options.items():
+                cur.execute("SELECT set_config(%s, %s, true)", (name, value))
+
+    @contextmanager
+    def savepoint(self):
+        """Roll back the queries of the block alone if it raises an exception."""
+        self.savepoints += 1
+        name = f"viixoo_savepoint_{self.savepoints}"
+        with self.conn.cursor() as cur:
+            cur.execute(f"SAVEPOINT {name}")
+        try:
+            yield self
+        except BaseException:
+            with self.conn.cursor() as cur:
+                cur.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            raise
+        with self.conn.cursor() as cur:
+            cur.execute(f"RELEASE SAVEPOINT {name}")
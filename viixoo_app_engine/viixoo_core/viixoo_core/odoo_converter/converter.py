@@ -119,6 +119,8 @@ class OdooModelParser:
                 args["relation_field"] = node.args[1].value
             if len(node.args) > 2 and isinstance(node.args[2], ast.Constant):
                 args["relation_table"] = node.args[2].value
+            if len(node.args) > 3 and isinstance(node.args[3], ast.Constant):
+                args["column2"] = node.args[3].value
 
         # Extract keyword arguments
         for kw in node.keywords:
@@ -380,6 +382,36 @@ class PydanticModelGenerator:
                 depends_doc=depends_doc,
             )
 
+    def _get_relation_extra(
+        self, field_type: str, comodel: str, field_args: dict
+    ) -> str:
+        """Return the json_schema_extra declaring a One2many or Many2many relation.
+
+        The positional arguments of Many2many are (comodel, relation, column1,
+        column2) and the ones of One2many (comodel, inverse_name).
+        """
+        extra = {}
+        if field_type == "Many2many":
+            extra["many2many"] = comodel.replace(".", "_")
+            positional = (
+                field_args.get("relation_field"),
+                field_args.get("relation_table"),
+            )
+            relation = field_args.get("relation") or positional[0]
+            column1 = field_args.get("column1") or positional[1]
+            if relation:
+                extra["relation"] = relation
+            if column1:
+                extra["column1"] = column1
+            if field_args.get("column2"):
+                extra["column2"] = field_args["column2"]
+        else:
+            extra["one2many"] = comodel.replace(".", "_")
+            extra["inverse"] = field_args.get("inverse_name") or field_args.get(
+                "relation_field"
+            )
+        return f"dict({', '.join(f'{key}={value!r}' for key, value in extra.items())})"
+
     def _generate_model_class(
         self, model_name, model_info: dict, model_names: Dict[str, str]
     ) -> str:
@@ -467,6 +499,9 @@ class PydanticModelGenerator:
                     python_type = f"List[{related_model}]"
                     self.has_lists = True
                     field_args["default_factory"] = "list"
+                    field_args["json_schema_extra"] = self._get_relation_extra(
+                        field_type, comodel, field_args
+                    )
                 elif field_type == "Many2one":
                     related_model = model_names.get(comodel, "Any")
                     if related_model == "Any":
@@ -518,6 +553,10 @@ class PydanticModelGenerator:
             field_params = []
             if "string" in field_args:
                 field_params.append(f'description="{field_args["string"]}"')
+            if field_args.get("json_schema_extra"):
+                field_params.append(
+                    f'json_schema_extra={field_args["json_schema_extra"]}'
+                )
 
             # Handle default factory functions
             for arg_name, arg_value in field_args.items():
@@ -1,7 +1,13 @@
 """Base controller class for all controllers in the application."""
 
-from fastapi import APIRouter
-from typing import List, Callable
+import inspect
+import functools
+from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Iterable, List, Callable
+from starlette.responses import Response, StreamingResponse
+from viixoo_core.models.postgres import EXPORT_BATCH_SIZE
+from viixoo_core.routes.export import ModelExporter
+from viixoo_core.routes.serializer import STREAM_CHUNK_SIZE, JSONSerializer
 
 
 class BaseController:
@@ -11,15 +17,90 @@ class BaseController:
         """Initialize a BaseController instance."""
         self.router = router
 
-    def add_route(self, path: str, func: Callable, methods: List[str] = ["GET"]):
+    def add_route(
+        self,
+        path: str,
+        func: Callable,
+        methods: List[str] = ["GET"],
+        fast_json: bool = False,
+    ):
         """Register a route dynamically within the controller.
 
         :param path: route path
         :param func: route function
         :param methods: HTTP methods
+        :param fast_json: serialize the result of the function with ``json_response``,
+            instead of validating and encoding it with FastAPI
         """
+        if fast_json:
+            func = self.fast_json(func)
         self.router.add_api_route(path, func, methods=methods)
 
+    def add_export_route(
+        self,
+        path: str,
+        model_class: type,
+        domain: List[Any] = [],
+        columns: List[str] = False,
+        formats: List[str] = ["ndjson", "csv"],
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ):
+        """Register a GET route streaming the rows of a model, see ``ModelExporter``.
+
+        The format is chosen with the ``format`` query parameter, the first of
+        ``formats`` by default, e.g. ``GET /orders/export?format=csv``.
+
+        :param path: route path
+        :param model_class: ``PostgresModel`` class to export
+        :param domain: domain of the rows exported, all by default
+        :param columns: columns exported, all by default
+        :param formats: export formats allowed, ``ndjson``, ``csv`` or ``arrow``
+        :param batch_size: rows read and serialized at once
+        """
+        for export_format in formats:
+            ModelExporter.check_format(export_format)
+
+        def export(export_format: str = Query(formats[0], alias="format")):
+            if export_format not in formats:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unknown export format '{export_format}'",
+                )
+            return ModelExporter.response(
+                model_class, domain, export_format, columns, batch_size
+            )
+
+        export.__doc__ = f"Export the rows of {model_class.__tablename__}."
+        self.router.add_api_route(path, export, methods=["GET"])
+
+    def fast_json(self, func: Callable) -> Callable:
+        """Wrap a route function to return its result with ``json_response``.
+
+        The responses returned by the function are returned as they are. The
+        signature of the function is kept, for its parameters and documentation.
+
+        :param func: route function
+        """
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                result = await func(*args, **kwargs)
+                if isinstance(result, Response):
+                    return result
+                return self.json_response(result)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            return self.json_response(result)
+
+        return wrapper
+
     def success_response(self, data: dict):
         """Return a response with a success message and data.
 
@@ -34,3 +115,24 @@ class BaseController:
         :param status_code: HTTP status code
         """
         return {"status": "error", "message": message, "status_code": status_code}
+
+    def json_response(self, data: Any, status_code: int = 200) -> Response:
+        """Return a JSON response, skipping the validation and encoding of FastAPI.
+
+        :param data: models, lists of models or rows, see ``JSONSerializer.dumps``
+        :param status_code: HTTP status code
+        """
+        return JSONSerializer.response(data, status_code)
+
+    def stream_response(
+        self, items: Iterable[Any], chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> StreamingResponse:
+        """Return a response streaming the items as a JSON array.
+
+        The items are read and serialized while the response is sent, e.g. from a
+        generator of rows, without building the whole list or document in memory.
+
+        :param items: items of the array
+        :param chunk_size: items serialized at once
+        """
+        return JSONSerializer.stream(items, chunk_size)
@@ -0,0 +1,251 @@
+"""Streamed exports of the models, as NDJSON, CSV or Arrow IPC."""
+
+import io
+import re
+import csv
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+from viixoo_core.models.postgres import EXPORT_BATCH_SIZE
+from viixoo_core.routes.serializer import JSONSerializer
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+# Media type and file extension of each export format
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+
+# SQL type of the migrations -> pyarrow type factory and its arguments, the other
+# types are exported as strings, see ModelExporter.get_arrow_type
+ARROW_TYPES = {
+    "SMALLINT": ("int16", ()),
+    "INTEGER": ("int32", ()),
+    "BIGINT": ("int64", ()),
+    "SERIAL": ("int32", ()),
+    "BIGSERIAL": ("int64", ()),
+    "BOOLEAN": ("bool_", ()),
+    "REAL": ("float32", ()),
+    "DOUBLE PRECISION": ("float64", ()),
+    "BYTEA": ("binary", ()),
+    "DATE": ("date32", ()),
+    "TIMESTAMP WITHOUT TIME ZONE": ("timestamp", ("us",)),
+    "TIMESTAMP": ("timestamp", ("us",)),
+    "TIME WITHOUT TIME ZONE": ("time64", ("us",)),
+    "INTERVAL": ("duration", ("us",)),
+}
+
+
+class ExportResponse(StreamingResponse):
+    """Stream the chunks of a generator, closing it when the client disconnects.
+
+    Each chunk is produced in a thread once the previous one is sent, so a slow
+    client slows down the reads instead of filling the memory. When the client
+    disconnects, the generator is closed, which releases its cursor and connection.
+    """
+
+    def __init__(self, content: Iterator[bytes], **kwargs):
+        """Initialize an ExportResponse instance.
+
+        :param content: A generator of the chunks of the body
+        """
+        super().__init__(content, **kwargs)
+        self.content = content
+
+    async def __call__(self, scope, receive, send):
+        """Send the response, then close the generator, also if it was cancelled."""
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await run_in_threadpool(self.content.close)
+
+
+class ModelExporter:
+    """Export the rows of a model, read by batches with a server-side cursor."""
+
+    @classmethod
+    def get_scalar(cls, value: Any) -> Any:
+        """Return a value of a row as a CSV or Arrow value, JSON for the JSON fields."""
+        if isinstance(value, Enum):
+            return value.value
+        if isinstance(value, dict):
+            return JSONSerializer.dumps(value).decode()
+        return value
+
+    @classmethod
+    def iter_ndjson(cls, batches: Iterable[List[Dict]]) -> Iterator[bytes]:
+        """Serialize the batches of rows to JSON lines, one chunk per batch."""
+        for rows in batches:
+            yield b"".join(JSONSerializer.dumps(row) + b"\n" for row in rows)
+
+    @classmethod
+    def iter_csv(
+        cls, batches: Iterable[List[Dict]], fieldnames: List[str]
+    ) -> Iterator[bytes]:
+        """Serialize the batches of rows to CSV with a header, one chunk per batch.
+
+        :param fieldnames: The columns of the header when there are no rows, the
+            header has the columns of the first row otherwise
+        """
+        buffer = io.StringIO()
+        writer = None
+        for rows in batches:
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+                writer.writeheader()
+            for row in rows:
+                writer.writerow(
+                    {
+                        key: (
+                            JSONSerializer.dumps(value).decode()
+                            if isinstance(value, list)
+                            else cls.get_scalar(value)
+                        )
+                        for key, value in row.items()
+                    }
+                )
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if writer is None:
+            csv.writer(buffer).writerow(fieldnames)
+            yield buffer.getvalue().encode()
+
+    @classmethod
+    def get_fields(
+        cls, model_class: type, columns: List[str] = False
+    ) -> Dict[str, str]:
+        """Return the SQL types of the columns exported, by column.
+
+        :param columns: The columns exported, all the columns of the model by default
+        """
+        types = model_class.get_column_types()
+        return {column: types.get(column, "TEXT") for column in columns or types}
+
+    @classmethod
+    def get_arrow_type(cls, sql_type: str):
+        """Return the Arrow type of a SQL type, string for the text and JSON types."""
+        if sql_type.endswith("[]"):
+            return pyarrow.list_(cls.get_arrow_type(sql_type[:-2]))
+        numeric = re.match(r"NUMERIC\((\d+),\s*(\d+)\)", sql_type)
+        if numeric:
+            return pyarrow.decimal128(int(numeric.group(1)), int(numeric.group(2)))
+        factory, args = ARROW_TYPES.get(sql_type, ("string", ()))
+        return getattr(pyarrow, factory)(*args)
+
+    @classmethod
+    def get_arrow_schema(cls, fields: Dict[str, str]):
+        """Return the Arrow schema of the columns exported, see ``get_fields``."""
+        return pyarrow.schema(
+            [
+                (column, cls.get_arrow_type(sql_type))
+                for column, sql_type in fields.items()
+            ]
+        )
+
+    @classmethod
+    def iter_arrow(cls, batches: Iterable[List[Dict]], schema) -> Iterator[bytes]:
+        """Serialize the batches of rows to an Arrow IPC stream, one record batch each.
+
+        The schema is the one of the model, not inferred from the rows, so a column
+        that is NULL in the first batch keeps its type in the next ones.
+
+        :param schema: The Arrow schema, see ``get_arrow_schema``
+        """
+        sink = io.BytesIO()
+        writer = pyarrow.ipc.new_stream(sink, schema)
+        text_columns = {
+            field.name for field in schema if pyarrow.types.is_string(field.type)
+        }
+        for rows in batches:
+            rows = [
+                {
+                    key: (
+                        JSONSerializer.dumps(value).decode()
+                        if key in text_columns and isinstance(value, list)
+                        else cls.get_scalar(value)
+                    )
+                    for key, value in row.items()
+                }
+                for row in rows
+            ]
+            writer.write_batch(pyarrow.RecordBatch.from_pylist(rows, schema=schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+        writer.close()
+        yield sink.getvalue()
+
+    @classmethod
+    def iter_export(
+        cls,
+        batches: Iterator[List[Dict]],
+        export_format: str,
+        model_class: type,
+        columns: List[str] = False,
+    ) -> Iterator[bytes]:
+        """Serialize the batches of rows to a format, closing their cursor at the end.
+
+        :param model_class: The ``PostgresModel`` class exported, for the header and
+            the schema of the columns when the format has one
+        :param columns: The columns exported, all by default
+        """
+        try:
+            if export_format == "csv":
+                fieldnames = list(cls.get_fields(model_class, columns))
+                yield from cls.iter_csv(batches, fieldnames)
+            elif export_format == "arrow":
+                schema = cls.get_arrow_schema(cls.get_fields(model_class, columns))
+                yield from cls.iter_arrow(batches, schema)
+            else:
+                yield from cls.iter_ndjson(batches)
+        finally:
+            batches.close()
+
+    @classmethod
+    def check_format(cls, export_format: str):
+        """Check an export format is known and its dependencies are installed."""
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(
+                f"Unknown export format '{export_format}', "
+                f"expected one of: {', '.join(EXPORT_FORMATS)}"
+            )
+        if export_format == "arrow" and pyarrow is None:
+            raise ValueError("The Arrow export requires pyarrow")
+
+    @classmethod
+    def response(
+        cls,
+        model_class: type,
+        domain: List[Any] = [],
+        export_format: str = "ndjson",
+        columns: List[str] = False,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> ExportResponse:
+        """Return a response streaming the rows of a model.
+
+        :param model_class: The ``PostgresModel`` class to export
+        :param domain: A list of tuples, each containing a field name, an operator and a value. For example::
+            [('name', '=', 'John'), ('age', '>', 30)]
+        :param export_format: ``ndjson``, ``csv`` or ``arrow``
+        :param columns: The columns exported, all by default
+        :param batch_size: The rows read and serialized at once
+        """
+        cls.check_format(export_format)
+        batches = model_class.model_construct().iter_batches(
+            columns, domain, batch_size
+        )
+        media_type, extension = EXPORT_FORMATS[export_format]
+        filename = f"{model_class.__tablename__}.{extension}"
+        return ExportResponse(
+            cls.iter_export(batches, export_format, model_class, columns),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
@@ -0,0 +1,91 @@
+"""JSON serialization of the responses, without the validation and encoding of FastAPI."""
+
+from typing import Any, Dict, Iterable, Iterator, List
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json, to_jsonable_python
+from starlette.responses import Response, StreamingResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Items serialized at once in the streamed JSON arrays
+STREAM_CHUNK_SIZE = 500
+
+
+class JSONSerializer:
+    """Serialize the data of the responses to JSON bytes in one pass.
+
+    The lists of models of the same class are serialized by a cached
+    ``TypeAdapter`` of the list, the other data, e.g. the rows of ``query_select``,
+    by orjson when it is installed, or by pydantic-core. The values are encoded as
+    in the JSON mode of Pydantic, e.g. ``Decimal`` as a string.
+    """
+
+    # TypeAdapter of the lists of each model class
+    adapters: Dict[type, TypeAdapter] = {}
+
+    @classmethod
+    def get_adapter(cls, model_class: type) -> TypeAdapter:
+        """Return the TypeAdapter of the lists of a model class."""
+        adapter = cls.adapters.get(model_class)
+        if adapter is None:
+            adapter = cls.adapters[model_class] = TypeAdapter(List[model_class])
+        return adapter
+
+    @classmethod
+    def dumps(cls, data: Any) -> bytes:
+        """Serialize data to JSON.
+
+        :param data: A model, a list of models, or JSON compatible data, e.g. rows
+        """
+        if isinstance(data, BaseModel):
+            return data.__pydantic_serializer__.to_json(data)
+        if isinstance(data, list) and data and isinstance(data[0], BaseModel):
+            model_class = type(data[0])
+            if all(type(item) is model_class for item in data):
+                return cls.get_adapter(model_class).dump_json(data)
+        if orjson is not None:
+            return orjson.dumps(
+                data, default=to_jsonable_python, option=orjson.OPT_NON_STR_KEYS
+            )
+        return to_json(data)
+
+    @classmethod
+    def iter_array(
+        cls, items: Iterable[Any], chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """Serialize the items to a JSON array, by chunks, reading them lazily.
+
+        :param items: The items of the array, e.g. a generator of models or rows
+        :param chunk_size: The items serialized at once
+        """
+        yield b"["
+        chunk = []
+        first = True
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield (b"" if first else b",") + cls.dumps(chunk)[1:-1]
+                first = False
+                chunk = []
+        if chunk:
+            yield (b"" if first else b",") + cls.dumps(chunk)[1:-1]
+        yield b"]"
+
+    @classmethod
+    def response(cls, data: Any, status_code: int = 200) -> Response:
+        """Return a JSON response of data, see ``dumps``."""
+        return Response(
+            cls.dumps(data), status_code=status_code, media_type="application/json"
+        )
+
+    @classmethod
+    def stream(
+        cls, items: Iterable[Any], chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> StreamingResponse:
+        """Return a response streaming the items as a JSON array, see ``iter_array``."""
+        return StreamingResponse(
+            cls.iter_array(items, chunk_size), media_type="application/json"
+        )
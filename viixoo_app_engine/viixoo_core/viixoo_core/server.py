@@ -0,0 +1,285 @@
+"""Production server. Preload the application once and fork its workers.
+
+Run it with::
+
+    viixoo_serve --host 0.0.0.0 --port 8000 --workers 4
+
+The application and its apps are imported once by the master process, before the
+workers are forked, so the workers share the imported code copy-on-write instead
+of importing it again. Each worker serves the shared socket with uvicorn and opens
+its own connection pools. Signals of the master: ``SIGTERM`` and ``SIGINT`` stop
+the workers gracefully, ``SIGHUP`` replaces them without dropping requests and
+``SIGUSR1`` reloads the settings of the workers, see ``BaseConfig.reload``.
+"""
+
+import os
+import time
+import signal
+import socket
+import argparse
+import importlib
+import traceback
+from typing import Any, Dict, List
+from viixoo_core.config import BaseConfig
+from viixoo_core.models.postgres import PostgresModel
+
+# Seconds given to the workers to finish their requests when they are stopped
+GRACEFUL_TIMEOUT = 30
+# Workers exiting sooner after their start are respawned after this delay, in seconds
+RESPAWN_DELAY = 1
+
+
+def get_default_workers() -> int:
+    """Return the number of CPUs available to the process."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+WORKERS: int = int(os.getenv("VIIXOO_WORKERS", 0)) or get_default_workers()
+
+
+class PreforkServer:
+    """Master process of the pre-fork server, that keeps its workers running."""
+
+    def __init__(
+        self,
+        app: str = "viixoo_core.app:app",
+        host: str = "0.0.0.0",
+        port: int = 8000,
+        workers: int = WORKERS,
+        graceful_timeout: int = GRACEFUL_TIMEOUT,
+        max_requests: int = 0,
+        backlog: int = 2048,
+    ):
+        """Initialize a PreforkServer instance.
+
+        :param app: The application to serve, as ``module:attribute``
+        :param host: The host to bind
+        :param port: The port to bind
+        :param workers: The number of worker processes
+        :param graceful_timeout: Seconds given to the workers to finish their requests
+        :param max_requests: Requests served by a worker before it is replaced, 0 for no limit
+        :param backlog: The maximum number of pending connections of the socket
+        """
+        self.app_path = app
+        self.host = host
+        self.port = port
+        self.workers_count = max(workers, 1)
+        self.graceful_timeout = graceful_timeout
+        self.max_requests = max_requests
+        self.backlog = backlog
+
+        self.app = None
+        self.socket = None
+        self.running = False
+        # Start time of the workers, by pid
+        self.workers: Dict[int, float] = {}
+        self.signals: List[int] = []
+
+    def load_app(self) -> Any:
+        """Import the application with its apps, in the master process."""
+        module_name, _, attribute = self.app_path.partition(":")
+        module = importlib.import_module(module_name)
+        self.app = getattr(module, attribute or "app")
+        # The workers open their own connections, none is inherited from the master
+        PostgresModel.close_pools()
+        return self.app
+
+    def bind(self) -> socket.socket:
+        """Open the listening socket shared by the workers."""
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(self.backlog)
+        sock.set_inheritable(True)
+        return sock
+
+    def spawn_worker(self) -> int:
+        """Fork a worker, return its pid in the master."""
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return pid
+
+        exit_code = 0
+        try:
+            self.run_worker()
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def run_worker(self):
+        """Serve the shared socket with uvicorn, in a worker process."""
+        import uvicorn
+
+        for sig in (signal.SIGUSR1, signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, signal.SIG_DFL)
+        BaseConfig.install_reload_signal()
+
+        print(f"👷 Worker started: {os.getpid()}")
+        config = uvicorn.Config(
+            self.app,
+            timeout_graceful_shutdown=self.graceful_timeout,
+            limit_max_requests=self.max_requests or None,
+        )
+        uvicorn.Server(config).run(sockets=[self.socket])
+
+    def handle_signal(self, sig: int, frame):
+        """Queue a signal received by the master, handled by its loop."""
+        self.signals.append(sig)
+
+    def reap_workers(self):
+        """Forget the workers that exited, to respawn them."""
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if not pid:
+                return
+
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            code = (
+                os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+            )
+            # uvicorn raises the stop signal again once the worker is shut down
+            if code in (0, -signal.SIGTERM, -signal.SIGINT):
+                print(f"👋 Worker exited: {pid}")
+                continue
+            print(f"⚠️ Worker {pid} exited with code {code}")
+            if self.running and time.monotonic() - started < RESPAWN_DELAY:
+                # Do not respawn in a loop the workers failing at startup
+                time.sleep(RESPAWN_DELAY)
+
+    def reload_workers(self):
+        """Reload the settings of the workers, without restarting them."""
+        print(f"🔄 Reloading the settings of {len(self.workers)} workers...")
+        for pid in list(self.workers):
+            self.kill_worker(pid, signal.SIGHUP)
+
+    def restart_workers(self):
+        """Replace the workers: start the new ones, then stop the old ones gracefully."""
+        old_workers = list(self.workers)
+        print(f"🔄 Restarting {len(old_workers)} workers...")
+        for _ in range(self.workers_count):
+            self.spawn_worker()
+        for pid in old_workers:
+            self.kill_worker(pid, signal.SIGTERM)
+
+    def kill_worker(self, pid: int, sig: int):
+        """Send a signal to a worker, if it is still running."""
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            self.workers.pop(pid, None)
+
+    def stop_workers(self):
+        """Stop the workers gracefully, kill the ones still running after the timeout."""
+        for pid in list(self.workers):
+            self.kill_worker(pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self.reap_workers()
+            time.sleep(0.1)
+
+        for pid in list(self.workers):
+            print(f"💀 Killing worker {pid}")
+            self.kill_worker(pid, signal.SIGKILL)
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self.workers.pop(pid, None)
+
+    def run(self):
+        """Preload the application, fork the workers and keep them running."""
+        self.socket = self.bind()
+        self.load_app()
+        print(
+            f"🚀 Serving {self.app_path} on {self.host}:{self.port} with "
+            f"{self.workers_count} workers, master {os.getpid()}"
+        )
+
+        for sig in (signal.SIGHUP, signal.SIGUSR1, signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self.handle_signal)
+
+        self.running = True
+        try:
+            while self.running:
+                while self.signals:
+                    sig = self.signals.pop(0)
+                    if sig == signal.SIGHUP:
+                        self.restart_workers()
+                    elif sig == signal.SIGUSR1:
+                        self.reload_workers()
+                    else:
+                        self.running = False
+                if not self.running:
+                    break
+
+                self.reap_workers()
+                while len(self.workers) < self.workers_count:
+                    self.spawn_worker()
+                time.sleep(0.2)
+        finally:
+            print("🛑 Stopping workers...")
+            self.stop_workers()
+            self.socket.close()
+
+
+def setup_parser():
+    """Set up the argument parser for the server."""
+    parser = argparse.ArgumentParser(
+        description="Serve the application with preloaded apps and forked workers."
+    )
+    parser.add_argument(
+        "--app",
+        default="viixoo_core.app:app",
+        help="Application to serve, as module:attribute (default: viixoo_core.app:app)",
+    )
+    parser.add_argument("--host", default="0.0.0.0", help="Host (default: 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=8000, help="Port (default: 8000)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help="Worker processes (default: VIIXOO_WORKERS or the number of CPUs)",
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=GRACEFUL_TIMEOUT,
+        help=f"Seconds to finish the requests when stopping (default: {GRACEFUL_TIMEOUT})",
+    )
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=0,
+        help="Requests served by a worker before it is replaced (default: no limit)",
+    )
+    return parser
+
+
+def main():
+    """Execute the main entry point for the server."""
+    args = setup_parser().parse_args()
+    PreforkServer(
+        app=args.app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        graceful_timeout=args.graceful_timeout,
+        max_requests=args.max_requests,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Startup profiler. Time the imports of the apps, their routes and their models.
+
+Enable it for ``viixoo_run`` with ``VIIXOO_PROFILE_STARTUP=1``, or profile the
+startup once, failing when it takes longer than a budget, with::
+
+    viixoo_profile_startup --output startup-trace.json --max-ms 3000
+
+The trace opens in ``chrome://tracing`` or https://ui.perfetto.dev.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+ENABLED_VALUES = ("1", "true", "yes")
+
+
+class StartupProfiler:
+    """Record the duration of the startup steps as Chrome trace events.
+
+    The steps are the import of each app, the registration of its routes and the
+    creation of each model class. When enabled, ``finish`` prints a report of the
+    slowest steps and writes the trace to
+    ``<VIIXOO_PROFILE_STARTUP_PATH>/startup-<pid>.json``.
+    """
+
+    enabled: bool = os.getenv("VIIXOO_PROFILE_STARTUP", "").lower() in ENABLED_VALUES
+    path: str = os.getenv("VIIXOO_PROFILE_STARTUP_PATH", ".viixoo_startup_profile")
+    # File of the trace, instead of the file of the process in the profile path
+    trace_file: str = None
+    top: int = 20
+
+    origin: float = time.perf_counter()
+    events: List[Dict[str, Any]] = []
+    # Start of the models being created, by class id
+    model_starts: Dict[int, float] = {}
+    lock = threading.Lock()
+
+    @classmethod
+    def add_event(cls, name: str, category: str, start: float, end: float):
+        """Record a complete event of the trace.
+
+        :param name: The name of the step
+        :param category: The kind of step, ``import``, ``routes`` or ``model``
+        :param start: The start of the step, from ``time.perf_counter``
+        :param end: The end of the step, from ``time.perf_counter``
+        """
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - cls.origin) * 1e6),
+            "dur": round((end - start) * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        with cls.lock:
+            cls.events.append(event)
+
+    @classmethod
+    @contextmanager
+    def span(cls, name: str, category: str):
+        """Time the block as a step of the startup, if the profiler is enabled."""
+        if not cls.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.add_event(name, category, start, time.perf_counter())
+
+    @classmethod
+    def start_model(cls, model: type):
+        """Mark the start of the creation of a model class."""
+        if cls.enabled:
+            cls.model_starts[id(model)] = time.perf_counter()
+
+    @classmethod
+    def end_model(cls, model: type):
+        """Record the creation of a model class, started by ``start_model``."""
+        start = cls.model_starts.pop(id(model), None)
+        if start is not None:
+            name = f"{model.__module__}.{model.__qualname__}"
+            cls.add_event(name, "model", start, time.perf_counter())
+
+    @classmethod
+    def get_trace(cls) -> Dict[str, Any]:
+        """Return the recorded events in the Chrome trace format."""
+        with cls.lock:
+            events = sorted(cls.events, key=lambda e: e["ts"])
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    @classmethod
+    def get_total(cls) -> float:
+        """Return the time in seconds since the profiler started."""
+        return time.perf_counter() - cls.origin
+
+    @classmethod
+    def format_report(cls) -> str:
+        """Return the ``top`` slowest steps and the time of each kind of step."""
+        with cls.lock:
+            events = sorted(cls.events, key=lambda e: e["dur"], reverse=True)
+
+        totals = {}
+        for event in events:
+            totals[event["cat"]] = totals.get(event["cat"], 0) + event["dur"]
+
+        lines = [f"⏱️ Startup: {cls.get_total() * 1000:.1f} ms"]
+        for category, total in sorted(totals.items(), key=lambda t: -t[1]):
+            lines.append(f"    {category}: {total / 1000:.1f} ms")
+        lines.append(f"🐢 Slowest {min(cls.top, len(events))} steps:")
+        for event in events[: cls.top]:
+            lines.append(
+                f"    {event['dur'] / 1000:9.1f} ms  {event['cat']:<7} {event['name']}"
+            )
+        return "\n".join(lines)
+
+    @classmethod
+    def write_trace(cls) -> str:
+        """Write the trace, to the file of this process in the profile path by default."""
+        file_path = cls.trace_file
+        if file_path is None:
+            os.makedirs(cls.path, exist_ok=True)
+            file_path = os.path.join(cls.path, f"startup-{os.getpid()}.json")
+
+        with open(file_path, "w") as f:
+            json.dump(cls.get_trace(), f)
+        return file_path
+
+    @classmethod
+    def finish(cls):
+        """Print the report and write the trace, if the profiler is enabled."""
+        if not cls.enabled:
+            return
+        print(cls.format_report())
+        print(f"📄 Startup trace written to {cls.write_trace()}")
+
+
+def setup_parser():
+    """Set up the argument parser for the startup profiler."""
+    parser = argparse.ArgumentParser(
+        description="Profile the startup of the application."
+    )
+    parser.add_argument(
+        "--output",
+        default="startup-trace.json",
+        help="File of the Chrome trace (default: startup-trace.json)",
+    )
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=0,
+        help="Fail when the startup takes longer, in milliseconds (default: no limit)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="Number of slowest steps reported (default: 20)",
+    )
+    return parser
+
+
+def main():
+    """Execute the main entry point for the startup profiler."""
+    args = setup_parser().parse_args()
+
+    # The class used by the application, also when run with ``python -m``
+    profiler = importlib.import_module("viixoo_core.startup_profiler").StartupProfiler
+    profiler.enabled = True
+    profiler.trace_file = args.output
+    profiler.top = args.top
+    # The application finishes the profile once its apps are loaded
+    profiler.origin = time.perf_counter()
+    importlib.import_module("viixoo_core.app")
+    total = profiler.get_total() * 1000
+
+    if args.max_ms and total > args.max_ms:
+        print(f"🚨 Startup took {total:.1f} ms, more than {args.max_ms:.1f} ms.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()